@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark the transcription backends (TRANSCRIPTION_BACKEND) on one fixed audio clip.
+
+For each installed backend: model load time, wall time per transcription (median of --runs),
+real-time factor, and word-timestamp drift against a reference - the first backend's words, or a
+--reference JSON of [{"word", "start", "end"}, ...]. Words are matched by text before comparing
+times. The transcript cache is bypassed, so every run really transcribes.
+
+The fixture is identified by the sha256 of its decoded 16 kHz samples (after --seconds), printed
+and written to the --json output; --expect-sha256 refuses to run on any other audio, so numbers
+from different machines are only compared on the same clip. openai-whisper transcribes clips of
+WHISPER_PARALLEL_MIN_S or more on CPU as parallel VAD chunks; --single-pass turns that off so the
+engines are compared on one-pass transcription.
+
+Usage:
+    python benchmark_transcription.py fixture.wav
+    python benchmark_transcription.py fixture.wav --backends openai-whisper faster-whisper --runs 3
+    python benchmark_transcription.py fixture.wav --seconds 60 --json results.json
+    python benchmark_transcription.py fixture.wav --single-pass --expect-sha256 <sha256 from an earlier run>
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+
+def _norm(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def segment_words(segments):
+    """Flatten Whisper-style segments into [{'word', 'start', 'end'}] in order."""
+    return [{"word": w["word"], "start": float(w["start"]), "end": float(w["end"])}
+            for seg in segments for w in (seg.get("words") or [])]
+
+
+def word_drift(reference, candidate):
+    """
+    Timestamp drift of candidate words against reference words, matched by normalized text.
+    Returns {'matched', 'reference_words', 'median_ms', 'p95_ms', 'max_ms'} over |start| and |end| errors.
+    """
+    ref_text = [_norm(w["word"]) for w in reference]
+    cand_text = [_norm(w["word"]) for w in candidate]
+    errors = []
+    matcher = difflib.SequenceMatcher(a=ref_text, b=cand_text, autojunk=False)
+    for block in matcher.get_matching_blocks():
+        for k in range(block.size):
+            r, c = reference[block.a + k], candidate[block.b + k]
+            if not ref_text[block.a + k]:
+                continue
+            errors += [abs(r["start"] - c["start"]), abs(r["end"] - c["end"])]
+    result = {"matched": len(errors) // 2, "reference_words": len(reference)}
+    if errors:
+        errors = np.array(errors) * 1000
+        result.update(median_ms=round(float(np.median(errors)), 1), p95_ms=round(float(np.percentile(errors, 95)), 1),
+                      max_ms=round(float(errors.max()), 1))
+    return result
+
+
+def fixture_info(app, path, audio):
+    """Identity of the benchmarked clip: file name, duration and sha256 of the decoded samples."""
+    return {"file": os.path.basename(path), "seconds": round(len(audio) / app.WHISPER_SAMPLE_RATE, 2),
+            "sample_rate": app.WHISPER_SAMPLE_RATE,
+            "pcm_sha256": hashlib.sha256(np.ascontiguousarray(audio, dtype=np.int16).tobytes()).hexdigest()}
+
+
+def openai_whisper_mode(app, audio):
+    """'single-pass' or 'chunked (N workers)': how openai-whisper will transcribe this clip here."""
+    workers = app.whisper_parallel_workers("large")
+    if (len(audio) >= app.WHISPER_PARALLEL_MIN_S * app.WHISPER_SAMPLE_RATE and workers > 1
+            and app._detect_whisper_device() == "cpu"):
+        return f"chunked ({workers} workers)"
+    return "single-pass"
+
+
+def benchmark_backend(app, name, audio, runs):
+    """Load (timed) and transcribe `runs` times with one backend; returns (stats, words of the last run)."""
+    backend = app.get_transcription_backend(name)
+    if backend.name != name:
+        return None, None
+    t0 = time.perf_counter()
+    segments, model_name = backend.transcribe(audio, None)  # first run includes loading the model
+    first = time.perf_counter() - t0
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        segments, model_name = backend.transcribe(audio, None)
+        times.append(time.perf_counter() - t0)
+    wall = statistics.median(times) if times else first
+    duration = len(audio) / app.WHISPER_SAMPLE_RATE
+    stats = {"backend": name, "model": model_name, "load_s": round(max(0.0, first - wall), 2),
+             "wall_s": round(wall, 2), "realtime_factor": round(wall / duration, 3),
+             "segments": len(segments)}
+    return stats, segment_words(segments)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare transcription backends on one audio clip")
+    parser.add_argument("audio", help="fixture audio/video file (use the same clip for every comparison)")
+    parser.add_argument("--backends", nargs="+", help="backends to run (default: every installed one)")
+    parser.add_argument("--runs", type=int, default=1, help="timed runs per backend after the first (default 1)")
+    parser.add_argument("--seconds", type=float, help="only use the first N seconds of the clip")
+    parser.add_argument("--reference", help="JSON list of reference words {word, start, end}")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--expect-sha256", help="stop unless the decoded clip has this pcm_sha256")
+    parser.add_argument("--single-pass", action="store_true",
+                        help="never split long clips into parallel chunks (openai-whisper)")
+    args = parser.parse_args()
+
+    import tiktok_full_gui as app
+
+    audio = app.decode_audio_16k(args.audio)
+    if args.seconds:
+        audio = audio[:int(args.seconds * app.WHISPER_SAMPLE_RATE)]
+    fixture = fixture_info(app, args.audio, audio)
+    if args.expect_sha256 and args.expect_sha256.lower() != fixture["pcm_sha256"]:
+        print(f"✗ {args.audio} decodes to pcm_sha256 {fixture['pcm_sha256']}, expected {args.expect_sha256}")
+        return 2
+    if args.single_pass:
+        app.WHISPER_PARALLEL_WORKERS = 1  # 1 = parallel transcription off
+    fixture["openai_whisper_mode"] = openai_whisper_mode(app, audio)
+    names = args.backends or [n for n, cls in app.TRANSCRIPTION_BACKENDS.items() if cls().available()]
+    reference = None
+    if args.reference:
+        with open(args.reference, encoding="utf-8") as f:
+            reference = json.load(f)
+
+    print("=" * 70)
+    print(f"Transcription benchmark: {args.audio} ({fixture['seconds']:.1f}s), "
+          f"device {app._detect_whisper_device()}")
+    print(f"pcm_sha256 {fixture['pcm_sha256']}")
+    print(f"openai-whisper: {fixture['openai_whisper_mode']}"
+          + ("" if args.single_pass or fixture["openai_whisper_mode"] == "single-pass" else " (--single-pass to compare one pass)"))
+    print("=" * 70)
+    results = []
+    for name in names:
+        print(f"\n[{name}] transcribing...")
+        try:
+            stats, words = benchmark_backend(app, name, audio, args.runs)
+        except Exception as e:
+            print(f"✗ {name} failed: {e}")
+            continue
+        if stats is None:
+            print(f"⚠ {name} is not installed - skipped")
+            continue
+        if reference is None:
+            reference = words
+            stats["drift"] = "reference"
+        else:
+            stats["drift"] = word_drift(reference, words)
+        results.append(stats)
+        print(f"✓ {stats}")
+
+    print("\n" + "=" * 70)
+    print(f"{'backend':<16}{'model':<34}{'load s':>8}{'wall s':>8}{'RTF':>7}{'drift med/p95 ms':>20}")
+    for r in results:
+        d = r["drift"]
+        drift = "reference" if d == "reference" else f"{d.get('median_ms', '-')}/{d.get('p95_ms', '-')}"
+        print(f"{r['backend']:<16}{r['model']:<34}{r['load_s']:>8}{r['wall_s']:>8}{r['realtime_factor']:>7}{drift:>20}")
+    print("=" * 70)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"fixture": fixture, "device": app._detect_whisper_device(), "results": results}, f, indent=2)
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
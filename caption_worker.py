@@ -0,0 +1,28 @@
+"""
+Worker side of batch caption rasterization (tiktok_full_gui.render_caption_sprites).
+
+The pool is started once per process with a forkserver/spawn context (so workers never inherit a
+lock that a GUI thread held at fork time) and kept for later jobs. init() receives the render
+function from the parent; render() turns one (RenderConfig, caption) task into raw RGBA bytes.
+Fonts are loaded once per worker by the render function's own font cache.
+"""
+
+import numpy as np
+
+_RENDER = None
+
+
+def init(render):
+    """Process pool initializer: keep the render function (generate_caption_image)."""
+    global _RENDER
+    _RENDER = render
+
+
+def render(task):
+    """Render one (config, text) task; returns (text, shape, raw RGBA bytes) or (text, None, None)."""
+    config, text = task
+    img = _RENDER(text, config=config)
+    if img is None:
+        return text, None, None
+    rgba = np.asarray(img.convert("RGBA"), dtype=np.uint8)
+    return text, rgba.shape, rgba.tobytes()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test the ASS caption renderer used by the FFmpeg paths: style/placement taken from RenderConfig,
+karaoke word highlight, and a libass render compared against the PIL caption image.
+The render test is skipped when ffmpeg (with libass) is not installed.
+"""
+
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+from dataclasses import replace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+SEGMENT = {
+    'text': 'one two three', 'start': 1.0, 'end': 2.5,
+    'words': [
+        {'word': ' one', 'start': 1.1, 'end': 1.4},
+        {'word': ' two', 'start': 1.5, 'end': 1.9},
+        {'word': ' three', 'start': 2.0, 'end': 2.4},
+    ],
+}
+
+
+def _ass_lines(segments, config):
+    from tiktok_full_gui import _generate_ass_subtitle_file
+    with tempfile.TemporaryDirectory() as tmp:
+        path, _ = _generate_ass_subtitle_file(segments, os.path.join(tmp, "c.ass"), config)
+        with open(path, encoding="utf-8") as f:
+            return f.read().splitlines()
+
+
+def test_style_follows_config():
+    """PlayRes, font size, stroke color and Y offset come from the job's RenderConfig."""
+    print("Testing ASS style from RenderConfig...")
+    from tiktok_full_gui import RenderConfig
+
+    hd = RenderConfig.from_globals(use_4k=False)
+    uhd = RenderConfig.from_globals(use_4k=True)
+    hd_lines, uhd_lines = _ass_lines([SEGMENT], hd), _ass_lines([SEGMENT], uhd)
+
+    assert "PlayResX: 1080" in hd_lines and "PlayResY: 1920" in hd_lines
+    assert "PlayResX: 2160" in uhd_lines and "PlayResY: 3840" in uhd_lines
+    hd_size = float(next(l for l in hd_lines if l.startswith("Style: Caption")).split(",")[2])
+    uhd_size = float(next(l for l in uhd_lines if l.startswith("Style: Caption")).split(",")[2])
+    assert abs(uhd_size - 2 * hd_size) < 0.05, f"4K font size {uhd_size} should double HD {hd_size}"
+
+    red_stroke = _ass_lines([SEGMENT], replace(hd, caption_stroke_color=(255, 0, 0, 150)))
+    assert "&H000000FF" in next(l for l in red_stroke if l.startswith("Style: Caption")), "Stroke color ignored"
+
+    def text_y(lines):
+        caption = next(l for l in lines if l.startswith("Dialogue: 1"))
+        return int(caption.split("\\pos(")[1].split(")")[0].split(",")[1])
+    moved = _ass_lines([SEGMENT], replace(hd, caption_y_offset=-300))
+    assert text_y(hd_lines) - text_y(moved) == 300, "Y offset should move the caption up 300px"
+    print(f"✓ HD {hd_size}pt / 4K {uhd_size}pt, stroke color and offset applied")
+    return True
+
+
+def test_karaoke_tags():
+    """With a highlight color, word timings become \\k tags; without one, no tags."""
+    print("\nTesting karaoke word highlight...")
+    from tiktok_full_gui import RenderConfig
+
+    cfg = RenderConfig()
+    plain = next(l for l in _ass_lines([SEGMENT], cfg) if l.startswith("Dialogue: 1"))
+    assert "\\k" not in plain, "No highlight color -> no karaoke tags"
+
+    karaoke = next(l for l in _ass_lines([SEGMENT], replace(cfg, caption_highlight_color=(255, 220, 0, 255)))
+                   if l.startswith("Dialogue: 1"))
+    tags = [int(t.split("}")[0]) for t in karaoke.split("\\k")[1:]]
+    assert tags == [10, 40, 50, 40], f"Unexpected karaoke timings: {tags}"
+    print(f"✓ Karaoke tags {tags}")
+    return True
+
+
+def test_libass_matches_pil():
+    """libass output sits on the PIL caption within a few levels on average."""
+    print("\nTesting libass render against PIL caption image...")
+    if not shutil.which("ffmpeg"):
+        print("⚠ ffmpeg not found - skipping")
+        return True
+    from tiktok_full_gui import RenderConfig, generate_caption_image, _build_caption_burn_filter
+
+    cases = [
+        ("Hello world", {}),
+        ("this is a long caption that should wrap across two lines at least", {}),
+        ("Styled", dict(caption_y_offset=-400, caption_text_color=(255, 220, 0, 255),
+                        caption_stroke_color=(200, 0, 0, 255), caption_stroke_width=6)),
+    ]
+    for text, overrides in cases:
+        cfg = RenderConfig.from_globals(use_4k=False, **overrides)
+        w, h = cfg.width, cfg.height
+        sprite = np.array(generate_caption_image(text, config=cfg)).astype(np.float64)
+        top = h - sprite.shape[0] + cfg.caption_y_offset
+        ref = np.zeros((h, w, 3)) + (40, 90, 160)
+        alpha = sprite[..., 3:] / 255.0
+        ref[top:top + sprite.shape[0]] = sprite[..., :3] * alpha + ref[top:top + sprite.shape[0]] * (1 - alpha)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            burn = _build_caption_burn_filter([{'text': text, 'start': 0, 'end': 2}], w, h, cfg,
+                                              lambda *_: None, work_dir=tmp)
+            cmd = ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", f"color=c=0x285aa0:s={w}x{h}:d=1:r=1",
+                   "-vf", "format=rgb24" + burn, "-frames:v", "1", "-f", "rawvideo", "-pix_fmt", "rgb24", "-"]
+            result = subprocess.run(cmd, capture_output=True)
+        if result.returncode != 0:
+            print(f"⚠ ffmpeg can't render ASS here ({result.stderr.decode(errors='replace')[-200:]}) - skipping")
+            return True
+        out = np.frombuffer(result.stdout, np.uint8).reshape(h, w, 3).astype(np.float64)
+        band = slice(top - 20, top + sprite.shape[0] + 20)
+        diff = np.abs(out[band] - ref[band]).mean()
+        assert diff < 15.0, f"'{text}': mean diff {diff:.2f} in caption band"
+        print(f"✓ '{text[:30]}': mean diff {diff:.2f}")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ASS Caption Tests")
+    print("=" * 60)
+
+    tests = [
+        test_style_follows_config,
+        test_karaoke_tags,
+        test_libass_matches_pil,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
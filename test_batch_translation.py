@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test batched segment translation (BatchTranslator / translate_segments) against a local stub
+backend: few round-trips instead of one per segment, a persistent per-language memo, and
+recovery when the service mangles the sentinel lines or fails.
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class StubService:
+    """Stands in for the translation service: tags every line, sleeps like a network round-trip."""
+
+    def __init__(self, latency=0.1, keep_sentinels=True, fail=False, drop=None):
+        self.latency = latency
+        self.keep_sentinels = keep_sentinels
+        self.fail = fail
+        self.drop = drop  # text the service swallows inside a batch (sentinel kept, line lost)
+        self.calls = []
+        self._lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def translate(self, text, target_language):
+        with self._lock:
+            self.calls.append(text)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.latency)
+            if self.fail:
+                raise ConnectionError("service unavailable")
+            lines = []
+            for line in text.split("\n"):
+                if line.startswith("⟦"):
+                    if self.keep_sentinels:
+                        lines.append(line.replace("⟦", "⟦ "))  # services may add spaces
+                elif line != self.drop or "⟦" not in text:
+                    lines.append(f"{target_language}:{line}")
+            return "\n".join(lines)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _segments(n):
+    return [{'start': i, 'end': i + 1, 'text': f" segment number {i} says hello"} for i in range(n)]
+
+
+def test_batches_and_concurrency():
+    """60 segments go out in a handful of concurrent requests and come back in order."""
+    print("Testing batched translation...")
+    import tiktok_full_gui as app
+
+    service = StubService(latency=0.2)
+    saved = app.TRANSLATOR
+    app.TRANSLATOR = app.BatchTranslator(service, memo_dir=None, max_chars=800, workers=4)
+    try:
+        segments = _segments(60)
+        t0 = time.perf_counter()
+        out = app.translate_segments(segments, target_language="es")
+        elapsed = time.perf_counter() - t0
+    finally:
+        app.TRANSLATOR = saved
+
+    assert [s['text'] for s in out] == [f"es:segment number {i} says hello" for i in range(60)], "Order/text mismatch"
+    assert out[7]['original_text'] == segments[7]['text'] and out[7]['start'] == 7
+    assert all(len(c) <= 800 for c in service.calls), "Chunk exceeded max_chars"
+    assert 2 <= len(service.calls) <= 6, f"Expected a few batched requests, got {len(service.calls)}"
+    assert service.max_active > 1, "Chunks should be sent concurrently"
+    per_segment = 60 * service.latency
+    print(f"✓ 60 segments -> {len(service.calls)} requests ({service.max_active} in flight), "
+          f"{elapsed:.2f}s vs ~{per_segment:.0f}s one request per segment")
+    return True
+
+
+def test_memo_persists_per_language():
+    """A new translator over the same memo dir sends nothing for known texts; other languages do."""
+    print("\nTesting persistent translation memo...")
+    from tiktok_full_gui import BatchTranslator
+
+    texts = [s['text'] for s in _segments(10)]
+    with tempfile.TemporaryDirectory() as tmp:
+        first = StubService(latency=0)
+        BatchTranslator(first, memo_dir=tmp).translate(texts, "fr")
+
+        second = StubService(latency=0)
+        translator = BatchTranslator(second, memo_dir=tmp)
+        again = translator.translate(texts + [texts[0]], "fr")
+        assert second.calls == [], f"Memoized texts should not be sent, got {len(second.calls)} requests"
+        assert again[-1] == again[0] == "fr:segment number 0 says hello"
+        assert translator.stats()["memo_hits"] == 11
+
+        translator.translate(texts[:3], "de")
+        assert len(second.calls) == 1, "A different language is a different memo entry"
+    print("✓ Memo reused across translator instances, keyed by target language")
+    return True
+
+
+def test_mangled_sentinels_and_failures():
+    """Lost sentinels or empty parts fall back to one text per request; a failing service leaves texts unchanged."""
+    print("\nTesting fallbacks...")
+    from tiktok_full_gui import BatchTranslator
+
+    texts = ["one", "two", "three"]
+    mangler = StubService(latency=0, keep_sentinels=False)
+    out = BatchTranslator(mangler).translate(texts, "it")
+    assert out == ["it:one", "it:two", "it:three"], f"Fallback produced {out}"
+    assert len(mangler.calls) == 4, "One batched attempt + one request per text"
+
+    dropper = StubService(latency=0, drop="two")
+    out = BatchTranslator(dropper).translate(texts, "it")
+    assert out == ["it:one", "it:two", "it:three"], f"An empty part should not be kept: {out}"
+    assert len(dropper.calls) == 4, "An empty part sends the chunk down the per-text path"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        broken = BatchTranslator(StubService(latency=0, fail=True), memo_dir=tmp)
+        assert broken.translate(texts, "it") == texts, "Failed translations should return the source text"
+        assert not os.listdir(tmp), "Failures must not be memoized"
+    print("✓ Sentinel loss and service errors handled")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Batch Translation Tests")
+    print("=" * 60)
+
+    tests = [
+        test_batches_and_concurrency,
+        test_memo_persists_per_language,
+        test_mangled_sentinels_and_failures,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test the caption overlay track: timed caption sprites packed into one ffconcat stream of PNG strips
+(one frame per caption change) and overlaid by the FFmpeg export in a single overlay filter.
+The render test is skipped when ffmpeg is not installed.
+"""
+
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+W, H = 360, 640
+
+
+def _sprite(color, w=W, h=40):
+    from tiktok_full_gui import CaptionSprite
+    rgba = np.zeros((h, w, 4), dtype=np.uint8)
+    rgba[..., :3] = color
+    rgba[5:h - 5, 40:w - 40, 3] = 255
+    return CaptionSprite(rgba)
+
+
+def _config(**kwargs):
+    from tiktok_full_gui import RenderConfig
+    return RenderConfig(width=W, height=H, **kwargs)
+
+
+def _read_index(path):
+    entries = []
+    with open(path) as f:
+        for line in f:
+            if line.startswith("file "):
+                entries.append([line.split("'")[1], None])
+            elif line.startswith("duration "):
+                entries[-1][1] = float(line.split()[1])
+    return entries
+
+
+def test_index_one_frame_per_change():
+    """Gaps become blank frames, repeated captions share a strip, overlaps go to the later caption."""
+    print("Testing overlay track index...")
+    from tiktok_full_gui import write_caption_overlay_track
+
+    a, b = _sprite((255, 0, 0)), _sprite((0, 255, 0), h=80)
+    placements = [
+        {'start': 0.5, 'end': 1.0, 'sprite': a},
+        {'start': 1.0, 'end': 1.6, 'sprite': b},
+        {'start': 1.4, 'end': 2.0, 'sprite': a},  # overlaps b, drawn on top
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        path, y = write_caption_overlay_track(placements, _config(caption_y_offset=-100), tmp, duration=3.0)
+        entries = _read_index(path)
+        strips = {name for name, _ in entries}
+
+        timed = [(name, round(d, 3)) for name, d in entries if d is not None]
+        blank, red, green = timed[0][0], timed[1][0], timed[2][0]
+        assert [d for _, d in timed] == [0.5, 0.5, 0.4, 0.6, 1.0], f"Unexpected durations: {timed}"
+        assert [n for n, _ in timed] == [blank, red, green, red, blank], f"Unexpected order: {timed}"
+        assert len(strips) == 3, f"Expected blank + 2 strips, got {strips}"
+        assert y == H - 80 - 100, f"Band should sit at height - band_h + offset, got {y}"
+    print(f"✓ {len(timed)} changes, {len(strips)} strips, overlay y={y}")
+    return True
+
+
+def test_nothing_to_draw():
+    """Invisible or empty captions produce no track."""
+    print("\nTesting empty track...")
+    from tiktok_full_gui import CaptionSprite, write_caption_overlay_track
+
+    invisible = CaptionSprite(np.zeros((10, W, 4), dtype=np.uint8))
+    with tempfile.TemporaryDirectory() as tmp:
+        assert write_caption_overlay_track([], _config(), tmp) == (None, None)
+        assert write_caption_overlay_track([{'start': 0, 'end': 1, 'sprite': invisible}], _config(), tmp) == (None, None)
+    print("✓ No track for nothing to draw")
+    return True
+
+
+def _frame_at(path, t):
+    cmd = ["ffmpeg", "-v", "error", "-ss", f"{t:.3f}", "-i", path, "-frames:v", "1",
+           "-f", "rawvideo", "-pix_fmt", "rgb24", "-"]
+    out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(out, np.uint8).reshape(H, W, 3)
+
+
+def test_ffmpeg_export_many_captions():
+    """150 captions render through one overlay input with the right caption on screen at each time."""
+    print("\nTesting FFmpeg export with the overlay track...")
+    if not shutil.which("ffmpeg"):
+        print("⚠ ffmpeg not found - skipping")
+        return True
+    import tiktok_full_gui as app
+
+    n, step = 150, 0.1
+    colors = [((i * 67) % 200 + 55, (i * 131) % 200 + 55, (i * 29) % 200 + 55) for i in range(n)]
+    placements = [{'start': i * step, 'end': (i + 1) * step, 'sprite': _sprite(c)} for i, c in enumerate(colors)]
+    config = _config()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bg, fg, audio, out = (os.path.join(tmp, name) for name in ("bg.png", "fg.mp4", "a.mp3", "out.mp4"))
+        from PIL import Image
+        Image.new("RGB", (W, H), (20, 20, 20)).save(bg)
+        subprocess.run(["ffmpeg", "-v", "error", "-y", "-f", "lavfi", "-i", f"color=c=0x303030:s={W}x200:d={n * step}:r=24",
+                        "-pix_fmt", "yuv420p", fg], check=True)
+        subprocess.run(["ffmpeg", "-v", "error", "-y", "-f", "lavfi", "-i", f"sine=d={n * step}", audio], check=True)
+
+        overlay = app.write_caption_overlay_track(placements, config, os.path.join(tmp, "captions"), duration=n * step)
+        saved_gpu = app.USE_GPU_IF_AVAILABLE
+        app.USE_GPU_IF_AVAILABLE = False
+        try:
+            ok = app._export_with_ffmpeg_filters(bg, fg, [], audio, out, W, H, lambda *_: None,
+                                                 config=config, caption_overlay=overlay)
+        finally:
+            app.USE_GPU_IF_AVAILABLE = saved_gpu
+        assert ok, "Export failed"
+
+        streams = subprocess.run(["ffmpeg", "-hide_banner", "-i", out], capture_output=True, text=True).stderr
+        assert streams.count("Video:") == 1, "Output should have exactly one video stream"
+
+        band_y = overlay[1] + 20  # middle of the 40px strip
+        for i in (0, 37, 99, 149):
+            frame = _frame_at(out, (i + 0.5) * step)
+            got = frame[band_y, W // 2].astype(int)
+            assert np.abs(got - colors[i]).max() < 12, f"Caption {i}: expected {colors[i]}, got {tuple(got)}"
+        assert np.abs(_frame_at(out, 0.05)[band_y, 10].astype(int) - 20).max() < 12, "Transparent area should show background"
+    print(f"✓ {n} captions overlaid from one input, spot checks match")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Caption Overlay Track Tests")
+    print("=" * 60)
+
+    tests = [
+        test_index_one_frame_per_change,
+        test_nothing_to_draw,
+        test_ffmpeg_export_many_captions,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
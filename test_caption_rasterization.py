@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test the batch caption rasterization stage (render_caption_sprites): the process pool must produce
+the same pixels as in-process rendering, reuse cached sprites and the pool itself, and report the
+wall-time speedup.
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+WORDS = ("the quick brown fox jumps over lazy dog while seven wizards quietly "
+         "hex every jolly plump vixen near big sphinx").split()
+
+
+def _texts(n):
+    return [f"{WORDS[i % len(WORDS)]} {WORDS[(i * 7 + 3) % len(WORDS)]} {i}" for i in range(n)]
+
+
+def test_pool_matches_serial():
+    """Sprites rendered by worker processes are identical to in-process renders."""
+    print("Testing pool output against in-process rendering...")
+    from tiktok_full_gui import RenderConfig, CaptionSpriteCache, render_caption_sprites
+
+    cfg = RenderConfig()
+    texts = _texts(16)
+    logs = []
+    serial = render_caption_sprites(texts, cfg, cache=CaptionSpriteCache(max_mb=512), workers=1)
+    pooled = render_caption_sprites(texts, cfg, cache=CaptionSpriteCache(max_mb=512), workers=4, log=logs.append)
+
+    assert set(serial) == set(pooled) == set(texts), "Every text should get a sprite"
+    for text in texts:
+        assert np.array_equal(serial[text].rgb, pooled[text].rgb), f"RGB differs for '{text}'"
+        assert np.array_equal(serial[text].mask, pooled[text].mask), f"Mask differs for '{text}'"
+    assert not any("unavailable" in line for line in logs), f"Pool fell back to in-process: {logs}"
+    print(f"✓ {len(texts)} sprites identical")
+    return True
+
+
+def test_cached_and_duplicate_texts():
+    """Repeated texts render once; a second batch is served entirely from the cache."""
+    print("\nTesting cache reuse in batches...")
+    from tiktok_full_gui import RenderConfig, CaptionSpriteCache, render_caption_sprites
+
+    cfg = RenderConfig()
+    cache = CaptionSpriteCache(max_mb=512)
+    texts = _texts(6) * 3
+    render_caption_sprites(texts, cfg, cache=cache, workers=1)
+    render_caption_sprites(texts, cfg, cache=cache, workers=4)
+
+    stats = cache.stats()
+    assert stats["misses"] == 6, f"Expected 6 renders, got {stats}"
+    assert stats["hits"] == 6, f"Second batch should be all hits, got {stats}"
+    print(f"✓ 18 requests -> 6 renders, stats: {stats}")
+    return True
+
+
+def test_pool_kept_between_batches():
+    """Later batches reuse the process pool the first one started; small batches stay in-process."""
+    print("\nTesting long-lived caption pool...")
+    import tiktok_full_gui as app
+
+    logs = []
+    for i in range(3):
+        texts = [f"{t} batch{i}" for t in _texts(app.CAPTION_RASTER_MIN_BATCH)]
+        app.render_caption_sprites(texts, app.RenderConfig(), cache=app.CaptionSpriteCache(max_mb=256),
+                                   workers=2, log=logs.append)
+    app.render_caption_sprites(_texts(2), app.RenderConfig(), cache=app.CaptionSpriteCache(max_mb=256),
+                               workers=2, log=logs.append)
+    paths = [line.split("), ", 1)[1] for line in logs if line.startswith("[CAPTIONS] Rasterized")]
+    assert paths[1:3] == ["process pool (reused)"] * 2, paths
+    assert paths[3].startswith("in-process (batch below"), paths
+    print(f"✓ {paths}")
+    return True
+
+
+def test_benchmark_scaling():
+    """Report wall time serial vs pool for a 3-minute video's worth of single-word captions."""
+    print("\nBenchmarking caption rasterization...")
+    from tiktok_full_gui import RenderConfig, CaptionSpriteCache, render_caption_sprites
+
+    cfg = RenderConfig()
+    texts = _texts(120)
+    cores = os.cpu_count() or 1
+
+    t0 = time.perf_counter()
+    render_caption_sprites(texts, cfg, cache=CaptionSpriteCache(max_mb=1024), workers=1)
+    serial_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    render_caption_sprites(texts, cfg, cache=CaptionSpriteCache(max_mb=1024), workers=cores)
+    pooled_s = time.perf_counter() - t0
+
+    print(f"  {len(texts)} captions: serial {serial_s:.2f}s -> {cores} workers {pooled_s:.2f}s "
+          f"({serial_s / pooled_s:.1f}x)")
+    if cores > 1:
+        assert pooled_s < serial_s, "Pool should be faster than serial on a multi-core machine"
+    print("✓ Benchmark complete")
+    return True
+
+
+def test_default_worker_cap():
+    """Without CAPTION_RASTER_WORKERS the pool uses half the cores, at most 4."""
+    print("\nTesting default worker count...")
+    import tiktok_full_gui as app
+
+    counts = {}
+    saved = os.cpu_count
+    try:
+        for cores in (2, 6, 32):
+            os.cpu_count = lambda cores=cores: cores
+            logs = []
+            app.render_caption_sprites(_texts(app.CAPTION_RASTER_MIN_BATCH), app.RenderConfig(),
+                                       cache=app.CaptionSpriteCache(max_mb=256), log=logs.append)
+            counts[cores] = int(logs[-1].split(" with ")[1].split()[0])
+    finally:
+        os.cpu_count = saved
+    assert app.CAPTION_RASTER_WORKERS == 0 and counts == {2: 1, 6: 3, 32: 4}, counts
+    print(f"✓ cores -> workers: {counts}")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Caption Rasterization Tests")
+    print("=" * 60)
+
+    tests = [
+        test_pool_matches_serial,
+        test_cached_and_duplicate_texts,
+        test_default_worker_cap,
+        test_pool_kept_between_batches,
+        test_benchmark_scaling,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed caption sprite cache used by the compose step.
+Uses a stubbed renderer so no fonts are needed.
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+
+def _sprite_rgba(w=40, h=20, value=200):
+    rgba = np.zeros((h, w, 4), dtype=np.uint8)
+    rgba[..., :3] = value
+    rgba[4:16, 5:35, 3] = 255
+    return rgba
+
+
+def test_key_tracks_text_and_style():
+    """Same text + style share a key; any style change or different text gets a new one."""
+    print("Testing sprite keys...")
+    from dataclasses import replace
+    from tiktok_full_gui import RenderConfig, caption_sprite_key
+
+    cfg = RenderConfig()
+    base = caption_sprite_key("Hello world", cfg)
+
+    assert caption_sprite_key("  Hello world ", cfg) == base, "Whitespace should not change the key"
+    assert caption_sprite_key("Hello there", cfg) != base, "Different text must not collide"
+    for field, value in [("caption_font_size", 60), ("caption_stroke_width", 7),
+                         ("caption_text_color", (255, 0, 0, 255)), ("width", 2160)]:
+        assert caption_sprite_key("Hello world", replace(cfg, **{field: value})) != base, f"{field} ignored"
+    assert caption_sprite_key("Hello world", replace(cfg, caption_y_offset=-300)) == base, \
+        "Position doesn't change the image and shouldn't split the cache"
+    print("✓ Keys follow text and style only")
+    return True
+
+
+def test_hit_skips_render():
+    """A second request for the same caption is served without calling generate_caption_image."""
+    print("\nTesting cache hits...")
+    import tiktok_full_gui as app
+
+    calls = []
+    saved = app.generate_caption_image
+
+    def fake_render(text, preferred_font=None, log=None, config=None):
+        calls.append(text)
+        from PIL import Image
+        return Image.fromarray(_sprite_rgba(), "RGBA")
+
+    app.generate_caption_image = fake_render
+    try:
+        cache = app.CaptionSpriteCache(max_mb=8)
+        cfg = app.RenderConfig()
+        first = cache.get_or_render("one two", cfg)
+        second = cache.get_or_render("one two", cfg)
+        cache.get_or_render("three", cfg)
+    finally:
+        app.generate_caption_image = saved
+
+    assert first is second, "Hit should return the cached sprite"
+    assert calls == ["one two", "three"], f"Unexpected renders: {calls}"
+    assert first.visible and first.mask.dtype == np.float32 and first.mask.max() == 1.0
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2, f"Unexpected stats: {stats}"
+    print(f"✓ Rendered twice for three requests, stats: {stats}")
+    return True
+
+
+def test_lru_byte_budget():
+    """Oldest sprites are evicted once the byte budget is exceeded."""
+    print("\nTesting LRU eviction...")
+    from tiktok_full_gui import CaptionSprite, CaptionSpriteCache
+
+    one = CaptionSprite(_sprite_rgba(w=200, h=100)).nbytes
+    cache = CaptionSpriteCache(max_mb=(2.5 * one) / (1024 * 1024))
+    cache.put("a", _sprite_rgba(w=200, h=100))
+    cache.put("b", _sprite_rgba(w=200, h=100))
+    cache.get("a")  # a is now most recent
+    cache.put("c", _sprite_rgba(w=200, h=100))
+
+    assert cache.get("b") is None, "Least-recently-used sprite should be evicted"
+    assert cache.get("a") is not None and cache.get("c") is not None
+    print(f"✓ Evicted LRU entry, stats: {cache.stats()}")
+    return True
+
+
+def test_disk_tier_round_trip():
+    """Sprites written by one cache are picked up from disk by a fresh one."""
+    print("\nTesting disk tier...")
+    from tiktok_full_gui import CaptionSpriteCache
+
+    rgba = _sprite_rgba()
+    with tempfile.TemporaryDirectory() as tmp:
+        CaptionSpriteCache(max_mb=8, disk_dir=tmp).put("ab12", rgba)
+        fresh = CaptionSpriteCache(max_mb=8, disk_dir=tmp)
+        sprite = fresh.get("ab12")
+
+        assert sprite is not None, "Sprite should load from disk"
+        assert np.array_equal(sprite.to_rgba(), rgba), "Disk round trip changed pixels"
+        assert fresh.stats()["disk_hits"] == 1
+    print("✓ Sprite restored from disk unchanged")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Caption Sprite Cache Tests")
+    print("=" * 60)
+
+    tests = [
+        test_key_tracks_text_and_style,
+        test_hit_skips_render,
+        test_lru_byte_budget,
+        test_disk_tier_round_trip,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
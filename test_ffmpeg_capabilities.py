@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test the process-wide ffmpeg capability registry (FFmpegCapabilities / FFMPEG_CAPS).
+Uses canned ffmpeg output so the real binary is not needed.
+"""
+
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+VERSION = "ffmpeg version 6.1.1-full_build-www.gyan.dev Copyright (c) 2000-2023 the FFmpeg developers\n"
+ENCODERS = """Encoders:
+ V..... = Video
+ A..... = Audio
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC (codec h264)
+ V....D h264_nvenc           NVIDIA NVENC H.264 encoder (codec h264)
+ A....D aac                  AAC (Advanced Audio Coding)
+"""
+FILTERS = """Filters:
+  T.. = Timeline support
+  A = Audio input/output
+  | = Source or sink filter
+ ... ass               V->V       Render ASS subtitles onto input video using the libass library.
+ TSC drawtext          V->V       Draw text on top of video frames using libfreetype library.
+ ... amix              N->A       Audio mixing.
+"""
+HWACCELS = "Hardware acceleration methods:\ncuda\nd3d11va\n\n"
+
+
+def _fake_caps(outputs):
+    from tiktok_full_gui import FFmpegCapabilities
+
+    class FakeCaps(FFmpegCapabilities):
+        calls = []
+
+        def _run(self, *args):
+            self.calls.append(args[0])
+            return outputs.get(args[0])
+
+    FakeCaps.calls = []
+    return FakeCaps()
+
+
+def test_parses_listings():
+    """Version, encoders, filters and hwaccels are read from ffmpeg's listings."""
+    print("Testing capability parsing...")
+    caps = _fake_caps({"-version": VERSION, "-encoders": ENCODERS, "-filters": FILTERS, "-hwaccels": HWACCELS})
+
+    assert caps.available and caps.version == "6.1.1-full_build-www.gyan.dev", f"Version: {caps.version}"
+    assert caps.version_tuple() == (6, 1)
+    assert caps.encoders == {"libx264", "h264_nvenc", "aac"}, f"Encoders: {caps.encoders}"
+    assert caps.filters == {"ass", "drawtext", "amix"}, f"Filters: {caps.filters}"
+    assert caps.hwaccels == {"cuda", "d3d11va"}, f"Hwaccels: {caps.hwaccels}"
+    assert caps.summary()["caption_filters"] == ["ass", "drawtext"]
+    print(f"✓ {caps.summary()}")
+    return True
+
+
+def test_probes_once_until_refresh():
+    """Repeated queries reuse one probe; refresh() probes again."""
+    print("\nTesting probe caching...")
+    caps = _fake_caps({"-version": VERSION, "-encoders": ENCODERS, "-filters": FILTERS, "-hwaccels": HWACCELS})
+
+    for _ in range(10):
+        caps.has_encoder("h264_nvenc")
+        caps.has_filter("ass")
+        caps.has_hwaccel("cuda")
+    assert len(caps.calls) == 4, f"Expected one probe (4 calls), got {len(caps.calls)}"
+    caps.refresh()
+    assert len(caps.calls) == 8, "refresh() should probe again"
+    print("✓ 30 queries -> 1 probe, refresh re-probes")
+    return True
+
+
+def test_concurrent_first_use_probes_once():
+    """Threads that all query before the first probe finishes share that one probe."""
+    print("\nTesting concurrent first use...")
+    outputs = {"-version": VERSION, "-encoders": ENCODERS, "-filters": FILTERS, "-hwaccels": HWACCELS}
+    caps = _fake_caps(outputs)
+    run = caps._run
+    caps._run = lambda *args: time.sleep(0.02) or run(*args)  # slow enough for the threads to overlap
+
+    start = threading.Barrier(8)
+    answers = []
+
+    def query():
+        start.wait()
+        answers.append(caps.has_encoder("libx264"))
+
+    threads = [threading.Thread(target=query) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert answers == [True] * 8, answers
+    assert len(caps.calls) == 4, f"Expected one probe (4 calls), got {len(caps.calls)}"
+    print("✓ 8 concurrent first queries -> 1 probe")
+    return True
+
+
+def test_missing_ffmpeg():
+    """Without ffmpeg everything reports unavailable and caption filters refuse to build."""
+    print("\nTesting missing ffmpeg...")
+    import tiktok_full_gui as app
+
+    caps = _fake_caps({})
+    assert not caps.available and not caps.has_encoder("libx264") and caps.version_tuple() is None
+
+    saved = app.FFMPEG_CAPS
+    app.FFMPEG_CAPS = caps
+    try:
+        try:
+            app._build_caption_burn_filter([{"text": "hi", "start": 0, "end": 1}], 1080, 1920,
+                                           app.RenderConfig(), lambda *_: None)
+            print("✗ Caption filter built without ass/drawtext")
+            return False
+        except RuntimeError:
+            pass
+        assert app._build_caption_burn_filter([], 1080, 1920, app.RenderConfig(), lambda *_: None) == ""
+    finally:
+        app.FFMPEG_CAPS = saved
+    print("✓ Unavailable ffmpeg detected, caption filter raises for the caller's fallback")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("FFmpeg Capability Tests")
+    print("=" * 60)
+
+    tests = [
+        test_parses_listings,
+        test_probes_once_until_refresh,
+        test_concurrent_first_use_probes_once,
+        test_missing_ffmpeg,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
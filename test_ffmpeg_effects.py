@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Visual-diff test: effects rendered by the ffmpeg filter chain (build_effects_filter_chain)
+compared against the PIL reference apply_video_effects. Skipped when ffmpeg is not installed.
+"""
+
+import sys
+import os
+import shutil
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+W, H = 360, 640
+
+
+def _test_frame(seed=0, level=128):
+    """Gradients plus noise with a mean of roughly `level` (60 = dark footage, 190 = bright)."""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:H, 0:W]
+    base = np.stack([xx * 255.0 / W, yy * 255.0 / H, 128 + 60 * np.sin(xx / 20.0)], axis=-1)
+    base = level + (base - 128) * min(level, 255 - level) / 128.0
+    return np.clip(base + rng.normal(0, 15, base.shape), 0, 255).astype(np.uint8)
+
+
+def _run_ffmpeg(frame, chain):
+    """Push one RGB frame through `chain` (in yuv444p, so chroma subsampling doesn't blur the diff)."""
+    vf = "format=yuv444p," + (chain + "," if chain else "") + "format=rgb24"
+    cmd = ["ffmpeg", "-v", "error", "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{W}x{H}", "-i", "-",
+           "-vf", vf, "-f", "rawvideo", "-pix_fmt", "rgb24", "-"]
+    result = subprocess.run(cmd, input=frame.tobytes(), capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode(errors="replace")[-500:])
+    return np.frombuffer(result.stdout, np.uint8).reshape(H, W, 3)
+
+
+def test_filters_match_pil_reference():
+    """Each deterministic effect stays within a few levels of the PIL result on average."""
+    print("Testing ffmpeg effect filters against PIL reference...")
+    if not shutil.which("ffmpeg"):
+        print("⚠ ffmpeg not found - skipping")
+        return True
+    from tiktok_full_gui import apply_video_effects, build_effects_filter_chain, frame_mean_luma
+
+    cases = [
+        ("sharpness", 128, {'effect_sharpness': True}, 2.5),
+        ("saturation", 128, {'effect_saturation': True}, 2.5),
+        ("contrast", 128, {'effect_contrast': True}, 4.0),
+        ("brightness", 128, {'effect_brightness': True}, 2.0),
+        ("saturation + contrast", 128, {'effect_saturation': True, 'effect_contrast': True}, 5.0),
+        # PIL pivots contrast on the frame's mean luma, not mid-grey
+        ("contrast, dark frame", 60, {'effect_contrast': True}, 4.0),
+        ("contrast, bright frame", 190, {'effect_contrast': True}, 4.0),
+        ("saturation + contrast, dark frame", 60, {'effect_saturation': True, 'effect_contrast': True}, 5.0),
+    ]
+    for name, level, settings, max_mean_diff in cases:
+        frame = _test_frame(level=level)
+        chain = build_effects_filter_chain(settings, mean_luma=frame_mean_luma(frame))
+        ref = apply_video_effects(frame, settings).astype(np.float64)
+        out = _run_ffmpeg(frame, chain).astype(np.float64)
+        diff = np.abs(ref - out).mean()
+        bias = (out - ref).mean()
+        assert diff < max_mean_diff, f"{name}: mean diff {diff:.2f} >= {max_mean_diff} ({chain})"
+        assert abs(bias) < 2.0, f"{name}: output {bias:+.2f} levels off the reference on average ({chain})"
+        print(f"✓ {name}: mean diff {diff:.2f}, bias {bias:+.2f} ({chain})")
+    return True
+
+
+def test_vintage_statistics():
+    """Grain is random, so compare per-channel brightness and spread instead of pixels."""
+    print("\nTesting vintage filter statistics...")
+    if not shutil.which("ffmpeg"):
+        print("⚠ ffmpeg not found - skipping")
+        return True
+    from tiktok_full_gui import apply_video_effects, build_effects_filter_chain
+
+    frame = _test_frame()
+    settings = {'effect_vintage': True}
+    ref = apply_video_effects(frame, settings).astype(np.float64)
+    out = _run_ffmpeg(frame, build_effects_filter_chain(settings)).astype(np.float64)
+    for c in range(3):
+        assert abs(ref[..., c].mean() - out[..., c].mean()) < 3.0, f"Channel {c} mean differs"
+        assert abs(ref[..., c].std() - out[..., c].std()) / ref[..., c].std() < 0.05, f"Channel {c} spread differs"
+    print(f"✓ Means {ref.mean():.1f} vs {out.mean():.1f}, std {ref.std():.1f} vs {out.std():.1f}")
+    return True
+
+
+def test_no_effects_no_filters():
+    """Disabled effects add nothing to the graph."""
+    print("\nTesting empty effect settings...")
+    from tiktok_full_gui import build_effects_filter_chain
+
+    assert build_effects_filter_chain(None) == ""
+    assert build_effects_filter_chain({'effect_sharpness': False}) == ""
+    print("✓ No filters emitted")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("FFmpeg Effects Filter Tests")
+    print("=" * 60)
+
+    tests = [
+        test_filters_match_pil_reference,
+        test_vintage_statistics,
+        test_no_effects_no_filters,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
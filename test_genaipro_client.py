@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Test the asyncio GenAI Pro client (GenAIProClient / generate_tts_with_genaipro) against a local
+mock of the API: concurrent tasks over reused connections, backoff between status polls, per-task
+status lookups with a fallback to the filtered task list, and streamed downloads.
+Skipped when aiohttp is not installed.
+"""
+
+import sys
+import os
+import asyncio
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+AUDIO_BYTES = 300 * 1024
+
+
+class MockGenAIPro:
+    """Tasks finish after `polls_needed` status checks; audio is served from /files/<id>.mp3."""
+
+    def __init__(self, polls_needed=3, by_id=True, fail_text=None, garbled_polls=0, cut_downloads=False,
+                 unknown_polls=0, unknown_status=404):
+        self.polls_needed = polls_needed
+        self.by_id = by_id
+        self.unknown_polls = unknown_polls  # first N per-task checks of each task don't know it yet (nor the list)
+        self.unknown_status = unknown_status  # 404, or 200 with a body that has no task
+        self.by_id_checks = {}
+        self.list_checks = 0
+        self.fail_text = fail_text
+        self.garbled_polls = garbled_polls  # first N status replies are an HTML error page with status 200
+        self.cut_downloads = cut_downloads  # downloads drop the connection halfway through
+        self.tasks = {}
+        self.polls = {}
+        self.clients = set()
+        self.download_auth = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.handle_error = self._handle_error
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handle_error(self, request, client_address):
+        # the client closing idle keep-alive connections is not a server error
+        if not isinstance(sys.exc_info()[1], ConnectionResetError):
+            ThreadingHTTPServer.handle_error(self.server, request, client_address)
+
+    def in_flight(self):
+        with self.lock:
+            return sum(1 for t in self.tasks.values() if t["status"] == "processing")
+
+    def _task_view(self, task_id):
+        with self.lock:
+            task = self.tasks[task_id]
+            self.polls.setdefault(task_id, []).append(time.monotonic())
+            if task["status"] == "processing" and len(self.polls[task_id]) >= self.polls_needed:
+                failed = task["text"] == self.fail_text
+                task["status"] = "failed" if failed else "completed"
+                task["result"] = "" if failed else f"{self.base}/files/{task_id}.mp3"
+            return dict(task, id=task_id)
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, code, body, content_type="application/json"):
+                data = body if isinstance(body, bytes) else json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                mock.clients.add(self.client_address)
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if self.headers.get("Authorization") != "Bearer test-key":
+                    return self._send(401, {"error": "unauthorized"})
+                with mock.lock:
+                    task_id = f"t{len(mock.tasks)}"
+                    mock.tasks[task_id] = {"status": "processing", "result": "", "text": body["input"]}
+                self._send(200, {"task_id": task_id})
+
+            def do_GET(self):
+                mock.clients.add(self.client_address)
+                url = urlparse(self.path)
+                parts = url.path.strip("/").split("/")
+                if parts[0] == "files":
+                    mock.download_auth.append(self.headers.get("Authorization"))
+                    task_id = parts[1].split(".")[0]
+                    if mock.cut_downloads:
+                        self.send_response(200)
+                        self.send_header("Content-Length", str(AUDIO_BYTES))
+                        self.end_headers()
+                        self.wfile.write(b"\0" * (AUDIO_BYTES // 2))
+                        self.close_connection = True
+                        return
+                    return self._send(200, bytes([int(task_id[1:]) % 256]) * AUDIO_BYTES, "audio/mpeg")
+                with mock.lock:
+                    garbled = mock.garbled_polls > 0
+                    mock.garbled_polls -= garbled
+                if garbled:
+                    return self._send(200, b"<html>502 Bad Gateway</html>", "text/html")
+                task_id = parts[-1] if parts[-1] != "task" else parse_qs(url.query).get("task_id", [None])[0]
+                with mock.lock:
+                    if parts[-1] != "task":
+                        mock.by_id_checks[task_id] = mock.by_id_checks.get(task_id, 0) + 1
+                    else:
+                        mock.list_checks += 1
+                    unknown = mock.by_id_checks.get(task_id, 0) <= mock.unknown_polls
+                if parts[-1] != "task" and mock.by_id and unknown:
+                    return self._send(mock.unknown_status, {"error": "not found"} if mock.unknown_status == 404 else {})
+                if parts[-1] != "task" and mock.by_id:
+                    return self._send(200, mock._task_view(parts[-1]))
+                if parts[-1] != "task":
+                    return self._send(404, {"error": "not found"})
+                known = task_id in mock.tasks and not (mock.by_id and unknown)
+                self._send(200, {"data": [mock._task_view(task_id)] if known else []})
+
+        return Handler
+
+
+def _client(mock, **kwargs):
+    from tiktok_full_gui import GenAIProClient
+    kwargs.setdefault("poll_initial", 0.02)
+    kwargs.setdefault("poll_max", 0.2)
+    return GenAIProClient("test-key", base_url=mock.base, **kwargs)
+
+
+def test_concurrent_tasks_reuse_connections():
+    """Six texts with max 3 in flight: all downloaded intact over a handful of connections."""
+    print("Testing concurrent synthesis...")
+    peak = []
+
+    async def run(mock, tmp):
+        async with _client(mock, max_in_flight=3) as client:
+            async def watch():
+                while True:
+                    peak.append(mock.in_flight())
+                    await asyncio.sleep(0.005)
+            watcher = asyncio.ensure_future(watch())
+            paths = await asyncio.gather(*(client.synthesize(f"text {i}", "voice", os.path.join(tmp, f"{i}.mp3"))
+                                           for i in range(6)))
+            watcher.cancel()
+            return paths
+
+    with MockGenAIPro() as mock, tempfile.TemporaryDirectory() as tmp:
+        paths = asyncio.run(run(mock, tmp))
+        for i, path in enumerate(paths):
+            with open(path, "rb") as f:
+                data = f.read()
+            assert len(data) == AUDIO_BYTES and data[:1] == bytes([i]), f"Audio {i} corrupted"
+        assert not [f for f in os.listdir(tmp) if f.endswith(".part")], "Partial downloads left behind"
+        assert max(peak) == 3, f"Expected 3 tasks in flight, saw {max(peak)}"
+        assert len(mock.clients) <= 6, f"Connections should be reused, saw {len(mock.clients)}"
+        assert mock.download_auth == [None] * 6, "API key must not be sent to the download host"
+    print(f"✓ 6 tasks, peak {max(peak)} in flight, {len(mock.clients)} connections")
+    return True
+
+
+def test_backoff_and_list_fallback():
+    """Polls back off exponentially; without a per-task endpoint the filtered list is used."""
+    print("\nTesting poll backoff and status fallback...")
+
+    async def run(mock, tmp):
+        async with _client(mock, poll_initial=0.05, poll_max=1.0) as client:
+            await client.synthesize("hello", "voice", os.path.join(tmp, "a.mp3"))
+            return client.by_id_endpoint
+
+    with MockGenAIPro(polls_needed=5, by_id=False) as mock, tempfile.TemporaryDirectory() as tmp:
+        by_id = asyncio.run(run(mock, tmp))
+        polls = mock.polls["t0"]
+        gaps = [b - a for a, b in zip(polls, polls[1:])]
+        assert not by_id, "Client should switch to the list endpoint after a 404"
+        assert len(polls) == 5 and gaps[-1] > gaps[0], f"Poll gaps should grow: {[round(g, 3) for g in gaps]}"
+    print(f"✓ Poll gaps {[round(g, 2) for g in gaps]}s, list endpoint used")
+    return True
+
+
+def test_task_missing_after_submit_keeps_endpoint():
+    """A task the server doesn't know yet (404, or 200 without it) doesn't switch the shared client off /task/<id>."""
+    print("\nTesting a just-submitted task missing from the status reply...")
+
+    async def run(mock, tmp):
+        async with _client(mock) as client:
+            await client.synthesize("hello", "voice", os.path.join(tmp, "a.mp3"))
+            first = client.by_id_endpoint
+            await client.synthesize("again", "voice", os.path.join(tmp, "b.mp3"))
+            return first, client.by_id_endpoint
+
+    for status in (404, 200):
+        with MockGenAIPro(unknown_polls=2, unknown_status=status) as mock, tempfile.TemporaryDirectory() as tmp:
+            first, second = asyncio.run(run(mock, tmp))
+            assert first and second, f"{status}: per-task endpoint dropped after a missing task"
+            assert mock.list_checks == 4, f"{status}: list asked only while the task was unknown ({mock.list_checks})"
+    print("✓ Per-task endpoint kept; list used only for the polls that missed")
+    return True
+
+
+def test_failed_task_and_sync_wrapper():
+    """A failed task surfaces as None from generate_tts_with_genaipro; successes return the path."""
+    print("\nTesting generate_tts_with_genaipro...")
+    import tiktok_full_gui as app
+
+    saved = app.GENAIPRO_API_BASE, app.GENAIPRO_POLL_INITIAL, app.GENAIPRO_POLL_MAX
+    with MockGenAIPro(fail_text="bad") as mock, tempfile.TemporaryDirectory() as tmp:
+        app.GENAIPRO_API_BASE, app.GENAIPRO_POLL_INITIAL, app.GENAIPRO_POLL_MAX = mock.base, 0.02, 0.1
+        try:
+            logs = []
+            ok = app.generate_tts_with_genaipro("good", output_path=os.path.join(tmp, "ok.mp3"),
+                                                api_key="test-key", log=logs.append)
+            bad = app.generate_tts_with_genaipro("bad", output_path=os.path.join(tmp, "bad.mp3"),
+                                                 api_key="test-key", log=logs.append)
+        finally:
+            app.GENAIPRO_API_BASE, app.GENAIPRO_POLL_INITIAL, app.GENAIPRO_POLL_MAX = saved
+        assert ok and os.path.getsize(ok) == AUDIO_BYTES, f"Successful task should return the audio path: {logs}"
+        assert bad is None and any("failed" in line for line in logs), "Failed task should return None"
+    print("✓ Success and failure reported like the blocking client")
+    return True
+
+
+def test_garbled_status_and_broken_download():
+    """A status reply that isn't JSON is retried; a download cut short leaves no .part file."""
+    print("\nTesting non-JSON status replies and broken downloads...")
+
+    async def run(mock, path):
+        async with _client(mock) as client:
+            try:
+                await client.synthesize("hello", "voice", path)
+            except Exception as e:
+                return e
+
+    with MockGenAIPro(garbled_polls=2) as mock, tempfile.TemporaryDirectory() as tmp:
+        error = asyncio.run(run(mock, os.path.join(tmp, "a.mp3")))
+        assert error is None and os.path.getsize(os.path.join(tmp, "a.mp3")) == AUDIO_BYTES, f"Poll error: {error}"
+    with MockGenAIPro(cut_downloads=True) as mock, tempfile.TemporaryDirectory() as tmp:
+        error = asyncio.run(run(mock, os.path.join(tmp, "b.mp3")))
+        assert error is not None, "A truncated download should fail"
+        assert not os.listdir(tmp), f"Partial download left behind: {os.listdir(tmp)}"
+    print(f"✓ Garbled polls retried; truncated download cleaned up ({type(error).__name__})")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("GenAI Pro Client Tests")
+    print("=" * 60)
+
+    try:
+        import aiohttp  # noqa: F401
+    except ImportError:
+        print("⚠ aiohttp not installed - skipping")
+        sys.exit(0)
+
+    tests = [
+        test_concurrent_tasks_reuse_connections,
+        test_backoff_and_list_fallback,
+        test_task_missing_after_submit_keeps_endpoint,
+        test_failed_task_and_sync_wrapper,
+        test_garbled_status_and_broken_download,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Test the shared media probe (probe_media / MediaInfo): parsing of ffprobe JSON and of the
+`ffmpeg -i` banner used when ffprobe is missing, real files of each kind, and the cache keyed by
+(path, mtime, size). Real-file tests need ffmpeg.
+"""
+
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+FFPROBE_JSON = {
+    "streams": [
+        {"codec_type": "video", "codec_name": "mjpeg", "width": 600, "height": 600, "disposition": {"attached_pic": 1}},
+        {"codec_type": "video", "codec_name": "h264", "width": 1920, "height": 1080, "avg_frame_rate": "30000/1001",
+         "r_frame_rate": "30/1", "side_data_list": [{"side_data_type": "Display Matrix", "rotation": -90}]},
+        {"codec_type": "audio", "codec_name": "aac", "sample_rate": "48000", "channels": 2},
+    ],
+    "format": {"duration": "12.345000"},
+}
+
+FFMPEG_BANNER = """Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'clip.mov':
+  Duration: 00:01:02.50, start: 0.000000, bitrate: 130 kb/s
+  Stream #0:0[0x1](und): Video: hevc (Main) (hvc1 / 0x31637668), yuv420p(tv, bt709), 3840x2160, 40000 kb/s, 59.94 fps, 59.94 tbr, 600 tbn (default)
+      Side data:
+        displaymatrix: rotation of -90.00 degrees
+  Stream #0:1[0x2](und): Audio: aac (LC) (mp4a / 0x6134706D), 44100 Hz, mono, fltp, 69 kb/s (default)
+At least one output file must be specified
+"""
+
+
+def test_parse_ffprobe_json():
+    """Cover art is skipped; fps fraction, display-matrix rotation and audio fields are read."""
+    print("Testing ffprobe JSON parsing...")
+    from tiktok_full_gui import MediaInfo, _parse_ffprobe_json
+
+    info = MediaInfo(path="x.mp4", **_parse_ffprobe_json(FFPROBE_JSON))
+    assert (info.width, info.height, info.video_codec) == (1920, 1080, "h264"), info
+    assert abs(info.fps - 29.97) < 0.01 and info.rotation == 270 and info.display_size == (1080, 1920), info
+    assert info.duration == 12.345 and info.has_audio and (info.audio_codec, info.sample_rate, info.channels) == ("aac", 48000, 2)
+
+    audio_only = MediaInfo(path="x.mp3", **_parse_ffprobe_json({"streams": [FFPROBE_JSON["streams"][2]], "format": {}}))
+    assert not audio_only.has_video and audio_only.has_audio and audio_only.duration == 0.0
+    print("✓ ffprobe JSON parsed")
+    return True
+
+
+def test_parse_ffmpeg_banner():
+    """The fallback parser reads the same fields from `ffmpeg -i` output."""
+    print("\nTesting ffmpeg banner parsing...")
+    from tiktok_full_gui import MediaInfo, _parse_ffmpeg_banner
+
+    info = MediaInfo(path="clip.mov", **_parse_ffmpeg_banner(FFMPEG_BANNER))
+    assert (info.width, info.height, info.video_codec, info.fps) == (3840, 2160, "hevc", 59.94), info
+    assert info.rotation == 270 and info.display_size == (2160, 3840), info
+    assert info.duration == 62.5 and (info.audio_codec, info.sample_rate, info.channels) == ("aac", 44100, 1), info
+    print("✓ ffmpeg banner parsed")
+    return True
+
+
+def _make_media(tmp):
+    def ffmpeg(*args):
+        subprocess.run(["ffmpeg", "-v", "error", "-y", *args], check=True)
+    av = os.path.join(tmp, "av.mp4")
+    ffmpeg("-f", "lavfi", "-i", "testsrc=size=320x240:rate=25", "-f", "lavfi", "-i", "sine=sample_rate=44100",
+           "-t", "2", "-c:v", "libx264", "-c:a", "aac", "-shortest", av)
+    silent = os.path.join(tmp, "silent.mp4")
+    ffmpeg("-i", av, "-an", "-c", "copy", silent)
+    voice = os.path.join(tmp, "voice.wav")
+    ffmpeg("-f", "lavfi", "-i", "sine=sample_rate=22050", "-t", "1.5", "-ac", "2", voice)
+    rotated = os.path.join(tmp, "rotated.mp4")
+    ffmpeg("-display_rotation", "90", "-i", av, "-c", "copy", rotated)
+    return av, silent, voice, rotated
+
+
+def test_probe_real_files():
+    """Video+audio, video-only, audio-only and rotated files."""
+    print("\nTesting probe_media on real files...")
+    if not shutil.which("ffmpeg"):
+        print("⚠ ffmpeg not found - skipping")
+        return True
+    from tiktok_full_gui import probe_media, probe_media_duration
+
+    with tempfile.TemporaryDirectory() as tmp:
+        av, silent, voice, rotated = _make_media(tmp)
+        info = probe_media(av)
+        assert (info.width, info.height, info.fps, info.video_codec) == (320, 240, 25.0, "h264"), info
+        assert info.has_audio and info.audio_codec == "aac" and info.sample_rate == 44100, info
+        assert abs(info.duration - 2.0) < 0.1 and probe_media_duration(av) == info.duration
+
+        assert probe_media(silent).has_video and not probe_media(silent).has_audio
+        wav = probe_media(voice)
+        assert not wav.has_video and (wav.audio_codec, wav.sample_rate, wav.channels) == ("pcm_s16le", 22050, 2), wav
+        assert abs(wav.duration - 1.5) < 0.01
+        assert probe_media(rotated).display_size == (240, 320), probe_media(rotated)
+
+        with open(os.path.join(tmp, "junk.mp4"), "wb") as f:
+            f.write(b"not a video" * 100)
+        assert probe_media(os.path.join(tmp, "junk.mp4")) is None
+        assert probe_media(os.path.join(tmp, "missing.mp4")) is None
+    tool = "ffprobe" if shutil.which("ffprobe") else "ffmpeg banner fallback"
+    print(f"✓ All media kinds probed ({tool})")
+    return True
+
+
+def test_cache_by_mtime_and_size():
+    """A second probe of the same file runs no process; rewriting the file probes again."""
+    print("\nTesting probe cache...")
+    if not shutil.which("ffmpeg"):
+        print("⚠ ffmpeg not found - skipping")
+        return True
+    import tiktok_full_gui as app
+
+    calls = []
+    real_run = app.subprocess.run
+
+    def counting_run(cmd, *args, **kwargs):
+        calls.append(cmd[0])
+        return real_run(cmd, *args, **kwargs)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        av, silent, _, _ = _make_media(tmp)
+        app.subprocess.run = counting_run
+        try:
+            first = app.probe_media(av)
+            probes = len(calls)
+            assert app.probe_media(av) is first and app.probe_media_duration(av) == first.duration
+            assert len(calls) == probes, "Cached probe should not run ffprobe/ffmpeg again"
+
+            time.sleep(0.01)
+            shutil.copyfile(silent, av)  # same path, new contents
+            assert not app.probe_media(av).has_audio, "Changed file must be probed again"
+            assert len(calls) > probes
+        finally:
+            app.subprocess.run = real_run
+    print(f"✓ Cached per (path, mtime, size); {probes} process(es) for the first probe, 0 for repeats")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Media Probe Tests")
+    print("=" * 60)
+
+    tests = [
+        test_parse_ffprobe_json,
+        test_parse_ffmpeg_banner,
+        test_probe_real_files,
+        test_cache_by_mtime_and_size,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test the process-wide model registry used to keep Whisper models resident between jobs.
+Uses fake loaders so no real model weights are downloaded.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class _FakeModel:
+    """Stand-in for a torch module; ModelRegistry falls back to size 0 when it can't measure."""
+    def __init__(self, name):
+        self.name = name
+
+
+def test_cache_hits_and_misses():
+    """Second request for the same key must not call the loader again."""
+    print("Testing model cache hits/misses...")
+    from tiktok_full_gui import ModelRegistry
+
+    registry = ModelRegistry(budget_mb=0)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return _FakeModel("large"), ("large", "cpu", "fp32")
+
+    key = ("large", "cpu", "fp32")
+    m1, _ = registry.get(key, loader)
+    m2, _ = registry.get(key, loader)
+
+    assert m1 is m2, "Cached model should be reused"
+    assert len(calls) == 1, f"Loader should run once, ran {len(calls)} times"
+    stats = registry.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1, f"Unexpected stats: {stats}"
+    print(f"✓ Loader called once, stats: {stats}")
+    return True
+
+
+def test_fallback_alias():
+    """A CUDA request that fell back to CPU should be served from the CPU entry next time."""
+    print("\nTesting device fallback aliasing...")
+    from tiktok_full_gui import ModelRegistry
+
+    registry = ModelRegistry(budget_mb=0)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return _FakeModel("large"), ("large", "cpu", "fp32")
+
+    registry.get(("large", "cuda", "fp16"), loader)
+    _, key = registry.get(("large", "cuda", "fp16"), loader)
+
+    assert len(calls) == 1, "Fallback key should be remembered"
+    assert key == ("large", "cpu", "fp32"), f"Unexpected resolved key: {key}"
+    print(f"✓ Requested CUDA key resolved to {key}")
+    return True
+
+
+def test_lru_eviction():
+    """Least-recently-used models are evicted once the RAM budget is exceeded."""
+    print("\nTesting LRU eviction under RAM budget...")
+    from tiktok_full_gui import ModelRegistry
+
+    class SizedRegistry(ModelRegistry):
+        @staticmethod
+        def estimate_size_bytes(model):
+            return 600 * 1024 * 1024  # 600 MB per fake model
+
+    registry = SizedRegistry(budget_mb=1000)
+    for name in ("small", "medium"):
+        key = (name, "cpu", "fp32")
+        registry.get(key, lambda k=key: (_FakeModel(k[0]), k))
+
+    stats = registry.stats()
+    assert stats["resident"] == [("medium", "cpu", "fp32")], f"Unexpected resident set: {stats['resident']}"
+    assert stats["evictions"] == 1, f"Expected 1 eviction, got {stats['evictions']}"
+    print(f"✓ Oldest model evicted, resident: {stats['resident']}")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Model Cache Tests")
+    print("=" * 60)
+
+    tests = [
+        test_cache_hits_and_misses,
+        test_fallback_alias,
+        test_lru_eviction,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
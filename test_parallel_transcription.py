@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Test chunked parallel transcription: the energy-VAD chunk plan (plan_transcription_chunks),
+mapping chunk times back onto the full track (offset_chunk_segments), transcribe_parallel
+end to end with a stand-in model that reports where it hears sound, and worker sizing with the
+shipped settings.
+"""
+
+import sys
+import os
+import types
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+SR = 16000
+
+
+def _talk(layout, seed=0):
+    """layout: list of ('speech' | 'pause', seconds). Returns (pcm, [(start, end) of each speech part])."""
+    rng = np.random.default_rng(seed)
+    pieces, spoken, pos = [], [], 0
+    for kind, seconds in layout:
+        n = int(seconds * SR)
+        if kind == "speech":
+            t = np.arange(n) / SR
+            pieces.append(np.sin(2 * np.pi * 200 * t) * 8000 * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t) ** 2))
+            spoken.append((pos / SR, (pos + n) / SR))
+        else:
+            pieces.append(rng.normal(0, 15, n))
+        pos += n
+    return np.clip(np.concatenate(pieces), -32768, 32767).astype(np.int16), spoken
+
+
+def test_chunk_plan():
+    """Chunks cover all speech, leave long pauses out and stay under the size limit."""
+    print("Testing plan_transcription_chunks...")
+    from tiktok_full_gui import plan_transcription_chunks
+
+    layout = [("pause", 1.0)]
+    for i in range(12):
+        layout += [("speech", 4.0 + i % 3), ("pause", 0.3), ("speech", 3.0), ("pause", 2.0 + i % 2)]
+    pcm, spoken = _talk(layout)
+    chunks = plan_transcription_chunks(pcm, max_chunk_s=20)
+    regions = [r for chunk in chunks for r in chunk]
+
+    covered = np.zeros(len(pcm), bool)
+    for s, e in regions:
+        covered[s:e] = True
+    for a, b in spoken:
+        assert covered[int(a * SR):int(b * SR)].all(), f"Speech {a:.1f}-{b:.1f}s not covered"
+    for (_, b), (a, _) in zip(spoken, spoken[1:]):
+        if a - b >= 2.0:
+            assert not covered[int((b + 0.5) * SR):int((a - 0.5) * SR)].any(), f"Pause {b:.1f}-{a:.1f}s transcribed"
+    assert all(sum(e - s for s, e in chunk) <= 20 * SR for chunk in chunks), "Chunk over the limit"
+    assert all(a[1] <= b[0] for a, b in zip(regions, regions[1:])), "Regions must be ordered and disjoint"
+    kept = sum(e - s for s, e in regions) / len(pcm)
+
+    # One long stretch with a single dip is cut at the dip; silence alone has nothing to transcribe
+    pcm, _ = _talk([("speech", 17.0), ("pause", 0.2), ("speech", 17.0)])
+    cuts = [chunk[0][0] / SR for chunk in plan_transcription_chunks(pcm, max_chunk_s=20)]
+    assert len(cuts) == 2 and abs(cuts[1] - 17.1) < 0.1, f"Expected a cut in the dip at 17.1s, got {cuts}"
+    assert plan_transcription_chunks(np.zeros(SR * 5, np.int16)) == []
+    print(f"✓ {len(chunks)} chunks, {kept:.0%} of the audio sent to Whisper, long speech cut at the quietest point")
+    return True
+
+
+def test_offset_chunk_segments():
+    """Times on a chunk's joined audio land on the matching region of the full track."""
+    print("\nTesting offset_chunk_segments...")
+    from tiktok_full_gui import offset_chunk_segments
+
+    regions = [(SR * 2, SR * 5), (SR * 10, SR * 12)]  # 3 s + 2 s joined
+    segments = [{"id": 0, "start": 0.5, "end": 3.5, "text": " a b", "words": [
+        {"word": " a", "start": 0.5, "end": 2.9}, {"word": " b", "start": 3.1, "end": 4.0}]},
+        {"id": 1, "start": 4.2, "end": 6.0, "text": " c"}]
+    out = offset_chunk_segments(segments, regions)
+    assert [out[0]["start"], out[0]["end"]] == [2.5, 10.5]
+    assert [(w["start"], w["end"]) for w in out[0]["words"]] == [(2.5, 4.9), (10.1, 11.0)]
+    assert [out[1]["start"], out[1]["end"]] == [11.2, 12.0], "Times past the chunk end clamp to the last region"
+    assert out[1]["text"] == " c" and segments[0]["start"] == 0.5, "Fields kept, input untouched"
+    print("✓ Segment and word times offset per region")
+    return True
+
+
+class _EarModel:
+    """Stand-in Whisper: one segment per stretch of sound, with chunk-relative times."""
+
+    def transcribe(self, audio, fp16=False, **kwargs):
+        assert audio.dtype == np.float32 and kwargs.get("word_timestamps")
+        frames = len(audio) // 160
+        loud = np.abs(audio[:frames * 160].reshape(frames, 160)).mean(axis=1) > 0.05
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], loud.astype(int), [0]])))
+        segments = []
+        for start, end in zip(edges[::2] / 100.0, edges[1::2] / 100.0):
+            segments.append({"start": start, "end": end, "text": " la",
+                             "words": [{"word": " la", "start": start, "end": end, "probability": 0.9}]})
+        return {"segments": segments}
+
+
+def test_transcribe_parallel():
+    """Each chunk goes to a whisper_worker; the merged words sit on the original speech times."""
+    print("\nTesting transcribe_parallel...")
+    import tiktok_full_gui as app
+
+    layout = [("pause", 0.5)]
+    for i in range(10):
+        layout += [("speech", 5.0 + i % 4), ("pause", 1.5)]
+    pcm, spoken = _talk(layout, seed=1)
+    loads = []
+
+    class InProcessPool(ThreadPoolExecutor):
+        """Same initializer/map protocol as the process pool, run in threads (start method is moot)."""
+
+        def __init__(self, max_workers=None, mp_context=None, initializer=None, initargs=()):
+            assert mp_context is not None and mp_context.get_start_method() in ("forkserver", "spawn")
+            super().__init__(max_workers=max_workers, initializer=initializer, initargs=initargs)
+
+    fake_whisper = types.SimpleNamespace(load_model=lambda name, device=None: loads.append((name, device)) or _EarModel())
+    fake_torch = types.SimpleNamespace(set_num_threads=lambda n: None)
+    saved = app.ProcessPoolExecutor, app.WHISPER_CHUNK_MAX_S
+    saved_modules = {name: sys.modules.get(name) for name in ("whisper", "torch")}
+    app.ProcessPoolExecutor = InProcessPool
+    app.WHISPER_CHUNK_MAX_S = 20
+    sys.modules.update(whisper=fake_whisper, torch=fake_torch)  # what the worker module imports
+    logs = []
+    try:
+        segments = app.transcribe_parallel(pcm, "large", workers=3, log=logs.append)
+    finally:
+        app.ProcessPoolExecutor, app.WHISPER_CHUNK_MAX_S = saved
+        for name, module in saved_modules.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+    assert loads and all(l == ("large", "cpu") for l in loads) and len(loads) <= 3, loads
+    assert [s["id"] for s in segments] == list(range(len(segments)))
+    assert len(segments) == len(spoken), f"{len(segments)} segments for {len(spoken)} stretches of speech"
+    for seg, (a, b) in zip(segments, spoken):
+        assert abs(seg["start"] - a) <= 0.02 and abs(seg["end"] - b) <= 0.02, f"{seg['start']}-{seg['end']} vs {a}-{b}"
+        assert seg["words"][0]["start"] == seg["start"]
+    assert any("Parallel:" in line for line in logs)
+    print(f"✓ {len(segments)} segments back on the track timeline; {logs[0].split('] ')[1]}")
+    return True
+
+
+def test_default_settings_go_parallel():
+    """With the shipped settings, long CPU audio on a 16-core/32 GB machine reaches transcribe_parallel."""
+    print("\nTesting default worker sizing...")
+    import tiktok_full_gui as app
+
+    class Resident:
+        def __init__(self, mb):
+            self.mb = mb
+
+        def stats(self):
+            return {"resident_mb": self.mb, "hits": 0, "misses": 0, "load_seconds": 0}
+
+    pcm, _ = _talk([("speech", 10.0), ("pause", 1.0)] * 12)  # 132 s
+    calls = []
+    saved = (app._system_memory_mb, os.cpu_count, app._detect_whisper_device, app._whisper_checkpoint_ready,
+             app.transcribe_parallel, app.decode_audio_16k, app.TRANSCRIPTS, app.WHISPER_MODELS)
+    app._system_memory_mb = lambda: 32768
+    os.cpu_count = lambda: 16
+    app._detect_whisper_device = lambda log=None: "cpu"
+    app._whisper_checkpoint_ready = lambda name: True
+    app.transcribe_parallel = lambda audio, name, workers=None, log=None: calls.append(name) or [
+        {"id": 0, "start": 0.0, "end": 1.0, "text": " hi", "words": []}]
+    app.decode_audio_16k = lambda path: pcm
+    app.WHISPER_MODELS = Resident(0)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            app.TRANSCRIPTS = app.TranscriptCache(tmp)
+            workers = app.whisper_parallel_workers("large")
+            segments = app.transcribe_captions("voice.wav", log=lambda s: None)
+        app.WHISPER_MODELS = Resident(7600)  # 'large' already held by this process
+        crowded = app.whisper_parallel_workers("large")
+        app._system_memory_mb = lambda: 0
+        unknown = app.whisper_parallel_workers("large")
+    finally:
+        (app._system_memory_mb, os.cpu_count, app._detect_whisper_device, app._whisper_checkpoint_ready,
+         app.transcribe_parallel, app.decode_audio_16k, app.TRANSCRIPTS, app.WHISPER_MODELS) = saved
+
+    assert app.WHISPER_PARALLEL_WORKERS == 0 and workers == 2, f"Expected 2 workers by default, got {workers}"
+    assert calls == ["large"] and segments[0]["text"] == " hi", "Default settings must reach transcribe_parallel"
+    assert crowded == 1, f"The resident model counts against the budget: {crowded}"
+    assert unknown == 1, "Unknown RAM means one pass"
+    print(f"✓ {workers} workers by default; 1 once 'large' is resident in this process")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Parallel Transcription Tests")
+    print("=" * 60)
+
+    tests = [
+        test_chunk_plan,
+        test_offset_chunk_segments,
+        test_transcribe_parallel,
+        test_default_settings_go_parallel,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test the per-job RenderConfig snapshot that lets HD and 4K jobs render in parallel
+without sharing mutable module globals.
+"""
+
+import sys
+import os
+import dataclasses
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_hd_and_4k_configs():
+    """use_4k selects dimensions and font size per job, independent of the GUI mode."""
+    print("Testing HD/4K config snapshots...")
+    import tiktok_full_gui as app
+
+    hd = app.RenderConfig.from_globals(use_4k=False)
+    uhd = app.RenderConfig.from_globals(use_4k=True)
+
+    assert (hd.width, hd.height) == (1080, 1920), f"Unexpected HD size: {hd.width}x{hd.height}"
+    assert (uhd.width, uhd.height) == (2160, 3840), f"Unexpected 4K size: {uhd.width}x{uhd.height}"
+    assert uhd.caption_font_size == 2 * hd.caption_font_size, "4K font size should be doubled"
+    assert app.WIDTH == 1080 and app.IS_4K_MODE is False, "Building configs must not touch globals"
+    print(f"✓ HD {hd.width}x{hd.height} @ {hd.caption_font_size}px, 4K {uhd.width}x{uhd.height} @ {uhd.caption_font_size}px")
+    return True
+
+
+def test_gui_pixel_settings_rescaled():
+    """Stroke width / Y offset set in 4K GUI mode are halved for an HD job."""
+    print("\nTesting pixel settings rescale between GUI mode and job mode...")
+    import tiktok_full_gui as app
+
+    saved = (app.IS_4K_MODE, app.CAPTION_STROKE_WIDTH, app.CAPTION_Y_OFFSET)
+    try:
+        app.IS_4K_MODE = True
+        app.CAPTION_STROKE_WIDTH = 6
+        app.CAPTION_Y_OFFSET = -400
+        hd = app.RenderConfig.from_globals(use_4k=False)
+        uhd = app.RenderConfig.from_globals(use_4k=True)
+    finally:
+        app.IS_4K_MODE, app.CAPTION_STROKE_WIDTH, app.CAPTION_Y_OFFSET = saved
+
+    assert (hd.caption_stroke_width, hd.caption_y_offset) == (3, -200), f"HD got {hd.caption_stroke_width}, {hd.caption_y_offset}"
+    assert (uhd.caption_stroke_width, uhd.caption_y_offset) == (6, -400), f"4K got {uhd.caption_stroke_width}, {uhd.caption_y_offset}"
+    print("✓ Pixel settings follow the job's resolution")
+    return True
+
+
+def test_config_is_immutable():
+    """A job's config can't be changed under it by another thread."""
+    print("\nTesting config immutability...")
+    import tiktok_full_gui as app
+
+    cfg = app.RenderConfig.from_globals()
+    try:
+        cfg.width = 1
+        print("✗ RenderConfig accepted an attribute assignment")
+        return False
+    except dataclasses.FrozenInstanceError:
+        pass
+    assert app.RenderConfig.from_globals(music_gain=0.5).music_gain == 0.5, "Overrides should apply"
+    print("✓ Config is frozen; overrides apply")
+    return True
+
+
+def test_resolved_font_is_a_real_file():
+    """Only a font file on disk becomes caption_font_path; family-name/fallback labels keep the preferred name."""
+    print("\nTesting with_resolved_font...")
+    import tiktok_full_gui as app
+
+    labels = {"FamilyOnlyFont": "family:FamilyOnlyFont", "FallbackFont": "DejaVuSans.ttf (fallback)",
+              "FileFont": os.path.abspath(__file__)}
+    saved = app._resolve_font
+    app._resolve_font = lambda preferred, size, log=None: (None, labels[preferred])
+    try:
+        resolved = {name: app.RenderConfig.from_globals(preferred_font=name).with_resolved_font() for name in labels}
+    finally:
+        app._resolve_font = saved
+        with app._RENDER_FONTS_LOCK:
+            for key in [k for k in app._RENDER_FONTS if k[0] in labels]:
+                del app._RENDER_FONTS[key]
+
+    for name in ("FamilyOnlyFont", "FallbackFont"):
+        cfg = resolved[name]
+        assert cfg.caption_font_path is None, f"{name}: label leaked into caption_font_path: {cfg.caption_font_path}"
+        assert app.caption_sprite_key("Hi", cfg) == app.caption_sprite_key("Hi", app.RenderConfig.from_globals(preferred_font=name))
+    assert resolved["FileFont"].caption_font_path == labels["FileFont"]
+    print("✓ Labels stay out of caption_font_path; font files are kept")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Render Config Tests")
+    print("=" * 60)
+
+    tests = [
+        test_hd_and_4k_configs,
+        test_gui_pixel_settings_rescaled,
+        test_config_is_immutable,
+        test_resolved_font_is_a_real_file,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Test the shared decode (DECODED_AUDIO): Whisper is handed the decoded 16 kHz float32 samples
+instead of a path, with or without the transcript cache; the silence remover's decode is reused
+by caption alignment; PCMCache holding one array per sample rate. File tests need ffmpeg.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+WORDS = [["One", "two", "three."], ["Four", "five", "six."], ["Seven", "eight", "nine."]]
+
+
+def _write_wav(path, pcm, sample_rate):
+    pcm = pcm.reshape(len(pcm), -1)
+    with wave.open(path, "wb") as w:
+        w.setnchannels(pcm.shape[1])
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm.tobytes())
+
+
+def _spoken_words(sample_rate, channels=2):
+    """0.3 s tone bursts per word, 50 ms between words and 0.6 s between sentences."""
+    t = np.arange(int(0.3 * sample_rate)) / sample_rate
+    word = np.sin(2 * np.pi * 220 * t) * 9000
+    gap, pause = np.zeros(int(0.05 * sample_rate)), np.zeros(int(0.6 * sample_rate))
+    pieces = [pause]
+    for sentence in WORDS:
+        for _ in sentence:
+            pieces += [word, gap]
+        pieces.append(pause)
+    mono = np.concatenate(pieces)
+    return np.stack([mono * (0.5 + 0.5 * c) for c in range(channels)], axis=1).astype(np.int16)
+
+
+def _counting_subprocess(app):
+    calls = []
+    real_run = app.subprocess.run
+
+    def counting_run(cmd, *args, **kwargs):
+        calls.append(cmd[0])
+        return real_run(cmd, *args, **kwargs)
+    return calls, counting_run, real_run
+
+
+def test_whisper_gets_shared_samples():
+    """Without the transcript cache Whisper still gets the decoded array, and nothing is decoded again."""
+    print("Testing transcribe_captions input...")
+    import tiktok_full_gui as app
+
+    received = []
+
+    class FakeModel:
+        def transcribe(self, audio, **kwargs):
+            received.append(audio)
+            return {"segments": [{"start": 0.0, "end": 1.0, "text": " Hi.", "words": []}]}
+
+    pcm = (np.sin(np.arange(32000) / 10.0) * 8000).astype(np.int16)
+    saved = app.TRANSCRIPTS, app.get_whisper_model
+    calls, counting_run, real_run = _counting_subprocess(app)
+    with tempfile.TemporaryDirectory() as tmp:
+        voice = os.path.join(tmp, "voice.wav")
+        _write_wav(voice, pcm, 16000)
+        app.DECODED_AUDIO.put(voice, pcm)  # as extract_voice_from_video leaves it
+        app.TRANSCRIPTS, app.get_whisper_model = None, lambda name, tries=3, log=None: (FakeModel(), "cpu")
+        app.subprocess.run = counting_run
+        try:
+            app.transcribe_captions(voice, log=lambda *_: None)
+        finally:
+            app.TRANSCRIPTS, app.get_whisper_model = saved
+            app.subprocess.run = real_run
+
+    audio = received[0]
+    assert isinstance(audio, np.ndarray) and audio.dtype == np.float32, f"Whisper got {type(audio)}"
+    assert np.array_equal(audio, pcm.astype(np.float32) / 32768.0), "Same scaling as whisper.load_audio"
+    assert not calls, f"No decode expected, ran {calls}"
+    print("✓ float32 16 kHz array passed to Whisper, no ffmpeg started")
+    return True
+
+
+def test_alignment_reuses_silence_decode():
+    """remove_silence_from_audio leaves both mono mixes in DECODED_AUDIO; alignment runs no process."""
+    print("\nTesting decode shared by silence removal and alignment...")
+    if not shutil.which("ffmpeg"):
+        print("⚠ ffmpeg not found - skipping")
+        return True
+    import tiktok_full_gui as app
+
+    rate = 24000
+    stereo = _spoken_words(rate)
+    segments = [{"start": 0.0, "end": 1.0, "text": " " + " ".join(s)} for s in WORDS]
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "tts.wav")
+        _write_wav(src, stereo, rate)
+        out, silence_map = app.remove_silence_from_audio(src, output_path=os.path.join(tmp, "out.wav"),
+                                                        min_silence_ms=300)
+        assert len(silence_map) == 3, silence_map
+
+        pcm, sample_rate = app.DECODED_AUDIO.get_any(src)
+        assert sample_rate == rate and np.array_equal(pcm, app.downmix_pcm(stereo)), "Source mono mix cached"
+        out_pcm, _ = app.DECODED_AUDIO.get_any(out)
+        with wave.open(out) as w:
+            written = np.frombuffer(w.readframes(w.getnframes()), np.int16).reshape(-1, 2)
+        assert np.array_equal(out_pcm, app.downmix_pcm(written)), "Output mono mix cached"
+
+        calls, counting_run, real_run = _counting_subprocess(app)
+        app.subprocess.run = counting_run
+        try:
+            shared = app.align_tts_captions(src, segments, silence_map=silence_map)
+        finally:
+            app.subprocess.run = real_run
+        assert not calls, f"Alignment should reuse the decode, ran {calls}"
+
+        decoded = app.align_text_to_speech(app.decode_audio_pcm(src, 16000), 16000, segments)
+        decoded = app.map_timestamps_after_silence_removal(decoded, silence_map)
+    got = np.array([[w["start"], w["end"]] for s in shared for w in s["words"]])
+    ref = np.array([[w["start"], w["end"]] for s in decoded for w in s["words"]])
+    assert np.abs(got - ref).max() <= 0.02, f"Native-rate alignment differs from 16 kHz by {np.abs(got - ref).max():.3f}s"
+    print(f"✓ One decode for silence removal + alignment (max {np.abs(got - ref).max() * 1000:.0f} ms from a 16 kHz decode)")
+    return True
+
+
+def test_pcm_cache_per_rate():
+    """One entry per file holds each rate; get_any prefers 16 kHz; eviction counts every rate."""
+    print("\nTesting PCMCache sample rates...")
+    from tiktok_full_gui import PCMCache
+
+    cache = PCMCache(max_mb=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        a, b = os.path.join(tmp, "a"), os.path.join(tmp, "b")
+        for path in (a, b):
+            with open(path, "w") as f:
+                f.write(path)
+        cache.put(a, np.ones(100000, np.int16), 44100)
+        pcm, rate = cache.get_any(a)
+        assert rate == 44100 and cache.get(a) is None, "No 16 kHz decode yet"
+        cache.put(a, np.full(40000, 2, np.int16))
+        assert cache.get_any(a)[1] == 16000 and cache.get(a, 44100)[0] == 1
+        assert cache.stats()["entries"] == 1
+
+        cache.put(b, np.zeros(400000, np.int16), 22050)  # 800 KB: a (280 KB) and b don't fit together
+        assert cache.get_any(a) is None and cache.get(b, 22050) is not None
+        assert cache.get_any(os.path.join(tmp, "missing")) is None
+    print(f"✓ Per-rate entries: {cache.stats()}")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Shared Decode Tests")
+    print("=" * 60)
+
+    tests = [
+        test_whisper_gets_shared_samples,
+        test_alignment_reuses_silence_decode,
+        test_pcm_cache_per_rate,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
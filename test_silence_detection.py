@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Test the NumPy silence detector (detect_nonsilent_ranges) against pydub's detect_nonsilent,
+the silence map produced by remove_silence_from_audio, the streaming mode (StreamingSilenceCutter)
+against the in-memory one, and benchmark a 10-minute track.
+pydub comparisons are skipped when pydub is not installed; file tests need ffmpeg.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+
+def _speech_like(seconds, sample_rate, channels, seed=0):
+    """Bursts of tone + noise separated by pauses of varying length, with a quiet noise floor."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sample_rate) + int(rng.integers(0, 97))  # odd lengths exercise the ms rounding
+    out = rng.normal(0, 30, (n, channels))
+    pos = int(rng.integers(0, sample_rate // 2))
+    while pos < n:
+        burst = int(rng.uniform(0.2, 1.5) * sample_rate)
+        t = np.arange(min(burst, n - pos)) / sample_rate
+        out[pos:pos + len(t)] += (np.sin(2 * np.pi * rng.uniform(100, 600) * t) * rng.uniform(2000, 12000))[:, None]
+        pos += burst + int(rng.choice([0.05, 0.2, 0.35, 0.8, 2.0]) * sample_rate)
+    return np.clip(out, -32768, 32767).astype(np.int16)
+
+
+def _pydub_segment(pcm, sample_rate):
+    from pydub import AudioSegment
+    return AudioSegment(data=pcm.tobytes(), sample_width=2, frame_rate=sample_rate, channels=pcm.shape[1])
+
+
+def _have_pydub():
+    try:
+        import warnings
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            import pydub.silence  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+def test_matches_pydub():
+    """Identical ranges to pydub for several rates, channel counts and silence lengths."""
+    print("Testing detect_nonsilent_ranges against pydub...")
+    if not _have_pydub():
+        print("⚠ pydub not installed - skipping")
+        return True
+    from pydub.silence import detect_nonsilent
+    from tiktok_full_gui import detect_nonsilent_ranges, pcm_dbfs
+
+    cases = [(44100, 2, 300), (22050, 1, 300), (16000, 1, 150), (48000, 2, 1000), (24000, 1, 300)]
+    for i, (rate, channels, min_len) in enumerate(cases):
+        pcm = _speech_like(12, rate, channels, seed=i)
+        seg = _pydub_segment(pcm, rate)
+        assert pcm_dbfs(pcm) == seg.dBFS, "dBFS differs"
+        expected = detect_nonsilent(seg, min_silence_len=min_len, silence_thresh=seg.dBFS - 16)
+        got = detect_nonsilent_ranges(pcm, rate, min_silence_len=min_len, silence_thresh=pcm_dbfs(pcm) - 16)
+        assert got == expected, f"{rate} Hz x{channels}, {min_len} ms: {got[:5]} != {expected[:5]}"
+        print(f"  {rate} Hz x{channels}, {min_len} ms: {len(got)} ranges identical")
+
+    silent = np.zeros((16000, 1), dtype=np.int16)
+    loud = (np.sin(np.arange(16000) / 5.0) * 10000).astype(np.int16)[:, None]
+    for pcm in (silent, loud, loud[:4000]):
+        seg = _pydub_segment(pcm, 16000)
+        expected = detect_nonsilent(seg, min_silence_len=300, silence_thresh=-40)
+        assert detect_nonsilent_ranges(pcm, 16000, 300, -40) == expected, f"Edge case differs: {expected}"
+    print("✓ Ranges match pydub, including all-silent / no-silence / too-short input")
+    return True
+
+
+def test_remove_silence_map():
+    """remove_silence_from_audio keeps exactly the non-silent audio and reports the same silence map."""
+    print("\nTesting remove_silence_from_audio...")
+    if not shutil.which("ffmpeg"):
+        print("⚠ ffmpeg not found - skipping")
+        return True
+    from tiktok_full_gui import remove_silence_from_audio, detect_nonsilent_ranges, pcm_dbfs
+
+    rate = 44100
+    pcm = _speech_like(20, rate, 2, seed=7)
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "voice.wav")
+        _write_wav(src, pcm, rate)
+        out, silence_map = remove_silence_from_audio(src, output_path=os.path.join(tmp, "out.wav"), min_silence_ms=300)
+
+        ranges = detect_nonsilent_ranges(pcm, rate, 300, pcm_dbfs(pcm) - 16)
+        assert [[round(a * 1000), round(b * 1000)] for a, b, _, _ in silence_map] == ranges, "Map should follow the ranges"
+        assert all(abs((m[1] - m[0]) - (m[3] - m[2])) < 1e-9 for m in silence_map), "Kept lengths must be preserved"
+        assert all(abs(a[3] - b[2]) < 1e-9 for a, b in zip(silence_map, silence_map[1:])), "New timeline must be contiguous"
+
+        with wave.open(out) as w:
+            kept = np.frombuffer(w.readframes(w.getnframes()), np.int16).reshape(-1, 2)
+        expected = np.concatenate([pcm[int(a * rate / 1000.0):int(b * rate / 1000.0)] for a, b in ranges])
+        assert np.array_equal(kept, expected), "Output should be the non-silent frames back to back"
+        removed = len(pcm) / rate - len(kept) / rate
+    print(f"✓ {len(silence_map)} kept segments, {removed:.2f}s removed, audio bit-exact")
+    return True
+
+
+def _write_wav(path, pcm, rate):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(pcm.shape[1])
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+
+
+def test_streaming_cutter_matches():
+    """Fed in blocks of any size, the streaming cutter finds the same ranges and keeps the same frames."""
+    print("\nTesting StreamingSilenceCutter against the in-memory detector...")
+    from tiktok_full_gui import StreamingSilenceCutter, detect_nonsilent_ranges, pcm_dbfs, _ms_to_frame
+
+    rng = np.random.default_rng(11)
+    cases = [(44100, 2, 300, 1), (16000, 1, 150, 1), (22050, 1, 300, 7), (48000, 2, 1000, 10), (8000, 1, 50, 100)]
+    silent = np.zeros((16000, 1), dtype=np.int16)
+    loud = (np.sin(np.arange(16000) / 5.0) * 10000).astype(np.int16)[:, None]
+    inputs = [(_speech_like(15, r, c, seed=i), r, L, step) for i, (r, c, L, step) in enumerate(cases)]
+    inputs += [(silent, 16000, 300, 1), (loud, 16000, 300, 1), (loud[:4000], 16000, 300, 1)]
+    for pcm, rate, L, step in inputs:
+        thresh = pcm_dbfs(pcm) - 16 if pcm.any() else -40
+        expected = detect_nonsilent_ranges(pcm, rate, L, thresh, seek_step=step)
+        padded = np.concatenate([pcm, np.zeros((rate, pcm.shape[1]), np.int16)])  # slices past the end are zero
+        kept_expected = np.concatenate([pcm[:0]] + [
+            padded[_ms_to_frame(a, rate):_ms_to_frame(b, rate)] for a, b in expected])
+        for block in (1, 997, 4096, 1 << 20):
+            if block == 1 and len(pcm) > 20000:
+                continue
+            out = []
+            cutter = StreamingSilenceCutter(rate, pcm.shape[1], len(pcm), out.append, L, thresh, seek_step=step)
+            sizes = rng.integers(1, 2 * block + 1, size=len(pcm) // block + 2)
+            pos = 0
+            for size in sizes:
+                cutter.feed(pcm[pos:pos + size])
+                pos += size
+            cutter.feed(pcm[pos:])
+            got = cutter.finish()
+            assert got == expected, f"{rate} Hz, {L} ms, step {step}, ~{block} frames: {got[:4]} != {expected[:4]}"
+            kept = np.concatenate(out) if out else kept_expected[:0]
+            assert np.array_equal(kept, kept_expected), f"Kept audio differs ({rate} Hz, ~{block} frames)"
+        print(f"  {rate} Hz x{pcm.shape[1]}, {L} ms, step {step}: {len(expected)} ranges identical")
+    print("✓ Streaming ranges and kept audio match, independent of block boundaries")
+    return True
+
+
+def test_streaming_file_constant_memory():
+    """streaming=True gives the same file and silence map; peak memory doesn't grow with the length."""
+    print("\nTesting streaming remove_silence_from_audio...")
+    if not shutil.which("ffmpeg"):
+        print("⚠ ffmpeg not found - skipping")
+        return True
+    import tiktok_full_gui as app
+
+    rate = 22050
+    peaks = {}
+    saved = app.SILENCE_STREAM_BLOCK_FRAMES
+    app.SILENCE_STREAM_BLOCK_FRAMES = 1 << 15
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for seconds in (60, 600):
+                src = os.path.join(tmp, f"voice{seconds}.wav")
+                _write_wav(src, _speech_like(seconds, rate, 1, seed=seconds), rate)
+                for streaming in (False, True):
+                    out = os.path.join(tmp, f"out{seconds}_{streaming}.wav")
+                    tracemalloc.start()
+                    _, silence_map = app.remove_silence_from_audio(src, output_path=out, streaming=streaming)
+                    peaks[seconds, streaming] = tracemalloc.get_traced_memory()[1] / 1e6
+                    tracemalloc.stop()
+                    with open(out, "rb") as f:
+                        if streaming:
+                            assert silence_map == reference_map, "Streaming silence map differs"
+                            assert f.read() == reference_audio, "Streaming output differs"
+                        else:
+                            reference_map, reference_audio = silence_map, f.read()
+                print(f"  {seconds}s: {len(silence_map)} kept segments, peak {peaks[seconds, False]:.1f} MB "
+                      f"in memory vs {peaks[seconds, True]:.1f} MB streaming")
+    finally:
+        app.SILENCE_STREAM_BLOCK_FRAMES = saved
+    assert peaks[600, True] < peaks[60, True] * 1.5 + 1, f"Streaming peak grew with length: {peaks}"
+    assert peaks[600, True] < peaks[600, False] / 4, f"Streaming should use far less memory: {peaks}"
+    print("✓ Identical output, streaming memory independent of input length")
+    return True
+
+
+
+def test_benchmark_10_minutes():
+    """Time the detector on a 10-minute 44.1 kHz stereo track (pydub timed on 60 s and projected)."""
+    print("\nBenchmarking silence detection...")
+    from tiktok_full_gui import detect_nonsilent_ranges, pcm_dbfs
+
+    rate = 44100
+    pcm = _speech_like(600, rate, 2, seed=3)
+    t0 = time.perf_counter()
+    ranges = detect_nonsilent_ranges(pcm, rate, 300, pcm_dbfs(pcm) - 16)
+    numpy_s = time.perf_counter() - t0
+    print(f"  NumPy: 10 min -> {len(ranges)} ranges in {numpy_s:.2f}s")
+
+    if _have_pydub():
+        from pydub.silence import detect_nonsilent
+        minute = pcm[:60 * rate]
+        seg = _pydub_segment(minute, rate)
+        t0 = time.perf_counter()
+        expected = detect_nonsilent(seg, min_silence_len=300, silence_thresh=seg.dBFS - 16)
+        pydub_s = time.perf_counter() - t0
+        assert detect_nonsilent_ranges(minute, rate, 300, pcm_dbfs(minute) - 16) == expected, "60 s ranges differ"
+        print(f"  pydub: 60 s in {pydub_s:.2f}s -> ~{pydub_s * 10:.0f}s projected for 10 min "
+              f"({pydub_s * 10 / numpy_s:.0f}x slower)")
+    print("✓ Benchmark complete")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Silence Detection Tests")
+    print("=" * 60)
+
+    tests = [
+        test_matches_pydub,
+        test_remove_silence_map,
+        test_streaming_cutter_matches,
+        test_streaming_file_constant_memory,
+        test_benchmark_10_minutes,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
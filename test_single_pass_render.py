@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test the single-pass ffmpeg render graph builder, caption grouping and the input checks that
+decide when single-pass is skipped. Only inspects the generated command and stubbed probes, so
+ffmpeg itself is not required.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def _build(**kwargs):
+    from tiktok_full_gui import RenderConfig, build_single_pass_render_cmd
+    args = dict(
+        video_path="in.mp4", voice_path="voice.mp3", music_path="music.mp3", output_path="out.mp4",
+        config=RenderConfig(), crop=(0, 576, 1920, 648),
+        source_duration=30.0, target_duration=20.0, music_duration=60.0,
+    )
+    args.update(kwargs)
+    cmd, mode = build_single_pass_render_cmd(**args)
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    return cmd, mode, graph
+
+
+def test_speed_change_in_graph():
+    """A speed change within bounds becomes a setpts filter, not a separate encode."""
+    print("Testing speed change via setpts...")
+    cmd, mode, graph = _build()
+
+    assert mode == "speed", f"Expected speed mode, got {mode}"
+    assert "setpts=(PTS-STARTPTS)/1.500000" in graph, "Missing setpts speed factor"
+    assert "crop=1920:648:0:576" in graph, "Missing crop"
+    assert graph.count("overlay=") == 1, "Expected one overlay"
+    assert cmd.count("-c:v") == 1, "Expected exactly one video encode"
+    assert "-t" in cmd and cmd[cmd.index("-t") + 1] == "20.000", "Output not cut to voice duration"
+    print(f"✓ Mode {mode}, single encode with setpts")
+    return True
+
+
+def test_loop_and_mirror():
+    """Short sources loop at the input; mirror flips both foreground and background."""
+    print("\nTesting loop fallback and mirror...")
+    cmd, mode, graph = _build(source_duration=5.0, target_duration=20.0, mirror_video=True)
+
+    assert mode == "loop", f"Expected loop mode, got {mode}"
+    first_input = cmd.index("-i")
+    assert cmd[first_input - 2:first_input] == ["-stream_loop", "-1"], "Video input should loop"
+    assert graph.count("hflip") == 2, "Mirror should apply to foreground and background"
+    print("✓ Looped input and mirrored layers")
+    return True
+
+
+def test_music_matching():
+    """Long music gets a fade-out, short music loops, mirroring make_music_match_duration."""
+    print("\nTesting music trim/loop...")
+    cmd, _, graph = _build(music_duration=60.0)
+    assert "afade=t=out" in graph, "Long music should fade out"
+    assert "amix=inputs=2:duration=first" in graph, "Audio should be mixed to voice length"
+
+    cmd, _, graph = _build(music_duration=5.0)
+    music_input = len(cmd) - 1 - cmd[::-1].index("music.mp3")
+    assert cmd[music_input - 3:music_input - 1] == ["-stream_loop", "-1"], "Short music should loop"
+    assert "afade" not in graph, "Looped music should not fade"
+    print("✓ Music fades when trimmed and loops when short")
+    return True
+
+
+def test_caption_groups():
+    """Word timestamps are grouped N words at a time with a minimum display duration."""
+    print("\nTesting caption grouping...")
+    from tiktok_full_gui import build_caption_groups
+
+    segments = [{
+        "start": 0.0, "end": 2.0, "text": "one two three",
+        "words": [
+            {"word": " one", "start": 0.0, "end": 0.1},
+            {"word": " two", "start": 0.1, "end": 0.5},
+            {"word": " three", "start": 0.5, "end": 2.0},
+        ],
+    }]
+    groups = build_caption_groups(segments, words_per_caption=2)
+
+    assert [g["text"] for g in groups] == ["one two", "three"], f"Unexpected groups: {groups}"
+    assert groups[0]["end"] - groups[0]["start"] >= 0.25, "Minimum duration not applied"
+    print(f"✓ Groups: {[g['text'] for g in groups]}")
+    return True
+
+
+def test_inputs_checked_before_graph():
+    """Inputs the graph can't take (missing music, no audio stream, crop off-frame) are skipped with a reason."""
+    print("\nTesting single-pass input checks...")
+    import tiktok_full_gui as app
+
+    probes = {
+        "in.mp4": app.MediaInfo(path="in.mp4", duration=30.0, width=1920, height=1080, fps=30.0, has_audio=True),
+        "voice.mp3": app.MediaInfo(path="voice.mp3", duration=20.0, has_audio=True),
+        "music.mp3": app.MediaInfo(path="music.mp3", duration=60.0, has_audio=True),
+        "silent.mp4": app.MediaInfo(path="silent.mp4", duration=60.0, width=640, height=360),
+    }
+    saved = app.probe_media
+    app.probe_media = lambda path, log=None: probes.get(path)
+    logs = []
+    try:
+        reason = lambda **kw: app.single_pass_skip_reason(**dict(
+            dict(video_path="in.mp4", voice_path="voice.mp3", music_path="music.mp3", crop=(0, 216, 1920, 648)), **kw))
+        assert reason() is None
+        assert "no music file" in reason(music_path=None)
+        assert "music" in reason(music_path="missing.mp3") and "probed" in reason(music_path="missing.mp3")
+        assert "no audio stream in the music file" in reason(music_path="silent.mp4")
+        assert "no video stream" in reason(video_path="voice.mp3")
+        assert "outside the 1920x1080 frame" in reason(crop=(0, 600, 1920, 648))
+        ok = app.render_job_single_pass("in.mp4", "voice.mp3", None, "out.mp4", [], app.RenderConfig(),
+                                        (0, 216, 1920, 648), log=logs.append)
+    finally:
+        app.probe_media = saved
+    assert ok is False and logs == ["[SINGLE-PASS] Skipped: no music file"], logs
+    print(f"✓ Bad inputs rejected before building the graph: {logs[0]}")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Single-Pass Render Tests")
+    print("=" * 60)
+
+    tests = [
+        test_speed_change_in_graph,
+        test_loop_and_mirror,
+        test_music_matching,
+        test_caption_groups,
+        test_inputs_checked_before_graph,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test vectorized timestamp remapping after silence removal (remap_times_after_silence_removal /
+map_timestamps_after_silence_removal) against the previous per-timestamp linear scan, including
+the edge cases (gaps, ties, before/after the map), and benchmark a 10k-word transcript.
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+
+def linear_map_time(original_time, silence_map):
+    """The previous implementation: scan for a containing segment, else snap to the closest one."""
+    for orig_start, orig_end, new_start, new_end in silence_map:
+        if orig_start <= original_time <= orig_end:
+            relative_pos = (original_time - orig_start) / (orig_end - orig_start) if (orig_end - orig_start) > 0 else 0
+            return new_start + relative_pos * (new_end - new_start)
+    closest_segment = min(silence_map, key=lambda seg: min(abs(seg[0] - original_time), abs(seg[1] - original_time)))
+    orig_start, orig_end, new_start, new_end = closest_segment
+    if original_time < orig_start:
+        return new_start
+    else:
+        return new_end
+
+
+def _silence_map(n, seed=0):
+    """n kept segments separated by removed gaps, in the format remove_silence_from_audio returns."""
+    from tiktok_full_gui import build_silence_map
+    rng = np.random.default_rng(seed)
+    ranges, pos = [], int(rng.integers(0, 500))
+    for _ in range(n):
+        length = int(rng.integers(200, 4000))
+        ranges.append([pos, pos + length])
+        pos += length + int(rng.integers(300, 2000))
+    return build_silence_map(ranges)
+
+
+def _transcript(words, duration, seed=0):
+    rng = np.random.default_rng(seed)
+    starts = np.sort(rng.uniform(-1, duration + 1, words))
+    segments = []
+    for i in range(0, words, 8):
+        chunk = [{'word': f' w{j}', 'start': float(s), 'end': float(s) + 0.2} for j, s in enumerate(starts[i:i + 8], i)]
+        segments.append({'start': chunk[0]['start'], 'end': chunk[-1]['end'], 'text': '...', 'words': chunk})
+    return segments
+
+
+def test_matches_linear_scan():
+    """Same values as the linear scan for interior, boundary, gap, tie and out-of-range times."""
+    print("Testing remap_times_after_silence_removal...")
+    from tiktok_full_gui import remap_times_after_silence_removal
+
+    silence_map = _silence_map(50)
+    edges = [t for entry in silence_map for t in entry[:2]]
+    gaps = [(a[1] + b[0]) / 2 for a, b in zip(silence_map, silence_map[1:])]  # exact ties
+    rng = np.random.default_rng(1)
+    times = edges + gaps + [-5.0, 0.0, silence_map[-1][1] + 10] + list(rng.uniform(-2, silence_map[-1][1] + 2, 5000))
+    got = remap_times_after_silence_removal(times, silence_map)
+    expected = [linear_map_time(t, silence_map) for t in times]
+    assert got.tolist() == expected, "Vectorized remap differs from the linear scan"
+
+    # Degenerate maps: a single entry, a zero-length entry and touching entries (first match wins)
+    for odd_map in ([(1.0, 2.0, 0.0, 1.0)],
+                    [(1.0, 1.0, 0.0, 0.0), (2.0, 3.0, 0.0, 1.0)],
+                    [(0.0, 1.0, 0.0, 1.0), (1.0, 2.0, 5.0, 6.0)]):
+        probe = [0.0, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 4.0]
+        got = remap_times_after_silence_removal(probe, odd_map).tolist()
+        assert got == [linear_map_time(t, odd_map) for t in probe], f"Differs for {odd_map}: {got}"
+    print(f"✓ {len(times)} timestamps identical to the linear scan, degenerate maps included")
+    return True
+
+
+def test_segments_and_words():
+    """Segment and word times are all remapped; other fields and missing keys are left alone."""
+    print("\nTesting map_timestamps_after_silence_removal...")
+    from tiktok_full_gui import map_timestamps_after_silence_removal
+
+    silence_map = [(0.5, 2.0, 0.0, 1.5), (3.0, 5.0, 1.5, 3.5)]
+    segments = [
+        {'start': 0.5, 'end': 4.0, 'text': 'hello', 'words': [{'word': ' a', 'start': 1.0, 'end': 2.5},
+                                                              {'word': ' b', 'start': 3.5}]},
+        {'end': 6.0, 'text': 'no start', 'words': []},
+    ]
+    out = map_timestamps_after_silence_removal(segments, silence_map)
+    assert out[0] == {'start': 0.0, 'end': 2.5, 'text': 'hello',
+                      'words': [{'word': ' a', 'start': 0.5, 'end': 1.5}, {'word': ' b', 'start': 2.0}]}, out[0]
+    assert out[1] == {'start': 0.0, 'end': 3.5, 'text': 'no start', 'words': []}, out[1]
+    assert segments[0]['words'][0]['start'] == 1.0, "Input segments must not be modified"
+    assert map_timestamps_after_silence_removal(segments, []) is segments
+    print("✓ Segments and words remapped, input untouched")
+    return True
+
+
+def test_benchmark_10k_words():
+    """10k words over a heavily chopped track: one searchsorted pass vs a scan per timestamp."""
+    print("\nBenchmarking 10k-word transcript...")
+    from tiktok_full_gui import map_timestamps_after_silence_removal
+
+    silence_map = _silence_map(1500, seed=2)
+    segments = _transcript(10000, silence_map[-1][1], seed=3)
+
+    t0 = time.perf_counter()
+    mapped = map_timestamps_after_silence_removal(segments, silence_map)
+    vectorized_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    reference = [linear_map_time(w['start'], silence_map) for seg in segments for w in seg['words']]
+    linear_s = (time.perf_counter() - t0) * 2  # starts only; ends cost the same again
+    assert [w['start'] for seg in mapped for w in seg['words']] == reference, "Benchmark results differ"
+    print(f"  {len(silence_map)} kept segments, 10000 words: {vectorized_s * 1000:.1f} ms vectorized, "
+          f"~{linear_s * 1000:.0f} ms linear scan ({linear_s / vectorized_s:.0f}x)")
+    print("✓ Benchmark complete")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Timestamp Remap Tests")
+    print("=" * 60)
+
+    tests = [
+        test_matches_linear_scan,
+        test_segments_and_words,
+        test_benchmark_10k_words,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
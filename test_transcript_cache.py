@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Test the on-disk transcript cache (TranscriptCache / TRANSCRIPTS): compact storage of Whisper
+segments, cache hits that skip model loading, per-language translation variants, audio
+fingerprints that survive a lossy re-encode, and the guards around envelope matching (quiet tracks,
+candidate pre-filter, index cap). The re-encode test is skipped without ffmpeg.
+"""
+
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+SEGMENTS = [
+    {'id': 0, 'seek': 0, 'start': 0.0, 'end': 1.52, 'text': ' Hello there.', 'tokens': [1, 2, 3],
+     'avg_logprob': -0.2, 'words': [{'word': ' Hello', 'start': 0.0, 'end': 0.61, 'probability': 0.98},
+                                    {'word': ' there.', 'start': 0.7, 'end': 1.52, 'probability': 0.9}]},
+    {'id': 1, 'seek': 0, 'start': 2.0, 'end': 3.1234, 'text': ' Bine ați venit!', 'tokens': [4],
+     'words': [{'word': ' Bine', 'start': 2.0, 'end': 2.4, 'probability': 0.7},
+               {'word': ' ați', 'start': 2.4, 'end': 2.7, 'probability': 0.8},
+               {'word': ' venit!', 'start': 2.7, 'end': 3.1234, 'probability': 0.95}]},
+]
+
+
+def _speech_like(seconds=6.0, seed=0):
+    """Syllable-rate amplitude-modulated tones with pauses, as 16 kHz int16."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * 16000)) / 16000.0
+    env = np.clip(np.sin(2 * np.pi * rng.uniform(2, 5) * t) + rng.uniform(-0.3, 0.3), 0, None)
+    env *= (np.sin(2 * np.pi * 0.4 * t + rng.uniform(0, 6)) > -0.5)
+    tone = sum(np.sin(2 * np.pi * f * t) for f in rng.uniform(120, 900, 4)) / 4
+    return (env * tone * 12000).astype(np.int16)
+
+
+def test_compact_round_trip():
+    """Segments come back with text, timings and words; storage is gzip JSON without Whisper internals."""
+    print("Testing compact segment storage...")
+    import gzip
+    from tiktok_full_gui import TranscriptCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranscriptCache(tmp)
+        cache.put("a" * 40, "large", SEGMENTS, {"word_timestamps": True})
+        got = cache.get("a" * 40, "large", {"word_timestamps": True})
+        assert got is not None, "Stored transcript not found"
+        assert cache.get("a" * 40, "medium", {"word_timestamps": True}) is None, "Model is part of the key"
+        assert cache.get("a" * 40, "large", {"word_timestamps": False}) is None, "Options are part of the key"
+
+        assert [s['text'] for s in got] == [s['text'] for s in SEGMENTS]
+        assert got[1]['end'] == 3.123 and got[1]['words'][2] == {'word': ' venit!', 'start': 2.7, 'end': 3.123,
+                                                                 'probability': 0.95}
+        assert 'tokens' not in got[0] and 'avg_logprob' not in got[0]
+
+        path = next(os.path.join(d, f) for d, _, files in os.walk(tmp) for f in files if f.endswith(".json.gz"))
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            raw = f.read()
+        print(f"✓ Round trip OK ({len(raw)} bytes JSON, {os.path.getsize(path)} bytes on disk)")
+    return True
+
+
+def test_hit_skips_model_and_translations_per_language():
+    """Second run loads no model; each target language is translated once and cached separately."""
+    print("\nTesting cache hits in transcribe_captions...")
+    import tiktok_full_gui as app
+
+    loads, translations = [], []
+
+    class FakeModel:
+        def transcribe(self, audio, **kwargs):
+            assert isinstance(audio, np.ndarray) and audio.dtype == np.float32, "Whisper should get the decoded samples"
+            return {"segments": SEGMENTS}
+
+    def fake_get_model(name, tries=3, log=None):
+        loads.append(name)
+        return FakeModel(), "cpu"
+
+    def fake_translate(segments, target_language='en', log=None):
+        translations.append(target_language)
+        return [dict(s, text=f"[{target_language}]{s['text']}", original_text=s['text']) for s in segments]
+
+    pcm = _speech_like()
+    saved = app.TRANSCRIPTS, app.get_whisper_model, app.translate_segments, app.decode_audio_16k
+    with tempfile.TemporaryDirectory() as tmp:
+        app.TRANSCRIPTS = app.TranscriptCache(tmp)
+        app.get_whisper_model, app.translate_segments = fake_get_model, fake_translate
+        app.decode_audio_16k = lambda path: pcm
+        try:
+            quiet = lambda *_: None
+            first = app.transcribe_captions("voice.mp3", log=quiet)
+            second = app.transcribe_captions("voice.mp3", log=quiet)
+            assert loads == ["large"], f"Cache hit should not load a model, loads={loads}"
+            assert [s['text'] for s in first] == [s['text'] for s in second]
+
+            es = app.transcribe_captions("voice.mp3", log=quiet, translate_to="es")
+            es_again = app.transcribe_captions("voice.mp3", log=quiet, translate_to="es")
+            fr = app.transcribe_captions("voice.mp3", log=quiet, translate_to="fr")
+            assert translations == ["es", "fr"], f"Each language should translate once, got {translations}"
+            assert loads == ["large"], f"Translations should reuse the cached transcript, loads={loads}"
+            assert es_again[0]['text'] == es[0]['text'] == "[es] Hello there."
+            assert es_again[0]['original_text'] == " Hello there." and fr[0]['text'] == "[fr] Hello there."
+        finally:
+            app.TRANSCRIPTS, app.get_whisper_model, app.translate_segments, app.decode_audio_16k = saved
+    print(f"✓ 5 calls -> {len(loads)} model load, {len(translations)} translations")
+    return True
+
+
+def test_fingerprint_survives_reencode():
+    """MP3 and AAC encodes of the same audio resolve to the original's id; different audio does not."""
+    print("\nTesting audio fingerprint across re-encodes...")
+    if not shutil.which("ffmpeg"):
+        print("⚠ ffmpeg not found - skipping")
+        return True
+    from tiktok_full_gui import TranscriptCache, decode_audio_16k, audio_fingerprint
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "voice.wav")
+        with wave.open(src, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(_speech_like().tobytes())
+        other = os.path.join(tmp, "other.wav")
+        with wave.open(other, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(_speech_like(seed=1).tobytes())
+
+        encodes = {}
+        for name, args in (("voice.mp3", ["-b:a", "64k"]), ("voice.m4a", ["-c:a", "aac", "-b:a", "96k"]),
+                           ("voice_44k.wav", ["-ar", "44100"])):
+            out = os.path.join(tmp, name)
+            result = subprocess.run(["ffmpeg", "-v", "error", "-y", "-i", src] + args + [out], capture_output=True)
+            if result.returncode == 0:
+                encodes[name] = out
+
+        cache = TranscriptCache(os.path.join(tmp, "cache"))
+        original = cache.resolve_audio_id(decode_audio_16k(src))
+        assert original == audio_fingerprint(decode_audio_16k(src))[0]
+        for name, path in encodes.items():
+            pcm = decode_audio_16k(path)
+            assert audio_fingerprint(pcm)[0] != original or name.endswith(".wav"), f"{name}: samples should differ"
+            assert cache.resolve_audio_id(pcm) == original, f"{name} should match the original audio"
+        assert cache.resolve_audio_id(decode_audio_16k(other)) != original, "Different audio must not match"
+    print(f"✓ {sorted(encodes)} matched the original, different audio did not")
+    return True
+
+
+def test_fuzzy_match_guards():
+    """Near-silent tracks never match by envelope; lookups only compare similar tracks; the index is capped."""
+    print("\nTesting envelope matching guards...")
+    import tiktok_full_gui as app
+
+    rng = np.random.default_rng(3)
+    quiet = [(rng.normal(0, 8, 16000 * 6)).astype(np.int16) for _ in range(2)]  # ~-72 dB: all floor
+    speech = _speech_like()
+    copy = np.clip(speech + rng.normal(0, 40, len(speech)), -32768, 32767).astype(np.int16)
+
+    compared = []
+    distance = app._envelope_distance_db
+    app._envelope_distance_db = lambda a, b: compared.append(len(b)) or distance(a, b)
+    logs = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = app.TranscriptCache(tmp, max_index_entries=20)
+            ids = [cache.resolve_audio_id(pcm) for pcm in quiet]
+            assert ids[0] != ids[1], "Two different quiet tracks must not share an id"
+            for seconds in range(2, 20):
+                cache.resolve_audio_id(_speech_like(seconds, seed=seconds))
+            original = cache.resolve_audio_id(speech)
+            del compared[:]
+            assert cache.resolve_audio_id(copy, log=logs.append) == original, "Noisy copy should match"
+            assert compared and all(abs(n - 60) <= 10 for n in compared), f"Compared against {compared} frames"
+
+            stats = cache.stats()
+            with open(os.path.join(tmp, "index.jsonl")) as f:
+                lines = f.readlines()
+            reloaded = app.TranscriptCache(tmp, max_index_entries=20)
+            assert reloaded.resolve_audio_id(copy) == original, "Match should survive a reload"
+            assert ids[0] not in reloaded._index, "Oldest ids are dropped once the cap is reached"
+    finally:
+        app._envelope_distance_db = distance
+
+    assert stats["fuzzy_matches"] == 1 and stats["indexed"] <= 20, stats
+    assert len(lines) <= 20, f"index.jsonl holds {len(lines)} lines over a cap of 20"
+    assert any("Fuzzy audio match" in line for line in logs), logs
+    print(f"✓ quiet tracks kept apart, {len(compared)} candidate(s) compared, index capped at {len(lines)} ids")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Transcript Cache Tests")
+    print("=" * 60)
+
+    tests = [
+        test_compact_round_trip,
+        test_hit_skips_model_and_translations_per_language,
+        test_fingerprint_survives_reencode,
+        test_fuzzy_match_guards,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Test the transcription backend layer: backend selection and fallback (get_transcription_backend),
+the segment/word schema produced by the faster-whisper and whisper.cpp adapters (with stand-in
+engines), transcribe_captions caching per backend model, and the benchmark's word drift measure.
+"""
+
+import sys
+import os
+import tempfile
+from collections import namedtuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+Word = namedtuple("Word", "start end word probability")
+Segment = namedtuple("Segment", "id start end text words")
+CppSegment = namedtuple("CppSegment", "t0 t1 text")
+
+
+def _check_schema(segments):
+    for seg in segments:
+        assert {"start", "end", "text", "words"} <= set(seg), seg
+        for w in seg["words"]:
+            assert set(w) == {"word", "start", "end", "probability"} and w["start"] <= w["end"], w
+            assert seg["start"] <= w["start"] and w["end"] <= seg["end"], (seg, w)
+
+
+def test_backend_selection():
+    """The configured backend is used; unknown names raise; missing engines fall back to openai-whisper."""
+    print("Testing get_transcription_backend...")
+    import tiktok_full_gui as app
+
+    assert app.get_transcription_backend("openai-whisper").model_name == "large", "Cache name must stay 'large'"
+    try:
+        app.get_transcription_backend("nope")
+        assert False, "Unknown backend should raise"
+    except ValueError:
+        pass
+    saved = app.FASTER_WHISPER_AVAILABLE, app.WHISPER_CPP_AVAILABLE
+    app.FASTER_WHISPER_AVAILABLE, app.WHISPER_CPP_AVAILABLE = False, True
+    logs = []
+    try:
+        assert app.get_transcription_backend("faster-whisper", log=logs.append).name == "openai-whisper"
+        assert app.get_transcription_backend("whisper.cpp").name == "whisper.cpp"
+    finally:
+        app.FASTER_WHISPER_AVAILABLE, app.WHISPER_CPP_AVAILABLE = saved
+    assert any("not installed" in line for line in logs)
+    print("✓ Selection and fallback")
+    return True
+
+
+def test_faster_whisper_adapter():
+    """CTranslate2 segments/words become the Whisper dict schema; int8 on CPU; model loaded once."""
+    print("\nTesting FasterWhisperBackend...")
+    import tiktok_full_gui as app
+
+    created = []
+
+    class FakeWhisperModel:
+        def __init__(self, size, device, compute_type, cpu_threads=0):
+            created.append((size, device, compute_type))
+
+        def transcribe(self, audio, word_timestamps=False):
+            assert audio.dtype == np.float32 and word_timestamps
+            words = [Word(0.5, 0.9, " Hello", 0.98), Word(0.9, 1.4, " world.", 0.91)]
+            return iter([Segment(0, 0.5, 1.4, " Hello world.", words)]), {"language": "en"}
+
+    saved = app.FasterWhisperModel, app.FASTER_WHISPER_AVAILABLE, app._detect_whisper_device, app.WHISPER_MODELS
+    app.FasterWhisperModel, app.FASTER_WHISPER_AVAILABLE = FakeWhisperModel, True
+    app._detect_whisper_device = lambda log=None: "cpu"
+    app.WHISPER_MODELS = app.ModelRegistry()
+    try:
+        backend = app.get_transcription_backend("faster-whisper")
+        pcm = np.zeros(16000 * 2, np.int16)
+        for _ in range(2):
+            segments, model_name = backend.transcribe(pcm, "voice.wav")
+    finally:
+        app.FasterWhisperModel, app.FASTER_WHISPER_AVAILABLE, app._detect_whisper_device, app.WHISPER_MODELS = saved
+
+    _check_schema(segments)
+    assert model_name == "faster-whisper/large-v2/int8", model_name
+    assert created == [("large-v2", "cpu", "int8")], f"Model should load once: {created}"
+    assert segments[0]["words"][1] == {"word": " world.", "start": 0.9, "end": 1.4, "probability": 0.91}
+    print(f"✓ {model_name}: schema matches openai-whisper")
+    return True
+
+
+def test_whisper_cpp_adapter():
+    """One-word whisper.cpp segments (centiseconds) are regrouped into sentences with word times."""
+    print("\nTesting WhisperCppBackend...")
+    import tiktok_full_gui as app
+
+    class FakeCppModel:
+        def __init__(self, model, **params):
+            pass
+
+        def transcribe(self, audio, **params):
+            assert params.get("max_len") == 1 and params.get("split_on_word") and params.get("token_timestamps")
+            return [CppSegment(10, 40, " Fish"), CppSegment(40, 70, " climb"), CppSegment(70, 110, " trees."),
+                    CppSegment(120, 150, " Really"), CppSegment(150, 160, ""), CppSegment(300, 340, " yes")]
+
+    saved = app.WhisperCppModel, app.WHISPER_CPP_AVAILABLE, app.WHISPER_MODELS
+    app.WhisperCppModel, app.WHISPER_CPP_AVAILABLE, app.WHISPER_MODELS = FakeCppModel, True, app.ModelRegistry()
+    try:
+        segments, model_name = app.get_transcription_backend("whisper.cpp").transcribe(np.zeros(100, np.int16), "v.wav")
+    finally:
+        app.WhisperCppModel, app.WHISPER_CPP_AVAILABLE, app.WHISPER_MODELS = saved
+
+    _check_schema(segments)
+    assert [s["text"] for s in segments] == [" Fish climb trees.", " Really", " yes"], "Split at '.' and at a 1.5s pause"
+    assert (segments[0]["start"], segments[0]["end"]) == (0.1, 1.1) and segments[2]["words"][0]["start"] == 3.0
+    assert model_name == "whisper.cpp/large-v2"
+    print("✓ Words regrouped into segments, times in seconds")
+    return True
+
+
+def test_transcribe_captions_caches_per_backend():
+    """The same audio transcribed by two backends is cached under each backend's model name."""
+    print("\nTesting transcribe_captions with backends...")
+    import tiktok_full_gui as app
+
+    calls = []
+
+    class StubBackend(app.TranscriptionBackend):
+        def __init__(self, name):
+            self.name, self.model_name = name, f"{name}/stub"
+
+        def transcribe(self, audio, source_path, log=None, cached=None):
+            calls.append(self.name)
+            return [{"start": 0.0, "end": 1.0, "text": f" {self.name}", "words": []}], self.model_name
+
+    pcm = (np.sin(np.arange(48000) / 7.0) * 6000).astype(np.int16)
+    saved = app.TRANSCRIPTS, app.get_transcription_backend, app.decode_audio_16k
+    with tempfile.TemporaryDirectory() as tmp:
+        app.TRANSCRIPTS = app.TranscriptCache(tmp)
+        app.decode_audio_16k = lambda path: pcm
+        quiet = lambda *_: None
+        try:
+            texts = []
+            for name in ("a", "b", "a", "b"):
+                app.get_transcription_backend = lambda name=name, log=None: StubBackend(name)
+                texts.append(app.transcribe_captions("voice.wav", log=quiet)[0]["text"])
+        finally:
+            app.TRANSCRIPTS, app.get_transcription_backend, app.decode_audio_16k = saved
+    assert calls == ["a", "b"], f"Second pass per backend should be a cache hit: {calls}"
+    assert texts == [" a", " b", " a", " b"]
+    print("✓ One transcription per backend, cached separately")
+    return True
+
+
+def test_benchmark_word_drift():
+    """Words are matched by text (punctuation/case ignored, insertions skipped) before comparing times."""
+    print("\nTesting benchmark word_drift...")
+    from benchmark_transcription import word_drift
+
+    ref = [{"word": " Hello", "start": 0.0, "end": 0.5}, {"word": " world.", "start": 0.5, "end": 1.0},
+           {"word": " Bye", "start": 2.0, "end": 2.4}]
+    cand = [{"word": " hello", "start": 0.02, "end": 0.5}, {"word": " uh", "start": 0.5, "end": 0.6},
+            {"word": " world", "start": 0.6, "end": 1.04}, {"word": " bye!", "start": 2.0, "end": 2.3}]
+    drift = word_drift(ref, cand)
+    assert drift["matched"] == 3 and drift["reference_words"] == 3, drift
+    assert drift["max_ms"] == 100.0 and drift["median_ms"] == 30.0, drift
+    assert word_drift(ref, [])["matched"] == 0
+    print(f"✓ {drift}")
+    return True
+
+
+def test_benchmark_fixture_and_single_pass():
+    """The JSON output pins the clip by checksum; --single-pass keeps openai-whisper off the chunked path."""
+    print("\nTesting benchmark fixture pinning and --single-pass...")
+    import json as _json
+    import benchmark_transcription as bench
+    import tiktok_full_gui as app
+
+    seen = []
+
+    class StubBackend(app.TranscriptionBackend):
+        name, model_name = "openai-whisper", "large"
+
+        def transcribe(self, audio, source_path, log=None, cached=None):
+            seen.append(app.WHISPER_PARALLEL_WORKERS)
+            return [{"start": 0.0, "end": 1.0, "text": " hi", "words": [
+                {"word": " hi", "start": 0.0, "end": 1.0, "probability": 1.0}]}], self.model_name
+
+    pcm = (np.sin(np.arange(16000 * 130) / 9.0) * 5000).astype(np.int16)  # over WHISPER_PARALLEL_MIN_S
+    saved = (app.decode_audio_16k, app.get_transcription_backend, app.WHISPER_PARALLEL_WORKERS,
+             app._detect_whisper_device, sys.argv)
+    app.decode_audio_16k = lambda path: pcm
+    app.get_transcription_backend = lambda name=None, log=None: StubBackend()
+    app._detect_whisper_device = lambda log=None: "cpu"
+    app.WHISPER_PARALLEL_WORKERS = 4
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "r.json")
+        try:
+            sys.argv = ["bench", "clip.wav", "--backends", "openai-whisper", "--runs", "0", "--json", out]
+            assert bench.main() == 0
+            with open(out) as f:
+                chunked = _json.load(f)
+            sys.argv += ["--single-pass", "--expect-sha256", chunked["fixture"]["pcm_sha256"]]
+            assert bench.main() == 0
+            with open(out) as f:
+                single = _json.load(f)
+            sys.argv[-1] = "0" * 64
+            mismatch = bench.main()
+        finally:
+            (app.decode_audio_16k, app.get_transcription_backend, app.WHISPER_PARALLEL_WORKERS,
+             app._detect_whisper_device, sys.argv) = saved
+
+    assert chunked["fixture"]["openai_whisper_mode"] == "chunked (4 workers)", chunked["fixture"]
+    assert single["fixture"]["openai_whisper_mode"] == "single-pass" and seen[-1] == 1, (single["fixture"], seen)
+    assert single["fixture"]["pcm_sha256"] == chunked["fixture"]["pcm_sha256"] and single["fixture"]["seconds"] == 130.0
+    assert single["results"][0]["backend"] == "openai-whisper"
+    assert mismatch == 2, "A different clip than --expect-sha256 must not be benchmarked"
+    print(f"✓ Fixture {single['fixture']['pcm_sha256'][:12]} recorded; --single-pass forces one pass")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Transcription Backend Tests")
+    print("=" * 60)
+
+    tests = [
+        test_backend_selection,
+        test_faster_whisper_adapter,
+        test_whisper_cpp_adapter,
+        test_transcribe_captions_caches_per_backend,
+        test_benchmark_word_drift,
+        test_benchmark_fixture_and_single_pass,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
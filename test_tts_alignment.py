@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test caption timing for a single-request TTS track without a second transcription:
+energy-based alignment of the known text (align_text_to_speech) and the remap onto the
+silence-removed timeline (align_tts_captions). Uses synthetic speech with known word times;
+file tests need ffmpeg.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+SR = 16000
+SCRIPT = [
+    "Hello there and welcome back to the channel.",
+    "Today we look at something quite unusual, a fish that climbs trees!",
+    "It lives in mangrove swamps.",
+    "Stay until the end to see it jump.",
+]
+
+
+def _synthetic_tts(seed=0):
+    """
+    Words as tone bursts (~55 ms per character, +-20%), short or no gaps between words and
+    350-600 ms pauses between sentences. Returns (pcm, segments, true word times).
+    """
+    rng = np.random.default_rng(seed)
+    pieces, truth, pos = [], [], 0.3
+    pieces.append(rng.normal(0, 20, int(0.3 * SR)))
+    segments = []
+    for i, text in enumerate(SCRIPT):
+        words = text.split()
+        for j, word in enumerate(words):
+            dur = 0.055 * (len(word) + 1) * rng.uniform(0.8, 1.2)
+            t = np.arange(int(dur * SR)) / SR
+            tone = np.sin(2 * np.pi * rng.uniform(150, 400) * t) * rng.uniform(5000, 12000)
+            pieces.append(tone * np.minimum(1, np.minimum(t, dur - t) / 0.01) + rng.normal(0, 20, len(t)))
+            truth.append((pos, pos + len(t) / SR))
+            pos += len(t) / SR
+            gap = rng.choice([0.0, 0.0, 0.04, 0.07]) if j < len(words) - 1 else rng.uniform(0.35, 0.6)
+            pieces.append(rng.normal(0, 20, int(gap * SR)))
+            pos += int(gap * SR) / SR
+        segments.append({'start': i * 3.0, 'end': i * 3.0 + 2.5, 'text': f" {text}", 'original_text': f"orig {i}"})
+    pieces.append(rng.normal(0, 20, int(0.3 * SR)))
+    pcm = np.clip(np.concatenate(pieces), -32768, 32767).astype(np.int16)
+    return pcm, segments, truth
+
+
+def test_align_known_text():
+    """Sentence boundaries land on the pauses; word times stay close to the truth."""
+    print("Testing align_text_to_speech...")
+    from tiktok_full_gui import align_text_to_speech
+
+    for seed in range(3):
+        pcm, segments, truth = _synthetic_tts(seed)
+        aligned = align_text_to_speech(pcm, SR, segments)
+        words = [w for seg in aligned for w in seg['words']]
+        assert [w['word'] for w in words] == [f" {w}" for text in SCRIPT for w in text.split()]
+        assert aligned[1]['original_text'] == "orig 1", "Other segment fields should be kept"
+
+        first = 0
+        for seg, text in zip(aligned, SCRIPT):
+            last = first + len(text.split()) - 1
+            assert abs(seg['start'] - truth[first][0]) <= 0.03, f"Segment start {seg['start']} vs {truth[first][0]}"
+            assert abs(seg['end'] - truth[last][1]) <= 0.03, f"Segment end {seg['end']} vs {truth[last][1]}"
+            first = last + 1
+        errors = np.abs([[w['start'] - a, w['end'] - b] for w, (a, b) in zip(words, truth)])
+        assert np.median(errors) < 0.06 and errors.max() < 0.25, f"Word errors: median {np.median(errors):.3f}, max {errors.max():.3f}"
+        assert all(a['end'] <= b['start'] for a, b in zip(words, words[1:])), "Words must not overlap"
+        print(f"  seed {seed}: {len(words)} words, median error {np.median(errors) * 1000:.0f} ms, "
+              f"max {errors.max() * 1000:.0f} ms")
+
+    assert align_text_to_speech(np.zeros(SR, np.int16), SR, segments) is None, "Silence has nothing to align"
+    print("✓ Sentences snap to pauses, words within tolerance")
+    return True
+
+
+def test_remapped_onto_compressed_audio():
+    """After silence removal, the remapped captions sit on the speech in the compressed track."""
+    print("\nTesting align_tts_captions with silence removal...")
+    if not shutil.which("ffmpeg"):
+        print("⚠ ffmpeg not found - skipping")
+        return True
+    from tiktok_full_gui import align_tts_captions, remove_silence_from_audio, remap_times_after_silence_removal
+
+    pcm, segments, truth = _synthetic_tts(seed=5)
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "tts.wav")
+        with wave.open(src, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(SR)
+            w.writeframes(pcm.tobytes())
+        compressed, silence_map = remove_silence_from_audio(src, output_path=os.path.join(tmp, "out.wav"),
+                                                            min_silence_ms=300)
+        logs = []
+        timed = align_tts_captions(src, segments, silence_map=silence_map, log=logs.append)
+        with wave.open(compressed) as w:
+            out = np.frombuffer(w.readframes(w.getnframes()), np.int16)
+
+    assert len(silence_map) >= 3, "Sentence pauses should have been removed"
+    expected = remap_times_after_silence_removal([t for pair in truth for t in pair], silence_map)
+    words = [w for seg in timed for w in seg['words']]
+    errors = np.abs(np.array([t for w in words for t in (w['start'], w['end'])]) - expected)
+    assert np.median(errors) < 0.06, f"Median error {np.median(errors):.3f}s on the compressed timeline"
+    assert timed[-1]['end'] <= len(out) / SR + 0.01, "Captions must end inside the compressed audio"
+    for seg in timed:
+        inside = np.abs(out[int(seg['start'] * SR):int(seg['end'] * SR)].astype(np.int32))
+        assert (inside > 2000).mean() > 0.5, f"No speech under caption {seg['start']}-{seg['end']}"
+    assert any("[ALIGN]" in line for line in logs)
+    print(f"✓ {len(timed)} segments on the {len(out) / SR:.2f}s compressed track "
+          f"(from {len(pcm) / SR:.2f}s), median error {np.median(errors) * 1000:.0f} ms")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TTS Caption Alignment Tests")
+    print("=" * 60)
+
+    tests = [
+        test_align_known_text,
+        test_remapped_onto_compressed_audio,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
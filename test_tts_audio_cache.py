@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed TTS audio cache (TTSAudioCache / tts_cache_key) in front of
+generate_tts_audio: cache keys, hits that skip the engine, LRU eviction by size, atomic writes.
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_cache_key():
+    """Whitespace differences share a key; language, engine, voice and params don't."""
+    print("Testing cache keys...")
+    from tiktok_full_gui import tts_cache_key
+
+    base = tts_cache_key("Salut, ce faci?", "ro", "genaipro", "v1", {"speed": 1.0})
+    assert tts_cache_key("  Salut,   ce faci?\n", "ro", "genaipro", "v1", {"speed": 1.0}) == base
+    others = [
+        tts_cache_key("Salut, ce faci?", "en", "genaipro", "v1", {"speed": 1.0}),
+        tts_cache_key("Salut, ce faci?", "ro", "gtts", "v1", {"speed": 1.0}),
+        tts_cache_key("Salut, ce faci?", "ro", "genaipro", "v2", {"speed": 1.0}),
+        tts_cache_key("Salut, ce faci?", "ro", "genaipro", "v1", {"speed": 1.1}),
+        tts_cache_key("Salut, ce faci", "ro", "genaipro", "v1", {"speed": 1.0}),
+    ]
+    assert base not in others and len(set(others)) == len(others), "Every voice input should change the key"
+    print("✓ Keys normalize whitespace and cover language/engine/voice/params")
+    return True
+
+
+def test_hit_skips_engine():
+    """The second request for the same text gets a copy of the cached file without calling gTTS."""
+    print("\nTesting generate_tts_audio through the cache...")
+    import tiktok_full_gui as app
+
+    saves = []
+
+    class FakeGTTS:
+        def __init__(self, text, lang, slow=False):
+            self.text = text
+
+        def save(self, path):
+            saves.append(self.text)
+            with open(path, "wb") as f:
+                f.write(b"ID3" + self.text.encode() * 100)
+
+    saved = app.TTS_AUDIO, app.gTTS, app.TTS_AVAILABLE
+    with tempfile.TemporaryDirectory() as tmp:
+        app.TTS_AUDIO, app.gTTS, app.TTS_AVAILABLE = app.TTSAudioCache(os.path.join(tmp, "cache")), FakeGTTS, True
+        try:
+            logs = []
+            first = app.generate_tts_audio("hello world", "en", output_path=os.path.join(tmp, "a.mp3"), log=logs.append)
+            second = app.generate_tts_audio("hello  world", "en", output_path=os.path.join(tmp, "b.mp3"), log=logs.append)
+            other = app.generate_tts_audio("hello world", "de", output_path=os.path.join(tmp, "c.mp3"), log=logs.append)
+            stats = app.TTS_AUDIO.stats()
+            os.remove(second)  # callers own what they get back
+            temp = app.generate_tts_audio("hello world", "en")
+        finally:
+            app.TTS_AUDIO, app.gTTS, app.TTS_AVAILABLE = saved
+
+        assert saves == ["hello world", "hello world"], f"Engine calls: {saves}"
+        assert second == os.path.join(tmp, "b.mp3"), f"Hit should be copied to output_path, got {second}"
+        assert not temp.startswith(os.path.join(tmp, "cache")), "Without output_path a hit is copied to a temp file"
+        with open(first, "rb") as f1, open(temp, "rb") as f2:
+            assert f1.read() == f2.read()
+        os.remove(temp)
+        assert other.endswith("c.mp3")
+        assert stats["hits"] == 1 and stats["misses"] == 2, f"Stats: {stats}"
+        assert any("[TTS-CACHE] HIT" in line and "hits=1" in line for line in logs), "Hit should be logged"
+    print(f"✓ 3 requests -> {len(saves)} syntheses, stats {stats}")
+    return True
+
+
+def test_lru_eviction_and_atomic_writes():
+    """Least recently used files go first once the size budget is exceeded; no temp files remain."""
+    print("\nTesting LRU eviction...")
+    from tiktok_full_gui import TTSAudioCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TTSAudioCache(os.path.join(tmp, "cache"), max_mb=100 / 1024)  # 100 KB
+        src = os.path.join(tmp, "src.mp3")
+        with open(src, "wb") as f:
+            f.write(b"\0" * 30 * 1024)
+
+        for key in ("a" * 40, "b" * 40, "c" * 40):
+            cache.put(key, src)
+            time.sleep(0.02)
+        assert cache.get("a" * 40), "a should be cached"  # refresh a: b is now least recently used
+        time.sleep(0.02)
+        cache.put("d" * 40, src)
+
+        assert cache.get("b" * 40) is None, "Least recently used entry should be evicted"
+        assert all(cache.get(k * 40) for k in "acd"), "Recently used entries should stay"
+        assert cache.stats()["size_mb"] * 1024 <= 100
+        leftovers = [f for _, _, files in os.walk(tmp) for f in files if f.endswith(".tmp")]
+        assert not leftovers, f"Temp files left behind: {leftovers}"
+    print("✓ LRU entry evicted, budget respected")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TTS Audio Cache Tests")
+    print("=" * 60)
+
+    tests = [
+        test_cache_key,
+        test_hit_skips_engine,
+        test_lru_eviction_and_atomic_writes,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Test per-segment AI voice synthesis (synthesize_tts_timeline) with a stub TTS engine: segments are
+synthesized concurrently, clips land on the timeline at the reported offsets with pauses capped,
+word timings follow the audio of each clip, one engine voices the whole timeline, and a failed
+segment makes the caller fall back. Skipped when ffmpeg is not installed.
+"""
+
+import sys
+import os
+import shutil
+import threading
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+SR = 24000
+
+
+class StubTTS:
+    """Writes a tone 0.05 s per character, padded with 0.2 s of silence each side, after a fixed latency."""
+
+    def __init__(self, latency=0.2, fail_on=None):
+        self.latency = latency
+        self.fail_on = fail_on
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def __call__(self, text, language, output_path):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.latency)
+            if text == self.fail_on:
+                return None
+            t = np.arange(int(0.05 * len(text) * SR)) / SR
+            tone = (np.sin(2 * np.pi * 440 * t) * 12000).astype(np.int16)
+            pad = np.zeros(int(0.2 * SR), dtype=np.int16)
+            path = output_path.rsplit(".", 1)[0] + ".wav"
+            with wave.open(path, "wb") as w:
+                w.setnchannels(1)
+                w.setsampwidth(2)
+                w.setframerate(SR)
+                w.writeframes(np.concatenate([pad, tone, pad]).tobytes())
+            return path
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+SEGMENTS = [
+    {'start': 0.5, 'end': 2.0, 'text': ' first line here'},        # 15 chars -> 0.75 s
+    {'start': 2.1, 'end': 3.0, 'text': ' second'},                  # 0.1 s pause kept
+    {'start': 5.0, 'end': 6.0, 'text': ' after a long pause'},     # 2 s pause capped to 0.3 s
+    {'start': 6.0, 'end': 7.0, 'text': '   '},                      # empty text is dropped
+    {'start': 7.0, 'end': 8.0, 'text': ' last'},
+]
+
+
+def _read(path):
+    with wave.open(path) as w:
+        return w.getframerate(), np.frombuffer(w.readframes(w.getnframes()), np.int16)
+
+
+def test_timeline_offsets():
+    """Reported segment times match where the speech actually is in the assembled track."""
+    print("Testing timeline assembly...")
+    if not shutil.which("ffmpeg"):
+        print("⚠ ffmpeg not found - skipping")
+        return True
+    from tiktok_full_gui import synthesize_tts_timeline
+
+    path, timed = synthesize_tts_timeline(SEGMENTS, log=lambda *_: None, max_pause_ms=300,
+                                          synthesize=StubTTS(latency=0))
+    try:
+        sr, pcm = _read(path)
+        assert [s['text'] for s in timed] == [' first line here', ' second', ' after a long pause', ' last']
+        assert timed[0]['start'] == 0.0, "Leading silence should be trimmed"
+        gaps = [round(timed[i]['start'] - timed[i - 1]['end'], 2) for i in range(1, len(timed))]
+        assert gaps == [0.1, 0.3, 0.3], f"Pauses should be original gaps capped at 0.3 s, got {gaps}"
+
+        loud = np.abs(pcm.astype(np.int32)) > 3000
+        for seg in timed:
+            inside = loud[int((seg['start'] + 0.04) * sr):int((seg['end'] - 0.04) * sr)]
+            assert inside.mean() > 0.5, f"No speech inside {seg['start']}-{seg['end']}"
+            speech = 0.05 * len(seg['text'].strip())
+            assert abs((seg['end'] - seg['start']) - speech) < 0.1, "Segment length should be the clip length"
+        for a, b in zip(timed, timed[1:]):
+            assert not loud[int((a['end'] + 0.04) * sr):int((b['start'] - 0.04) * sr)].any(), "Speech in a pause"
+
+        words = timed[2]['words']
+        assert [w['word'] for w in words] == [' after', ' a', ' long', ' pause']
+        assert timed[2]['start'] <= words[0]['start'] < timed[2]['start'] + 0.05, "Words start at the speech"
+        assert timed[2]['end'] - 0.05 < words[-1]['end'] <= timed[2]['end']
+    finally:
+        os.remove(path)
+    print(f"✓ {len(timed)} segments, pauses {gaps}, duration {len(pcm) / sr:.2f}s")
+    return True
+
+
+def test_concurrent_synthesis():
+    """Segments are synthesized in parallel, bounded by the worker count."""
+    print("\nTesting concurrent synthesis...")
+    if not shutil.which("ffmpeg"):
+        print("⚠ ffmpeg not found - skipping")
+        return True
+    from tiktok_full_gui import synthesize_tts_timeline
+
+    segments = [{'start': i, 'end': i + 0.5, 'text': f' segment {i}'} for i in range(12)]
+    stub = StubTTS(latency=0.3)
+    t0 = time.perf_counter()
+    path, timed = synthesize_tts_timeline(segments, log=lambda *_: None, workers=4, synthesize=stub)
+    elapsed = time.perf_counter() - t0
+    os.remove(path)
+    assert len(timed) == 12 and stub.max_active == 4, f"Expected 4 requests in flight, saw {stub.max_active}"
+    assert elapsed < 12 * stub.latency / 2, f"Parallel synthesis took {elapsed:.2f}s"
+    print(f"✓ 12 segments in {elapsed:.2f}s with 4 workers (~{12 * stub.latency:.1f}s one at a time)")
+    return True
+
+
+def test_words_follow_pauses_in_a_clip():
+    """A pause inside a segment's clip moves the following words, instead of spreading them evenly."""
+    print("\nTesting word timing inside a clip...")
+    if not shutil.which("ffmpeg"):
+        print("⚠ ffmpeg not found - skipping")
+        return True
+    from tiktok_full_gui import synthesize_tts_timeline
+
+    def halting(text, language, output_path):
+        """Each word a tone of 0.05 s per character; 0.6 s of silence before the last word."""
+        parts = []
+        for i, word in enumerate(text.split()):
+            if i:
+                parts.append(np.zeros(int((0.6 if word == "pause" else 0.05) * SR), np.int16))
+            t = np.arange(int(0.05 * len(word) * SR)) / SR
+            parts.append((np.sin(2 * np.pi * 440 * t) * 12000).astype(np.int16))
+        path = output_path.rsplit(".", 1)[0] + ".wav"
+        with wave.open(path, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(SR)
+            w.writeframes(np.concatenate(parts).tobytes())
+        return path
+
+    segments = [{'start': 0.0, 'end': 1.0, 'text': ' one'}, {'start': 1.2, 'end': 3.0, 'text': ' wait for the pause'}]
+    path, timed = synthesize_tts_timeline(segments, log=lambda *_: None, synthesize=halting)
+    os.remove(path)
+    words = timed[1]['words']
+    pause_word = words[-1]
+    spoken_end = timed[1]['start'] + 0.03 + 0.05 * len("waitforthe") + 0.05 * 2  # pad + words + short gaps
+    assert pause_word['start'] >= spoken_end + 0.5, f"'pause' should start after the gap: {words}"
+    assert words[-2]['end'] <= spoken_end + 0.05, f"'the' should end before the gap: {words}"
+    print(f"✓ ' pause' starts at {pause_word['start']}s, after the 0.6 s gap")
+    return True
+
+
+def test_one_engine_per_timeline():
+    """With a GenAI Pro key, a segment GenAI Pro fails on fails the timeline - gTTS never voices part of it."""
+    print("\nTesting one TTS engine per timeline...")
+    import tiktok_full_gui as app
+
+    gtts_calls = []
+
+    class FakeGTTS:
+        def __init__(self, text, lang, slow=False):
+            gtts_calls.append(text)
+
+        def save(self, path):
+            raise AssertionError("gTTS must not be used when GenAI Pro is the timeline's engine")
+
+    def genaipro(text, language='en', output_path=None, api_key=None, log=None):
+        return None if text == "second" else StubTTS(latency=0)(text, language, output_path)
+
+    saved = (app._tts_api_key, app.generate_tts_with_genaipro, app.TTS_AUDIO, app.TTS_AVAILABLE,
+             getattr(app, "gTTS", None))
+    app._tts_api_key = lambda: "key"
+    app.generate_tts_with_genaipro, app.TTS_AUDIO, app.TTS_AVAILABLE, app.gTTS = genaipro, None, True, FakeGTTS
+    logs = []
+    try:
+        result = app.synthesize_tts_timeline(SEGMENTS, log=logs.append)
+    finally:
+        (app._tts_api_key, app.generate_tts_with_genaipro, app.TTS_AUDIO, app.TTS_AVAILABLE, app.gTTS) = saved
+    assert result == (None, None) and not gtts_calls, f"Mixed engines: {result}, gTTS calls {gtts_calls}"
+    assert any("genaipro" in line for line in logs), logs
+    print("✓ GenAI Pro failure fails the timeline; no gTTS segments")
+    return True
+
+
+def test_failed_segment_falls_back():
+    """One segment failing (after a retry) returns (None, None) so the job uses the single-request path."""
+    print("\nTesting failed segment...")
+    from tiktok_full_gui import synthesize_tts_timeline
+
+    result = synthesize_tts_timeline(SEGMENTS, log=lambda *_: None, synthesize=StubTTS(latency=0, fail_on="second"))
+    assert result == (None, None), f"Expected fallback signal, got {result}"
+    print("✓ Failure reported to the caller")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TTS Timeline Tests")
+    print("=" * 60)
+
+    tests = [
+        test_timeline_offsets,
+        test_concurrent_synthesis,
+        test_words_follow_pauses_in_a_clip,
+        test_one_engine_per_timeline,
+        test_failed_segment_falls_back,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
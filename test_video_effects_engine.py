@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test the vectorized VideoEffectsEngine against the PIL reference apply_video_effects,
+and benchmark frames/sec for both on a 1080x1920 frame.
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+ALL_TONE_EFFECTS = {
+    'effect_sharpness': True,
+    'effect_saturation': True,
+    'effect_contrast': True,
+    'effect_brightness': True,
+}
+
+
+def _test_frame(h=1920, w=1080, seed=0):
+    """Gradients plus noise so every stage (edges, colors, clipping) has something to do."""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:h, 0:w]
+    base = np.stack([xx * 255.0 / w, yy * 255.0 / h, (xx + yy) % 256], axis=-1)
+    return np.clip(base + rng.normal(0, 20, base.shape), 0, 255).astype(np.uint8)
+
+
+def test_matches_pil_reference():
+    """Deterministic effects match the PIL reference within a few levels."""
+    print("Testing engine output against PIL reference...")
+    from tiktok_full_gui import apply_video_effects, VideoEffectsEngine
+
+    frame = _test_frame()
+    cases = [
+        ("sharpness", {'effect_sharpness': True}),
+        ("saturation", {'effect_saturation': True}),
+        ("contrast", {'effect_contrast': True}),
+        ("brightness", {'effect_brightness': True}),
+        ("all tone effects", ALL_TONE_EFFECTS),
+        ("custom intensities", dict(ALL_TONE_EFFECTS, effect_saturation_intensity=0.6, effect_contrast_intensity=1.8)),
+    ]
+    for name, settings in cases:
+        ref = apply_video_effects(frame, settings).astype(np.int16)
+        out = VideoEffectsEngine(settings).process(frame).astype(np.int16)
+        diff = np.abs(ref - out)
+        assert out.shape == ref.shape, f"{name}: shape {out.shape} != {ref.shape}"
+        assert diff.mean() < 0.5, f"{name}: mean diff {diff.mean():.3f}"
+        assert diff.max() <= 4, f"{name}: max diff {diff.max()}"
+        print(f"✓ {name}: mean diff {diff.mean():.3f}, max diff {diff.max()}")
+    return True
+
+
+def test_vintage_grain_statistics():
+    """Grain is random in both versions, so compare brightness and spread instead of pixels."""
+    print("\nTesting vintage grain statistics...")
+    from tiktok_full_gui import apply_video_effects, VideoEffectsEngine
+
+    frame = _test_frame()
+    settings = {'effect_vintage': True, 'effect_vintage_intensity': 0.5}
+    ref = apply_video_effects(frame, settings).astype(np.float64)
+    out = VideoEffectsEngine(settings, seed=1).process(frame).astype(np.float64)
+
+    for c in range(3):
+        assert abs(ref[..., c].mean() - out[..., c].mean()) < 1.0, f"Channel {c} mean differs"
+        assert abs(ref[..., c].std() - out[..., c].std()) / ref[..., c].std() < 0.03, f"Channel {c} spread differs"
+    print(f"✓ Means {ref.mean():.2f} vs {out.mean():.2f}, std {ref.std():.2f} vs {out.std():.2f}")
+    return True
+
+
+def test_buffers_reused_output_fresh():
+    """Work buffers are reused across frames but each returned frame is a separate array."""
+    print("\nTesting buffer reuse...")
+    from tiktok_full_gui import VideoEffectsEngine
+
+    engine = VideoEffectsEngine(ALL_TONE_EFFECTS)
+    frame = _test_frame(h=64, w=48)
+    first = engine.process(frame)
+    second = engine.process(frame)
+
+    assert len(engine._buffers) == 1, "Buffers should be allocated once per frame size"
+    assert first is not second and not np.shares_memory(first, second), "Outputs must not alias"
+    assert np.array_equal(first, second), "Same input should give the same output"
+    print("✓ One buffer set, independent outputs")
+    return True
+
+
+def test_benchmark_fps():
+    """Report frames/sec before (PIL) and after (engine); the engine should not be slower."""
+    print("\nBenchmarking 1080x1920 frames...")
+    from tiktok_full_gui import apply_video_effects, VideoEffectsEngine
+
+    frame = _test_frame()
+    for name, settings in [("tone effects", ALL_TONE_EFFECTS), ("vintage", {'effect_vintage': True})]:
+        engine = VideoEffectsEngine(settings)
+        engine.process(frame)  # warm up buffers/LUTs
+
+        t0 = time.perf_counter()
+        for _ in range(3):
+            apply_video_effects(frame, settings)
+        ref_fps = 3 / (time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        for _ in range(10):
+            engine.process(frame)
+        eng_fps = 10 / (time.perf_counter() - t0)
+
+        print(f"  {name}: PIL {ref_fps:.1f} fps -> engine {eng_fps:.1f} fps ({eng_fps / ref_fps:.1f}x)")
+        assert eng_fps >= ref_fps, f"{name}: engine slower than reference"
+    print("✓ Engine faster than PIL reference")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Video Effects Engine Tests")
+    print("=" * 60)
+
+    tests = [
+        test_matches_pil_reference,
+        test_vintage_grain_statistics,
+        test_buffers_reused_output_fresh,
+        test_benchmark_fps,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
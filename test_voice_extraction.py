@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test voice extraction from video (extract_voice_from_video): one ffmpeg call that stream-copies
+the audio and hands 16 kHz PCM to DECODED_AUDIO, so decode_audio_16k (transcription) doesn't decode the
+file again; the PCM fallback when the stream can't be copied; and PCMCache itself.
+File tests need ffmpeg.
+"""
+
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+
+def _make_video(tmp, audio=True):
+    path = os.path.join(tmp, "clip.mp4" if audio else "silent.mp4")
+    cmd = ["ffmpeg", "-v", "error", "-y", "-f", "lavfi", "-i", "testsrc=size=160x120:rate=25"]
+    if audio:
+        cmd += ["-f", "lavfi", "-i", "sine=frequency=330:sample_rate=44100", "-c:a", "aac", "-ac", "2"]
+    subprocess.run(cmd + ["-t", "3", "-c:v", "libx264", "-shortest", path], check=True)
+    return path
+
+
+def _decode_native(path):
+    out = subprocess.run(["ffmpeg", "-v", "error", "-i", path, "-f", "s16le", "-acodec", "pcm_s16le", "-"],
+                         capture_output=True, check=True).stdout
+    return np.frombuffer(out, np.int16)
+
+
+def test_stream_copy_and_shared_pcm():
+    """AAC is copied to .m4a untouched; the 16 kHz PCM is cached and served without another decode."""
+    print("Testing extract_voice_from_video...")
+    if not shutil.which("ffmpeg"):
+        print("⚠ ffmpeg not found - skipping")
+        return True
+    import tiktok_full_gui as app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = _make_video(tmp)
+        logs = []
+        voice = app.extract_voice_from_video(video, log=logs.append)
+        try:
+            assert voice.endswith(".m4a"), f"AAC should be stream-copied into .m4a: {voice}"
+            assert np.array_equal(_decode_native(voice), _decode_native(video)), "Copied audio must decode identically"
+            assert any("stream copy" in line for line in logs), logs
+
+            calls = []
+            real_run = app.subprocess.run
+            app.subprocess.run = lambda cmd, *a, **k: calls.append(cmd) or real_run(cmd, *a, **k)
+            try:
+                shared = app.decode_audio_16k(voice)
+            finally:
+                app.subprocess.run = real_run
+            assert not calls, "decode_audio_16k should be served from DECODED_AUDIO"
+            assert np.array_equal(shared, app.decode_audio_pcm(voice, app.WHISPER_SAMPLE_RATE)), \
+                "Cached PCM must equal a fresh 16 kHz decode of the extracted file"
+            assert abs(len(shared) / app.WHISPER_SAMPLE_RATE - 3.0) < 0.05
+            assert not shared.flags.writeable, "Shared arrays must be read-only"
+        finally:
+            os.remove(voice)
+
+        assert app.extract_voice_from_video(_make_video(tmp, audio=False)) is None, "No audio track -> None"
+    print("✓ Stream copy, PCM shared with transcription")
+    return True
+
+
+def test_pcm_fallback_when_copy_fails():
+    """A container that can't hold the codec falls back to a WAV at the source rate."""
+    print("\nTesting PCM fallback...")
+    if not shutil.which("ffmpeg"):
+        print("⚠ ffmpeg not found - skipping")
+        return True
+    import tiktok_full_gui as app
+
+    saved = dict(app.VOICE_COPY_CONTAINERS)
+    app.VOICE_COPY_CONTAINERS["aac"] = ".flac"  # the flac muxer rejects AAC
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            video = _make_video(tmp)
+            voice = app.extract_voice_from_video(video)
+            leftovers = [f for f in os.listdir(tempfile.gettempdir()) if f.startswith("extracted_voice_") and f.endswith(".flac")]
+            try:
+                assert voice.endswith(".wav"), voice
+                assert np.array_equal(_decode_native(voice), _decode_native(video)), "Fallback WAV must be lossless"
+                assert app.DECODED_AUDIO.get(voice) is not None
+            finally:
+                os.remove(voice)
+    finally:
+        app.VOICE_COPY_CONTAINERS.clear()
+        app.VOICE_COPY_CONTAINERS.update(saved)
+    assert not leftovers, f"Failed copy attempt left files behind: {leftovers}"
+    print("✓ Lossless WAV when the stream can't be copied")
+    return True
+
+
+def test_pcm_cache_lru_and_invalidation():
+    """Entries are keyed by (path, mtime, size) and evicted least-recently-used by size."""
+    print("\nTesting PCMCache...")
+    from tiktok_full_gui import PCMCache
+
+    cache = PCMCache(max_mb=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for name in "abc":
+            paths.append(os.path.join(tmp, name))
+            with open(paths[-1], "w") as f:
+                f.write(name)
+        block = np.zeros(200 * 1024, np.int16)  # 400 KB
+        cache.put(paths[0], block)
+        cache.put(paths[1], block + 1)
+        assert cache.get(paths[0]) is not None  # a is now most recently used
+        cache.put(paths[2], block + 2)
+        assert cache.get(paths[1]) is None, "Least recently used entry should be evicted"
+        assert cache.get(paths[0]) is not None and cache.get(paths[2])[0] == 2
+        assert cache.stats()["size_mb"] <= 1
+
+        time.sleep(0.01)
+        with open(paths[0], "w") as f:
+            f.write("changed")
+        assert cache.get(paths[0]) is None, "Rewritten file must not be served stale PCM"
+        assert cache.get(os.path.join(tmp, "missing")) is None
+    print(f"✓ LRU by size, invalidated on change: {cache.stats()}")
+    return True
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Voice Extraction Tests")
+    print("=" * 60)
+
+    tests = [
+        test_stream_copy_and_shared_pcm,
+        test_pcm_fallback_when_copy_fails,
+        test_pcm_cache_lru_and_invalidation,
+    ]
+
+    all_passed = True
+    for test in tests:
+        try:
+            if not test():
+                all_passed = False
+        except Exception as e:
+            print(f"✗ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            all_passed = False
+
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("✓ ALL TESTS PASSED")
+        print("=" * 60)
+        sys.exit(0)
+    else:
+        print("✗ SOME TESTS FAILED")
+        print("=" * 60)
+        sys.exit(1)
@@ -64,20 +64,34 @@ def find_ttf_in_tiktok(font_name, search_root=r"C:\tiktok"):
 
 import sys
 import threading
+import multiprocessing
 import queue
 import subprocess
 import math
+import re
 import time
 import tempfile
 import shutil
 import json
 import gc
+import hashlib
+import unicodedata
+import asyncio
+import atexit
+import random
+import base64
+import gzip
+import heapq
 
 import tkinter as tk
 import tkinter.font as tkfont
 from tkinter import ttk, filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
 from pathlib import Path
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 
 import numpy as np
 # --- Pillow compatibility shim: ensure Image.ANTIALIAS exists for older code / moviepy ---
@@ -110,6 +124,23 @@ from moviepy.audio.fx.all import audio_fadeout
 
 import whisper
 import torch  # For GPU detection in Whisper
+import whisper_worker  # worker side of transcribe_parallel (import-light, for worker processes)
+import caption_worker  # worker side of render_caption_sprites
+
+# Optional transcription engines (see TRANSCRIPTION_BACKEND)
+try:
+    from faster_whisper import WhisperModel as FasterWhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+    FasterWhisperModel = None
+
+try:
+    from pywhispercpp.model import Model as WhisperCppModel
+    WHISPER_CPP_AVAILABLE = True
+except ImportError:
+    WHISPER_CPP_AVAILABLE = False
+    WhisperCppModel = None
 
 # ----------------- TRANSLATION & AI VOICE MODULES -----------------
 try:
@@ -133,7 +164,192 @@ except ImportError:
     REQUESTS_AVAILABLE = False
     requests = None
 
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    aiohttp = None
+
 # ----------------- TRANSLATION FUNCTIONS -----------------
+class GoogleTranslateBackend:
+    """Translation backend over googletrans; one Translator (one HTTP session) per request."""
+
+    name = "google"
+
+    def translate(self, text, target_language):
+        return Translator().translate(text, dest=target_language).text
+
+
+class BatchTranslator:
+    """
+    Translates many texts in a few round-trips.
+
+    Texts are looked up in a persistent (source text, target language) memo first; the rest are
+    joined with numbered sentinel lines into chunks of at most max_chars, the chunks are sent to the
+    backend concurrently and the replies split back on the sentinels. A chunk whose sentinels don't
+    survive the round-trip is retried one text per request.
+
+    backend is any object with translate(text, target_language) -> str; tests plug in a local stub.
+    """
+
+    SENTINEL = "⟦{}⟧"
+
+    def __init__(self, backend, memo_dir=None, max_chars=4500, workers=4):
+        self.backend = backend
+        self.memo_dir = memo_dir
+        self.max_chars = max(200, int(max_chars))
+        self.workers = max(1, int(workers))
+        self._memo = {}
+        self._lock = threading.Lock()
+        self.memo_hits = 0
+        self.requests = 0
+
+    @property
+    def available(self):
+        return self.backend is not None
+
+    def _memo_path(self, target_language):
+        safe = "".join(c for c in target_language if c.isalnum() or c in "-_") or "unknown"
+        return os.path.join(self.memo_dir, f"{safe}.json") if self.memo_dir else None
+
+    def _memo_for(self, target_language):
+        """The memo table for a language (caller holds the lock); loaded from disk on first use."""
+        table = self._memo.get(target_language)
+        if table is None:
+            table = {}
+            path = self._memo_path(target_language)
+            if path and os.path.exists(path):
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        table = json.load(f)
+                except Exception:
+                    table = {}
+            self._memo[target_language] = table
+        return table
+
+    def _save_memo(self, target_language):
+        path = self._memo_path(target_language)
+        if not path:
+            return
+        with self._lock:
+            data = json.dumps(self._memo_for(target_language), ensure_ascii=False)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            pass
+
+    def _chunks(self, texts):
+        """Split texts into lists whose joined size (text + sentinel lines) stays under max_chars."""
+        chunk, size = [], 0
+        for text in texts:
+            cost = len(text) + len(self.SENTINEL.format(len(chunk))) + 2
+            if chunk and size + cost > self.max_chars:
+                yield chunk
+                chunk, size = [], 0
+                cost = len(text) + len(self.SENTINEL.format(0)) + 2
+            chunk.append(text)
+            size += cost
+        if chunk:
+            yield chunk
+
+    def _split(self, reply, count):
+        """Texts between sentinels 0..count-1 of a translated chunk, or None if any went missing or came back empty."""
+        parts = re.split(r"\s*⟦\s*(\d+)\s*⟧\s*", reply or "")
+        # parts = [before-first, idx0, text0, idx1, text1, ...]
+        indices = [int(i) for i in parts[1::2]]
+        if indices != list(range(count)):
+            return None
+        texts = [t.strip() for t in parts[2::2]]
+        return texts if all(texts) else None
+
+    def _request(self, text, target_language):
+        with self._lock:
+            self.requests += 1
+        return self.backend.translate(text, target_language)
+
+    def _translate_chunk(self, chunk, target_language):
+        """Return {source: translation} for one chunk; texts that fail are left out."""
+        if len(chunk) > 1:
+            joined = "\n".join(f"{self.SENTINEL.format(i)}\n{text}" for i, text in enumerate(chunk))
+            try:
+                parts = self._split(self._request(joined, target_language), len(chunk))
+                if parts is not None:
+                    return dict(zip(chunk, parts))
+            except Exception:
+                pass
+        results = {}
+        for text in chunk:
+            try:
+                translated = (self._request(text, target_language) or "").strip()
+                if translated:
+                    results[text] = translated
+            except Exception:
+                pass
+        return results
+
+    def translate(self, texts, target_language, log=None):
+        """
+        Translate a list of texts; returns a list of the same length. Texts that could not be
+        translated come back unchanged (and are not memoized).
+        """
+        keys = [(t or "").strip() for t in texts]
+        with self._lock:
+            memo = self._memo_for(target_language)
+            known = {k: memo[k] for k in set(keys) if k and k in memo}
+            self.memo_hits += sum(1 for k in keys if k in known)
+        pending = list(dict.fromkeys(k for k in keys if k and k not in known))
+
+        if pending and self.available:
+            chunks = list(self._chunks(pending))
+            if log:
+                log(f"[TRANSLATE] {len(pending)} texts in {len(chunks)} request(s) "
+                    f"({len(keys) - len(pending)} from memo) -> {target_language}")
+            fresh = {}
+            if len(chunks) == 1 or self.workers == 1:
+                for chunk in chunks:
+                    fresh.update(self._translate_chunk(chunk, target_language))
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.workers, len(chunks))) as pool:
+                    for result in pool.map(lambda c: self._translate_chunk(c, target_language), chunks):
+                        fresh.update(result)
+            if fresh:
+                with self._lock:
+                    self._memo_for(target_language).update(fresh)
+                self._save_memo(target_language)
+                known.update(fresh)
+            if log and len(fresh) < len(pending):
+                log(f"[TRANSLATE ERROR] {len(pending) - len(fresh)} text(s) could not be translated")
+
+        return [known.get(k, text) for k, text in zip(keys, texts)]
+
+    def stats(self):
+        with self._lock:
+            return {"memo_hits": self.memo_hits, "requests": self.requests}
+
+
+TRANSLATOR = None
+_TRANSLATOR_LOCK = threading.Lock()
+
+
+def get_translator():
+    """The process-wide BatchTranslator (created on first use from the TRANSLATE_* settings)."""
+    global TRANSLATOR
+    with _TRANSLATOR_LOCK:
+        if TRANSLATOR is None:
+            TRANSLATOR = BatchTranslator(
+                GoogleTranslateBackend() if TRANSLATION_AVAILABLE else None,
+                memo_dir=os.path.join(CACHE_ROOT, "translations") if TRANSLATION_MEMO else None,
+                max_chars=TRANSLATE_BATCH_CHARS,
+                workers=TRANSLATE_WORKERS,
+            )
+        return TRANSLATOR
+
+
 def translate_text(text, target_language='en', log=None):
     """
     Translate text to target language using Google Translate API.
@@ -146,7 +362,8 @@ def translate_text(text, target_language='en', log=None):
     Returns:
         Translated text or original text if translation fails
     """
-    if not TRANSLATION_AVAILABLE:
+    translator = get_translator()
+    if not translator.available:
         if log:
             log("[TRANSLATE] googletrans not available - skipping translation")
         return text
@@ -154,20 +371,14 @@ def translate_text(text, target_language='en', log=None):
     if not text or not text.strip():
         return text
     
-    try:
-        translator = Translator()
-        result = translator.translate(text, dest=target_language)
-        if log:
-            log(f"[TRANSLATE] '{text[:50]}...' -> '{result.text[:50]}...' ({target_language})")
-        return result.text
-    except Exception as e:
-        if log:
-            log(f"[TRANSLATE ERROR] Failed to translate: {e}")
-        return text
+    result = translator.translate([text], target_language)[0]
+    if log:
+        log(f"[TRANSLATE] '{text[:50]}...' -> '{result[:50]}...' ({target_language})")
+    return result
 
 def translate_segments(segments, target_language='en', log=None):
     """
-    Translate all caption segments to target language.
+    Translate all caption segments to target language in batched requests (see BatchTranslator).
     
     Args:
         segments: List of caption segments from Whisper
@@ -177,27 +388,28 @@ def translate_segments(segments, target_language='en', log=None):
     Returns:
         List of segments with translated text
     """
-    if not TRANSLATION_AVAILABLE or target_language == 'none':
+    translator = get_translator()
+    if not translator.available or target_language == 'none':
         return segments
     
     if log:
         log(f"[TRANSLATE] Translating {len(segments)} segments to {target_language}...")
     
+    originals = [seg.get("text", "") for seg in segments]
+    try:
+        texts = translator.translate(originals, target_language, log=log)
+    except Exception as e:
+        if log:
+            log(f"[TRANSLATE ERROR] Batch translation failed: {e}")
+        return segments
+    
     translated = []
-    for i, seg in enumerate(segments):
-        try:
-            original_text = seg.get("text", "")
-            translated_text = translate_text(original_text, target_language, log=None)
-            
-            # Create new segment with translated text
-            new_seg = seg.copy()
-            new_seg["text"] = translated_text
-            new_seg["original_text"] = original_text
-            translated.append(new_seg)
-        except Exception as e:
-            if log:
-                log(f"[TRANSLATE ERROR] Failed segment {i}: {e}")
-            translated.append(seg)
+    for seg, original_text, translated_text in zip(segments, originals, texts):
+        # Create new segment with translated text
+        new_seg = seg.copy()
+        new_seg["text"] = translated_text
+        new_seg["original_text"] = original_text
+        translated.append(new_seg)
     
     if log:
         log(f"[TRANSLATE] Translation complete!")
@@ -206,10 +418,324 @@ def translate_segments(segments, target_language='en', log=None):
 
 # ----------------- AI VOICE REPLACEMENT FUNCTIONS -----------------
 
+GENAIPRO_DONE_STATUSES = ('completed', 'done', 'success', 'succeeded', 'finished')
+GENAIPRO_FAILED_STATUSES = ('failed', 'error', 'cancelled', 'canceled')
+
+
+def genaipro_voice_id(language):
+    """Voice for a language: TTS_VOICE_ID when set, otherwise the per-language default."""
+    # Map language codes to voice IDs (you can expand this mapping)
+    # Check if a custom voice ID is specified, otherwise use language defaults
+    if TTS_VOICE_ID and TTS_VOICE_ID != 'auto':
+        return TTS_VOICE_ID
+    voice_map = {
+        'en': 'uju3wxzG5OhpWcoi3SMy',  # Default English voice
+        'es': 'uju3wxzG5OhpWcoi3SMy',  # Using same for now, can be customized
+        'fr': 'uju3wxzG5OhpWcoi3SMy',
+        'de': 'uju3wxzG5OhpWcoi3SMy',
+        'it': 'uju3wxzG5OhpWcoi3SMy',
+        'pt': 'uju3wxzG5OhpWcoi3SMy',
+        'ro': 'uju3wxzG5OhpWcoi3SMy',
+        'ru': 'uju3wxzG5OhpWcoi3SMy',
+        'zh': 'uju3wxzG5OhpWcoi3SMy',
+        'ja': 'uju3wxzG5OhpWcoi3SMy',
+        'ko': 'uju3wxzG5OhpWcoi3SMy',
+    }
+    return voice_map.get(language, 'uju3wxzG5OhpWcoi3SMy')
+
+
+def genaipro_task_payload(text, voice_id):
+    return {
+        'input': text,
+        'voice_id': voice_id,
+        'model_id': 'eleven_turbo_v2_5',  # Fast model
+        'speed': 1.0,
+        'style': 0.0,
+        'use_speaker_boost': False,
+        'similarity': 0.75,
+        'stability': 0.5
+    }
+
+
+def find_genaipro_task(tasks, task_id):
+    """Find one task in a GenAI Pro status response (a task, a list, or a {'tasks'|'data': [...]} wrapper)."""
+    if isinstance(tasks, list):
+        candidates = tasks
+    elif isinstance(tasks, dict):
+        # Could be a single task response or a wrapper
+        if (tasks.get('task_id') or tasks.get('id')) == task_id:
+            return tasks
+        candidates = tasks.get('tasks') or tasks.get('data') or []
+        if isinstance(candidates, dict):
+            candidates = [candidates]
+    else:
+        return None
+    for task in candidates:
+        # Check both 'task_id' and 'id' fields
+        if isinstance(task, dict) and (task.get('task_id') or task.get('id')) == task_id:
+            return task
+    return None
+
+
+def genaipro_audio_url(task):
+    # Try multiple possible field names for the audio URL, including 'result'
+    return (task.get('result') or task.get('output_url') or task.get('audio_url') or
+            task.get('result_url') or task.get('file_url') or task.get('url'))
+
+
+class GenAIProError(RuntimeError):
+    pass
+
+
+class GenAIProClient:
+    """
+    asyncio client for the GenAI Pro TTS API.
+
+    All requests go through one pooled aiohttp session (keep-alive connections are reused between
+    submits, polls and downloads). Up to max_in_flight tasks run at once; each is polled with
+    exponential backoff plus jitter, by id (GET /labs/task/{id}) unless the server rejects that,
+    in which case the task list is filtered with ?task_id=. Audio is streamed to disk in chunks.
+    The API key is only sent to base_url, not to the (possibly third-party) download host.
+    """
+
+    def __init__(self, api_key, base_url=None, max_in_flight=None, poll_initial=None, poll_max=None,
+                 task_timeout=None):
+        self.api_key = api_key
+        self.base_url = (base_url or GENAIPRO_API_BASE).rstrip('/')
+        self.max_in_flight = max(1, int(max_in_flight or GENAIPRO_MAX_IN_FLIGHT))
+        self.poll_initial = float(poll_initial or GENAIPRO_POLL_INITIAL)
+        self.poll_max = float(poll_max or GENAIPRO_POLL_MAX)
+        self.task_timeout = float(task_timeout or GENAIPRO_TASK_TIMEOUT)
+        self.by_id_endpoint = True
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _headers(self):
+        return {'Authorization': f'Bearer {self.api_key}', 'Content-Type': 'application/json'}
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_in_flight * 2, keepalive_timeout=60)
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=15, sock_read=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def submit(self, text, voice_id):
+        """Create a TTS task; returns its id."""
+        async with self._get_session().post(f'{self.base_url}/labs/task', headers=self._headers(),
+                                            json=genaipro_task_payload(text, voice_id)) as resp:
+            if resp.status != 200:
+                raise GenAIProError(f"Task submission failed: {resp.status} - {(await resp.text())[:300]}")
+            data = await resp.json(content_type=None)
+        # GenAI Pro might return 'task_id' or 'id' field
+        task_id = (data.get('task_id') or data.get('id')) if isinstance(data, dict) else None
+        if not task_id:
+            raise GenAIProError(f"No task_id in response: {data}")
+        return task_id
+
+    async def task_status(self, task_id):
+        """
+        Current task object, or None if the server didn't report it this time.
+
+        The per-task endpoint is tried first; when it doesn't report the task this poll, the filtered
+        list is asked instead. The client (shared by every job) only stops using the per-task endpoint
+        on a 405, or when the list finds a task the per-task endpoint answered 404 for - a task that
+        is missing right after submission says nothing about the server.
+        """
+        session = self._get_session()
+        by_id_404 = False
+        if self.by_id_endpoint:
+            async with session.get(f'{self.base_url}/labs/task/{task_id}', headers=self._headers()) as resp:
+                if resp.status == 200:
+                    task = find_genaipro_task(await resp.json(content_type=None), task_id)
+                    if task is not None:
+                        return task
+                elif resp.status == 405:
+                    self.by_id_endpoint = False
+                elif resp.status == 404:
+                    by_id_404 = True
+                else:
+                    return None
+        async with session.get(f'{self.base_url}/labs/task', headers=self._headers(),
+                               params={'task_id': task_id}) as resp:
+            if resp.status != 200:
+                return None
+            task = find_genaipro_task(await resp.json(content_type=None), task_id)
+        if task is not None and by_id_404:
+            self.by_id_endpoint = False
+        return task
+
+    async def wait(self, task_id, log=None):
+        """Poll until the task finishes; returns the audio URL."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        attempt = 0
+        while True:
+            # Exponential backoff with jitter: bursts of tasks don't poll in lockstep
+            delay = min(self.poll_max, self.poll_initial * (2 ** attempt))
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            attempt += 1
+            try:
+                task = await self.task_status(task_id)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                # ValueError: a body that isn't JSON (proxy error page, truncated reply) - no status this poll
+                if log:
+                    log(f"[GenAI Pro] Status check failed ({e}) - retrying")
+                task = None
+            elapsed = loop.time() - started
+            if task is not None:
+                status = str(task.get('status', '')).lower()
+                audio_url = genaipro_audio_url(task)
+                # GenAI Pro fills the 'result' field with audio URL when done
+                if status in GENAIPRO_DONE_STATUSES or audio_url:
+                    if not audio_url:
+                        raise GenAIProError(f"Task completed but no audio URL found (fields: {list(task.keys())})")
+                    if log:
+                        log(f"[GenAI Pro] ✓ Task {task_id} complete after {elapsed:.0f}s ({attempt} polls)")
+                    return audio_url
+                if status in GENAIPRO_FAILED_STATUSES:
+                    raise GenAIProError(f"Task failed with status '{status}': {task}")
+            if elapsed > self.task_timeout:
+                raise GenAIProError(f"Task timeout after {elapsed / 60:.0f} minutes")
+
+    async def download(self, url, output_path, chunk_size=64 * 1024):
+        """Stream url to output_path (written to a .part file, then renamed)."""
+        tmp_path = f"{output_path}.part"
+        try:
+            async with self._get_session().get(url) as resp:
+                if resp.status != 200:
+                    raise GenAIProError(f"Failed to download audio: {resp.status}")
+                with open(tmp_path, 'wb') as f:
+                    async for chunk in resp.content.iter_chunked(chunk_size):
+                        f.write(chunk)
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+        return output_path
+
+    async def synthesize(self, text, voice_id, output_path, log=None):
+        """Submit, wait and download one text; at most max_in_flight run concurrently."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        async with self._semaphore:
+            if log:
+                log(f"[GenAI Pro] Submitting TTS task ({len(text)} chars)...")
+            task_id = await self.submit(text, voice_id)
+            audio_url = await self.wait(task_id, log=log)
+            return await self.download(audio_url, output_path)
+
+
+class _BackgroundLoop:
+    """One event loop on a daemon thread, so blocking callers in any thread share async clients."""
+
+    def __init__(self):
+        self._loop = None
+        self._lock = threading.Lock()
+
+    @property
+    def started(self):
+        return self._loop is not None
+
+    def run(self, coro, timeout=None):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="async-io", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+
+_ASYNC_IO = _BackgroundLoop()
+_GENAIPRO_CLIENTS = {}
+
+
+def _close_genaipro_clients():
+    """atexit: close the shared GenAI Pro sessions on the background loop."""
+    if not _ASYNC_IO.started or not _GENAIPRO_CLIENTS:
+        return
+
+    async def _close_all():
+        for client in list(_GENAIPRO_CLIENTS.values()):
+            await client.close()
+    try:
+        _ASYNC_IO.run(_close_all(), timeout=5)
+    except Exception:
+        pass
+
+
+atexit.register(_close_genaipro_clients)
+
+
+async def _genaipro_synthesize(api_key, text, voice_id, output_path, log):
+    # Clients live on the background loop; one per (key, endpoint) so connections are reused
+    key = (api_key, GENAIPRO_API_BASE)
+    client = _GENAIPRO_CLIENTS.get(key)
+    if client is None:
+        client = _GENAIPRO_CLIENTS[key] = GenAIProClient(api_key)
+    return await client.synthesize(text, voice_id, output_path, log=log)
+
+
 def generate_tts_with_genaipro(text, language='en', output_path=None, api_key=None, log=None):
     """
     Generate Text-to-Speech audio using GenAI Pro API.
     
+    Runs on the shared GenAIProClient (blocking only the calling thread), so concurrent callers
+    such as synthesize_tts_timeline's workers multiplex over one connection pool.
+    Falls back to the blocking requests implementation when aiohttp is not installed.
+    
+    Args:
+        text: Text to convert to speech
+        language: Language code for TTS
+        output_path: Path to save audio file (temp file if None)
+        api_key: GenAI Pro API key (JWT token)
+        log: Optional logging function
+    
+    Returns:
+        Path to generated audio file or None if failed
+    """
+    if not AIOHTTP_AVAILABLE:
+        return _generate_tts_with_genaipro_requests(text, language, output_path, api_key, log)
+    
+    if not api_key:
+        if log:
+            log("[GenAI Pro] No API key provided")
+        return None
+    
+    if not text or not text.strip():
+        return None
+    
+    if output_path is None:
+        fd, output_path = tempfile.mkstemp(suffix='.mp3', prefix='genaipro_tts_')
+        os.close(fd)
+    
+    try:
+        result = _ASYNC_IO.run(_genaipro_synthesize(api_key, text, genaipro_voice_id(language), output_path, log))
+        if log:
+            log(f"[GenAI Pro] ✅ TTS generated successfully: {result}")
+        return result
+    except Exception as e:
+        if log:
+            log(f"[GenAI Pro ERROR] {e}")
+        return None
+
+def _generate_tts_with_genaipro_requests(text, language='en', output_path=None, api_key=None, log=None):
+    """
+    Generate Text-to-Speech audio using GenAI Pro API (blocking requests version, used without aiohttp).
+    
     Args:
         text: Text to convert to speech
         language: Language code for TTS
@@ -241,26 +767,7 @@ def generate_tts_with_genaipro(text, language='en', output_path=None, api_key=No
             fd, output_path = tempfile.mkstemp(suffix='.mp3', prefix='genaipro_tts_')
             os.close(fd)
         
-        # Map language codes to voice IDs (you can expand this mapping)
-        # Check if a custom voice ID is specified, otherwise use language defaults
-        global TTS_VOICE_ID
-        if TTS_VOICE_ID and TTS_VOICE_ID != 'auto':
-            voice_id = TTS_VOICE_ID
-        else:
-            voice_map = {
-                'en': 'uju3wxzG5OhpWcoi3SMy',  # Default English voice
-                'es': 'uju3wxzG5OhpWcoi3SMy',  # Using same for now, can be customized
-                'fr': 'uju3wxzG5OhpWcoi3SMy',
-                'de': 'uju3wxzG5OhpWcoi3SMy',
-                'it': 'uju3wxzG5OhpWcoi3SMy',
-                'pt': 'uju3wxzG5OhpWcoi3SMy',
-                'ro': 'uju3wxzG5OhpWcoi3SMy',
-                'ru': 'uju3wxzG5OhpWcoi3SMy',
-                'zh': 'uju3wxzG5OhpWcoi3SMy',
-                'ja': 'uju3wxzG5OhpWcoi3SMy',
-                'ko': 'uju3wxzG5OhpWcoi3SMy',
-            }
-            voice_id = voice_map.get(language, 'uju3wxzG5OhpWcoi3SMy')
+        voice_id = genaipro_voice_id(language)
         
         # Step 1: Submit TTS task
         if log:
@@ -271,19 +778,10 @@ def generate_tts_with_genaipro(text, language='en', output_path=None, api_key=No
             'Content-Type': 'application/json'
         }
         
-        task_payload = {
-            'input': text,
-            'voice_id': voice_id,
-            'model_id': 'eleven_turbo_v2_5',  # Fast model
-            'speed': 1.0,
-            'style': 0.0,
-            'use_speaker_boost': False,
-            'similarity': 0.75,
-            'stability': 0.5
-        }
+        task_payload = genaipro_task_payload(text, voice_id)
         
         response = requests.post(
-            'https://genaipro.vn/api/v1/labs/task',
+            f'{GENAIPRO_API_BASE}/labs/task',
             headers=headers,
             json=task_payload,
             timeout=30
@@ -326,7 +824,7 @@ def generate_tts_with_genaipro(text, language='en', output_path=None, api_key=No
                     log(f"[GenAI Pro] ⏳ Waiting: {elapsed_mins}m {elapsed_secs}s elapsed - Still processing...")
             
             status_response = requests.get(
-                'https://genaipro.vn/api/v1/labs/task',
+                f'{GENAIPRO_API_BASE}/labs/task',
                 headers=headers,
                 timeout=10
             )
@@ -339,33 +837,7 @@ def generate_tts_with_genaipro(text, language='en', output_path=None, api_key=No
             tasks = status_response.json()
             
             # Find our task in the list
-            our_task = None
-            if isinstance(tasks, list):
-                for task in tasks:
-                    # Check both 'task_id' and 'id' fields
-                    task_identifier = task.get('task_id') or task.get('id')
-                    if task_identifier == task_id:
-                        our_task = task
-                        break
-            elif isinstance(tasks, dict):
-                # Could be a single task response or a wrapper
-                task_identifier = tasks.get('task_id') or tasks.get('id')
-                if task_identifier == task_id:
-                    our_task = tasks
-                elif 'tasks' in tasks and isinstance(tasks['tasks'], list):
-                    # Response might have tasks in a 'tasks' field
-                    for task in tasks['tasks']:
-                        task_identifier = task.get('task_id') or task.get('id')
-                        if task_identifier == task_id:
-                            our_task = task
-                            break
-                elif 'data' in tasks and isinstance(tasks['data'], list):
-                    # Response might have tasks in a 'data' field
-                    for task in tasks['data']:
-                        task_identifier = task.get('task_id') or task.get('id')
-                        if task_identifier == task_id:
-                            our_task = task
-                            break
+            our_task = find_genaipro_task(tasks, task_id)
             
             if our_task:
                 status = our_task.get('status', '').lower()
@@ -377,7 +849,7 @@ def generate_tts_with_genaipro(text, language='en', output_path=None, api_key=No
                 
                 # Check if task is complete - either by status OR by result field being populated
                 # GenAI Pro fills the 'result' field with audio URL when done
-                is_complete = (status in ['completed', 'done', 'success', 'succeeded', 'finished'] or 
+                is_complete = (status in GENAIPRO_DONE_STATUSES or 
                               (result and result != ''))
                 
                 if is_complete:
@@ -390,12 +862,7 @@ def generate_tts_with_genaipro(text, language='en', output_path=None, api_key=No
                         log(f"[GenAI Pro DEBUG] Complete task - Full object: {our_task}")
                     
                     # Try multiple possible field names for the audio URL, including 'result'
-                    audio_url = (our_task.get('result') or
-                                our_task.get('output_url') or 
-                                our_task.get('audio_url') or 
-                                our_task.get('result_url') or
-                                our_task.get('file_url') or
-                                our_task.get('url'))
+                    audio_url = genaipro_audio_url(our_task)
                     
                     if not audio_url:
                         if log:
@@ -423,7 +890,7 @@ def generate_tts_with_genaipro(text, language='en', output_path=None, api_key=No
                             log(f"[GenAI Pro ERROR] Failed to download audio: {audio_response.status_code}")
                         return None
                 
-                elif status in ['failed', 'error', 'cancelled', 'canceled']:
+                elif status in GENAIPRO_FAILED_STATUSES:
                     if log:
                         log(f"[GenAI Pro ERROR] ❌ Task failed with status '{status}': {our_task}")
                     return None
@@ -457,88 +924,543 @@ def generate_tts_with_genaipro(text, language='en', output_path=None, api_key=No
             log(f"[GenAI Pro ERROR] Exception: {e}")
         return None
 
-def remove_silence_from_audio(audio_path, output_path=None, log=None, min_silence_ms=300):
+def decode_audio_native(path):
+    """
+    Decode an audio/video file to interleaved 16-bit PCM at its own sample rate and channel count
+    (what pydub's AudioSegment.from_file holds). Returns (frames x channels int16 array, sample_rate).
+    """
+    cmd = ["ffmpeg", "-nostdin", "-i", path, "-vn", "-f", "wav", "-acodec", "pcm_s16le", "-"]
+    result = subprocess.run(cmd, capture_output=True)
+    data = result.stdout
+    if result.returncode != 0 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise RuntimeError(f"Failed to decode audio: {result.stderr.decode(errors='replace')[-300:]}")
+    # Walk the RIFF chunks; ffmpeg can't seek back into a pipe, so the data chunk size may be bogus
+    pos, channels, sample_rate = 12, None, None
+    while pos + 8 <= len(data):
+        chunk_id, size = data[pos:pos + 4], int.from_bytes(data[pos + 4:pos + 8], "little")
+        if chunk_id == b"fmt ":
+            channels = int.from_bytes(data[pos + 10:pos + 12], "little")
+            sample_rate = int.from_bytes(data[pos + 12:pos + 16], "little")
+        elif chunk_id == b"data":
+            payload = data[pos + 8:]
+            payload = payload[:len(payload) - len(payload) % (2 * channels)]
+            return np.frombuffer(payload, np.int16).reshape(-1, channels), sample_rate
+        pos += 8 + size + (size & 1)
+    raise RuntimeError("Failed to decode audio: no PCM data in ffmpeg output")
+
+
+def _ms_to_frame(ms, sample_rate):
+    """pydub's millisecond -> frame index conversion (AudioSegment._parse_position)."""
+    return (np.asarray(ms, dtype=np.float64) * (sample_rate / 1000.0)).astype(np.int64)
+
+
+def detect_nonsilent_ranges(pcm, sample_rate, min_silence_len=1000, silence_thresh=-16, seek_step=1):
+    """
+    Vectorized pydub.silence.detect_nonsilent for a (frames x channels) int16 array.
+
+    Same windows (min_silence_len ms, every seek_step ms on pydub's ms->frame grid), same integer RMS
+    as audioop.rms and the same range merging, so the [start_ms, end_ms] ranges are identical.
+    Window energies come from exact int64 sums per millisecond, accumulated in blocks.
+    """
+    pcm = pcm.reshape(len(pcm), -1)
+    frames, channels = pcm.shape
+    seg_len = int(round(1000 * (frames / sample_rate)))
+    if seg_len < min_silence_len:
+        return [[0, seg_len]]
+
+    # Energy of each 1 ms bucket [frame(k), frame(k+1)), then its cumulative sum on the ms grid
+    bounds = np.minimum(_ms_to_frame(np.arange(seg_len + 1), sample_rate), frames)
+    ms_energy = np.zeros(seg_len, dtype=np.int64)
+    block = 1 << 20
+    limit = int(bounds[-1])  # frames after the last whole ms are never inside a window
+    for f0 in range(0, limit, block):
+        f1 = min(limit, f0 + block)
+        sq = pcm[f0:f1].astype(np.int64)
+        sq = (sq * sq).sum(axis=1)
+        k0 = int(np.searchsorted(bounds, f0, side="right")) - 1
+        k1 = min(seg_len, int(np.searchsorted(bounds, f1, side="left")))
+        if k1 <= k0:
+            continue
+        starts = np.maximum(bounds[k0:k1], f0) - f0
+        ms_energy[k0:k1] += np.add.reduceat(sq, starts)
+    cumulative = np.concatenate([[0], np.cumsum(ms_energy)])
+
+    last_start = seg_len - min_silence_len
+    window_starts = np.arange(0, last_start + 1, seek_step)
+    if last_start % seek_step:
+        window_starts = np.append(window_starts, last_start)
+    window_ends = window_starts + min_silence_len
+    energy = cumulative[window_ends] - cumulative[window_starts]
+    # pydub pads a slice running past the data with silent frames, so the divisor is the nominal length
+    first = _ms_to_frame(window_starts, sample_rate)
+    count = (_ms_to_frame(window_ends, sample_rate) - first) * channels
+    count = np.where(first < frames, count, 0)
+    rms = np.floor(np.sqrt(energy / np.maximum(count, 1))).astype(np.int64)
+    rms[count == 0] = 0
+
+    threshold = (10 ** (silence_thresh / 20)) * 32768.0
+    silence_starts = window_starts[rms <= threshold]
+    if len(silence_starts) == 0:
+        return [[0, seg_len]]
+
+    # Merge like pydub: a new silent range starts only where consecutive silent windows are
+    # neither adjacent nor overlapping
+    prev, cur = silence_starts[:-1], silence_starts[1:]
+    breaks = np.flatnonzero((cur != prev + seek_step) & (cur > prev + min_silence_len))
+    range_starts = np.concatenate([[silence_starts[0]], cur[breaks]])
+    range_ends = np.concatenate([prev[breaks], [silence_starts[-1]]]) + min_silence_len
+    silent_ranges = [[int(a), int(b)] for a, b in zip(range_starts, range_ends)]
+
+    if silent_ranges[0][0] == 0 and silent_ranges[0][1] == seg_len:
+        return []
+    nonsilent, prev_end = [], 0
+    for start_ms, end_ms in silent_ranges:
+        nonsilent.append([prev_end, start_ms])
+        prev_end = end_ms
+    if prev_end != seg_len:
+        nonsilent.append([prev_end, seg_len])
+    if nonsilent[0] == [0, 0]:
+        nonsilent.pop(0)
+    return nonsilent
+
+
+def _dbfs(energy, samples):
+    """dBFS from a sum of squared int16 samples, with pydub's integer RMS."""
+    if not samples:
+        return -float("inf")
+    rms = math.floor(math.sqrt(energy / samples))
+    if not rms:
+        return -float("inf")
+    return 20 * math.log(rms / 32768.0, 10)
+
+
+def pcm_dbfs(pcm):
+    """Loudness of int16 PCM in dBFS, as pydub's AudioSegment.dBFS (integer RMS over all samples)."""
+    pcm = np.asarray(pcm)
+    return _dbfs(int(np.square(pcm.astype(np.int64)).sum()), pcm.size)
+
+
+class PCMStream:
+    """
+    ffmpeg decoding a file to 16-bit PCM at its own sample rate and channel count, read from the pipe
+    in blocks of (frames x channels) int16 arrays. Only one block is held in memory at a time.
+    """
+
+    def __init__(self, path, block_frames=1 << 18):
+        self.path = path
+        self.block_frames = block_frames
+        self._stderr = tempfile.TemporaryFile()
+        cmd = ["ffmpeg", "-nostdin", "-i", path, "-vn", "-f", "wav", "-acodec", "pcm_s16le", "-"]
+        self._proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=self._stderr)
+        try:
+            self.channels, self.sample_rate = self._read_header()
+        except Exception:
+            self.close()
+            raise
+
+    def _error_tail(self):
+        self._stderr.seek(0)
+        return self._stderr.read().decode(errors="replace")[-300:]
+
+    def _read_header(self):
+        # Same RIFF walk as decode_audio_native, but off the pipe: stop at the data chunk
+        read = self._proc.stdout.read
+        head = read(12)
+        if head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+            self._proc.wait()
+            raise RuntimeError(f"Failed to decode audio: {self._error_tail()}")
+        channels = sample_rate = None
+        while True:
+            chunk = read(8)
+            if len(chunk) < 8:
+                raise RuntimeError("Failed to decode audio: no PCM data in ffmpeg output")
+            chunk_id, size = chunk[:4], int.from_bytes(chunk[4:8], "little")
+            if chunk_id == b"data":
+                return channels, sample_rate
+            body = read(size + (size & 1))
+            if chunk_id == b"fmt ":
+                channels = int.from_bytes(body[2:4], "little")
+                sample_rate = int.from_bytes(body[4:8], "little")
+
+    def __iter__(self):
+        frame_bytes = 2 * self.channels
+        leftover = b""
+        while True:
+            data = self._proc.stdout.read(self.block_frames * frame_bytes)
+            if not data:
+                break
+            data = leftover + data
+            usable = len(data) - len(data) % frame_bytes
+            leftover = data[usable:]
+            if usable:
+                yield np.frombuffer(data[:usable], np.int16).reshape(-1, self.channels)
+        if self._proc.wait() != 0:
+            raise RuntimeError(f"Failed to decode audio: {self._error_tail()}")
+
+    def close(self):
+        if self._proc.poll() is None:
+            self._proc.kill()
+            self._proc.wait()
+        self._proc.stdout.close()
+        self._stderr.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PCMWriter:
+    """
+    Sink for (frames x channels) int16 blocks: a WAV file written directly, any other extension
+    encoded by ffmpeg reading raw PCM from a pipe.
+    """
+
+    def __init__(self, output_path, sample_rate, channels):
+        self.output_path = output_path
+        self.frames = 0
+        self._wav = self._proc = None
+        if output_path.lower().endswith(".wav"):
+            import wave
+            self._wav = wave.open(output_path, "wb")
+            self._wav.setnchannels(channels)
+            self._wav.setsampwidth(2)
+            self._wav.setframerate(sample_rate)
+        else:
+            self._stderr = tempfile.TemporaryFile()
+            cmd = ["ffmpeg", "-nostdin", "-y", "-v", "error", "-f", "s16le", "-ar", str(sample_rate),
+                   "-ac", str(channels), "-i", "-", output_path]
+            self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                          stderr=self._stderr)
+
+    def write(self, pcm):
+        data = np.ascontiguousarray(pcm, dtype=np.int16).tobytes()
+        self.frames += len(pcm)
+        if self._wav is not None:
+            self._wav.writeframesraw(data)
+        else:
+            self._proc.stdin.write(data)
+
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+            return self.output_path
+        self._proc.stdin.close()
+        returncode = self._proc.wait()
+        self._stderr.seek(0)
+        error = self._stderr.read().decode(errors="replace")[-300:]
+        self._stderr.close()
+        if returncode != 0:
+            raise RuntimeError(f"Failed to encode {self.output_path}: {error}")
+        return self.output_path
+
+
+def write_pcm_audio(pcm, sample_rate, output_path):
+    """Write (frames x channels) int16 PCM: WAV directly, any other extension through ffmpeg."""
+    pcm = pcm.reshape(len(pcm), -1)
+    writer = PCMWriter(output_path, sample_rate, pcm.shape[1])
+    writer.write(pcm)
+    return writer.close()
+
+
+class StreamingSilenceCutter:
+    """
+    detect_nonsilent_ranges for PCM arriving block by block, passing the kept frames to `write` as soon
+    as they are known to lie outside every silent range.
+
+    The ranges depend on the length and loudness of the whole track, so total_frames and
+    silence_thresh are needed up front (remove_silence_from_audio gets them from a first pass).
+    Between blocks only the open silent range, the cumulative energies of the windows not yet
+    evaluated and the frames not yet decided are kept - about min_silence_len ms plus one block,
+    whatever the input length. feed() blocks of any size, then finish() returns the same
+    [start_ms, end_ms] ranges as detect_nonsilent_ranges.
+    """
+
+    def __init__(self, sample_rate, channels, total_frames, write, min_silence_len=1000,
+                 silence_thresh=-16, seek_step=1):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.total_frames = total_frames
+        self.write = write
+        self.min_silence_len = min_silence_len
+        self.seek_step = seek_step
+        self.threshold = (10 ** (silence_thresh / 20)) * 32768.0
+        self.seg_len = int(round(1000 * (total_frames / sample_rate)))
+        self.last_start = self.seg_len - min_silence_len
+        self.ranges = []
+        self._fed = 0
+        self._energy = 0
+        # Energy of all frames before ms k (pydub's ms->frame grid) for k in [_cum_ms, _known_ms]
+        self._cum = np.zeros(1, dtype=np.int64)
+        self._cum_ms = 0
+        self._known_ms = 0
+        self._next_window = 0
+        self._tail_window_done = self.last_start < 0 or self.last_start % seek_step == 0
+        # Silent range being extended: [first window, last silent window]
+        self._open = None
+        self._prev_end = 0
+        self._emitted_ms = 0
+        self._pending = np.zeros((0, channels), dtype=np.int16)
+        self._pending_start = 0
+
+    def _frame(self, ms):
+        return int(_ms_to_frame(ms, self.sample_rate))
+
+    def _upcoming_window(self):
+        """Start of the next window to evaluate (None once all are done)."""
+        if self._next_window <= self.last_start:
+            return self._next_window
+        if not self._tail_window_done:
+            return self.last_start
+        return None
+
+    def feed(self, block):
+        block = block.reshape(len(block), self.channels)[:self.total_frames - self._fed]
+        if not len(block):
+            return
+        f0 = self._fed
+        f1 = f0 + len(block)
+        sq = block.astype(np.int64)
+        running = np.cumsum((sq * sq).sum(axis=1))
+
+        # Cumulative energy at every ms boundary that falls inside this block
+        k_hi = self.seg_len if f1 == self.total_frames else min(
+            self.seg_len, int(f1 * 1000 // self.sample_rate) + 2)
+        ks = np.arange(self._known_ms + 1, k_hi + 1)
+        bounds = np.minimum(_ms_to_frame(ks, self.sample_rate), self.total_frames)
+        inside = bounds <= f1
+        ks, bounds = ks[inside], bounds[inside]
+        if len(ks):
+            values = self._energy + np.where(bounds > f0, running[np.maximum(bounds - f0 - 1, 0)], 0)
+            self._cum = np.concatenate([self._cum, values])
+            self._known_ms = int(ks[-1])
+        self._energy += int(running[-1])
+        self._fed = f1
+        self._pending = np.concatenate([self._pending, block]) if len(self._pending) else block
+        self._advance()
+
+    def _advance(self):
+        L, step = self.min_silence_len, self.seek_step
+        hi = min(self.last_start, self._known_ms - L)
+        starts = np.arange(self._next_window, hi + 1, step) if hi >= self._next_window else np.zeros(0, np.int64)
+        if len(starts):
+            self._next_window = int(starts[-1]) + step
+        if (not self._tail_window_done and self._next_window > self.last_start
+                and self.last_start + L <= self._known_ms):
+            starts = np.append(starts, self.last_start)
+            self._tail_window_done = True
+
+        if len(starts):
+            ends = starts + L
+            energy = self._cum[ends - self._cum_ms] - self._cum[starts - self._cum_ms]
+            first = _ms_to_frame(starts, self.sample_rate)
+            count = (_ms_to_frame(ends, self.sample_rate) - first) * self.channels
+            count = np.where(first < self.total_frames, count, 0)
+            rms = np.floor(np.sqrt(energy / np.maximum(count, 1))).astype(np.int64)
+            rms[count == 0] = 0
+            self._merge(starts[rms <= self.threshold])
+
+        upcoming = self._upcoming_window()
+        if self._open is not None:
+            last = self._open[1]
+            if upcoming is None or (upcoming > last + L and upcoming != last + step):
+                self._silence_end(last + L)
+        if self._open is None:
+            self._emit_until(min(self.seg_len if upcoming is None else upcoming, self._known_ms))
+
+        # Drop energies and frames nothing will look at again
+        keep_ms = min(self._known_ms, self.seg_len if upcoming is None else upcoming)
+        self._cum = self._cum[keep_ms - self._cum_ms:]
+        self._cum_ms = keep_ms
+        keep_frame = min(self._frame(self._open[1] + L if self._open else self._emitted_ms), self._fed)
+        if keep_frame > self._pending_start:
+            self._pending = self._pending[keep_frame - self._pending_start:]
+            self._pending_start = keep_frame
+
+    def _merge(self, silent):
+        """Extend/close/open silent ranges exactly as detect_nonsilent_ranges merges them."""
+        if not len(silent):
+            return
+        L, step = self.min_silence_len, self.seek_step
+        seq = np.concatenate([[self._open[1]], silent]) if self._open else silent
+        prev, cur = seq[:-1], seq[1:]
+        breaks = np.flatnonzero((cur != prev + step) & (cur > prev + L))
+        if self._open is None:
+            self._silence_start(int(seq[0]))
+        for prev_i, cur_i in zip(prev[breaks], cur[breaks]):
+            self._silence_end(int(prev_i) + L)
+            self._silence_start(int(cur_i))
+        self._open[1] = int(seq[-1])
+
+    def _silence_start(self, start_ms):
+        self._emit_until(start_ms)
+        if not (self._prev_end == 0 and start_ms == 0):
+            self.ranges.append([self._prev_end, start_ms])
+        self._open = [start_ms, start_ms]
+
+    def _silence_end(self, end_ms):
+        self._open = None
+        self._prev_end = self._emitted_ms = end_ms
+
+    def _emit_until(self, ms):
+        if ms <= self._emitted_ms:
+            return
+        a, b = self._frame(self._emitted_ms), self._frame(ms)
+        chunk = self._pending[a - self._pending_start:b - self._pending_start]
+        if len(chunk) < b - a:
+            # Past the end of the data (ms rounding): pad with silence like pydub
+            chunk = np.concatenate([chunk, np.zeros((b - a - len(chunk), self.channels), dtype=np.int16)])
+        self.write(chunk)
+        self._emitted_ms = ms
+
+    def finish(self):
+        if self._fed != self.total_frames:
+            raise RuntimeError(f"Decoded {self._fed} frames, expected {self.total_frames}")
+        if self.seg_len < self.min_silence_len:
+            self._emit_until(self.seg_len)
+            self.ranges = [[0, self.seg_len]]
+            return self.ranges
+        self._advance()
+        if self._prev_end != self.seg_len:
+            self._emit_until(self.seg_len)
+            self.ranges.append([self._prev_end, self.seg_len])
+        return self.ranges
+
+
+def build_silence_map(nonsilent_ranges):
+    """(original_start, original_end, new_start, new_end) in seconds for each kept [start_ms, end_ms]."""
+    silence_map = []
+    new_position = 0
+    for start_ms, end_ms in nonsilent_ranges:
+        segment_duration = end_ms - start_ms
+        silence_map.append((
+            start_ms / 1000.0,  # original start in seconds
+            end_ms / 1000.0,    # original end in seconds
+            new_position / 1000.0,  # new start in seconds
+            (new_position + segment_duration) / 1000.0  # new end in seconds
+        ))
+        new_position += segment_duration
+    return silence_map
+
+
+def _remove_silence_streaming(audio_path, output_path, log, min_silence_ms):
+    """Two passes over an ffmpeg pipe: loudness and length of the track, then cut while decoding."""
+    energy = frames = 0
+    with PCMStream(audio_path, SILENCE_STREAM_BLOCK_FRAMES) as stream:
+        for block in stream:
+            flat = block.astype(np.int64)
+            energy += int((flat * flat).sum())
+            frames += len(block)
+        sample_rate, channels = stream.sample_rate, stream.channels
+    if not frames:
+        raise RuntimeError("no audio frames decoded")
+    orig_dur = round(1000 * (frames / sample_rate)) / 1000.0
+
+    if log:
+        log(f"[SILENCE] Original duration: {orig_dur:.2f}s (streaming)")
+
+    writer = PCMWriter(output_path, sample_rate, channels)
+    try:
+        cutter = StreamingSilenceCutter(sample_rate, channels, frames, writer.write,
+                                        min_silence_len=min_silence_ms,
+                                        silence_thresh=_dbfs(energy, frames * channels) - 16)
+        with PCMStream(audio_path, SILENCE_STREAM_BLOCK_FRAMES) as stream:
+            for block in stream:
+                cutter.feed(block)
+        nonsilent_ranges = cutter.finish()
+    finally:
+        writer.close()
+    return nonsilent_ranges, orig_dur, writer.frames / sample_rate
+
+
+def remove_silence_from_audio(audio_path, output_path=None, log=None, min_silence_ms=300, streaming=None):
     """
     Remove long silences from audio file while keeping natural speech pauses.
     
+    The audio is decoded once to a PCM array; silence detection (detect_nonsilent_ranges, same
+    ranges as pydub's detect_nonsilent) and assembly of the kept audio are array operations. The mono
+    mix of the input and of a .wav output go into DECODED_AUDIO for the later stages.
+    In streaming mode the file is read from an ffmpeg pipe in blocks instead (twice: loudness, then
+    cutting) and kept audio goes straight to the output, so memory doesn't grow with the length.
+    
     Args:
         audio_path: Path to input audio file
-        output_path: Path to save processed audio (temp file if None)
+        output_path: Path to save processed audio (temp .wav if None; other extensions are encoded)
         log: Optional logging function
         min_silence_ms: Minimum silence length in milliseconds to remove (default: 300ms)
+        streaming: Force streaming on/off; None streams files of SILENCE_STREAMING_MIN_MB or more
     
     Returns:
         Tuple of (output_path, silence_map) where silence_map is a list of
         (original_start, original_end, new_start, new_end) for each kept segment
     """
-    try:
-        from pydub import AudioSegment
-        from pydub.silence import detect_nonsilent
-    except ImportError:
-        if log:
-            log("[SILENCE] pydub not available - skipping silence removal")
-        return audio_path, []
-    
+    created_output = output_path is None
     try:
         if log:
             log(f"[SILENCE] Loading audio: {audio_path}")
         
-        # Load audio
-        audio = AudioSegment.from_file(audio_path)
+        if output_path is None:
+            fd, output_path = tempfile.mkstemp(suffix='.wav', prefix='audio_no_silence_')
+            os.close(fd)
+        
+        if streaming is None:
+            streaming = os.path.getsize(audio_path) >= SILENCE_STREAMING_MIN_MB * 1024 * 1024
         
-        if log:
-            log(f"[SILENCE] Original duration: {len(audio)/1000.0:.2f}s")
-        
-        # Detect non-silent chunks (balanced - remove gaps based on user setting)
-        # min_silence_len: minimum length of silence to consider (default 300ms)
-        # silence_thresh: volume threshold for silence (audio.dBFS - 16 = fairly sensitive)
-        nonsilent_ranges = detect_nonsilent(
-            audio,
-            min_silence_len=min_silence_ms,  # User-configurable threshold
-            silence_thresh=audio.dBFS - 16  # Detect even quiet parts as non-silent
-        )
+        if streaming:
+            # Same detection (min_silence_len / dBFS - 16 threshold), done block by block
+            nonsilent_ranges, orig_dur, new_dur = _remove_silence_streaming(audio_path, output_path, log, min_silence_ms)
+        else:
+            pcm, sample_rate = decode_audio_native(audio_path)
+            # Caption alignment of this track reuses the decode (align_tts_captions)
+            DECODED_AUDIO.put(audio_path, downmix_pcm(pcm), sample_rate)
+            orig_dur = round(1000 * (len(pcm) / sample_rate)) / 1000.0
+            
+            if log:
+                log(f"[SILENCE] Original duration: {orig_dur:.2f}s")
+            
+            # Detect non-silent chunks (balanced - remove gaps based on user setting)
+            # min_silence_len: minimum length of silence to consider (default 300ms)
+            # silence_thresh: volume threshold for silence (audio.dBFS - 16 = fairly sensitive)
+            nonsilent_ranges = detect_nonsilent_ranges(
+                pcm,
+                sample_rate,
+                min_silence_len=min_silence_ms,  # User-configurable threshold
+                silence_thresh=pcm_dbfs(pcm) - 16  # Detect even quiet parts as non-silent
+            )
+            
+            if nonsilent_ranges:
+                # Copy all non-silent segments into one preallocated buffer
+                starts = _ms_to_frame([r[0] for r in nonsilent_ranges], sample_rate)
+                ends = _ms_to_frame([r[1] for r in nonsilent_ranges], sample_rate)
+                output_pcm = np.zeros((int((ends - starts).sum()), pcm.shape[1]), dtype=np.int16)
+                cursor = 0
+                for start_f, end_f in zip(starts, ends):
+                    # Frames past the end of the data stay zero (pydub pads slices the same way)
+                    available = pcm[start_f:min(end_f, len(pcm))]
+                    output_pcm[cursor:cursor + len(available)] = available
+                    cursor += int(end_f - start_f)
+                write_pcm_audio(output_pcm, sample_rate, output_path)
+                if output_path.lower().endswith(".wav"):
+                    DECODED_AUDIO.put(output_path, downmix_pcm(output_pcm), sample_rate)
+                new_dur = len(output_pcm) / sample_rate
         
         if not nonsilent_ranges:
             if log:
                 log("[SILENCE] No non-silent segments found!")
+            if created_output and os.path.exists(output_path):
+                os.remove(output_path)
             return audio_path, []
         
         if log:
             log(f"[SILENCE] Found {len(nonsilent_ranges)} non-silent segments")
         
-        # Concatenate all non-silent segments
-        output_audio = AudioSegment.empty()
-        silence_map = []
-        new_position = 0
-        
-        for i, (start_ms, end_ms) in enumerate(nonsilent_ranges):
-            segment = audio[start_ms:end_ms]
-            output_audio += segment
-            
-            # Track mapping: original time -> new time
-            segment_duration = end_ms - start_ms
-            silence_map.append((
-                start_ms / 1000.0,  # original start in seconds
-                end_ms / 1000.0,    # original end in seconds
-                new_position / 1000.0,  # new start in seconds
-                (new_position + segment_duration) / 1000.0  # new end in seconds
-            ))
-            new_position += segment_duration
+        # Track mapping: original time -> new time
+        silence_map = build_silence_map(nonsilent_ranges)
         
         if log:
-            orig_dur = len(audio) / 1000.0
-            new_dur = len(output_audio) / 1000.0
             removed = orig_dur - new_dur
             log(f"[SILENCE] New duration: {new_dur:.2f}s (removed {removed:.2f}s of silence)")
-        
-        # Save processed audio
-        if output_path is None:
-            fd, output_path = tempfile.mkstemp(suffix='.mp3', prefix='audio_no_silence_')
-            os.close(fd)
-        
-        output_audio.export(output_path, format="mp3")
-        
-        if log:
             log(f"[SILENCE] ✅ Saved silence-removed audio: {output_path}")
         
         return output_path, silence_map
@@ -546,8 +1468,41 @@ def remove_silence_from_audio(audio_path, output_path=None, log=None, min_silenc
     except Exception as e:
         if log:
             log(f"[SILENCE ERROR] Failed to remove silence: {e}")
+        if created_output and output_path and os.path.exists(output_path):
+            os.remove(output_path)
         return audio_path, []
 
+
+def remap_times_after_silence_removal(times, silence_map):
+    """
+    Map original timestamps onto the timeline after silence removal, all in one vectorized pass.
+    
+    The silence map is turned into sorted arrays and each time is located with searchsorted:
+    inside a kept segment it is interpolated; in a removed gap it snaps to the end of the previous
+    kept segment or the start of the next, whichever is closer (the previous one on a tie); before
+    the first / after the last segment it clamps to the new timeline's start / end.
+    
+    Returns a float64 array the same length as `times`.
+    """
+    entries = sorted(silence_map, key=lambda entry: entry[0])
+    orig_start, orig_end, new_start, new_end = (np.asarray(col, dtype=np.float64) for col in zip(*entries))
+    t = np.asarray(times, dtype=np.float64)
+    
+    # First kept segment ending at or after t - the only one that can contain it
+    idx = np.searchsorted(orig_end, t, side='left')
+    cur = np.minimum(idx, len(orig_end) - 1)
+    inside = (idx < len(orig_end)) & (orig_start[cur] <= t)
+    span = orig_end[cur] - orig_start[cur]
+    relative_pos = np.where(span > 0, (t - orig_start[cur]) / np.where(span > 0, span, 1.0), 0.0)
+    mapped = new_start[cur] + relative_pos * (new_end[cur] - new_start[cur])
+    
+    # Between kept segments: snap to the closer edge
+    prev = np.maximum(idx - 1, 0)
+    use_prev = (idx == len(orig_end)) | ((idx > 0) & (t - orig_end[prev] <= orig_start[cur] - t))
+    snapped = np.where(use_prev, new_end[prev], new_start[cur])
+    return np.where(inside, mapped, snapped)
+
+
 def map_timestamps_after_silence_removal(segments, silence_map, log=None):
     """
     Re-map caption segment timestamps after silence removal.
@@ -568,36 +1523,24 @@ def map_timestamps_after_silence_removal(segments, silence_map, log=None):
     if log:
         log(f"[TIMESTAMP] Re-mapping {len(segments)} segments to compressed audio timeline")
     
-    def map_time(original_time):
-        """Map an original timestamp to the new timeline after silence removal."""
-        # Find which segment contains this timestamp
-        for orig_start, orig_end, new_start, new_end in silence_map:
-            if orig_start <= original_time <= orig_end:
-                # Time falls within this segment
-                # Calculate relative position within the segment
-                relative_pos = (original_time - orig_start) / (orig_end - orig_start) if (orig_end - orig_start) > 0 else 0
-                # Map to new timeline
-                return new_start + relative_pos * (new_end - new_start)
-        
-        # If time doesn't fall in any segment, find the closest segment
-        # (this handles edge cases and slight timestamp mismatches)
-        closest_segment = min(silence_map, key=lambda seg: min(abs(seg[0] - original_time), abs(seg[1] - original_time)))
-        orig_start, orig_end, new_start, new_end = closest_segment
-        
-        if original_time < orig_start:
-            return new_start  # Before first segment
-        else:
-            return new_end  # After last segment
+    # Gather every segment and word timestamp, remap them in one pass, then rebuild in the same order
+    times = []
+    for seg in segments:
+        times.append(seg.get('start', 0))
+        times.append(seg.get('end', 0))
+        for word in seg.get('words') or ():
+            if 'start' in word:
+                times.append(word['start'])
+            if 'end' in word:
+                times.append(word['end'])
+    mapped_times = iter(remap_times_after_silence_removal(times, silence_map).tolist())
     
     # Create new segments with mapped timestamps
     mapped_segments = []
     for seg in segments:
         new_seg = seg.copy()
-        orig_start = seg.get('start', 0)
-        orig_end = seg.get('end', 0)
-        
-        new_seg['start'] = map_time(orig_start)
-        new_seg['end'] = map_time(orig_end)
+        new_seg['start'] = next(mapped_times)
+        new_seg['end'] = next(mapped_times)
         
         # If segment has word-level timestamps, map those too
         if 'words' in seg and seg['words']:
@@ -605,9 +1548,9 @@ def map_timestamps_after_silence_removal(segments, silence_map, log=None):
             for word in seg['words']:
                 new_word = word.copy()
                 if 'start' in word:
-                    new_word['start'] = map_time(word['start'])
+                    new_word['start'] = next(mapped_times)
                 if 'end' in word:
-                    new_word['end'] = map_time(word['end'])
+                    new_word['end'] = next(mapped_times)
                 new_words.append(new_word)
             new_seg['words'] = new_words
         
@@ -620,7 +1563,19 @@ def map_timestamps_after_silence_removal(segments, silence_map, log=None):
     
     return mapped_segments
 
-def generate_tts_audio(text, language='en', output_path=None, log=None):
+def _tts_api_key():
+    """GenAI Pro API key from tts_config.json next to this file, or None."""
+    try:
+        config_path = os.path.join(os.path.dirname(__file__), "tts_config.json")
+        if os.path.exists(config_path):
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+                return config.get("api_key", "").strip() or None
+    except Exception:
+        pass
+    return None
+
+def generate_tts_audio(text, language='en', output_path=None, log=None, engine=None):
     """
     Generate Text-to-Speech audio from text using GenAI Pro (if API key available) or gTTS (fallback).
     
@@ -629,23 +1584,32 @@ def generate_tts_audio(text, language='en', output_path=None, log=None):
         language: Language code for TTS
         output_path: Path to save audio file (temp file if None)
         log: Optional logging function
+        engine: 'genaipro' or 'gtts' to use only that engine (no fallback); None = GenAI Pro, then gTTS
     
     Returns:
         Path to generated audio file or None if failed
     """
-    # Try to load API key from config
-    api_key = None
-    try:
-        config_path = os.path.join(os.path.dirname(__file__), "tts_config.json")
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-                api_key = config.get("api_key", "").strip()
-    except Exception:
-        pass
+    if not text or not text.strip():
+        return None
+    
+    api_key = _tts_api_key() if engine != "gtts" else None
+    if engine == "genaipro" and not api_key:
+        if log:
+            log("[TTS] GenAI Pro API key not configured")
+        return None
+    
+    # Synthesized audio is cached by text + engine settings (see TTSAudioCache); a hit costs no request
+    cache = TTS_AUDIO
     
     # Try GenAI Pro first if API key is available
     if api_key:
+        voice_id = genaipro_voice_id(language)
+        params = {k: v for k, v in genaipro_task_payload("", voice_id).items() if k not in ('input', 'voice_id')}
+        cache_key = tts_cache_key(text, language, "genaipro", voice_id, params)
+        cached = cache.get(cache_key, log=log) if cache else None
+        cached = cache.copy_out(cached, output_path) if cached else None
+        if cached:
+            return cached
         if log:
             log("="*60)
             log("[TTS] 🎙️  STARTING AI VOICE GENERATION")
@@ -660,7 +1624,13 @@ def generate_tts_audio(text, language='en', output_path=None, log=None):
                 log("[TTS] ✅ AI VOICE GENERATION COMPLETE!")
                 log(f"[TTS] Audio file ready: {result}")
                 log("="*60)
+            if cache:
+                cache.put(cache_key, result)
             return result
+        if engine == "genaipro":
+            if log:
+                log("[TTS] ⚠️  GenAI Pro failed")
+            return None
         if log:
             log("[TTS] ⚠️  GenAI Pro failed, falling back to gTTS...")
     
@@ -670,8 +1640,11 @@ def generate_tts_audio(text, language='en', output_path=None, log=None):
             log("[TTS] gTTS not available - skipping voice generation")
         return None
     
-    if not text or not text.strip():
-        return None
+    cache_key = tts_cache_key(text, language, "gtts", None, {'slow': False})
+    cached = cache.get(cache_key, log=log) if cache else None
+    cached = cache.copy_out(cached, output_path) if cached else None
+    if cached:
+        return cached
     
     try:
         if output_path is None:
@@ -684,6 +1657,8 @@ def generate_tts_audio(text, language='en', output_path=None, log=None):
         if log:
             log(f"[TTS/gTTS] Generated audio: {output_path} (length: {len(text)} chars)")
         
+        if cache:
+            cache.put(cache_key, output_path)
         return output_path
     except Exception as e:
         if log:
@@ -733,20 +1708,267 @@ def replace_voice_with_tts(caption_segments, language='en', log=None):
             log(f"[TTS ERROR] Failed to replace voice: {e}")
         return None
 
-# ----------------- SETTINGS (defaults) -----------------
-WIDTH = 1080
-HEIGHT = 1920
-IS_4K_MODE = False  # Track resolution mode for proper scaling
+def _trim_silence(pcm, sample_rate, thresh_db=-45.0, pad_ms=30):
+    """Strip leading/trailing silence (10 ms frames below thresh_db), keeping pad_ms around the speech."""
+    frame = max(1, sample_rate // 100)
+    n = len(pcm) // frame
+    if n == 0:
+        return pcm
+    x = pcm[:n * frame].astype(np.float32).reshape(n, frame) / 32768.0
+    loud = np.flatnonzero(10.0 * np.log10(np.mean(x * x, axis=1) + 1e-12) > thresh_db)
+    if len(loud) == 0:
+        return pcm[:0]
+    pad = int(sample_rate * pad_ms / 1000)
+    return pcm[max(0, loud[0] * frame - pad):min(len(pcm), (loud[-1] + 1) * frame + pad)]
+
+
+def _spread_words(text, start, end):
+    """Word timings for synthesized text: the clip's duration split in proportion to word length."""
+    words = text.split()
+    if not words:
+        return []
+    weights = np.array([len(w) + 1 for w in words], dtype=np.float64)
+    edges = start + (end - start) * np.concatenate([[0.0], np.cumsum(weights) / weights.sum()])
+    return [{"word": f" {w}", "start": round(float(edges[i]), 3), "end": round(float(edges[i + 1]), 3),
+             "probability": 1.0} for i, w in enumerate(words)]
 
-CROP_TOP_RATIO = 0.30
-CROP_BOTTOM_RATIO = 0.35
 
-VOICE_GAIN = 1.5  # Default: 1.5x louder for better voice clarity
-MUSIC_GAIN = 0.15  # Default: 0.15x quieter for subtle background music
-CAPTION_FONT_PREFERRED = "Bangers"
-CAPTION_FONT_SIZE = 56
+def synthesize_tts_timeline(caption_segments, language='en', log=None, workers=None, max_pause_ms=300,
+                            output_path=None, synthesize=None):
+    """
+    Generate AI voice one caption segment at a time and assemble the clips on the segment timeline.
 
-# Debug: force saving caption images and force-visible overlay for testing
+    Segments are synthesized concurrently (at most `workers` requests in flight, default TTS_WORKERS).
+    Each clip is trimmed of the engine's leading/trailing silence and placed after the previous one,
+    separated by the original pause between the segments capped at max_pause_ms - the same result the
+    silence-removal pass produces, but with every clip's offset known. The returned segments carry
+    those offsets, and per-word timings from aligning each clip's text to its audio
+    (align_text_to_speech), so no second transcription is needed.
+
+    synthesize(text, language, output_path) -> path defaults to generate_tts_audio with one engine
+    for the whole timeline: GenAI Pro when an API key is configured, else gTTS. A segment the engine
+    fails on fails the timeline instead of being voiced by the other engine.
+
+    Returns:
+        (wav_path, timed_segments), or (None, None) if any segment could not be synthesized
+    """
+    if synthesize is None:
+        engine = "genaipro" if _tts_api_key() else "gtts"
+        if engine == "gtts" and not TTS_AVAILABLE:
+            if log:
+                log("[TTS] gTTS not available - cannot replace voice")
+            return None, None
+        if log:
+            log(f"[TTS] Engine for every segment: {engine}")
+        synthesize = lambda text, lang, path: generate_tts_audio(text, language=lang, output_path=path,
+                                                                 engine=engine)
+    workers = max(1, int(workers or TTS_WORKERS))
+    sample_rate = TTS_TIMELINE_SAMPLE_RATE
+    segments = [seg for seg in caption_segments if (seg.get("text") or "").strip()]
+    if not segments:
+        return None, None
+
+    work_dir = tempfile.mkdtemp(prefix="tts_segments_")
+
+    def _one(index):
+        text = segments[index]["text"].strip()
+        path = os.path.join(work_dir, f"seg_{index:04d}.mp3")
+        for attempt in range(2):
+            try:
+                result = synthesize(text, language, path)
+                if result:
+                    return _trim_silence(decode_audio_pcm(result, sample_rate), sample_rate)
+            except Exception as e:
+                if log and attempt:
+                    log(f"[TTS ERROR] Segment {index + 1}: {e}")
+        return None
+
+    if log:
+        log(f"[TTS] Synthesizing {len(segments)} segments ({min(workers, len(segments))} at a time)...")
+    cache_before = TTS_AUDIO.stats() if TTS_AUDIO else None
+    t0 = time.time()
+    try:
+        with ThreadPoolExecutor(max_workers=min(workers, len(segments))) as pool:
+            clips = list(pool.map(_one, range(len(segments))))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if log and cache_before:
+        cache_after = TTS_AUDIO.stats()
+        log(f"[TTS-CACHE] {cache_after['hits'] - cache_before['hits']} hits, "
+            f"{cache_after['misses'] - cache_before['misses']} misses for this job "
+            f"({cache_after['size_mb']:.0f} MB cached)")
+    failed = [i + 1 for i, clip in enumerate(clips) if clip is None]
+    if failed:
+        if log:
+            log(f"[TTS ERROR] {len(failed)} segment(s) failed to synthesize: {failed[:10]}")
+        return None, None
+
+    # Lay the clips out: original pause before each segment, capped at max_pause_ms
+    max_pause = max(0, int(max_pause_ms)) * sample_rate // 1000
+    offsets, cursor = [], 0
+    for i, (seg, clip) in enumerate(zip(segments, clips)):
+        if i:
+            gap = float(seg.get("start", 0.0)) - float(segments[i - 1].get("end", 0.0))
+            cursor += min(max_pause, max(0, int(gap * sample_rate)))
+        offsets.append(cursor)
+        cursor += len(clip)
+
+    track = np.zeros(cursor, dtype=np.int16)
+    timed = []
+    for seg, clip, offset in zip(segments, clips, offsets):
+        track[offset:offset + len(clip)] = clip
+        start, end = offset / sample_rate, (offset + len(clip)) / sample_rate
+        new_seg = seg.copy()
+        new_seg["start"], new_seg["end"] = round(start, 3), round(end, 3)
+        # Word timings from the clip's own audio (pauses inside the segment included)
+        aligned = align_text_to_speech(clip, sample_rate, [seg])
+        if aligned:
+            new_seg["words"] = [dict(w, start=round(w["start"] + start, 3), end=round(w["end"] + start, 3))
+                                for w in aligned[0]["words"]]
+        else:
+            new_seg["words"] = _spread_words(seg["text"], start, end)
+        timed.append(new_seg)
+
+    if output_path is None:
+        fd, output_path = tempfile.mkstemp(suffix='.wav', prefix='tts_timeline_')
+        os.close(fd)
+    import wave
+    with wave.open(output_path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(track.tobytes())
+
+    if log:
+        log(f"[TTS] ✅ {len(segments)} segments synthesized in {time.time() - t0:.1f}s, "
+            f"timeline {cursor / sample_rate:.2f}s: {output_path}")
+    return output_path, timed
+
+def _snap_to_pauses(targets, tolerances, pauses):
+    """
+    Move each target position onto the nearest unused pause within its tolerance, keeping the order.
+    Positions are counted in speech frames; targets with no pause close enough stay where they are.
+    """
+    snapped, next_pause, floor = [], 0, 0
+    for target, tolerance in zip(targets, tolerances):
+        j = int(np.searchsorted(pauses, target))
+        candidates = [k for k in (j - 1, j) if next_pause <= k < len(pauses)]
+        best = min(candidates, key=lambda k: abs(pauses[k] - target), default=None)
+        if best is not None and abs(pauses[best] - target) <= tolerance and pauses[best] >= floor:
+            position = int(pauses[best])
+            next_pause = best + 1
+        else:
+            position = max(floor, int(round(target)))
+        snapped.append(position)
+        floor = position
+    return snapped
+
+
+def align_text_to_speech(pcm, sample_rate, caption_segments, segment_pause_ms=120, word_pause_ms=30):
+    """
+    Energy-based forced alignment of known text (the script the TTS engine just spoke) to its audio.
+
+    10 ms frames louder than the track's dBFS - 16 (the silence-removal threshold) count as speech.
+    Words are laid out over the speech frames only, in proportion to their length; segment
+    boundaries then move onto the nearest pause of segment_pause_ms or more, and word boundaries
+    inside each segment onto pauses of word_pause_ms or more, within half the neighbouring
+    segment's / word's expected length.
+
+    Returns copies of the segments with 'start'/'end' and per-word timings in seconds of this audio,
+    or None if no speech was found.
+    """
+    pcm = np.asarray(pcm).reshape(-1)
+    frame = max(1, sample_rate // 100)
+    n = len(pcm) // frame
+    if n == 0:
+        return None
+    x = pcm[:n * frame].astype(np.float64).reshape(n, frame)
+    loudness = pcm_dbfs(pcm)
+    if not np.isfinite(loudness):
+        return None
+    level = 10.0 * np.log10(np.mean(x * x, axis=1) / (32768.0 ** 2) + 1e-12)
+    speech_idx = np.flatnonzero(level > loudness - 16)
+    total = len(speech_idx)
+    if total == 0:
+        return None
+    frame_s = frame / sample_rate
+
+    # Pauses: gaps between consecutive speech frames, as (speech frames before, length in frames)
+    gaps = np.diff(speech_idx) - 1
+    at = np.flatnonzero(gaps > 0)
+    pause_pos, pause_len = at + 1, gaps[at] * frame_s * 1000.0
+
+    def _start(p):
+        return round(float(speech_idx[min(p, total - 1)] * frame_s), 3)
+
+    def _end(p):
+        return round(float((speech_idx[max(p - 1, 0)] + 1) * frame_s), 3)
+
+    words = [(seg.get("text") or "").split() for seg in caption_segments]
+    seg_weight = np.array([sum(len(w) + 1 for w in ws) for ws in words], dtype=np.float64)
+    if not seg_weight.sum():
+        return None
+    expected = total * seg_weight / seg_weight.sum()
+    targets = np.cumsum(expected)[:-1]
+    tolerances = 0.5 * np.minimum(expected[:-1], expected[1:])
+    bounds = [0] + _snap_to_pauses(targets, tolerances, pause_pos[pause_len >= segment_pause_ms]) + [total]
+
+    word_pauses = pause_pos[pause_len >= word_pause_ms]
+    aligned = []
+    for seg, ws, p0, p1 in zip(caption_segments, words, bounds, bounds[1:]):
+        new_seg = seg.copy()
+        new_seg["start"], new_seg["end"] = _start(p0), max(_start(p0), _end(p1))
+        new_seg["words"] = []
+        if ws:
+            weight = np.array([len(w) + 1 for w in ws], dtype=np.float64)
+            span = (p1 - p0) * weight / weight.sum()
+            inner = word_pauses[(word_pauses > p0) & (word_pauses < p1)]
+            cuts = [p0] + _snap_to_pauses(p0 + np.cumsum(span)[:-1], 0.5 * np.minimum(span[:-1], span[1:]),
+                                         inner) + [p1]
+            for w, q0, q1 in zip(ws, cuts, cuts[1:]):
+                new_seg["words"].append({"word": f" {w}", "start": _start(q0), "end": max(_start(q0), _end(q1)),
+                                         "probability": 1.0})
+        aligned.append(new_seg)
+    return aligned
+
+
+def align_tts_captions(tts_audio_path, caption_segments, silence_map=None, log=None):
+    """
+    Caption timing for a single-request TTS track without a second transcription: the spoken text is
+    aligned to the TTS audio (align_text_to_speech) and remapped onto the silence-removed timeline
+    through the map remove_silence_from_audio returned.
+
+    Returns the timed segments, or None if the audio has no detectable speech.
+    """
+    t0 = time.time()
+    # Usually already decoded by remove_silence_from_audio; any sample rate will do
+    decoded = DECODED_AUDIO.get_any(tts_audio_path)
+    pcm, sample_rate = decoded if decoded else (decode_audio_16k(tts_audio_path), WHISPER_SAMPLE_RATE)
+    aligned = align_text_to_speech(pcm, sample_rate, caption_segments)
+    if aligned is None:
+        return None
+    if silence_map:
+        aligned = map_timestamps_after_silence_removal(aligned, silence_map, log)
+    if log:
+        log(f"[ALIGN] {len(aligned)} segments / {sum(len(s['words']) for s in aligned)} words aligned "
+            f"to the TTS audio in {time.time() - t0:.2f}s")
+    return aligned
+
+# ----------------- SETTINGS (defaults) -----------------
+WIDTH = 1080
+HEIGHT = 1920
+IS_4K_MODE = False  # Track resolution mode for proper scaling
+
+CROP_TOP_RATIO = 0.30
+CROP_BOTTOM_RATIO = 0.35
+
+VOICE_GAIN = 1.5  # Default: 1.5x louder for better voice clarity
+MUSIC_GAIN = 0.15  # Default: 0.15x quieter for subtle background music
+CAPTION_FONT_PREFERRED = "Bangers"
+CAPTION_FONT_SIZE = 56
+
+# Debug: force saving caption images and force-visible overlay for testing
 CAPTION_DEBUG_SAVE_IMAGES = True
 CAPTION_DEBUG_FORCE_VISIBLE = True
 CAPTION_PADDING = 200
@@ -754,6 +1976,8 @@ CAPTION_PADDING = 200
 # Default caption colors (RGBA)
 CAPTION_TEXT_COLOR = (255, 255, 255, 255)
 CAPTION_STROKE_COLOR = (0, 0, 0, 150)
+# Per-word karaoke highlight color for ASS-rendered captions (None = no highlight)
+CAPTION_HIGHLIGHT_COLOR = None
 # Stroke width (pixels) for caption border
 CAPTION_STROKE_WIDTH = max(1, int(CAPTION_FONT_SIZE * 0.05))
 
@@ -766,6 +1990,19 @@ TARGET_LANGUAGE = 'none'  # 'none', 'en', 'es', 'fr', 'ro', etc.
 USE_AI_VOICE_REPLACEMENT = False
 TTS_LANGUAGE = 'en'
 TTS_VOICE_ID = 'auto'  # 'auto' or specific voice ID
+# AI voice: each caption segment is synthesized separately, TTS_WORKERS requests at a time,
+# and the clips are laid out on the segment timeline (see synthesize_tts_timeline)
+TTS_WORKERS = 4
+TTS_TIMELINE_SAMPLE_RATE = 44100
+# When the whole script goes out as one TTS request instead, caption timing comes from aligning the
+# known text to the audio ('energy', see align_tts_captions) or from transcribing it again ('whisper')
+TTS_CAPTION_ALIGNMENT = 'energy'
+# GenAI Pro API client: concurrent tasks, status polling backoff (seconds) and overall task timeout
+GENAIPRO_API_BASE = "https://genaipro.vn/api/v1"
+GENAIPRO_MAX_IN_FLIGHT = 4
+GENAIPRO_POLL_INITIAL = 1.0
+GENAIPRO_POLL_MAX = 15.0
+GENAIPRO_TASK_TIMEOUT = 3600
 # Premium TTS API keys (for better quality voices)
 # Supported: 'elevenlabs', 'openai', 'azure'
 TTS_ENGINE = 'gtts'  # Options: 'gtts' (free, basic), 'elevenlabs', 'openai', 'azure'
@@ -783,8 +2020,78 @@ STATIC_BG_BLUR_RADIUS = 25
 BG_SCALE_EXTRA = 1.08
 DIM_FACTOR = 0.55
 
+# On-disk caches shared by all jobs (caption sprites, transcripts, TTS audio, ...)
+CACHE_ROOT = os.path.join(os.path.expanduser("~"), ".cache", "tiktok_auto")
+
+# Rendered caption images are reused across caption groups and jobs: an in-memory LRU bounded
+# by CAPTION_SPRITE_CACHE_MB plus an optional PNG tier under CACHE_ROOT/caption_sprites.
+CAPTION_SPRITE_CACHE_MB = 256
+CAPTION_SPRITE_DISK_CACHE = True
+
+# Caption rasterization runs in a process pool (PIL text + Gaussian blur is CPU-bound and holds the GIL).
+# 0 = half the CPU cores, at most 4. The pool is started on first use and kept for later jobs, so only
+# the first batch pays for worker startup; batches smaller than CAPTION_RASTER_MIN_BATCH render in-process.
+CAPTION_RASTER_WORKERS = 0
+CAPTION_RASTER_MIN_BATCH = 12
+
+# Whisper transcripts are cached on disk under CACHE_ROOT/transcripts, keyed by a fingerprint of the
+# decoded 16 kHz audio + model + options, so re-running a job (or a re-encoded copy of the same
+# voice track) skips model loading and inference. Translations are cached per target language.
+TRANSCRIPT_CACHE = True
+TRANSCRIPT_INDEX_MAX = 5000  # fingerprints kept for matching re-encoded copies (oldest dropped first)
+# Mono PCM decoded for Whisper, silence removal or caption alignment (or extracted with the voice
+# track) is kept in memory for the other stages of the job, up to this many MB
+DECODED_AUDIO_CACHE_MB = 512
+
+# Synthesized TTS files are cached under CACHE_ROOT/tts by text + language + engine + voice/model
+# settings, so re-exports and A/B variants of the same script don't pay for synthesis again.
+TTS_AUDIO_CACHE = True
+TTS_AUDIO_CACHE_MB = 1024
+
+# Silence removal decodes the whole voice track into memory; files of SILENCE_STREAMING_MIN_MB or more
+# are instead cut while streaming from ffmpeg in blocks of SILENCE_STREAM_BLOCK_FRAMES frames.
+SILENCE_STREAMING_MIN_MB = 20
+SILENCE_STREAM_BLOCK_FRAMES = 1 << 18
+
+# Translation: segments are batched into requests of at most TRANSLATE_BATCH_CHARS characters,
+# sent TRANSLATE_WORKERS at a time; results are memoized per language under CACHE_ROOT/translations.
+TRANSLATE_BATCH_CHARS = 4500
+TRANSLATE_WORKERS = 4
+TRANSLATION_MEMO = True
+
+# Whisper model cache: loaded models stay resident between jobs/transcription passes.
+# Least-recently-used models are evicted when the total estimated size exceeds this budget.
+WHISPER_CACHE_RAM_BUDGET_MB = 12000
+
+# Transcription engine: 'openai-whisper' (PyTorch), 'faster-whisper' (CTranslate2 - int8 on CPU, much
+# faster than PyTorch fp32) or 'whisper.cpp' (pywhispercpp). One that isn't installed falls back to
+# openai-whisper. Compare them on this machine with benchmark_transcription.py
+TRANSCRIPTION_BACKEND = 'openai-whisper'
+FASTER_WHISPER_MODEL = 'large-v2'
+FASTER_WHISPER_COMPUTE_TYPE = 'auto'  # 'auto' = int8 on CPU, float16 on CUDA
+WHISPER_CPP_MODEL = 'large-v2'  # ggml model, downloaded by pywhispercpp on first use
+
+# Parallel CPU transcription: audio longer than WHISPER_PARALLEL_MIN_S is split at pauses found by
+# an energy VAD and the chunks are transcribed by several worker processes, each holding its own
+# copy of the model (openai-whisper backend). Pauses between chunks are never transcribed. GPU
+# transcription stays one pass.
+# Workers: 0 = auto (one per 4 cores, as many model copies as fit in WHISPER_PARALLEL_RAM_MB minus the
+# models this process already holds; fewer than 2 = one pass); 1 = off; N = always N workers
+WHISPER_PARALLEL_WORKERS = 0
+WHISPER_PARALLEL_RAM_MB = 0  # RAM the worker models may use; 0 = 60% of the machine's physical RAM
+WHISPER_PARALLEL_MIN_S = 120
+WHISPER_CHUNK_MAX_S = 60  # seconds of speech per chunk
+WHISPER_VAD_MIN_SILENCE_MS = 700  # pauses at least this long split speech regions
+WHISPER_VAD_THRESH_DB = 25  # quieter than the track's average level by this much = not speech
+
+# Queue scheduling: how many jobs run at once, and how many of them may be inside
+# each heavy stage at the same time (e.g. only one Whisper inference, N encodes).
+QUEUE_MAX_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 8))
+STAGE_SLOTS = {"whisper": 1, "tts": 2, "encode": 2}
+
 USE_GPU_IF_AVAILABLE = True
 PREFERRED_NVENC_CODEC = "h264_nvenc"
+SINGLE_PASS_RENDER = True  # Render crop/scale/speed/captions/audio in one ffmpeg pass when possible
 USE_HARDWARE_DECODING = True  # Enable GPU-accelerated decoding
 NVENC_PRESET_SPEED = "p4"  # p1=fastest, p7=slowest/best quality. p4=balanced for speed
 
@@ -800,6 +2107,110 @@ CROP_SETTINGS_FILE = "crop_settings.json"
 
 CREATED_OUTPUTS = set()
 
+# ----------------- per-job render configuration -----------------
+HD_SIZE = (1080, 1920)
+UHD_SIZE = (2160, 3840)
+HD_CAPTION_FONT_SIZE = 56
+
+@dataclass(frozen=True)
+class RenderConfig:
+    """
+    Immutable render settings for one job.
+
+    Built once when a job starts (snapshotting the GUI-controlled globals) and passed through
+    crop, pre-render, caption generation and export, so jobs with different settings (e.g. a 4K
+    and an HD job) can render in parallel threads without reading shared mutable state.
+    """
+    width: int = HD_SIZE[0]
+    height: int = HD_SIZE[1]
+    is_4k: bool = False
+    fps: int = 24
+    caption_font_preferred: str = "Bangers"
+    caption_font_path: str = None
+    caption_font_size: int = HD_CAPTION_FONT_SIZE
+    caption_stroke_width: int = 2
+    caption_text_color: tuple = (255, 255, 255, 255)
+    caption_stroke_color: tuple = (0, 0, 0, 150)
+    caption_highlight_color: tuple = None
+    caption_y_offset: int = 0
+    video_zoom_scale: float = 1.0
+    crop_top_ratio: float = 0.30
+    crop_bottom_ratio: float = 0.35
+    blur_radius: float = 25
+    bg_scale_extra: float = 1.08
+    dim_factor: float = 0.55
+    voice_gain: float = 1.5
+    music_gain: float = 0.15
+
+    @classmethod
+    def from_globals(cls, use_4k=None, preferred_font=None, **overrides):
+        """
+        Snapshot the current global (GUI) settings into a RenderConfig.
+
+        use_4k selects the output resolution for this job; pixel-based settings the GUI keeps in
+        its own resolution (stroke width, caption Y offset) are rescaled when the job's resolution
+        differs from the GUI's current mode. Keyword overrides replace individual fields.
+        """
+        g = globals()
+        gui_4k = bool(g.get('IS_4K_MODE', False))
+        job_4k = gui_4k if use_4k is None else bool(use_4k)
+        rescale = (2.0 if job_4k else 1.0) / (2.0 if gui_4k else 1.0)
+        width, height = UHD_SIZE if job_4k else HD_SIZE
+        font_size = HD_CAPTION_FONT_SIZE * (2 if job_4k else 1)
+        try:
+            stroke_width = int(round(float(g.get('CAPTION_STROKE_WIDTH', max(1, int(font_size * 0.05)))) * rescale))
+        except Exception:
+            stroke_width = max(1, int(font_size * 0.05))
+        try:
+            y_offset = int(round(float(g.get('CAPTION_Y_OFFSET', 0)) * rescale))
+        except Exception:
+            y_offset = 0
+        values = dict(
+            width=width,
+            height=height,
+            is_4k=job_4k,
+            fps=int(g.get('FPS', 24)),
+            caption_font_preferred=preferred_font or g.get('CAPTION_FONT_PREFERRED', "Bangers"),
+            caption_font_size=font_size,
+            caption_stroke_width=stroke_width,
+            caption_text_color=tuple(g.get('CAPTION_TEXT_COLOR', (255, 255, 255, 255))),
+            caption_stroke_color=tuple(g.get('CAPTION_STROKE_COLOR', (0, 0, 0, 150))),
+            caption_highlight_color=tuple(g['CAPTION_HIGHLIGHT_COLOR']) if g.get('CAPTION_HIGHLIGHT_COLOR') else None,
+            caption_y_offset=y_offset,
+            video_zoom_scale=float(g.get('VIDEO_ZOOM_SCALE', 1.0)),
+            crop_top_ratio=float(g.get('CROP_TOP_RATIO', 0.30)),
+            crop_bottom_ratio=float(g.get('CROP_BOTTOM_RATIO', 0.35)),
+            blur_radius=g.get('STATIC_BG_BLUR_RADIUS', 25),
+            bg_scale_extra=g.get('BG_SCALE_EXTRA', 1.08),
+            dim_factor=g.get('DIM_FACTOR', 0.55),
+            voice_gain=float(g.get('VOICE_GAIN', 1.5)),
+            music_gain=float(g.get('MUSIC_GAIN', 0.15)),
+        )
+        values.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**values)
+
+    def font(self, log=None):
+        """Return the PIL font for captions (shared, thread-safe cache)."""
+        font, _ = get_render_font(self.caption_font_path or self.caption_font_preferred, self.caption_font_size, log=log)
+        return font
+
+    def font_label(self, log=None):
+        """Path (or 'family:<name>' / fallback label) of the font captions actually render with."""
+        _, font_path = get_render_font(self.caption_font_path or self.caption_font_preferred,
+                                       self.caption_font_size, log=log)
+        return font_path
+
+    def with_resolved_font(self, log=None):
+        """
+        Return a copy with caption_font_path set to the font file actually found on disk.
+        Fonts loaded by family name or as a fallback have no file: caption_font_path stays None
+        and everything keeps keying on caption_font_preferred.
+        """
+        font_path = self.font_label(log=log)
+        if not (isinstance(font_path, str) and os.path.isfile(font_path)):
+            return self
+        return replace(self, caption_font_path=font_path)
+
 # ----------------- FONT / DIACRITICS / UTIL -----------------
 FONT_CANDIDATES = ["Bangers-Regular.ttf", "Bangers.ttf", "bangers.ttf", "Bangers.otf", "Bangers-Regular.otf"]
 
@@ -993,51 +2404,69 @@ def load_preferred_font_cached(preferred, size, log=None):
     except Exception:
         pass
 
+    LOADED_FONT, LOADED_FONT_PATH = _resolve_font(preferred, size, log=log)
+    return LOADED_FONT
+
+def _resolve_font(preferred, size, log=None):
+    """Locate and load a font; returns (font, font_path) without touching any globals."""
     if preferred:
         if os.path.isfile(preferred):
             try:
-                LOADED_FONT = ImageFont.truetype(preferred, size)
-                LOADED_FONT_PATH = os.path.abspath(preferred)
-                if log: log(f"[FONT] ✓ Loaded font from file: {LOADED_FONT_PATH}")
-                return LOADED_FONT
+                font = ImageFont.truetype(preferred, size)
+                font_path = os.path.abspath(preferred)
+                if log: log(f"[FONT] ✓ Loaded font from file: {font_path}")
+                return font, font_path
             except Exception:
                 pass
         found = find_font_file_recursive(preferred)
         if found:
             try:
-                LOADED_FONT = ImageFont.truetype(found, size)
-                LOADED_FONT_PATH = found
+                font = ImageFont.truetype(found, size)
                 if log: log(f"[FONT] ✓ Loaded font (searched): {found}")
-                return LOADED_FONT
+                return font, found
             except Exception:
                 pass
         try:
-            LOADED_FONT = ImageFont.truetype(preferred, size)
-            LOADED_FONT_PATH = f"family:{preferred}"
+            font = ImageFont.truetype(preferred, size)
             if log: log(f"[FONT] ✓ Loaded font by family name: {preferred}")
-            return LOADED_FONT
+            return font, f"family:{preferred}"
         except Exception:
             pass
     found = find_font_file_recursive(None)
     if found:
         try:
-            LOADED_FONT = ImageFont.truetype(found, size)
-            LOADED_FONT_PATH = found
+            font = ImageFont.truetype(found, size)
             if log: log(f"[FONT] ✓ Loaded candidate font: {found}")
-            return LOADED_FONT
+            return font, found
         except Exception:
             pass
     try:
-        LOADED_FONT = ImageFont.truetype("DejaVuSans.ttf", size)
-        LOADED_FONT_PATH = "DejaVuSans.ttf (fallback)"
+        font = ImageFont.truetype("DejaVuSans.ttf", size)
         if log: log("[FONT] WARNING: Preferred font not found — using DejaVuSans.ttf fallback.")
-        return LOADED_FONT
+        return font, "DejaVuSans.ttf (fallback)"
     except Exception:
         pass
     if log: log("[FONT] WARNING: No TrueType fonts available. Using default bitmap font.")
-    LOADED_FONT = ImageFont.load_default()
-    LOADED_FONT_PATH = "default"
-    return LOADED_FONT
+    return ImageFont.load_default(), "default"
+
+_RENDER_FONTS = {}
+_RENDER_FONTS_LOCK = threading.Lock()
+
+def get_render_font(preferred, size, log=None):
+    """
+    Thread-safe font cache used by the render pipeline, keyed by (preferred, size).
+    Unlike load_preferred_font_cached it never mutates LOADED_FONT, so jobs with different
+    fonts/sizes (e.g. HD and 4K) can render captions at the same time.
+    Returns (font, font_path).
+    """
+    key = (preferred or "", int(size))
+    with _RENDER_FONTS_LOCK:
+        cached = _RENDER_FONTS.get(key)
+    if cached is not None:
+        return cached
+    resolved = _resolve_font(preferred, int(size), log=log)
+    with _RENDER_FONTS_LOCK:
+        return _RENDER_FONTS.setdefault(key, resolved)
 
 def normalize_text(s: str) -> str:
     if not s: return s
@@ -1063,13 +2492,235 @@ class QueueWriter:
     def flush(self):
         pass
 
+class JobLogQueue:
+    """Wraps the GUI message queue and tags every message with a per-job prefix."""
+    def __init__(self, q, prefix=""):
+        self.q = q
+        self.prefix = prefix
+    def put(self, msg, *args, **kwargs):
+        self.q.put(f"{self.prefix}{msg}", *args, **kwargs)
+
+class ThreadRoutedStream:
+    """
+    sys.stdout/sys.stderr replacement that routes writes to a per-thread log function.
+    Jobs running concurrently each bind their own log, so printed output (MoviePy, Whisper)
+    lands in the right job's log; unbound threads write to the original stream.
+    """
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self._local = threading.local()
+    def bind(self, write_fn):
+        self._local.write_fn = write_fn
+    def current(self):
+        return getattr(self._local, "write_fn", None)
+    def write(self, s):
+        write_fn = self.current()
+        if write_fn is None:
+            try:
+                return self.fallback.write(s)
+            except Exception:
+                return None
+        if s and not s.isspace():
+            write_fn(str(s))
+    def flush(self):
+        try:
+            if self.current() is None:
+                self.fallback.flush()
+        except Exception:
+            pass
+
+def route_output_to(write_fn):
+    """Route print/stdout/stderr of the calling thread to write_fn (None restores the console)."""
+    for name in ("stdout", "stderr"):
+        stream = getattr(sys, name)
+        if not isinstance(stream, ThreadRoutedStream):
+            stream = ThreadRoutedStream(stream)
+            setattr(sys, name, stream)
+        stream.bind(write_fn)
+
+def current_output_route():
+    stream = sys.stdout
+    return stream.current() if isinstance(stream, ThreadRoutedStream) else None
+
+# ----------------- job scheduling helpers -----------------
+class StageSlots:
+    """
+    Per-stage concurrency limits shared by every job in the process.
+    Jobs wrap heavy stages in `with STAGE_LIMITER.slot("whisper", log):` so that independent
+    stages of different jobs overlap while e.g. only one Whisper inference runs at a time.
+    """
+    def __init__(self, limits=None):
+        self._lock = threading.Lock()
+        self._sems = {}
+        self._limits = {}
+        self.configure(limits or {})
+
+    def configure(self, limits):
+        # Semaphores are only replaced when a limit changes; holders release the one they acquired.
+        with self._lock:
+            for stage, n in (limits or {}).items():
+                n = max(1, int(n))
+                if self._limits.get(stage) != n:
+                    self._sems[stage] = threading.BoundedSemaphore(n)
+                    self._limits[stage] = n
+
+    def limits(self):
+        with self._lock:
+            return dict(self._limits)
+
+    @contextmanager
+    def slot(self, stage, log=None):
+        with self._lock:
+            sem = self._sems.get(stage)
+        if sem is None:
+            yield
+            return
+        if not sem.acquire(blocking=False):
+            if log: log(f"[SCHED] Waiting for a free '{stage}' slot...")
+            t0 = time.time()
+            sem.acquire()
+            if log: log(f"[SCHED] Got '{stage}' slot after {time.time() - t0:.1f}s")
+        try:
+            yield
+        finally:
+            sem.release()
+
+STAGE_LIMITER = StageSlots(STAGE_SLOTS)
+
 # ----------------- ffmpeg / pre-render / export helpers -----------------
+class FFmpegCapabilities:
+    """
+    What the local ffmpeg build supports: version, encoders, hwaccels and filters.
+
+    Probed lazily on first use (four quick `ffmpeg -...` calls) and then shared by all jobs, so
+    encoder/filter decisions don't fork ffmpeg again. refresh() re-probes, e.g. after the user
+    installs a different ffmpeg.
+    """
+
+    def __init__(self, ffmpeg="ffmpeg"):
+        self.ffmpeg = ffmpeg
+        self._lock = threading.Lock()
+        self._probe_lock = threading.RLock()  # one probe at a time; held across the ffmpeg calls
+        self._probed = False
+        self._available = False
+        self._version = None
+        self._encoders = frozenset()
+        self._hwaccels = frozenset()
+        self._filters = frozenset()
+
+    def _run(self, *args):
+        try:
+            return subprocess.check_output([self.ffmpeg, "-hide_banner", *args], stderr=subprocess.STDOUT,
+                                           text=True, timeout=30)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _parse_encoders(out):
+        """`ffmpeg -encoders`: ' V....D name  description' rows after the '------' separator."""
+        lines = (out or "").splitlines()
+        start = next((i + 1 for i, l in enumerate(lines) if l.strip().startswith("---")), len(lines))
+        return frozenset(l.split()[1] for l in lines[start:] if len(l.split()) >= 2)
+
+    @staticmethod
+    def _parse_filters(out):
+        """`ffmpeg -filters`: ' TSC name  V->V  description' rows."""
+        names = set()
+        for line in (out or "").splitlines():
+            parts = line.split()
+            if len(parts) >= 3 and "->" in parts[2]:
+                names.add(parts[1])
+        return frozenset(names)
+
+    def probe(self):
+        """Run the probes now (replacing any earlier results); returns self."""
+        with self._probe_lock:
+            version_out = self._run("-version")
+            encoders = self._parse_encoders(self._run("-encoders"))
+            filters = self._parse_filters(self._run("-filters"))
+            hwaccel_out = self._run("-hwaccels") or ""
+            hwaccels = frozenset(l.strip() for l in hwaccel_out.splitlines()[1:] if l.strip())
+            version = None
+            if version_out:
+                first = version_out.splitlines()[0].split()
+                version = first[2] if len(first) > 2 and first[:2] == ["ffmpeg", "version"] else first[-1]
+            with self._lock:
+                self._available = version_out is not None
+                self._version = version
+                self._encoders = encoders
+                self._filters = filters
+                self._hwaccels = hwaccels
+                self._probed = True
+        return self
+
+    def refresh(self):
+        return self.probe()
+
+    def _ensure(self):
+        # Double-checked: jobs starting together wait for the first probe instead of each running one
+        if not self._probed:
+            with self._probe_lock:
+                if not self._probed:
+                    self.probe()
+
+    @property
+    def available(self):
+        self._ensure()
+        return self._available
+
+    @property
+    def version(self):
+        self._ensure()
+        return self._version
+
+    @property
+    def encoders(self):
+        self._ensure()
+        return self._encoders
+
+    @property
+    def hwaccels(self):
+        self._ensure()
+        return self._hwaccels
+
+    @property
+    def filters(self):
+        self._ensure()
+        return self._filters
+
+    def version_tuple(self):
+        """(major, minor) of the ffmpeg release, or None for git/unknown builds."""
+        import re
+        m = re.match(r"n?(\d+)\.(\d+)", self.version or "")
+        return (int(m.group(1)), int(m.group(2))) if m else None
+
+    def has_encoder(self, name):
+        return name in self.encoders
+
+    def has_hwaccel(self, name):
+        return name in self.hwaccels
+
+    def has_filter(self, name):
+        return name in self.filters
+
+    def summary(self):
+        return {
+            "available": self.available,
+            "version": self.version,
+            "nvenc": sorted(e for e in self.encoders if e.endswith("_nvenc")),
+            "hwaccels": sorted(self.hwaccels),
+            "caption_filters": sorted(f for f in ("ass", "subtitles", "drawtext") if f in self.filters),
+        }
+
+
+FFMPEG_CAPS = FFmpegCapabilities()
+
 def ffmpeg_supports_nvenc(codec_name="h264_nvenc"):
-    try:
-        out = subprocess.check_output(["ffmpeg", "-hide_banner", "-encoders"], stderr=subprocess.STDOUT, text=True)
-        return codec_name in out
-    except Exception:
-        return False
+    return FFMPEG_CAPS.has_encoder(codec_name)
+
+def ffmpeg_cuda_decode_available():
+    """-hwaccel cuda is only worth adding when the build has it."""
+    return FFMPEG_CAPS.has_hwaccel("cuda")
 
 def get_export_settings():
     audio_bitrate = "192k"
@@ -1084,15 +2735,16 @@ def get_export_settings():
 def reencode_with_libx264(input_path, output_path, log=None):
     # Use hardware acceleration if available
     cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"]
+    use_nvenc = USE_GPU_IF_AVAILABLE and ffmpeg_supports_nvenc(PREFERRED_NVENC_CODEC)
     
     # Add hardware decoding
-    if USE_HARDWARE_DECODING and USE_GPU_IF_AVAILABLE and ffmpeg_supports_nvenc(PREFERRED_NVENC_CODEC):
+    if USE_HARDWARE_DECODING and use_nvenc and ffmpeg_cuda_decode_available():
         cmd.extend(["-hwaccel", "cuda"])
     
     cmd.extend(["-i", input_path])
     
     # Use NVENC if available, otherwise use faster CPU preset
-    if USE_GPU_IF_AVAILABLE and ffmpeg_supports_nvenc(PREFERRED_NVENC_CODEC):
+    if use_nvenc:
         cmd.extend(["-c:v", PREFERRED_NVENC_CODEC, "-rc", "vbr_hq", "-cq", "20", "-b:v", "0", 
                    "-preset", NVENC_PRESET_SPEED, "-pix_fmt", "yuv420p", "-profile:v", "high"])
     else:
@@ -1101,7 +2753,7 @@ def reencode_with_libx264(input_path, output_path, log=None):
     
     cmd.extend(["-c:a", "aac", "-b:a", "192k", "-movflags", "+faststart", output_path])
     
-    if log: log(f"[ffmpeg] Re-encoding to: {output_path} (GPU={'NVENC' if USE_GPU_IF_AVAILABLE and ffmpeg_supports_nvenc(PREFERRED_NVENC_CODEC) else 'No'})")
+    if log: log(f"[ffmpeg] Re-encoding to: {output_path} (GPU={'NVENC' if use_nvenc else 'No'})")
     try:
         subprocess.check_call(cmd)
         if log: log("[ffmpeg] Re-encode completed.")
@@ -1110,6 +2762,159 @@ def reencode_with_libx264(input_path, output_path, log=None):
         if log: log(f"[ffmpeg] Re-encode failed: {e}")
         return False
 
+@dataclass(frozen=True)
+class MediaInfo:
+    """
+    Container/stream metadata for one input file, read once per (path, mtime, size) by probe_media.
+
+    width/height are the coded frame size; display_size applies the rotation, which is what MoviePy
+    reports as clip.size. Fields that don't apply (no video / no audio stream) are 0 or None.
+    """
+    path: str
+    duration: float = 0.0
+    width: int = 0
+    height: int = 0
+    fps: float = 0.0
+    rotation: int = 0
+    video_codec: str = None
+    has_audio: bool = False
+    audio_codec: str = None
+    sample_rate: int = 0
+    channels: int = 0
+
+    @property
+    def has_video(self):
+        return bool(self.width and self.height)
+
+    @property
+    def display_size(self):
+        if self.rotation in (90, 270):
+            return self.height, self.width
+        return self.width, self.height
+
+
+def _frame_rate(value):
+    """'30000/1001' / '25' -> float (0.0 if unknown)."""
+    try:
+        num, _, den = str(value).partition("/")
+        return float(num) / float(den or 1) if float(den or 1) else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _parse_ffprobe_json(data):
+    """MediaInfo fields from `ffprobe -of json -show_format -show_streams` output."""
+    streams = data.get("streams") or []
+    video = next((s for s in streams if s.get("codec_type") == "video"
+                  and not (s.get("disposition") or {}).get("attached_pic")), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    fields = {}
+    durations = [(data.get("format") or {}).get("duration")] + [s.get("duration") for s in (video, audio) if s]
+    for value in durations:
+        try:
+            fields["duration"] = float(value)
+            break
+        except (TypeError, ValueError):
+            continue
+    if video:
+        rotation = (video.get("tags") or {}).get("rotate")
+        for side_data in video.get("side_data_list") or []:
+            if "rotation" in side_data:
+                rotation = side_data["rotation"]
+        fields.update(width=int(video.get("width") or 0), height=int(video.get("height") or 0),
+                      fps=_frame_rate(video.get("avg_frame_rate")) or _frame_rate(video.get("r_frame_rate")),
+                      rotation=int(round(float(rotation or 0))) % 360, video_codec=video.get("codec_name"))
+    if audio:
+        fields.update(has_audio=True, audio_codec=audio.get("codec_name"),
+                      sample_rate=int(audio.get("sample_rate") or 0), channels=int(audio.get("channels") or 0))
+    return fields
+
+
+_CHANNEL_LAYOUTS = {"mono": 1, "stereo": 2, "2.1": 3, "quad": 4, "5.0": 5, "5.1": 6, "6.1": 7, "7.1": 8}
+
+
+def _parse_ffmpeg_banner(text):
+    """The same fields from the stream summary `ffmpeg -i` prints (when ffprobe isn't installed)."""
+    import re
+    fields = {}
+    m = re.search(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)", text)
+    if m:
+        fields["duration"] = int(m.group(1)) * 3600 + int(m.group(2)) * 60 + float(m.group(3))
+    video = re.search(r"Stream #\S+.*?: Video: (\w+).*?, (\d{2,5})x(\d{2,5})(.*)", text)
+    if video and "attached pic" not in video.group(4):
+        fps = re.search(r"([\d.]+)(k?) fps", video.group(4)) or re.search(r"([\d.]+)(k?) tbr", video.group(4))
+        rotation = re.search(r"rotation of (-?[\d.]+) degrees", text) or re.search(r"rotate\s*:\s*(-?\d+)", text)
+        fields.update(width=int(video.group(2)), height=int(video.group(3)), video_codec=video.group(1),
+                      fps=float(fps.group(1)) * (1000 if fps.group(2) else 1) if fps else 0.0,
+                      rotation=int(round(float(rotation.group(1)))) % 360 if rotation else 0)
+    audio = re.search(r"Stream #\S+.*?: Audio: (\w+)[^,\n]*(?:, (\d+) Hz)?(?:, ([\w.]+))?", text)
+    if audio:
+        layout = audio.group(3) or ""
+        fields.update(has_audio=True, audio_codec=audio.group(1), sample_rate=int(audio.group(2) or 0),
+                      channels=_CHANNEL_LAYOUTS.get(layout) or int(re.match(r"(\d*)", layout).group(1) or 0))
+    return fields
+
+
+_MEDIA_PROBES = OrderedDict()
+_MEDIA_PROBES_LOCK = threading.Lock()
+MEDIA_PROBE_CACHE_SIZE = 256
+
+
+def probe_media(path, log=None):
+    """
+    Return MediaInfo for `path` (None if it can't be probed).
+
+    Runs `ffprobe -of json` once per (path, mtime, size) and serves every later stage from the cache;
+    without ffprobe the banner of `ffmpeg -i` is parsed instead. Stages that only need metadata
+    use this rather than opening a MoviePy reader.
+    """
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    with _MEDIA_PROBES_LOCK:
+        info = _MEDIA_PROBES.get(key)
+        if info is not None:
+            _MEDIA_PROBES.move_to_end(key)
+            return info
+
+    fields = None
+    try:
+        result = subprocess.run(["ffprobe", "-v", "error", "-of", "json", "-show_format", "-show_streams", path],
+                                capture_output=True, text=True, timeout=30)
+        if result.returncode == 0:
+            fields = _parse_ffprobe_json(json.loads(result.stdout or "{}"))
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        pass
+    if fields is None:
+        try:
+            result = subprocess.run(["ffmpeg", "-hide_banner", "-nostdin", "-i", path],
+                                    capture_output=True, text=True, timeout=30, errors="replace")
+            fields = _parse_ffmpeg_banner(result.stderr)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+    if not fields or not (fields.get("duration") or fields.get("width") or fields.get("has_audio")):
+        if log:
+            log(f"[PROBE] Could not read media info: {path}")
+        return None
+
+    info = MediaInfo(path=path, **fields)
+    if log:
+        what = [f"{info.duration:.2f}s"]
+        if info.has_video:
+            what.append(f"{info.width}x{info.height} {info.video_codec} @ {info.fps:.3g} fps"
+                        + (f", rotated {info.rotation}°" if info.rotation else ""))
+        what.append(f"audio {info.audio_codec} {info.sample_rate} Hz x{info.channels}" if info.has_audio else "no audio")
+        log(f"[PROBE] {os.path.basename(path)}: {', '.join(what)}")
+    with _MEDIA_PROBES_LOCK:
+        _MEDIA_PROBES[key] = info
+        while len(_MEDIA_PROBES) > MEDIA_PROBE_CACHE_SIZE:
+            _MEDIA_PROBES.popitem(last=False)
+    return info
+
 def probe_file_with_ffmpeg(path):
     cmd = ["ffmpeg", "-hide_banner", "-i", path]
     try:
@@ -1130,7 +2935,8 @@ def pre_render_foreground_ffmpeg(input_path, out_path, crop_x, crop_y, crop_w, c
     cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"]
     
     # Add hardware decoding for speed (without output format to maintain filter compatibility)
-    if USE_HARDWARE_DECODING and use_nvenc:
+    hwaccel = USE_HARDWARE_DECODING and use_nvenc and ffmpeg_cuda_decode_available()
+    if hwaccel:
         cmd.extend(["-hwaccel", "cuda"])
     
     cmd.extend(["-i", input_path, "-an", "-vf", vf, "-r", str(int(fps))])
@@ -1145,7 +2951,7 @@ def pre_render_foreground_ffmpeg(input_path, out_path, crop_x, crop_y, crop_w, c
     
     cmd.extend(vparams + ["-pix_fmt", "yuv420p", out_path])
     
-    if log: log(f"[ffmpeg] Pre-render starting -> {os.path.basename(out_path)} (nvenc={use_nvenc}, hwaccel={USE_HARDWARE_DECODING and use_nvenc})")
+    if log: log(f"[ffmpeg] Pre-render starting -> {os.path.basename(out_path)} (nvenc={use_nvenc}, hwaccel={hwaccel})")
     try:
         subprocess.check_call(cmd)
         if log: log(f"[ffmpeg] Pre-render completed: {out_path}")
@@ -1160,23 +2966,27 @@ def pre_render_foreground_ffmpeg(input_path, out_path, crop_x, crop_y, crop_w, c
         if log: log(f"[ffmpeg] Pre-render exception: {e}")
         return False
 
+_OUTPUT_PATH_LOCK = threading.Lock()
+
 def make_unique_output_path(requested_path, log=None):
     base = os.path.abspath(requested_path)
     dirn, fname = os.path.split(base)
     name, ext = os.path.splitext(fname)
-    candidate = base
-    if candidate in CREATED_OUTPUTS or os.path.exists(candidate):
-        i = 1
-        while True:
-            new_name = f"{name}_{i}{ext}"
-            candidate = os.path.join(dirn, new_name)
-            if candidate not in CREATED_OUTPUTS and not os.path.exists(candidate):
-                break
-            i += 1
-        if log: log(f"[output] '{requested_path}' exists -> using '{candidate}' instead")
-    else:
-        if log: log(f"[output] Using requested output: {candidate}")
-    CREATED_OUTPUTS.add(candidate)
+    # Lock so parallel jobs with the same requested output can't claim the same name
+    with _OUTPUT_PATH_LOCK:
+        candidate = base
+        if candidate in CREATED_OUTPUTS or os.path.exists(candidate):
+            i = 1
+            while True:
+                new_name = f"{name}_{i}{ext}"
+                candidate = os.path.join(dirn, new_name)
+                if candidate not in CREATED_OUTPUTS and not os.path.exists(candidate):
+                    break
+                i += 1
+            if log: log(f"[output] '{requested_path}' exists -> using '{candidate}' instead")
+        else:
+            if log: log(f"[output] Using requested output: {candidate}")
+        CREATED_OUTPUTS.add(candidate)
     return candidate
 
 # ----------------- Whisper robust loading & transcription -----------------
@@ -1206,9 +3016,8 @@ def _find_and_remove_corrupted_whisper_models(model_name, log=None):
                         if log: log(f"[whisper-cleanup] failed to remove {full}: {e}")
     return removed
 
-def _load_whisper_model_with_retries(model_name="large-v3", tries=3, log=None):
-    last_exc = None
-    
+def _detect_whisper_device(log=None):
+    """Return 'cuda' when PyTorch can see a usable GPU, otherwise 'cpu'."""
     # Detect GPU availability for Whisper with improved detection
     device = "cpu"  # Default to CPU
     cuda_available = False
@@ -1233,6 +3042,12 @@ def _load_whisper_model_with_retries(model_name="large-v3", tries=3, log=None):
     except Exception as e:
         if log:
             log(f"[whisper] GPU detection failed ({str(e)}) - will use CPU")
+    return device
+
+def _load_whisper_model_with_retries(model_name="large-v3", tries=3, log=None, device=None):
+    last_exc = None
+    if device is None:
+        device = _detect_whisper_device(log=log)
     
     for attempt in range(1, tries + 1):
         try:
@@ -1295,10 +3110,1042 @@ def _load_whisper_model_with_retries(model_name="large-v3", tries=3, log=None):
         raise last_exc
     raise RuntimeError(f"Could not load whisper model '{model_name}' for unknown reason.")
 
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models keyed by (model_name, device, precision).
+
+    Models stay resident between jobs and between transcription passes of the same job.
+    When the estimated size of all cached models exceeds budget_mb, the least-recently-used
+    models are evicted. Hit/miss/load-time counters are available via stats().
+    """
+
+    def __init__(self, budget_mb=WHISPER_CACHE_RAM_BUDGET_MB):
+        self.budget_mb = budget_mb
+        self._models = OrderedDict()   # key -> (model, size_bytes)
+        self._aliases = {}             # requested key -> key actually loaded (e.g. CUDA fell back to CPU)
+        self._size_hints = {}          # model_name -> last observed size in bytes
+        self._key_locks = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    @staticmethod
+    def estimate_size_bytes(model):
+        """Estimate resident size of a torch module from its parameters and buffers."""
+        try:
+            total = sum(p.numel() * p.element_size() for p in model.parameters())
+            total += sum(b.numel() * b.element_size() for b in model.buffers())
+            return int(total)
+        except Exception:
+            return 0
+
+    def _budget_bytes(self):
+        try:
+            return max(0, int(float(self.budget_mb) * 1024 * 1024))
+        except Exception:
+            return 0
+
+    def _evict_for(self, incoming_bytes, keep_key=None, log=None):
+        """Evict LRU models until incoming_bytes fits in the budget (caller holds the lock)."""
+        budget = self._budget_bytes()
+        if budget <= 0:
+            return
+        used = sum(size for _, size in self._models.values())
+        for key in list(self._models.keys()):
+            if used + incoming_bytes <= budget:
+                break
+            if key == keep_key:
+                continue
+            _, size = self._models.pop(key)
+            used -= size
+            self.evictions += 1
+            if log: log(f"[model-cache] Evicted {key} ({size / (1024 * 1024):.0f} MB) to stay within {self.budget_mb} MB budget")
+        if used + incoming_bytes > budget:
+            gc.collect()
+            try:
+                if torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+            except Exception:
+                pass
+
+    def get(self, key, loader, log=None):
+        """
+        Return a cached model for key, loading it with loader() on a miss.
+
+        loader must return (model, actual_key); actual_key may differ from key when the
+        loader had to fall back (e.g. CUDA -> CPU), and later requests for key reuse it.
+        """
+        with self._lock:
+            resolved = self._aliases.get(key, key)
+            if resolved in self._models:
+                self._models.move_to_end(resolved)
+                self.hits += 1
+                if log: log(f"[model-cache] HIT {resolved} (hits={self.hits}, misses={self.misses})")
+                return self._models[resolved][0], resolved
+            key_lock = self._key_locks.setdefault(resolved, threading.Lock())
+
+        # Load outside the registry lock so other models can still be served; the per-key
+        # lock makes concurrent misses for the same model wait for a single load.
+        with key_lock:
+            with self._lock:
+                if resolved in self._models:
+                    self._models.move_to_end(resolved)
+                    self.hits += 1
+                    return self._models[resolved][0], resolved
+                self.misses += 1
+                self._evict_for(self._size_hints.get(key[0], 0), log=log)
+            if log: log(f"[model-cache] MISS {key} - loading model")
+            t0 = time.time()
+            model, actual_key = loader()
+            elapsed = time.time() - t0
+            size = self.estimate_size_bytes(model)
+            with self._lock:
+                self.load_seconds += elapsed
+                self._size_hints[key[0]] = size
+                if actual_key != key:
+                    self._aliases[key] = actual_key
+                self._models[actual_key] = (model, size)
+                self._models.move_to_end(actual_key)
+                self._evict_for(0, keep_key=actual_key, log=log)
+            if log: log(f"[model-cache] Loaded {actual_key} in {elapsed:.1f}s ({size / (1024 * 1024):.0f} MB)")
+            return model, actual_key
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._aliases.clear()
+        gc.collect()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "load_seconds": round(self.load_seconds, 2),
+                "resident": list(self._models.keys()),
+                "resident_mb": round(sum(size for _, size in self._models.values()) / (1024 * 1024), 1),
+            }
+
+
+WHISPER_MODELS = ModelRegistry()
+
+def get_whisper_model(model_name="large", tries=3, log=None):
+    """
+    Return (model, device) from the process-wide Whisper cache, loading it on first use.
+    The cache key is (model_name, device, precision) where precision is the inference
+    precision used by transcribe_captions (fp16 on CUDA, fp32 on CPU).
+    """
+    WHISPER_MODELS.budget_mb = globals().get('WHISPER_CACHE_RAM_BUDGET_MB', WHISPER_MODELS.budget_mb)
+    device = _detect_whisper_device(log=None)
+    key = (model_name, device, "fp16" if device == "cuda" else "fp32")
+
+    def _loader():
+        model, actual_device = _load_whisper_model_with_retries(model_name, tries=tries, log=log, device=device)
+        return model, (model_name, actual_device, "fp16" if actual_device == "cuda" else "fp32")
+
+    model, actual_key = WHISPER_MODELS.get(key, _loader, log=log)
+    return model, actual_key[1]
+
+# ----------------- TTS audio cache -----------------
+def tts_cache_key(text, language, engine, voice_id=None, params=None):
+    """Content address of synthesized speech: normalized text + everything that changes the voice."""
+    normalized = " ".join(unicodedata.normalize("NFC", text or "").split())
+    parts = ("v1", normalized, language, engine, voice_id, sorted((params or {}).items()))
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+class TTSAudioCache:
+    """
+    Disk cache of synthesized TTS files, one file per tts_cache_key under cache_dir.
+
+    Size-bounded LRU: a hit refreshes the file's mtime, and put() evicts the least recently used
+    files once the total exceeds max_mb. Files are written to a temp name and renamed into place,
+    so concurrent jobs never see a partial file. get() returns the cached path itself; callers hand
+    out a copy (copy_out), never the cache's own file.
+    """
+
+    def __init__(self, cache_dir, max_mb=1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._total = None
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key, ext=".mp3"):
+        return os.path.join(self.cache_dir, key[:2], key + ext)
+
+    def _entries(self):
+        """[(mtime, size, path)] for every cached file."""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                    entries.append((st.st_mtime, st.st_size, path))
+                except OSError:
+                    pass
+        return entries
+
+    def get(self, key, log=None):
+        """Cached file path for key, or None."""
+        path = None
+        for ext in (".mp3", ".wav"):
+            candidate = self._path(key, ext)
+            if os.path.exists(candidate):
+                path = candidate
+                break
+        with self._lock:
+            if path:
+                self.hits += 1
+            else:
+                self.misses += 1
+            hits, misses = self.hits, self.misses
+        if path:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        if log:
+            log(f"[TTS-CACHE] {'HIT' if path else 'MISS'} {key[:12]} (hits={hits}, misses={misses})")
+        return path
+
+    @staticmethod
+    def copy_out(cached_path, output_path=None):
+        """Copy a cached file to output_path (or a new temp file); returns the copy's path, None on failure."""
+        try:
+            if output_path is None:
+                fd, output_path = tempfile.mkstemp(suffix=os.path.splitext(cached_path)[1] or ".mp3", prefix="tts_")
+                os.close(fd)
+            shutil.copyfile(cached_path, output_path)
+            return output_path
+        except OSError:
+            return None
+
+    def put(self, key, source_path):
+        """Copy a synthesized file into the cache; returns the cached path (None on failure)."""
+        ext = os.path.splitext(source_path)[1].lower() or ".mp3"
+        path = self._path(key, ext if ext in (".mp3", ".wav") else ".mp3")
+        try:
+            size = os.path.getsize(source_path)
+            if size == 0 or size > self.max_bytes:
+                return None
+            replaced = os.path.getsize(path) if os.path.exists(path) else 0
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            shutil.copyfile(source_path, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            return None
+        with self._lock:
+            if self._total is None:
+                self._total = sum(e[1] for e in self._entries())
+            else:
+                self._total += size - replaced
+            if self._total > self.max_bytes:
+                self._evict()
+        return path
+
+    def _evict(self):
+        """Delete least recently used files until under budget (caller holds the lock)."""
+        entries = sorted(self._entries())
+        self._total = sum(e[1] for e in entries)
+        for _, size, path in entries:
+            if self._total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self._total -= size
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            if self._total is None:
+                self._total = sum(e[1] for e in self._entries())
+            return {"hits": self.hits, "misses": self.misses, "size_mb": self._total / (1024 * 1024)}
+
+
+TTS_AUDIO = TTSAudioCache(os.path.join(CACHE_ROOT, "tts"), TTS_AUDIO_CACHE_MB) if TTS_AUDIO_CACHE else None
+
+# ----------------- transcript cache -----------------
+WHISPER_SAMPLE_RATE = 16000
+# Loudness envelope used to recognise the same audio after a lossy re-encode: 100 ms frames,
+# level in dB clamped to [-60, 0] and stored at 0.25 dB resolution.
+FINGERPRINT_FRAME = WHISPER_SAMPLE_RATE // 10
+FINGERPRINT_FLOOR_DB = -60.0
+FINGERPRINT_MAX_DIFF_DB = 1.0
+# A re-encoded copy must also follow the same loudness curve (correlation over the frames above the
+# floor), and only tracks with enough frames 10 dB over the floor are matched by envelope at all:
+# near-silent tracks all look alike and resolve by exact sha1 only.
+FINGERPRINT_MIN_CORRELATION = 0.9
+FINGERPRINT_MIN_ACTIVE = 0.2
+
+
+def decode_audio_pcm(path, sample_rate):
+    """Decode any audio/video file to mono int16 PCM at sample_rate with ffmpeg."""
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0", "-i", path,
+           "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-"]
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to decode audio: {result.stderr.decode(errors='replace')[-300:]}")
+    return np.frombuffer(result.stdout, np.int16)
+
+
+class PCMCache:
+    """
+    Decoded mono int16 PCM shared between the stages of a job (and jobs reusing a file), so each
+    source is decoded once: keyed by the source's (path, mtime, size) so a rewritten file is decoded
+    again, with one array per sample rate it was decoded at. Arrays are stored read-only; the least
+    recently used files are dropped once their total size exceeds max_mb.
+    """
+
+    def __init__(self, max_mb=512):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+    def _lookup(self, path, sample_rate):
+        key = self._key(path)
+        with self._lock:
+            rates = self._entries.get(key) if key else None
+            if rates and sample_rate is None:
+                sample_rate = WHISPER_SAMPLE_RATE if WHISPER_SAMPLE_RATE in rates else next(iter(rates))
+            pcm = rates.get(sample_rate) if rates else None
+            if pcm is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pcm, sample_rate
+
+    def get(self, path, sample_rate=WHISPER_SAMPLE_RATE):
+        """PCM of path decoded at sample_rate, or None."""
+        hit = self._lookup(path, sample_rate)
+        return hit[0] if hit else None
+
+    def get_any(self, path):
+        """(pcm, sample_rate) of any decode of path held (16 kHz preferred), or None."""
+        return self._lookup(path, None)
+
+    def put(self, path, pcm, sample_rate=WHISPER_SAMPLE_RATE):
+        key = self._key(path)
+        if key is None or pcm.nbytes > self.max_bytes:
+            return
+        pcm = np.asarray(pcm)
+        if pcm.flags.writeable:
+            pcm = pcm.copy()
+            pcm.flags.writeable = False
+        with self._lock:
+            rates = self._entries.pop(key, {})
+            old = rates.get(sample_rate)
+            if old is not None:
+                self._bytes -= old.nbytes
+            rates[sample_rate] = pcm
+            self._entries[key] = rates
+            self._bytes += pcm.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= sum(a.nbytes for a in evicted.values())
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "size_mb": round(self._bytes / 1048576, 1),
+                    "hits": self.hits, "misses": self.misses}
+
+
+DECODED_AUDIO = PCMCache(DECODED_AUDIO_CACHE_MB)
+
+
+def downmix_pcm(pcm):
+    """(frames x channels) int16 -> mono int16, averaging the channels like ffmpeg's -ac 1."""
+    if pcm.ndim == 1 or pcm.shape[1] == 1:
+        return pcm.reshape(-1)
+    return np.round(pcm.mean(axis=1)).astype(np.int16)
+
+
+def decode_audio_16k(path):
+    """
+    Decode to mono 16 kHz int16 PCM - the exact input whisper.load_audio feeds the model,
+    so the samples can be both hashed and transcribed. Served from DECODED_AUDIO when already decoded.
+    """
+    pcm = DECODED_AUDIO.get(path)
+    if pcm is None:
+        pcm = decode_audio_pcm(path, WHISPER_SAMPLE_RATE)
+        DECODED_AUDIO.put(path, pcm)
+    return pcm
+
+
+# Containers that hold each audio codec as-is for extract_voice_from_video (anything else: Matroska)
+VOICE_COPY_CONTAINERS = {"aac": ".m4a", "alac": ".m4a", "mp3": ".mp3", "flac": ".flac", "opus": ".ogg",
+                         "vorbis": ".ogg", "pcm_s16le": ".wav", "pcm_s24le": ".wav", "pcm_f32le": ".wav"}
+
+
+def extract_voice_from_video(video_path, log=None):
+    """
+    Pull the voice track out of a video with one ffmpeg call and no re-encode.
+
+    The first audio stream is demuxed as-is (-c:a copy) for mixing, and the same call decodes it to
+    16 kHz mono PCM on stdout, which goes into DECODED_AUDIO so transcription doesn't decode the file again.
+    If the stream can't be copied into a file, it is written as 16-bit WAV at its own rate instead.
+
+    Returns the extracted audio path, or None if the video has no audio or extraction failed.
+    """
+    info = probe_media(video_path, log=log)
+    if info is not None and not info.has_audio:
+        return None
+    copy_ext = VOICE_COPY_CONTAINERS.get(info.audio_codec if info else None, ".mka")
+    t0 = time.time()
+    error = ""
+    for codec, ext in (("copy", copy_ext), ("pcm_s16le", ".wav")):
+        fd, voice_path = tempfile.mkstemp(suffix=ext, prefix='extracted_voice_')
+        os.close(fd)
+        cmd = ["ffmpeg", "-nostdin", "-y", "-v", "error", "-i", video_path,
+               "-map", "0:a:0", "-vn", "-c:a", codec, voice_path,
+               "-map", "0:a:0", "-vn", "-ac", "1", "-ar", str(WHISPER_SAMPLE_RATE),
+               "-f", "s16le", "-acodec", "pcm_s16le", "-"]
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode == 0 and os.path.getsize(voice_path) > 0 and result.stdout:
+            DECODED_AUDIO.put(voice_path, np.frombuffer(result.stdout, np.int16))
+            if log:
+                how = "stream copy" if codec == "copy" else "PCM (stream could not be copied)"
+                log(f"[VOICE] Extracted {info.audio_codec if info else 'audio'} by {how} + 16 kHz PCM "
+                    f"in {time.time() - t0:.2f}s")
+            return voice_path
+        error = result.stderr.decode(errors="replace")[-300:]
+        os.remove(voice_path)
+    if log:
+        log(f"[VOICE] ffmpeg extraction failed: {error}")
+    return None
+
+
+def audio_fingerprint(pcm):
+    """
+    Return (sha1, envelope) for 16 kHz int16 PCM. sha1 matches the exact samples (remuxes, renamed
+    or re-tagged files); envelope is the quantized loudness curve compared by TranscriptCache when a
+    lossy re-encode changes the samples but not the sound.
+    """
+    pcm = np.asarray(pcm, dtype=np.int16)
+    digest = hashlib.sha1(pcm.tobytes()).hexdigest()
+    frames = len(pcm) // FINGERPRINT_FRAME
+    if frames == 0:
+        return digest, np.zeros(0, dtype=np.uint8)
+    x = pcm[:frames * FINGERPRINT_FRAME].astype(np.float32).reshape(frames, FINGERPRINT_FRAME) / 32768.0
+    db = 10.0 * np.log10(np.mean(x * x, axis=1) + 1e-12)
+    db = np.clip(db, FINGERPRINT_FLOOR_DB, 0.0)
+    return digest, np.round((db - FINGERPRINT_FLOOR_DB) * 4).astype(np.uint8)
+
+
+def _envelope_distance_db(a, b):
+    """Mean level difference in dB between two envelopes, or None if their lengths don't line up."""
+    if len(a) == 0 or abs(len(a) - len(b)) > 2:
+        return None
+    n = min(len(a), len(b))
+    return float(np.mean(np.abs(a[:n].astype(np.int16) - b[:n].astype(np.int16)))) / 4.0
+
+
+def _envelope_correlation(a, b):
+    """Correlation of two envelopes over the frames where either is above the floor (0.0 if flat)."""
+    n = min(len(a), len(b))
+    a, b = a[:n].astype(np.float32), b[:n].astype(np.float32)
+    heard = (a > 0) | (b > 0)
+    a, b = a[heard], b[heard]
+    if len(a) < 2 or a.std() == 0 or b.std() == 0:
+        return 0.0
+    return float(np.corrcoef(a, b)[0, 1])
+
+
+def _compact_segments(segments):
+    """Whisper segments -> nested lists holding only what the captioning code reads."""
+    out = []
+    for seg in segments:
+        words = [[w.get("word", ""), round(float(w.get("start", 0.0)), 3), round(float(w.get("end", 0.0)), 3),
+                  round(float(w.get("probability", 0.0)), 3)] for w in (seg.get("words") or [])]
+        item = [round(float(seg.get("start", 0.0)), 3), round(float(seg.get("end", 0.0)), 3),
+                seg.get("text", ""), words]
+        if "original_text" in seg:
+            item.append(seg["original_text"])
+        out.append(item)
+    return out
+
+
+def _expand_segments(compact):
+    """Inverse of _compact_segments: Whisper-style segment dicts."""
+    segments = []
+    for i, item in enumerate(compact):
+        seg = {
+            "id": i,
+            "start": item[0],
+            "end": item[1],
+            "text": item[2],
+            "words": [{"word": w, "start": s, "end": e, "probability": p} for w, s, e, p in item[3]],
+        }
+        if len(item) > 4:
+            seg["original_text"] = item[4]
+        segments.append(seg)
+    return segments
+
+
+class TranscriptCache:
+    """
+    Disk cache of Whisper transcripts (gzip JSON, one file per variant) under cache_dir.
+
+    An entry is keyed by (audio id, model name, transcribe options, target language); language None
+    is the untranslated transcript. The audio id is the sha1 of the decoded PCM; index.jsonl keeps
+    each audio id's loudness envelope (one line appended per new id, at most max_index_entries) so
+    a re-encoded copy resolves to the id it was cached under.
+    """
+
+    def __init__(self, cache_dir, max_index_entries=None):
+        self.cache_dir = cache_dir
+        self.max_index_entries = max_index_entries or TRANSCRIPT_INDEX_MAX
+        self._lock = threading.Lock()
+        self._index = None  # audio id -> (envelope, mean level in dB), least recently matched first
+        self._buckets = {}  # envelope length in seconds -> audio ids
+        self.hits = 0
+        self.misses = 0
+        self.exact_matches = 0
+        self.fuzzy_matches = 0
+
+    @staticmethod
+    def entry_key(audio_id, model_name, options=None, language=None):
+        parts = ("v1", audio_id, model_name, sorted((options or {}).items()), language or None)
+        return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".json.gz")
+
+    def _index_path(self):
+        return os.path.join(self.cache_dir, "index.jsonl")
+
+    @staticmethod
+    def _bucket(envelope):
+        return len(envelope) * FINGERPRINT_FRAME // WHISPER_SAMPLE_RATE
+
+    def _index_add(self, audio_id, envelope):
+        self._index[audio_id] = (envelope, float(envelope.mean()) / 4.0 if len(envelope) else 0.0)
+        self._buckets.setdefault(self._bucket(envelope), set()).add(audio_id)
+
+    def _load_index(self):
+        if self._index is not None:
+            return self._index
+        self._index, self._buckets = OrderedDict(), {}
+        records = []
+        try:
+            with open(self._index_path(), encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue  # line cut short by a crash
+        except OSError:
+            pass
+        for record in records:
+            try:
+                self._index_add(record["id"], np.frombuffer(base64.b64decode(record["env"]), np.uint8))
+            except Exception:
+                continue
+        if len(self._index) > self.max_index_entries:
+            self._compact_index()
+        return self._index
+
+    @staticmethod
+    def _index_line(audio_id, envelope):
+        return json.dumps({"id": audio_id, "env": base64.b64encode(envelope.tobytes()).decode("ascii")}) + "\n"
+
+    def _compact_index(self):
+        """Drop the least recently matched ids down to 90% of the cap and rewrite index.jsonl."""
+        while len(self._index) > self.max_index_entries * 0.9:
+            audio_id, (envelope, _) = self._index.popitem(last=False)
+            self._buckets.get(self._bucket(envelope), set()).discard(audio_id)
+        data = "".join(self._index_line(audio_id, env) for audio_id, (env, _) in self._index.items())
+        try:
+            self._write_atomic(self._index_path(), data.encode("utf-8"))
+        except Exception:
+            pass
+
+    def _write_atomic(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _closest(self, envelope):
+        """
+        Best envelope match among indexed tracks of about the same duration and loudness:
+        (audio id, mean dB difference) or (None, None).
+        """
+        if len(envelope) == 0 or np.mean(envelope > 40) < FINGERPRINT_MIN_ACTIVE:  # 40 = 10 dB over the floor
+            return None, None
+        level = float(envelope.mean()) / 4.0
+        bucket = self._bucket(envelope)
+        best_id, best_diff = None, None
+        for candidates in (self._buckets.get(b, ()) for b in (bucket - 1, bucket, bucket + 1)):
+            for audio_id in candidates:
+                other, other_level = self._index[audio_id]
+                if abs(other_level - level) > FINGERPRINT_MAX_DIFF_DB + 0.5:  # mean |diff| >= |mean diff|
+                    continue
+                diff = _envelope_distance_db(envelope, other)
+                if diff is None or diff > FINGERPRINT_MAX_DIFF_DB or (best_diff is not None and diff >= best_diff):
+                    continue
+                if _envelope_correlation(envelope, other) >= FINGERPRINT_MIN_CORRELATION:
+                    best_id, best_diff = audio_id, diff
+        return best_id, best_diff
+
+    def resolve_audio_id(self, pcm, log=None):
+        """
+        Return the audio id for decoded PCM: its own sha1, or the id of a previously cached track
+        whose loudness envelope matches (same audio, re-encoded - see FINGERPRINT_*). Fuzzy matches
+        are logged and counted apart from exact ones.
+        """
+        digest, envelope = audio_fingerprint(pcm)
+        with self._lock:
+            index = self._load_index()
+            if digest in index:
+                index.move_to_end(digest)
+                self.exact_matches += 1
+                return digest
+            best_id, diff = self._closest(envelope)
+            if best_id is not None:
+                index.move_to_end(best_id)
+                self.fuzzy_matches += 1
+            else:
+                self._index_add(digest, envelope)
+                if len(index) > self.max_index_entries:
+                    self._compact_index()
+                else:
+                    try:
+                        os.makedirs(self.cache_dir, exist_ok=True)
+                        with open(self._index_path(), "a", encoding="utf-8") as f:
+                            f.write(self._index_line(digest, envelope))
+                    except Exception:
+                        pass
+        if best_id is None:
+            return digest
+        if log:
+            log(f"[TRANSCRIPT-CACHE] Fuzzy audio match: {digest[:12]} -> {best_id[:12]} "
+                f"(re-encoded copy, envelope diff {diff:.2f} dB)")
+        return best_id
+
+    def get(self, audio_id, model_name, options=None, language=None):
+        """Return cached Whisper-style segments or None."""
+        path = self._path(self.entry_key(audio_id, model_name, options, language))
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                segments = _expand_segments(json.load(f)["segments"])
+        except Exception:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return segments
+
+    def put(self, audio_id, model_name, segments, options=None, language=None):
+        path = self._path(self.entry_key(audio_id, model_name, options, language))
+        payload = {"model": model_name, "language": language, "segments": _compact_segments(segments)}
+        try:
+            data = gzip.compress(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            self._write_atomic(path, data)
+        except Exception:
+            pass
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "exact_matches": self.exact_matches,
+                    "fuzzy_matches": self.fuzzy_matches, "indexed": len(self._index or ())}
+
+
+TRANSCRIPTS = TranscriptCache(os.path.join(CACHE_ROOT, "transcripts")) if TRANSCRIPT_CACHE else None
+
+# ----------------- parallel chunked transcription (CPU) -----------------
+# Approximate resident size of each Whisper model in fp32 on CPU, for sizing the worker pool
+WHISPER_CPU_MODEL_MB = {"tiny": 250, "base": 400, "small": 1200, "medium": 3800, "large": 7600}
+
+
+def plan_transcription_chunks(pcm, sample_rate=WHISPER_SAMPLE_RATE, max_chunk_s=None, min_silence_ms=None, pad_ms=200):
+    """
+    Split mono PCM into chunks for parallel transcription, at pauses found by an energy VAD.
+
+    Speech is whatever detect_nonsilent_ranges finds louder than WHISPER_VAD_THRESH_DB under the
+    track's average level, padded by pad_ms; pauses of at least min_silence_ms separate regions. A
+    region longer than max_chunk_s is cut at its quietest 50 ms inside the second half of the limit.
+    Consecutive regions are grouped into chunks of at most max_chunk_s of speech; the silence between
+    them is left out of the chunk audio entirely.
+
+    Returns a list of chunks, each a list of (start_frame, end_frame) regions in order.
+    """
+    max_chunk_s = WHISPER_CHUNK_MAX_S if max_chunk_s is None else max_chunk_s
+    min_silence_ms = WHISPER_VAD_MIN_SILENCE_MS if min_silence_ms is None else min_silence_ms
+    loudness = pcm_dbfs(pcm) if len(pcm) else float("-inf")
+    if not np.isfinite(loudness):
+        return []
+    ranges = detect_nonsilent_ranges(pcm, sample_rate, min_silence_len=min_silence_ms,
+                                     silence_thresh=loudness - WHISPER_VAD_THRESH_DB, seek_step=10)
+
+    # Padded speech regions in frames, merged where the padding makes them touch
+    regions = []
+    pad = int(pad_ms * sample_rate / 1000)
+    for start_ms, end_ms in ranges:
+        start = max(0, int(start_ms * sample_rate / 1000) - pad)
+        end = min(len(pcm), int(end_ms * sample_rate / 1000) + pad)
+        if regions and start <= regions[-1][1]:
+            regions[-1][1] = max(regions[-1][1], end)
+        elif end > start:
+            regions.append([start, end])
+
+    # Cut overlong regions where the audio is quietest
+    limit = int(max_chunk_s * sample_rate)
+    step = max(1, sample_rate // 20)
+    pieces = []
+    for start, end in regions:
+        while end - start > limit:
+            lo = start + limit // 2
+            window = pcm[lo:start + limit].astype(np.float32)
+            frames = len(window) // step
+            energy = (window[:frames * step].reshape(frames, step) ** 2).mean(axis=1)
+            cut = lo + int(np.argmin(energy)) * step + step // 2
+            pieces.append((start, cut))
+            start = cut
+        pieces.append((start, end))
+
+    chunks, speech = [], 0
+    for start, end in pieces:
+        if chunks and speech + (end - start) <= limit:
+            chunks[-1].append((start, end))
+            speech += end - start
+        else:
+            chunks.append([(start, end)])
+            speech = end - start
+    return chunks
+
+
+def _chunk_to_track_times(times, regions):
+    """Map times on a chunk's joined audio back onto the full track (seconds, WHISPER_SAMPLE_RATE)."""
+    starts = np.array([s for s, _ in regions], dtype=np.float64) / WHISPER_SAMPLE_RATE
+    ends = np.array([e for _, e in regions], dtype=np.float64) / WHISPER_SAMPLE_RATE
+    offsets = np.concatenate([[0.0], np.cumsum(ends - starts)[:-1]])
+    times = np.asarray(times, dtype=np.float64)
+    idx = np.clip(np.searchsorted(offsets, times, side="right") - 1, 0, len(regions) - 1)
+    return np.minimum(starts[idx] + np.maximum(times - offsets[idx], 0.0), ends[idx])
+
+
+def offset_chunk_segments(segments, regions):
+    """Whisper segments of one chunk with their segment and word times on the full track's timeline."""
+    times = []
+    for seg in segments:
+        times += [seg.get("start", 0.0), seg.get("end", 0.0)]
+        for w in seg.get("words") or []:
+            times += [w.get("start", 0.0), w.get("end", 0.0)]
+    mapped = iter(_chunk_to_track_times(times, regions).tolist()) if times else iter(())
+    out = []
+    for seg in segments:
+        seg = dict(seg, start=next(mapped), end=next(mapped))
+        if seg.get("words"):
+            seg["words"] = [dict(w, start=next(mapped), end=next(mapped)) for w in seg["words"]]
+        out.append(seg)
+    return out
+
+
+def _whisper_checkpoint_ready(model_name):
+    """True when the model file is already downloaded, so worker processes don't all download it."""
+    url = getattr(whisper, "_MODELS", {}).get(model_name)
+    if not url:
+        return False
+    root = os.path.join(os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")), "whisper")
+    return os.path.isfile(os.path.join(root, os.path.basename(url)))
+
+
+def _system_memory_mb():
+    """Physical RAM of this machine in MB, or 0 when it can't be read."""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+
+            class _MemoryStatus(ctypes.Structure):
+                _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong)] + [
+                    (name, ctypes.c_ulonglong) for name in ("ullTotalPhys", "ullAvailPhys", "ullTotalPageFile",
+                                                            "ullAvailPageFile", "ullTotalVirtual", "ullAvailVirtual",
+                                                            "ullAvailExtendedVirtual")]
+
+            status = _MemoryStatus()
+            status.dwLength = ctypes.sizeof(_MemoryStatus)
+            if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return 0
+            return int(status.ullTotalPhys // (1024 * 1024))
+        return int(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024))
+    except (AttributeError, OSError, ValueError):
+        return 0
+
+
+def whisper_parallel_workers(model_name="large"):
+    """
+    Worker processes for parallel CPU transcription. WHISPER_PARALLEL_WORKERS forces a count; 0 sizes
+    the pool by cores (one per 4) and by how many copies of the model fit in WHISPER_PARALLEL_RAM_MB
+    (default 60% of physical RAM) after the models already resident in WHISPER_MODELS.
+    """
+    if WHISPER_PARALLEL_WORKERS:
+        return max(1, int(WHISPER_PARALLEL_WORKERS))
+    budget = WHISPER_PARALLEL_RAM_MB or _system_memory_mb() * 0.6
+    budget -= WHISPER_MODELS.stats()["resident_mb"]
+    by_cores = (os.cpu_count() or 1) // 4
+    by_ram = int(max(0, budget) // WHISPER_CPU_MODEL_MB.get(model_name, WHISPER_CPU_MODEL_MB["large"]))
+    return max(1, min(by_cores, by_ram, 8))
+
+
+def worker_pool_context():
+    """
+    multiprocessing context for process pools: forkserver where the platform has it, else spawn.
+    Workers never fork from the GUI process itself, so they can't inherit its threads or a lock
+    another thread held at fork time.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    # The server imports this module once; caption workers then fork with it already loaded
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(list(dict.fromkeys(["__main__", __name__])))
+    return context
+
+
+def transcribe_parallel(pcm, model_name="large", workers=None, log=None):
+    """
+    Transcribe 16 kHz int16 PCM as VAD chunks (plan_transcription_chunks) in worker processes
+    (whisper_worker), each with its own copy of the model, and return the segments on the full
+    track's timeline. The model must already be downloaded (_whisper_checkpoint_ready).
+    Pauses between chunks never reach Whisper. Raises if the pool or a worker fails.
+    """
+    workers = workers or whisper_parallel_workers(model_name)
+    chunks = plan_transcription_chunks(pcm)
+    if not chunks:
+        return []
+    workers = max(1, min(workers, len(chunks)))
+    audio = [np.concatenate([pcm[s:e] for s, e in regions]).astype(np.float32) / 32768.0 for regions in chunks]
+    if log:
+        speech = sum(len(a) for a in audio) / WHISPER_SAMPLE_RATE
+        log(f"[whisper] Parallel: {len(chunks)} chunks, {speech:.0f}s of speech out of "
+            f"{len(pcm) / WHISPER_SAMPLE_RATE:.0f}s, {workers} worker(s) with '{model_name}'")
+    t0 = time.time()
+    threads = (os.cpu_count() or 1) // workers
+    with ProcessPoolExecutor(max_workers=workers, mp_context=worker_pool_context(),
+                             initializer=whisper_worker.init,
+                             initargs=(model_name, threads, TRANSCRIBE_OPTIONS)) as pool:
+        results = list(pool.map(whisper_worker.transcribe, audio))
+    segments = []
+    for regions, chunk_segments in zip(chunks, results):
+        segments += offset_chunk_segments(chunk_segments, regions)
+    for i, seg in enumerate(segments):
+        seg["id"] = i
+    if log:
+        log(f"[whisper] Parallel transcription: {len(segments)} segments in {time.time() - t0:.1f}s")
+    return segments
+
+
+# ----------------- transcription backends -----------------
+class TranscriptionBackend:
+    """
+    Engine under transcribe_captions (selected by TRANSCRIPTION_BACKEND).
+
+    transcribe(audio, source_path, log, cached) takes 16 kHz mono int16 PCM (or None, to read
+    source_path itself) and returns (segments, model_name): Whisper-style segments - dicts with
+    start, end, text and words [{word, start, end, probability}], times in seconds - and the name
+    they are cached under in TRANSCRIPTS. cached(model_name) looks up a stored transcript, for
+    engines that fall back to another model after the first lookup missed.
+    """
+
+    name = None
+    model_name = None  # transcript cache name of the preferred model
+
+    def available(self):
+        return True
+
+    def transcribe(self, audio, source_path, log=None, cached=None):
+        raise NotImplementedError
+
+
+class OpenAIWhisperBackend(TranscriptionBackend):
+    """openai-whisper (PyTorch): 'large', falling back to 'medium'; long CPU audio in parallel chunks."""
+
+    name = "openai-whisper"
+    model_name = "large"
+
+    def transcribe(self, audio, source_path, log=None, cached=None):
+        log = log or (lambda s: None)
+        model_name = self.model_name
+        # Long audio on CPU: VAD chunks transcribed side by side in worker processes
+        if (audio is not None and len(audio) >= WHISPER_PARALLEL_MIN_S * WHISPER_SAMPLE_RATE
+                and whisper_parallel_workers(model_name) > 1 and _detect_whisper_device() == "cpu"):
+            if not _whisper_checkpoint_ready(model_name):
+                log(f"[whisper] '{model_name}' not downloaded yet - transcribing in one pass this time")
+            else:
+                try:
+                    return transcribe_parallel(audio, model_name, log=log), model_name
+                except Exception as e:
+                    log(f"[whisper] Parallel transcription failed ({e}) - transcribing in one pass")
+
+        # Use Whisper for transcription
+        # Using 'large' (not large-v3) for accurate word-level timestamps needed for caption sync
+        # Medium/small models are faster but timestamps not accurate enough, causing caption-voice mismatch
+        try:
+            model, device = get_whisper_model(model_name, tries=3, log=log)
+        except Exception as e_large:
+            log(f"[whisper] Failed to load 'large' model after retries: {e_large}")
+            log("[whisper] Falling back to 'medium' model (faster but less accurate timestamps).")
+            try:
+                model, device = get_whisper_model("medium", tries=2, log=log)
+                model_name = "medium"
+            except Exception as e_medium:
+                log(f"[whisper] Failed to load 'medium' model as well: {e_medium}")
+                raise RuntimeError("Whisper models unavailable. Verifică conexiunea la internet și spațiul pe disc.") from e_medium
+            segments = cached(model_name) if cached else None
+            if segments is not None:
+                return segments, model_name
+
+        # Show appropriate message based on actual device being used
+        if device == "cuda":
+            log("[whisper] Transcribing audio with word-level timestamps (5-8 minutes on GPU)...")
+        else:
+            log("[whisper] Transcribing audio with word-level timestamps (15-20 minutes on CPU)...")
+
+        # Enable word_timestamps for precise caption synchronization
+        # Use FP16 on GPU for faster inference (2x speedup with minimal quality loss)
+        # Only enable FP16 if actually running on GPU
+        use_fp16 = (device == "cuda")
+        if use_fp16:
+            log("[whisper] Using FP16 precision on GPU for faster transcription (2x speedup)")
+
+        source = source_path if audio is None else audio.astype(np.float32) / 32768.0
+        result = model.transcribe(source, fp16=use_fp16, **TRANSCRIBE_OPTIONS)
+        return result["segments"], model_name
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """faster-whisper (CTranslate2): int8 on CPU, float16 on CUDA, same word-timestamp output."""
+
+    name = "faster-whisper"
+
+    @property
+    def model_name(self):
+        return f"faster-whisper/{FASTER_WHISPER_MODEL}/{self._compute_type(_detect_whisper_device())}"
+
+    def available(self):
+        return FASTER_WHISPER_AVAILABLE
+
+    @staticmethod
+    def _compute_type(device):
+        if FASTER_WHISPER_COMPUTE_TYPE != "auto":
+            return FASTER_WHISPER_COMPUTE_TYPE
+        return "float16" if device == "cuda" else "int8"
+
+    def transcribe(self, audio, source_path, log=None, cached=None):
+        log = log or (lambda s: None)
+        device = _detect_whisper_device()
+        compute_type = self._compute_type(device)
+        key = (f"faster-whisper/{FASTER_WHISPER_MODEL}", device, compute_type)
+        model, _ = WHISPER_MODELS.get(
+            key, lambda: (FasterWhisperModel(FASTER_WHISPER_MODEL, device=device, compute_type=compute_type,
+                                             cpu_threads=os.cpu_count() or 0), key), log=log)
+        log(f"[whisper] faster-whisper '{FASTER_WHISPER_MODEL}' ({compute_type} on {device.upper()}): "
+            f"transcribing with word-level timestamps...")
+        source = source_path if audio is None else audio.astype(np.float32) / 32768.0
+        raw, _ = model.transcribe(source, **TRANSCRIBE_OPTIONS)
+        segments = []
+        for i, seg in enumerate(raw):  # a generator: decoding happens while iterating
+            segments.append({"id": i, "start": seg.start, "end": seg.end, "text": seg.text, "words": [
+                {"word": w.word, "start": w.start, "end": w.end, "probability": w.probability}
+                for w in (seg.words or [])]})
+        return segments, self.model_name
+
+
+def _words_to_segments(words, max_pause=1.0):
+    """Group timed words into Whisper-style segments at sentence ends and pauses of max_pause s or more."""
+    segments, current = [], []
+    for i, w in enumerate(words):
+        current.append(w)
+        last = i == len(words) - 1
+        if last or w["word"].rstrip().endswith((".", "?", "!")) or words[i + 1]["start"] - w["end"] >= max_pause:
+            segments.append({"id": len(segments), "start": current[0]["start"], "end": current[-1]["end"],
+                             "text": "".join(x["word"] for x in current), "words": current})
+            current = []
+    return segments
+
+
+class WhisperCppBackend(TranscriptionBackend):
+    """
+    whisper.cpp through pywhispercpp. Word times come from one-word segments (max_len=1,
+    split_on_word), regrouped into sentences by _words_to_segments.
+    """
+
+    name = "whisper.cpp"
+
+    @property
+    def model_name(self):
+        return f"whisper.cpp/{WHISPER_CPP_MODEL}"
+
+    def available(self):
+        return WHISPER_CPP_AVAILABLE
+
+    def transcribe(self, audio, source_path, log=None, cached=None):
+        log = log or (lambda s: None)
+        key = (self.model_name, "cpu", "ggml")
+        model, _ = WHISPER_MODELS.get(
+            key, lambda: (WhisperCppModel(WHISPER_CPP_MODEL, n_threads=os.cpu_count() or 1,
+                                          print_progress=False, print_realtime=False), key), log=log)
+        log(f"[whisper] whisper.cpp '{WHISPER_CPP_MODEL}': transcribing with word-level timestamps...")
+        source = source_path if audio is None else audio.astype(np.float32) / 32768.0
+        raw = model.transcribe(source, token_timestamps=True, max_len=1, split_on_word=True)
+        words = [{"word": s.text if s.text.startswith(" ") else f" {s.text}", "start": s.t0 / 100.0,
+                  "end": s.t1 / 100.0, "probability": float(getattr(s, "probability", 1.0))}
+                 for s in raw if s.text.strip()]
+        return _words_to_segments(words), self.model_name
+
+
+TRANSCRIPTION_BACKENDS = {cls.name: cls for cls in (OpenAIWhisperBackend, FasterWhisperBackend, WhisperCppBackend)}
+
+
+def get_transcription_backend(name=None, log=None):
+    """The TranscriptionBackend for name (default TRANSCRIPTION_BACKEND); openai-whisper if it isn't installed."""
+    name = name or TRANSCRIPTION_BACKEND
+    cls = TRANSCRIPTION_BACKENDS.get(name)
+    if cls is None:
+        raise ValueError(f"Unknown transcription backend {name!r} (choose from {', '.join(TRANSCRIPTION_BACKENDS)})")
+    backend = cls()
+    if not backend.available():
+        if log:
+            log(f"[whisper] Backend '{name}' is not installed - using openai-whisper")
+        backend = OpenAIWhisperBackend()
+    return backend
+
+
+# transcribe_captions options that change Whisper's output (part of the cache key)
+TRANSCRIBE_OPTIONS = {"word_timestamps": True}
+
 def transcribe_captions(voice_path, log=None, translate_to=None):
     """
     Transcribe audio to text captions using Whisper, with optional translation.
     
+    Transcripts (and each translation) are looked up in TRANSCRIPTS first; a hit returns without
+    loading a Whisper model. Otherwise the TRANSCRIPTION_BACKEND engine transcribes the decoded
+    samples (see TranscriptionBackend); with openai-whisper, long audio on CPU is transcribed as VAD
+    chunks in parallel worker processes (transcribe_parallel).
+    
     Args:
         voice_path: Path to audio file
         log: Optional logging function
@@ -1313,48 +4160,112 @@ def transcribe_captions(voice_path, log=None, translate_to=None):
         except Exception:
             pass
     log_fn = _default_log if log is None else log
-    
-    # Use Whisper for transcription
-    # Using 'large' (not large-v3) for accurate word-level timestamps needed for caption sync
-    # Medium/small models are faster but timestamps not accurate enough, causing caption-voice mismatch
+    translate = bool(translate_to and translate_to != 'none')
+    
+    # Decode once (or reuse the shared decode): the samples are fingerprinted for the cache and fed
+    # straight to Whisper on a miss, so Whisper never starts its own ffmpeg
+    cache = TRANSCRIPTS
+    audio, audio_id, segments = None, None, None
+    backend = get_transcription_backend(log=log_fn)
+    model_name = backend.model_name
     try:
-        model, device = _load_whisper_model_with_retries("large", tries=3, log=log_fn)
-    except Exception as e_large:
-        log_fn(f"[whisper] Failed to load 'large' model after retries: {e_large}")
-        log_fn("[whisper] Falling back to 'medium' model (faster but less accurate timestamps).")
-        try:
-            model, device = _load_whisper_model_with_retries("medium", tries=2, log=log_fn)
-        except Exception as e_medium:
-            log_fn(f"[whisper] Failed to load 'medium' model as well: {e_medium}")
-            raise RuntimeError("Whisper models unavailable. Verifică conexiunea la internet și spațiul pe disc.") from e_medium
-    
-    # Show appropriate message based on actual device being used
-    if device == "cuda":
-        log_fn("[whisper] Transcribing audio with word-level timestamps (5-8 minutes on GPU)...")
-    else:
-        log_fn("[whisper] Transcribing audio with word-level timestamps (15-20 minutes on CPU)...")
-    
-    # Enable word_timestamps for precise caption synchronization
-    # Use FP16 on GPU for faster inference (2x speedup with minimal quality loss)
-    # Only enable FP16 if actually running on GPU
-    use_fp16 = (device == "cuda")
-    if use_fp16:
-        log_fn("[whisper] Using FP16 precision on GPU for faster transcription (2x speedup)")
-    
-    result = model.transcribe(voice_path, word_timestamps=True, fp16=use_fp16)
-    log_fn("[whisper] Transcription finished.")
-    segments = result["segments"]
+        audio = decode_audio_16k(voice_path)
+    except Exception as e:
+        log_fn(f"[whisper] Decoding failed ({e}) - Whisper will read the file itself")
+    if cache is not None and audio is not None:
+        try:
+            audio_id = cache.resolve_audio_id(audio, log=log_fn)
+        except Exception as e:
+            log_fn(f"[TRANSCRIPT-CACHE] Fingerprint failed ({e}) - transcribing without cache")
+    if audio_id:
+        if translate:
+            segments = cache.get(audio_id, model_name, TRANSCRIBE_OPTIONS, language=translate_to)
+            if segments is not None:
+                log_fn(f"[TRANSCRIPT-CACHE] HIT {audio_id[:12]} ({model_name}, {translate_to}) - {len(segments)} segments")
+                return segments
+        segments = cache.get(audio_id, model_name, TRANSCRIBE_OPTIONS)
+        if segments is not None:
+            log_fn(f"[TRANSCRIPT-CACHE] HIT {audio_id[:12]} ({model_name}) - skipping Whisper, {len(segments)} segments")
+    
+    if segments is None:
+        # Only one job at a time may load/run Whisper (see STAGE_SLOTS); others wait here
+        with STAGE_LIMITER.slot("whisper", log=log_fn):
+            cached = (lambda name: cache.get(audio_id, name, TRANSCRIBE_OPTIONS)) if audio_id else None
+            segments, model_name = backend.transcribe(audio, voice_path, log=log_fn, cached=cached)
+            if audio_id:
+                cache.put(audio_id, model_name, segments, TRANSCRIBE_OPTIONS)
+        log_fn("[whisper] Transcription finished.")
+        cache_stats = WHISPER_MODELS.stats()
+        log_fn(f"[model-cache] hits={cache_stats['hits']} misses={cache_stats['misses']} "
+               f"load_time={cache_stats['load_seconds']}s resident={cache_stats['resident_mb']} MB")
     
     # Apply translation if requested
     # Translation is enabled when translate_to is specified and not 'none'
-    if translate_to and translate_to != 'none':
+    if translate:
         log_fn(f"[TRANSCRIBE] Translating to {translate_to}...")
-        segments = translate_segments(segments, target_language=translate_to, log=log_fn)
+        translated = translate_segments(segments, target_language=translate_to, log=log_fn)
+        # translate_text falls back to the source text on errors - don't cache a failed run
+        if audio_id and any(t.get("text") != s.get("text") for t, s in zip(translated, segments)):
+            cache.put(audio_id, model_name, translated, TRANSCRIBE_OPTIONS, language=translate_to)
+        segments = translated
     
     return segments
 
 # ----------------- caption generation -----------------
-def generate_caption_image(text, preferred_font=None, log=None):
+def _measure_caption_text(draw, s, font):
+    try:
+        l, t, r, b = draw.textbbox((0,0), s, font=font)
+        return (r-l, b-t)
+    except Exception:
+        return font.getsize(s)
+
+def caption_layout(text, font, width, font_size):
+    """
+    Line wrapping and bubble geometry of a caption image, shared by generate_caption_image and
+    the ASS renderer so both place the same lines at the same pixels.
+
+    Returns a dict with lines, line_widths, line_heights, line_spacing, padding_x, padding_y,
+    extra_bottom_margin, total_height, bubble_width and image_height (all in pixels).
+    """
+    draw_tmp = ImageDraw.Draw(Image.new("RGBA", (width, 10), (0,0,0,0)))
+    max_text_width = width - 160
+    words = text.split()
+    lines, current = [], ""
+    for w in words:
+        test = (current + " " + w).strip()
+        w_width, _ = _measure_caption_text(draw_tmp, test, font)
+        if w_width <= max_text_width:
+            current = test
+        else:
+            if current: lines.append(current)
+            current = w
+    if current: lines.append(current)
+    
+    line_widths, line_heights = [], []
+    for line in lines:
+        lw, lh = _measure_caption_text(draw_tmp, line, font)
+        line_widths.append(lw)
+        line_heights.append(lh)
+    
+    line_spacing = int(font_size * 0.18)
+    padding_x = 24; padding_y = 24  # increased vertical padding to avoid bottom cutoff
+    extra_bottom_margin = int(font_size * 0.35)  # extra transparent margin at bottom
+    total_height = sum(line_heights) + line_spacing*(len(lines)-1) + padding_y*2 + extra_bottom_margin
+    bubble_width = min(width - 80, max(line_widths, default=0) + padding_x*2)
+    return {
+        "lines": lines,
+        "line_widths": line_widths,
+        "line_heights": line_heights,
+        "line_spacing": line_spacing,
+        "padding_x": padding_x,
+        "padding_y": padding_y,
+        "extra_bottom_margin": extra_bottom_margin,
+        "total_height": total_height,
+        "bubble_width": bubble_width,
+        "image_height": total_height + 8 + extra_bottom_margin,
+    }
+
+def generate_caption_image(text, preferred_font=None, log=None, config=None):
     """
     Generate caption image with visible background and proper transparency settings.
     
@@ -1363,7 +4274,17 @@ def generate_caption_image(text, preferred_font=None, log=None):
     - Removed duplicate shadow drawing code
     - Added logging for caption rendering errors
     - Normalized color values to ensure valid RGBA ranges
+
+    Size, font and colors come from `config` (a RenderConfig); when omitted the current
+    global settings are snapshotted.
     """
+    if config is None:
+        config = RenderConfig.from_globals(preferred_font=preferred_font)
+    elif preferred_font and preferred_font != config.caption_font_preferred:
+        config = replace(config, caption_font_preferred=preferred_font, caption_font_path=None)
+    width = config.width
+    font_size = config.caption_font_size
+
     try:
         if log:
             log(f"[CAPTION-GEN] ═══════════════════════════════════════════════")
@@ -1375,12 +4296,12 @@ def generate_caption_image(text, preferred_font=None, log=None):
         pass
     
     try:
-        font = load_preferred_font_cached(preferred_font or CAPTION_FONT_PREFERRED, CAPTION_FONT_SIZE, log=log)
+        font, font_path = get_render_font(config.caption_font_path or config.caption_font_preferred, font_size, log=log)
         try:
             if log:
-                font_info = f"{LOADED_FONT_PATH}" if LOADED_FONT_PATH else "unknown"
+                font_info = f"{font_path}" if font_path else "unknown"
                 log(f"[CAPTION-GEN] Font loaded successfully: {font_info}")
-                log(f"[CAPTION-GEN] Font size: {CAPTION_FONT_SIZE}px")
+                log(f"[CAPTION-GEN] Font size: {font_size}px")
         except Exception:
             pass
     except Exception as e:
@@ -1394,52 +4315,28 @@ def generate_caption_image(text, preferred_font=None, log=None):
     text = normalize_text(text)
     
     def measure_text(draw, s):
-        try:
-            l, t, r, b = draw.textbbox((0,0), s, font=font)
-            return (r-l, b-t)
-        except Exception:
-            return font.getsize(s)
+        return _measure_caption_text(draw, s, font)
     
-    tmp_img = Image.new("RGBA", (WIDTH, 10), (0,0,0,0))
-    draw_tmp = ImageDraw.Draw(tmp_img)
-    max_text_width = WIDTH - 160
-    words = text.split()
-    lines, current = [], ""
-    for w in words:
-        test = (current + " " + w).strip()
-        w_width, _ = measure_text(draw_tmp, test)
-        if w_width <= max_text_width:
-            current = test
-        else:
-            if current: lines.append(current)
-            current = w
-    if current: lines.append(current)
-    
-    line_heights = []
-    max_line_w = 0
-    for line in lines:
-        lw, lh = measure_text(draw_tmp, line)
-        line_heights.append(lh)
-        max_line_w = max(max_line_w, lw)
-    
-    line_spacing = int(CAPTION_FONT_SIZE * 0.18)
-    padding_x = 24; padding_y = 24  # increased vertical padding to avoid bottom cutoff
-    extra_bottom_margin = int(CAPTION_FONT_SIZE * 0.35)  # extra transparent margin at bottom
-    total_height = sum(line_heights) + line_spacing*(len(lines)-1) + padding_y*2 + extra_bottom_margin
-    bubble_width = min(WIDTH - 80, max_line_w + padding_x*2)
+    layout = caption_layout(text, font, width, font_size)
+    lines = layout["lines"]
+    line_spacing = layout["line_spacing"]
+    padding_x, padding_y = layout["padding_x"], layout["padding_y"]
+    extra_bottom_margin = layout["extra_bottom_margin"]
+    total_height = layout["total_height"]
+    bubble_width = layout["bubble_width"]
     
     try:
         if log:
-            log(f"[CAPTION-GEN] Image dimensions: {WIDTH}x{total_height + 8 + extra_bottom_margin}")
+            log(f"[CAPTION-GEN] Image dimensions: {width}x{total_height + 8 + extra_bottom_margin}")
             log(f"[CAPTION-GEN] Number of lines: {len(lines)}")
             log(f"[CAPTION-GEN] Bubble width: {bubble_width}px, height: {total_height - extra_bottom_margin}px")
             log(f"[CAPTION-GEN] Padding: x={padding_x}px, y={padding_y}px")
     except Exception:
         pass
     
-    img = Image.new("RGBA", (WIDTH, total_height + 8 + extra_bottom_margin), (0,0,0,0))
+    img = Image.new("RGBA", (width, total_height + 8 + extra_bottom_margin), (0,0,0,0))
     draw = ImageDraw.Draw(img)
-    bubble_x0 = (WIDTH - bubble_width)//2; bubble_x1 = bubble_x0 + bubble_width
+    bubble_x0 = (width - bubble_width)//2; bubble_x1 = bubble_x0 + bubble_width
     bubble_y0 = 4; bubble_y1 = bubble_y0 + (total_height - extra_bottom_margin)  # bubble excludes the extra bottom margin
     
     # Draw shadow (FIXED: removed duplicate code)
@@ -1489,16 +4386,16 @@ def generate_caption_image(text, preferred_font=None, log=None):
         return tuple(max(0, min(255, int(c))) for c in color)
     
     try:
-        stroke_w = int(CAPTION_STROKE_WIDTH)
+        stroke_w = int(config.caption_stroke_width)
     except Exception:
-        stroke_w = max(1, int(CAPTION_FONT_SIZE * 0.05))
+        stroke_w = max(1, int(font_size * 0.05))
     
     # Increase stroke width for better visibility without white background
     # Make stroke at least 3 pixels for good visibility
     stroke_w = max(3, stroke_w)
     
     try:
-        stroke_fill = normalize_color(tuple(CAPTION_STROKE_COLOR))
+        stroke_fill = normalize_color(tuple(config.caption_stroke_color))
     except Exception:
         stroke_fill = (0,0,0,150)
     
@@ -1506,7 +4403,7 @@ def generate_caption_image(text, preferred_font=None, log=None):
     stroke_fill = (stroke_fill[0], stroke_fill[1], stroke_fill[2], 255)
     
     try:
-        text_fill = normalize_color(tuple(CAPTION_TEXT_COLOR))
+        text_fill = normalize_color(tuple(config.caption_text_color))
     except Exception:
         text_fill = (255,255,255,255)
     
@@ -1539,22 +4436,360 @@ def generate_caption_image(text, preferred_font=None, log=None):
             draw.text((x,y), line, font=font, fill=text_fill)
         except Exception as e:
             try:
-                if log:
-                    log(f"[CAPTION-GEN ERROR] Failed to draw text line {line_idx}: {e}")
+                if log:
+                    log(f"[CAPTION-GEN ERROR] Failed to draw text line {line_idx}: {e}")
+            except Exception:
+                pass
+            raise
+        y += lh + line_spacing
+    
+    try:
+        if log:
+            log(f"[CAPTION-GEN] ✓ Caption image generated successfully!")
+            log(f"[CAPTION-GEN] Final image size: {img.size[0]}x{img.size[1]}px")
+            log(f"[CAPTION-GEN] ═══════════════════════════════════════════════")
+    except Exception:
+        pass
+    
+    return img
+
+class CaptionSprite:
+    """A rendered caption split once into what MoviePy needs: RGB pixels and a 0..1 float mask."""
+    __slots__ = ("rgb", "mask", "visible")
+
+    def __init__(self, rgba):
+        rgba = np.asarray(rgba, dtype=np.uint8)
+        self.rgb = np.ascontiguousarray(rgba[..., :3])
+        self.mask = rgba[..., 3].astype(np.float32) / 255.0
+        self.visible = bool(rgba[..., 3].any())
+
+    @property
+    def nbytes(self):
+        return self.rgb.nbytes + self.mask.nbytes
+
+    @property
+    def size(self):
+        return self.rgb.shape[1], self.rgb.shape[0]
+
+    def to_rgba(self):
+        alpha = np.rint(self.mask * 255.0).astype(np.uint8)
+        return np.dstack([self.rgb, alpha])
+
+
+def caption_sprite_key(text, config):
+    """Content address of a caption image: normalized text + every style input of generate_caption_image."""
+    parts = (
+        "v1",
+        normalize_text((text or "").strip()),
+        str(config.caption_font_path or config.caption_font_preferred),
+        int(config.caption_font_size),
+        tuple(config.caption_text_color),
+        tuple(config.caption_stroke_color),
+        int(config.caption_stroke_width),
+        int(config.width),
+    )
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+class CaptionSpriteCache:
+    """
+    Content-addressed cache of rendered caption sprites.
+
+    Memory tier: LRU bounded by total sprite bytes. Disk tier (optional): one RGBA PNG per key under
+    disk_dir, shared by all jobs and app runs. Thread-safe; rendering happens outside the lock.
+    """
+
+    def __init__(self, max_mb=CAPTION_SPRITE_CACHE_MB, disk_dir=None):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.disk_dir = disk_dir
+        self._sprites = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + ".png") if self.disk_dir else None
+
+    def _remember(self, key, sprite):
+        with self._lock:
+            old = self._sprites.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            if sprite.nbytes > self.max_bytes:
+                return
+            self._sprites[key] = sprite
+            self._bytes += sprite.nbytes
+            while self._bytes > self.max_bytes and self._sprites:
+                _, evicted = self._sprites.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def get(self, key):
+        """Return the cached CaptionSprite for key (memory, then disk) or None."""
+        with self._lock:
+            sprite = self._sprites.get(key)
+            if sprite is not None:
+                self._sprites.move_to_end(key)
+                self.hits += 1
+                return sprite
+        path = self._disk_path(key)
+        if path and os.path.exists(path):
+            try:
+                with Image.open(path) as im:
+                    sprite = CaptionSprite(np.array(im.convert("RGBA")))
+                self._remember(key, sprite)
+                with self._lock:
+                    self.disk_hits += 1
+                return sprite
+            except Exception:
+                pass
+        return None
+
+    def put(self, key, rgba):
+        """Store an RGBA array (or PIL image) under key; returns the CaptionSprite."""
+        if isinstance(rgba, Image.Image):
+            rgba = np.array(rgba.convert("RGBA"))
+        sprite = CaptionSprite(rgba)
+        self._remember(key, sprite)
+        path = self._disk_path(key)
+        if path and not os.path.exists(path):
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                Image.fromarray(np.asarray(rgba, dtype=np.uint8), "RGBA").save(tmp_path, format="PNG")
+                os.replace(tmp_path, path)
+            except Exception:
+                pass
+        return sprite
+
+    def get_or_render(self, text, config, preferred_font=None, log=None):
+        """Return the CaptionSprite for text, rendering with generate_caption_image on a miss."""
+        if preferred_font and preferred_font != config.caption_font_preferred:
+            config = replace(config, caption_font_preferred=preferred_font, caption_font_path=None)
+        key = caption_sprite_key(text, config)
+        sprite = self.get(key)
+        if sprite is not None:
+            return sprite
+        with self._lock:
+            self.misses += 1
+        img = generate_caption_image(text, log=log, config=config)
+        if img is None:
+            return None
+        return self.put(key, img)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._sprites),
+                "resident_mb": self._bytes / (1024 * 1024),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._sprites.clear()
+            self._bytes = 0
+
+
+CAPTION_SPRITES = CaptionSpriteCache(
+    CAPTION_SPRITE_CACHE_MB,
+    disk_dir=os.path.join(CACHE_ROOT, "caption_sprites") if CAPTION_SPRITE_DISK_CACHE else None,
+)
+
+_CAPTION_POOL = None  # (workers, ProcessPoolExecutor) shared by every job in this process
+_CAPTION_POOL_LOCK = threading.Lock()
+
+def caption_raster_pool(workers):
+    """
+    The process-wide caption pool (caption_worker, from worker_pool_context) with at least `workers`
+    processes. Started on first use and reused by later jobs - under spawn every worker imports this
+    module, which costs far more than a batch of captions. Returns (pool, started_now).
+    """
+    global _CAPTION_POOL
+    with _CAPTION_POOL_LOCK:
+        current = _CAPTION_POOL
+        if current is not None and current[0] >= workers:
+            return current[1], False
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=worker_pool_context(),
+                                   initializer=caption_worker.init, initargs=(generate_caption_image,))
+        _CAPTION_POOL = (workers, pool)
+    if current is not None:
+        current[1].shutdown(wait=False)  # work already queued on the smaller pool still finishes
+    return pool, True
+
+def _discard_caption_pool(pool):
+    """Drop a pool that failed (e.g. a worker died) so the next batch starts a fresh one."""
+    global _CAPTION_POOL
+    with _CAPTION_POOL_LOCK:
+        if _CAPTION_POOL is not None and _CAPTION_POOL[1] is pool:
+            _CAPTION_POOL = None
+    try:
+        pool.shutdown(wait=False)
+    except Exception:
+        pass
+
+def render_caption_sprites(texts, config, preferred_font=None, log=None, cache=None, workers=None):
+    """
+    Batch stage for caption rasterization: returns {text: CaptionSprite or None} for every text.
+
+    Cached sprites are reused; the remaining unique texts are rendered on the long-lived caption
+    pool (caption_raster_pool) and stored in the cache. Small batches, or a pool that fails, fall
+    back to rendering in-process; the log line says which path was taken.
+    """
+    cache = CAPTION_SPRITES if cache is None else cache
+    if preferred_font and preferred_font != config.caption_font_preferred:
+        config = replace(config, caption_font_preferred=preferred_font, caption_font_path=None)
+
+    sprites, keys, todo = {}, {}, []
+    for text in texts:
+        if text in keys:
+            continue
+        keys[text] = caption_sprite_key(text, config)
+        sprite = cache.get(keys[text])
+        if sprite is not None:
+            sprites[text] = sprite
+        else:
+            todo.append(text)
+    if not todo:
+        return sprites
+
+    with cache._lock:
+        cache.misses += len(todo)
+    if workers is None:
+        workers = CAPTION_RASTER_WORKERS or min(4, (os.cpu_count() or 1) // 2)
+    workers = max(1, min(int(workers), len(todo)))
+    t0 = time.time()
+    if workers <= 1:
+        path = "in-process"
+    elif len(todo) < CAPTION_RASTER_MIN_BATCH:
+        path = f"in-process (batch below CAPTION_RASTER_MIN_BATCH={CAPTION_RASTER_MIN_BATCH})"
+        workers = 1
+    else:
+        pool = None
+        try:
+            pool, started = caption_raster_pool(workers)
+            path = f"process pool ({'started' if started else 'reused'})"
+            # hand workers the font file itself so they skip the font search
+            worker_config = config if config.caption_font_path else config.with_resolved_font(log=log)
+            chunksize = max(1, len(todo) // (workers * 4))
+            tasks = [(worker_config, text) for text in todo]
+            for text, shape, data in pool.map(caption_worker.render, tasks, chunksize=chunksize):
+                if data is None:
+                    sprites[text] = None
+                    continue
+                rgba = np.frombuffer(data, dtype=np.uint8).reshape(shape)
+                sprites[text] = cache.put(keys[text], rgba)
+        except Exception as e:
+            if pool is not None:
+                _discard_caption_pool(pool)
+            try:
+                log(f"[CAPTIONS] Process pool unavailable ({e}), rendering in-process")
             except Exception:
                 pass
-            raise
-        y += lh + line_spacing
-    
+            path = "in-process (pool failed)"
+            workers = 1
+    for text in todo:
+        if text not in sprites:
+            img = generate_caption_image(text, log=log, config=config)
+            sprites[text] = cache.put(keys[text], img) if img is not None else None
+
     try:
-        if log:
-            log(f"[CAPTION-GEN] ✓ Caption image generated successfully!")
-            log(f"[CAPTION-GEN] Final image size: {img.size[0]}x{img.size[1]}px")
-            log(f"[CAPTION-GEN] ═══════════════════════════════════════════════")
+        log(f"[CAPTIONS] Rasterized {len(todo)} caption(s) with {workers} worker(s) in {time.time() - t0:.2f}s "
+            f"({len(sprites) - len(todo)} cached), {path}")
     except Exception:
         pass
-    
-    return img
+    return sprites
+
+def write_caption_overlay_track(placements, config, work_dir, duration=None, log=None):
+    """
+    Pack timed caption sprites into one transparent overlay stream for ffmpeg.
+
+    placements: list of {'start', 'end', 'sprite'} (CaptionSprite) in compositing order; where
+    captions overlap the later one wins, as with MoviePy layers. Writes one PNG strip per distinct
+    caption (plus one blank strip) and an ffconcat index holding one frame per caption change, so
+    the export overlays a single input no matter how many captions there are.
+
+    Returns (ffconcat_path, overlay_y) or (None, None) when there is nothing to draw. Strips are
+    bottom-aligned in a band as tall as the tallest caption; overlay_y places that band at
+    height - band_h + caption_y_offset, the same spot compose uses for each ImageClip.
+    """
+    placements = [p for p in placements if p.get("sprite") is not None and p["sprite"].visible
+                  and float(p["end"]) > float(p["start"])]
+    if not placements:
+        return None, None
+
+    band_w = max(p["sprite"].size[0] for p in placements)
+    band_h = max(p["sprite"].size[1] for p in placements)
+    os.makedirs(work_dir, exist_ok=True)
+
+    # Which caption is on top for each interval between consecutive start/end times: one sweep over
+    # the start/end events, with the active placements in a max-heap of indices (the later one wins).
+    # Times are rounded to the index's microseconds so float noise can't leave zero-length slivers.
+    starts = sorted((max(0.0, round(float(p["start"]), 6)), idx) for idx, p in enumerate(placements))
+    ends = sorted((max(0.0, round(float(p["end"]), 6)), idx) for idx, p in enumerate(placements))
+    cuts = sorted({0.0} | {t for t, _ in starts} | {t for t, _ in ends})
+    active, ended = [], set()
+    next_start = next_end = 0
+    timeline = []  # [(placement index or None, start, end)]
+    for t0, t1 in zip(cuts, cuts[1:]):
+        while next_start < len(starts) and starts[next_start][0] <= t0:
+            heapq.heappush(active, -starts[next_start][1])
+            next_start += 1
+        while next_end < len(ends) and ends[next_end][0] <= t0:
+            ended.add(ends[next_end][1])
+            next_end += 1
+        while active and -active[0] in ended:
+            heapq.heappop(active)
+        top = -active[0] if active else None
+        if timeline and timeline[-1][0] is not None and top is not None \
+                and placements[timeline[-1][0]]["sprite"] is placements[top]["sprite"]:
+            timeline[-1] = (timeline[-1][0], timeline[-1][1], t1)
+        elif timeline and timeline[-1][0] is None and top is None:
+            timeline[-1] = (None, timeline[-1][1], t1)
+        else:
+            timeline.append((top, t0, t1))
+    end_time = max(cuts[-1], float(duration or 0.0))
+    if end_time > cuts[-1]:
+        timeline.append((None, cuts[-1], end_time))
+
+    # One strip per distinct sprite (repeated captions reuse the same file)
+    strip_names = {}
+
+    def _strip_for(sprite):
+        key = "blank" if sprite is None else id(sprite)
+        if key not in strip_names:
+            band = np.zeros((band_h, band_w, 4), dtype=np.uint8)
+            if sprite is not None:
+                sw, sh = sprite.size
+                x = (band_w - sw) // 2
+                band[band_h - sh:, x:x + sw] = sprite.to_rgba()
+            name = f"caption_{len(strip_names):05d}.png"
+            Image.fromarray(band, "RGBA").save(os.path.join(work_dir, name), format="PNG", compress_level=1)
+            strip_names[key] = name
+        return strip_names[key]
+
+    lines = ["ffconcat version 1.0"]
+    for idx, t0, t1 in timeline:
+        name = _strip_for(placements[idx]["sprite"] if idx is not None else None)
+        lines.append(f"file '{name}'")
+        lines.append(f"duration {t1 - t0:.6f}")
+    # the concat demuxer only honours the last entry's duration if the file is listed again
+    lines.append(f"file '{_strip_for(None)}'")
+    concat_path = os.path.join(work_dir, "captions.ffconcat")
+    with open(concat_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+    overlay_y = config.height - band_h + int(config.caption_y_offset)
+    try:
+        log(f"[CAPTIONS] Overlay track: {len(placements)} captions -> {len(timeline)} changes, "
+            f"{len(strip_names)} strips of {band_w}x{band_h} at y={overlay_y}")
+    except Exception:
+        pass
+    return concat_path, overlay_y
+
 # ----------------- preview helpers (with timeline support) -----------------
 def extract_and_scale_frame(video_path, time_sec=None, desired_width=360):
     # video_path may be a path (str) or a VideoFileClip instance. If it's a clip, reuse it.
@@ -1759,77 +4994,178 @@ def _rgba_to_hex(rgba_tuple):
         return "0xFFFFFF"  # Default to white
 
 
-def _generate_ass_subtitle_file(caption_segments, output_path, font_name="Arial", fontsize=56, 
-                                text_color_rgba=(255, 255, 0, 255), stroke_width=3):
+def _ass_color(rgba):
+    """RGBA tuple -> ASS &HAABBGGRR (ASS alpha is inverted: 00 = opaque)."""
+    r, g, b, a = (max(0, min(255, int(c))) for c in tuple(rgba) + (255,) * (4 - len(rgba)))
+    return f"&H{255 - a:02X}{b:02X}{g:02X}{r:02X}"
+
+
+def _ass_time(t):
+    """Seconds -> ASS H:MM:SS.CS"""
+    cs = int(round(max(0.0, float(t)) * 100))
+    return f"{cs // 360000}:{(cs // 6000) % 60:02d}:{(cs // 100) % 60:02d}.{cs % 100:02d}"
+
+
+def _ass_escape(text):
+    """Keep caption text from being read as override blocks or escapes."""
+    return text.replace("\\", "/").replace("{", "(").replace("}", ")")
+
+
+def _ass_rounded_rect(w, h, r, x=0, y=0):
+    """ASS drawing path (\\p1 / vector \\iclip) for a w x h rectangle at (x, y) with corner radius r."""
+    r = max(0, min(r, w / 2.0, h / 2.0))
+    c = r * 0.448  # bezier handle offset from the corner (1 - 0.552)
+    pts = [
+        (r, 0), (w - r, 0), (w - c, 0, w, c, w, r),
+        (w, h - r), (w, h - c, w - c, h, w - r, h),
+        (r, h), (c, h, 0, h - c, 0, h - r),
+        (0, r), (0, c, c, 0, r, 0),
+    ]
+    cmds = []
+    for i, p in enumerate(pts):
+        coords = " ".join(f"{v + (x if j % 2 == 0 else y):.1f}" for j, v in enumerate(p))
+        cmds.append(("m " if i == 0 else "b " if len(p) == 6 else "l ") + coords)
+    return " ".join(cmds)
+
+
+def _font_ass_size(font, size):
     """
-    Generate an ASS (Advanced SubStation Alpha) subtitle file for word-by-word captions.
-    
+    Fontsize for libass that renders `font` at the same pixel size PIL uses for `size`.
+    libass scales a font so usWinAscent + usWinDescent (OS/2 table) span the font size, PIL scales
+    the em square; read both from the font file, falling back to PIL's ascent + descent.
+    """
+    import struct
+    try:
+        with open(font.path, "rb") as f:
+            data = f.read()
+        offset = 12 if data[:4] != b"ttcf" else struct.unpack(">I", data[12:16])[0] + 12
+        num_tables = struct.unpack(">H", data[offset - 8:offset - 6])[0]
+        tables = {}
+        for i in range(num_tables):
+            tag, _, tbl_off, _ = struct.unpack(">4sIII", data[offset + 16 * i:offset + 16 * i + 16])
+            tables[tag] = tbl_off
+        units_per_em = struct.unpack(">H", data[tables[b"head"] + 18:tables[b"head"] + 20])[0]
+        win_ascent, win_descent = struct.unpack(">HH", data[tables[b"OS/2"] + 74:tables[b"OS/2"] + 78])
+        return round(size * (win_ascent + win_descent) / float(units_per_em), 2)
+    except Exception:
+        try:
+            ascent, descent = font.getmetrics()
+            return ascent + descent
+        except Exception:
+            return size
+
+
+def _ass_karaoke_lines(lines, words, start):
+    """
+    Split Whisper word timings over the wrapped lines as \\k tags (centiseconds).
+    Returns one tagged string per line, or None when the timings don't line up with the text.
+    """
+    line_words = [line.split() for line in lines]
+    if not words or sum(len(lw) for lw in line_words) != len(words):
+        return None
+    starts = [float(w.get("start", start)) for w in words]
+    ends = [float(w.get("end", s)) for w, s in zip(words, starts)]
+    durs = [max(0, int(round(((starts[i + 1] if i + 1 < len(words) else ends[i]) - starts[i]) * 100)))
+            for i in range(len(words))]
+    lead = max(0, int(round((starts[0] - start) * 100)))
+    tagged, idx = [], 0
+    for lw in line_words:
+        parts = [f"{{\\k{lead + sum(durs[:idx])}}}"] if lead + sum(durs[:idx]) else []
+        parts.append(" ".join(f"{{\\k{durs[idx + j]}}}{_ass_escape(word)}" for j, word in enumerate(lw)))
+        tagged.append("".join(parts))
+        idx += len(lw)
+    return tagged
+
+
+def _generate_ass_subtitle_file(caption_segments, output_path, config, log=None):
+    """
+    Generate an ASS (Advanced SubStation Alpha) subtitle file for word-by-word captions that
+    libass renders like generate_caption_image: same font and pixel size, line wrapping and
+    position (caption_layout + caption_y_offset), text/stroke colors, and the blurred shadow edge
+    under the caption bubble. PlayRes matches the output resolution, so all sizes are in output pixels.
+
+    With config.caption_highlight_color set and Whisper word timings on a caption ('words'),
+    words switch to the highlight color as they are spoken (\\k karaoke tags).
+
     Args:
-        caption_segments: List of caption dictionaries with 'text', 'start', 'end'
+        caption_segments: List of caption dictionaries with 'text', 'start', 'end' (optional 'words')
         output_path: Path where to save the .ass file
-        font_name: Font name (e.g., "Bangers", "Arial")
-        fontsize: Font size in pixels
-        text_color_rgba: Text color as RGBA tuple
-        stroke_width: Outline/border width
+        config: RenderConfig with the job's caption style
         
     Returns:
-        Path to generated ASS file
+        (path to generated ASS file, directory of the font file or None)
     """
-    import re
-    
-    # Convert RGBA to ASS color format (BGR in hex with alpha)
-    # ASS uses &HAABBGGRR format
-    r, g, b, a = text_color_rgba
-    # Convert alpha: 255 = fully opaque = 00, 0 = fully transparent = FF
-    alpha_hex = f"{255 - int(a):02X}"
-    text_color_ass = f"&H{alpha_hex}{b:02X}{g:02X}{r:02X}"
-    outline_color_ass = "&H00000000"  # Black outline, fully opaque
-    
-    # ASS file header
-    ass_content = f"""[Script Info]
-Title: Generated Subtitles
-ScriptType: v4.00+
-WrapStyle: 0
-PlayResX: 1080
-PlayResY: 1920
-ScaledBorderAndShadow: yes
-
-[V4+ Styles]
-Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
-Style: Default,{font_name},{fontsize},{text_color_ass},&H00FFFFFF,{outline_color_ass},&H00000000,0,0,0,0,100,100,0,0,1,{stroke_width},0,2,10,10,150,1
-
-[Events]
-Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
-"""
-    
-    # Add each caption as a dialogue line
+    font, font_path = get_render_font(config.caption_font_path or config.caption_font_preferred,
+                                      config.caption_font_size, log=log)
+    try:
+        family = font.getname()[0]
+    except Exception:
+        family = "Arial"
+    ass_fontsize = _font_ass_size(font, config.caption_font_size)
+
+    width, height = int(config.width), int(config.height)
+    stroke_w = max(3, int(config.caption_stroke_width))  # same minimum as generate_caption_image
+    text_color = _ass_color(config.caption_text_color)
+    stroke_color = _ass_color(tuple(config.caption_stroke_color)[:3] + (255,))
+    highlight = config.caption_highlight_color
+    primary = _ass_color(highlight) if highlight else text_color
+
+    lines_out = [
+        "[Script Info]",
+        "Title: Generated Subtitles",
+        "ScriptType: v4.00+",
+        "WrapStyle: 2",
+        f"PlayResX: {width}",
+        f"PlayResY: {height}",
+        "ScaledBorderAndShadow: yes",
+        "YCbCr Matrix: None",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+        f"Style: Caption,{family},{ass_fontsize},{primary},{text_color},{stroke_color},&H00000000,0,0,0,0,100,100,0,0,1,{stroke_w},0,7,0,0,0,1",
+        "Style: Shadow,Arial,20,&H62000000,&H62000000,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,0,0,7,0,0,0,1",
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+
     for segment in caption_segments:
-        # Convert time to ASS format (H:MM:SS.CS where CS is centiseconds)
-        start_time = segment['start']
-        end_time = segment['end']
-        
-        start_h = int(start_time // 3600)
-        start_m = int((start_time % 3600) // 60)
-        start_s = int(start_time % 60)
-        start_cs = int((start_time % 1) * 100)
-        start_str = f"{start_h}:{start_m:02d}:{start_s:02d}.{start_cs:02d}"
-        
-        end_h = int(end_time // 3600)
-        end_m = int((end_time % 3600) // 60)
-        end_s = int(end_time % 60)
-        end_cs = int((end_time % 1) * 100)
-        end_str = f"{end_h}:{end_m:02d}:{end_s:02d}.{end_cs:02d}"
-        
-        # Escape text for ASS (replace newlines with \N)
-        text = segment['text'].replace('\n', '\\N')
-        
-        ass_content += f"Dialogue: 0,{start_str},{end_str},Default,,0,0,0,,{text}\n"
-    
-    # Write ASS file
+        text = normalize_text(str(segment.get('text', '')).replace('\n', ' ').strip())
+        if not text:
+            continue
+        start, end = float(segment['start']), float(segment['end'])
+        t0, t1 = _ass_time(start), _ass_time(end)
+        layout = caption_layout(text, font, width, config.caption_font_size)
+
+        # Same placement as the ImageClip in compose: image bottom at height + caption_y_offset
+        img_top = height - layout["image_height"] + int(config.caption_y_offset)
+        bubble_x0 = (width - layout["bubble_width"]) // 2
+        bubble_y0 = img_top + 4
+        box_h = layout["total_height"] - layout["extra_bottom_margin"]
+        radius = int(layout["padding_y"] * 0.8)
+        # The PIL caption pastes a blurred dark box 2px below the (transparent) bubble and then
+        # clears the bubble area, so only the box's edge shows; draw the same remnant
+        bubble_path = _ass_rounded_rect(layout["bubble_width"], box_h, radius, bubble_x0, bubble_y0)
+        lines_out.append(
+            f"Dialogue: 0,{t0},{t1},Shadow,,0,0,0,,{{\\pos({bubble_x0},{bubble_y0 + 2})\\blur2"
+            f"\\iclip({bubble_path})\\p1}}{_ass_rounded_rect(layout['bubble_width'], box_h, radius)}{{\\p0}}"
+        )
+
+        tagged = _ass_karaoke_lines(layout["lines"], segment.get("words"), start) if highlight else None
+        y = bubble_y0 + layout["padding_y"]
+        for i, line in enumerate(layout["lines"]):
+            x = bubble_x0 + (layout["bubble_width"] - layout["line_widths"][i]) // 2
+            body = tagged[i] if tagged else _ass_escape(line)
+            if highlight and not tagged:
+                body = f"{{\\1c{text_color}}}" + body  # no word timings: plain text color
+            lines_out.append(f"Dialogue: 1,{t0},{t1},Caption,,0,0,0,,{{\\pos({x},{y})}}{body}")
+            y += layout["line_heights"][i] + layout["line_spacing"]
+
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(ass_content)
-    
-    return output_path
+        f.write("\n".join(lines_out) + "\n")
+
+    fonts_dir = os.path.dirname(font_path) if font_path and os.path.isfile(font_path) else None
+    return output_path, fonts_dir
 
 
 def _build_caption_drawtext_filter(caption_text, start_time, end_time, video_width, video_height, 
@@ -1929,7 +5265,75 @@ def _build_all_caption_filters(caption_segments, video_width, video_height,
     return ','.join(filters)
 
 
-def _export_with_ffmpeg_filters(bg_path, fg_path, caption_segments, audio_path, output_path, video_width, video_height, log_fn):
+def _build_caption_burn_filter(caption_segments, video_width, video_height, config, log_fn, work_dir=None):
+    """
+    Build the caption burn-in part of an FFmpeg filter chain for `caption_segments`.
+
+    Returns a string to append to a video filter chain (starting with ',' or empty). Captions are
+    written to an ASS subtitle file (in work_dir, or a new temp dir) styled like the PIL captions
+    and burned in by libass in one `ass` filter, whatever the caption count. If the ASS file can't
+    be written, or ffmpeg was built without libass, one drawtext filter per caption is chained
+    instead. Raises RuntimeError when this ffmpeg has neither filter, so callers fall back to
+    rendering captions themselves.
+    """
+    if not caption_segments:
+        return ""
+    if not FFMPEG_CAPS.has_filter("ass") and not FFMPEG_CAPS.has_filter("drawtext"):
+        raise RuntimeError("ffmpeg has neither the 'ass' nor the 'drawtext' filter")
+
+    try:
+        if not FFMPEG_CAPS.has_filter("ass"):
+            raise RuntimeError("ffmpeg was built without libass")
+        temp_dir = work_dir or tempfile.mkdtemp(prefix="tiktok_subtitles_")
+        ass_subtitle_path, fonts_dir = _generate_ass_subtitle_file(
+            caption_segments,
+            os.path.join(temp_dir, "captions.ass"),
+            config,
+            log=log_fn
+        )
+        log_fn(f"[EXPORT] ASS subtitle file generated for {len(caption_segments)} captions: {ass_subtitle_path}")
+        # Escape paths for the filter graph (Windows drive letters / backslashes)
+        escaped_ass_path = ass_subtitle_path.replace('\\', '/').replace(':', '\\:')
+        ass_filter = f",ass='{escaped_ass_path}'"
+        if fonts_dir:
+            ass_filter += ":fontsdir='" + fonts_dir.replace('\\', '/').replace(':', '\\:') + "'"
+        return ass_filter
+    except Exception as e:
+        if not FFMPEG_CAPS.has_filter("drawtext"):
+            raise
+        log_fn(f"[EXPORT] Warning: ASS captions failed ({e}), using drawtext filters")
+
+    # Get font and color settings for this job
+    try:
+        font_path = config.caption_font_path
+        text_color_rgba = config.caption_text_color
+        stroke_width = config.caption_stroke_width
+        words_per_caption = globals().get('WORDS_PER_CAPTION', None)  # Get words per caption setting
+        text_color_hex = _rgba_to_hex(text_color_rgba)
+        stroke_color_hex = _rgba_to_hex(config.caption_stroke_color)
+    except Exception as e:
+        log_fn(f"[EXPORT] Warning: Could not get custom settings, using defaults: {e}")
+        font_path = None
+        text_color_hex = "0xFFFFFF"
+        stroke_color_hex = "0x000000"
+        stroke_width = 3
+        words_per_caption = None
+
+    log_fn(f"[EXPORT] Using drawtext filters for {len(caption_segments)} captions")
+    caption_filters = _build_all_caption_filters(
+        caption_segments, video_width, video_height,
+        font_path=font_path,
+        text_color=text_color_hex,
+        stroke_color=stroke_color_hex,
+        stroke_width=stroke_width,
+        words_per_line=words_per_caption  # Pass words per caption setting
+    )
+    if caption_filters:
+        return "," + caption_filters
+    return ""
+
+
+def _export_with_ffmpeg_filters(bg_path, fg_path, caption_segments, audio_path, output_path, video_width, video_height, log_fn, config=None, effect_settings=None, caption_overlay=None, effects_mean_luma=None):
     """
     Fast export using pure FFmpeg complex filters.
     2-3x faster than MoviePy's Python frame processing.
@@ -1943,91 +5347,38 @@ def _export_with_ffmpeg_filters(bg_path, fg_path, caption_segments, audio_path,
         video_width: Video width
         video_height: Video height
         log_fn: Logging function
+        config: RenderConfig with the job's font/color settings (defaults to current globals)
+        effect_settings: CapCut-style effects, applied to the foreground as ffmpeg filters
+        effects_mean_luma: contrast pivot (frame_mean_luma of the frame compose sampled)
+        caption_overlay: (ffconcat_path, y) from write_caption_overlay_track; when given, captions
+            are one pre-rendered overlay input instead of drawtext/ASS filters
         
     Returns:
         True if successful, False otherwise
     """
+    if config is None:
+        config = RenderConfig.from_globals()
     try:
         log_fn("[EXPORT] ═══════════════════════════════════════════════════")
         log_fn("[EXPORT] Using fast FFmpeg filter-based export...")
         log_fn(f"[EXPORT] Building filter chain for {len(caption_segments)} caption segments...")
         
-        # Get current font and color settings from globals
-        try:
-            font_path = globals().get('LOADED_FONT_PATH', None)
-            text_color_rgba = globals().get('CAPTION_TEXT_COLOR', (255, 255, 255, 255))
-            stroke_width = globals().get('CAPTION_STROKE_WIDTH', 3)
-            words_per_caption = globals().get('WORDS_PER_CAPTION', None)  # Get words per caption setting
-            
-            # Convert colors to hex for FFmpeg
-            text_color_hex = _rgba_to_hex(text_color_rgba)
-            stroke_color_hex = "0x000000"  # Black stroke (can be made customizable later)
-            
-            if font_path:
-                log_fn(f"[EXPORT] Using custom font: {font_path}")
-            log_fn(f"[EXPORT] Text color: {text_color_hex} (RGBA: {text_color_rgba})")
-            log_fn(f"[EXPORT] Stroke width: {stroke_width}px")
-            if words_per_caption:
-                log_fn(f"[EXPORT] Words per caption: {words_per_caption}")
-        except Exception as e:
-            log_fn(f"[EXPORT] Warning: Could not get custom settings, using defaults: {e}")
-            font_path = None
-            text_color_hex = "0xFFFFFF"
-            stroke_color_hex = "0x000000"
-            stroke_width = 3
-            words_per_caption = None
-        
-        # For many captions (>100), use subtitle file approach to avoid command line length limits
-        # Otherwise use drawtext filters for better compatibility
-        use_subtitle_file = len(caption_segments) > 100
-        ass_subtitle_path = None
-        
-        if use_subtitle_file:
-            log_fn(f"[EXPORT] Using ASS subtitle file for {len(caption_segments)} captions (efficient for many captions)")
-            # Generate ASS subtitle file in temp directory
-            import tempfile
-            temp_dir = tempfile.mkdtemp(prefix="tiktok_subtitles_")
-            ass_subtitle_path = os.path.join(temp_dir, "captions.ass")
-            
-            # Extract font name from font path
-            font_name = "Arial"  # Default
-            if font_path and os.path.exists(font_path):
-                font_name = os.path.splitext(os.path.basename(font_path))[0]
-            
-            _generate_ass_subtitle_file(
-                caption_segments, 
-                ass_subtitle_path,
-                font_name=font_name,
-                fontsize=56,
-                text_color_rgba=text_color_rgba,
-                stroke_width=stroke_width
-            )
-            log_fn(f"[EXPORT] ASS subtitle file generated: {ass_subtitle_path}")
-            caption_filters = None
+        if caption_overlay:
+            caption_filter = f"[cbase];[cbase][3:v]overlay=x=(W-w)/2:y={int(caption_overlay[1])}:eof_action=pass"
+            log_fn(f"[EXPORT] Captions from pre-rendered overlay track: {caption_overlay[0]}")
         else:
-            log_fn(f"[EXPORT] Using drawtext filters for {len(caption_segments)} captions")
-            # Build caption filters with custom styling and words per caption
-            caption_filters = _build_all_caption_filters(
-                caption_segments, video_width, video_height,
-                font_path=font_path,
-                text_color=text_color_hex,
-                stroke_color=stroke_color_hex,
-                stroke_width=stroke_width,
-                words_per_line=words_per_caption  # Pass words per caption setting
-            )
+            caption_filter = _build_caption_burn_filter(caption_segments, video_width, video_height, config, log_fn)
+        effects_filter = build_effects_filter_chain(effect_settings, mean_luma=effects_mean_luma)
         
         # Build complete filter chain
-        # [0:v] = background, [1:v] = foreground
+        # [0:v] = background, [1:v] = foreground, [3:v] = caption overlay track (optional)
         # Overlay foreground on background centered (x=(W-w)/2) to fill width and crop equally from both sides
-        if use_subtitle_file and ass_subtitle_path:
-            # Use ass subtitle filter (burns subtitles into video)
-            # Escape path for Windows
-            escaped_ass_path = ass_subtitle_path.replace('\\', '/').replace(':', '\\:')
-            filter_chain = f"[0:v][1:v]overlay=x=(W-w)/2:y=(H-h)/2,ass='{escaped_ass_path}'"
+        if effects_filter:
+            log_fn(f"[EXPORT] Effects as ffmpeg filters: {effects_filter}")
+            filter_chain = f"[1:v]{effects_filter}[fgfx];[0:v][fgfx]overlay=x=(W-w)/2:y=(H-h)/2" + caption_filter
         else:
-            filter_chain = f"[0:v][1:v]overlay=x=(W-w)/2:y=(H-h)/2"
-            if caption_filters:
-                filter_chain += "," + caption_filters
+            filter_chain = f"[0:v][1:v]overlay=x=(W-w)/2:y=(H-h)/2" + caption_filter
+        filter_chain += "[vout]"
         
         # Build FFmpeg command
         cmd = [
@@ -2035,13 +5386,17 @@ def _export_with_ffmpeg_filters(bg_path, fg_path, caption_segments, audio_path,
             "-loop", "1", "-i", bg_path,  # Background (looped image)
             "-i", fg_path,                # Foreground video
             "-i", audio_path,             # Audio
+        ]
+        if caption_overlay:
+            cmd.extend(["-f", "concat", "-safe", "0", "-i", caption_overlay[0]])
+        cmd.extend([
             "-filter_complex", filter_chain,
-            "-map", "0:v",                # Use video from filter chain
+            "-map", "[vout]",             # Use video from filter chain
             "-map", "2:a",                # Use audio from audio file
             "-shortest",                   # End when shortest input ends
             "-c:a", "aac",                # Audio codec
             "-b:a", "192k",               # Audio bitrate
-        ]
+        ])
         
         # Add video encoding parameters
         if USE_GPU_IF_AVAILABLE and ffmpeg_supports_nvenc(PREFERRED_NVENC_CODEC):
@@ -2095,6 +5450,207 @@ def _export_with_ffmpeg_filters(bg_path, fg_path, caption_segments, audio_path,
         return False
 
 
+# ----------------- single-pass ffmpeg render -----------------
+def _even(value):
+    """Round to the nearest even integer >= 2 (yuv420p needs even frame sizes)."""
+    return max(2, int(round(float(value) / 2.0)) * 2)
+
+def probe_media_duration(path):
+    """Return the container duration of `path` in seconds (from the cached probe_media), or None."""
+    info = probe_media(path)
+    return info.duration if info is not None and info.duration else None
+
+def sample_mean_luma(video_path, time_sec, crop=None):
+    """frame_mean_luma of the (cropped) source frame at time_sec, decoded small by ffmpeg; None on failure."""
+    vf = "scale=64:-2:flags=area"
+    if crop is not None:
+        crop_x, crop_y, crop_w, crop_h = [int(v) for v in crop]
+        vf = f"crop={crop_w}:{crop_h}:{crop_x}:{crop_y}," + vf
+    cmd = ["ffmpeg", "-nostdin", "-v", "error", "-ss", f"{float(time_sec):.3f}", "-i", video_path,
+           "-frames:v", "1", "-vf", vf, "-f", "rawvideo", "-pix_fmt", "rgb24", "-"]
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=60)
+    except Exception:
+        return None
+    if result.returncode != 0 or len(result.stdout) < 3:
+        return None
+    return frame_mean_luma(np.frombuffer(result.stdout, np.uint8)[:len(result.stdout) // 3 * 3])
+
+def build_single_pass_render_cmd(video_path, voice_path, music_path, output_path, config, crop, source_duration,
+                                 target_duration, music_duration, caption_filter="", mirror_video=False,
+                                 use_nvenc=False, max_speed_change=2.0, effect_settings=None, effects_mean_luma=None):
+    """
+    Build one ffmpeg command that renders a whole job: crop, scale, speed change (setpts), mirror,
+    effects, static blurred background, overlay, caption burn-in, voice/music mix and the final encode.
+
+    The source is decoded once (plus a single seeked frame for the background) and encoded once,
+    replacing pre-render -> MoviePy decode -> re-encode. Timing rules mirror adjust_video_speed and
+    make_music_match_duration so both pipelines produce the same cut.
+
+    Args:
+        crop: (x, y, w, h) crop rectangle in source pixels
+        source_duration / target_duration / music_duration: seconds
+        caption_filter: string from _build_caption_burn_filter (',...' or '')
+        effects_mean_luma: contrast pivot for build_effects_filter_chain (see sample_mean_luma)
+
+    Returns:
+        (cmd, video_mode) where video_mode is 'copy', 'speed', 'loop' or 'trim'
+    """
+    crop_x, crop_y, crop_w, crop_h = [int(v) for v in crop]
+    width, height, fps = config.width, config.height, int(config.fps)
+
+    # Foreground: fill the canvas width, then apply the user's zoom (same as compose)
+    fg_w = _even(width * config.video_zoom_scale)
+    fg_h = _even(crop_h * fg_w / float(crop_w))
+
+    # Background: cover the canvas, overscale by bg_scale_extra, center-crop, blur and dim
+    bg_scale = max(width / float(crop_w), height / float(crop_h)) * float(config.bg_scale_extra)
+    bg_w = max(width, int(crop_w * bg_scale))
+    bg_h = max(height, int(crop_h * bg_scale))
+    t_mid = min(max(0.001, source_duration / 2.0), max(0.001, source_duration - 0.01))
+
+    # Speed: same bounds/fallbacks as adjust_video_speed
+    factor = source_duration / float(target_duration)
+    if abs(source_duration - target_duration) < 0.01:
+        video_mode, speed_filter = "copy", "setpts=PTS-STARTPTS"
+    elif 1.0 / max_speed_change <= factor <= max_speed_change:
+        video_mode, speed_filter = "speed", f"setpts=(PTS-STARTPTS)/{factor:.6f}"
+    elif source_duration < target_duration:
+        video_mode, speed_filter = "loop", "setpts=PTS-STARTPTS"
+    else:
+        video_mode, speed_filter = "trim", "setpts=PTS-STARTPTS"
+    mirror = ",hflip" if mirror_video else ""
+    effects = build_effects_filter_chain(effect_settings, mean_luma=effects_mean_luma)
+    effects = f",{effects}" if effects else ""
+
+    fg_chain = (f"[0:v]crop={crop_w}:{crop_h}:{crop_x}:{crop_y},"
+                f"scale={fg_w}:{fg_h}:flags=lanczos{mirror}{effects},{speed_filter},fps={fps}[fg]")
+    dim = float(config.dim_factor)
+    bg_chain = (f"[1:v]trim=end_frame=1,crop={crop_w}:{crop_h}:{crop_x}:{crop_y}{mirror},"
+                f"scale={bg_w}:{bg_h}:flags=lanczos,crop={width}:{height}:(iw-{width})/2:(ih-{height})/2,"
+                f"gblur=sigma={float(config.blur_radius):g},"
+                f"colorchannelmixer=rr={dim:g}:gg={dim:g}:bb={dim:g},"
+                f"loop=loop=-1:size=1,setpts=N/({fps}*TB)[bg]")
+    video_out = f"[bg][fg]overlay=x=(W-w)/2:y=(H-h)/2:shortest=1{caption_filter},format=yuv420p[vout]"
+
+    # Audio: voice gain + music matched to the voice (loop when short, trim + fade when long)
+    music_filters = [f"volume={float(config.music_gain):g}"]
+    loop_music = music_duration is not None and music_duration < target_duration - 0.01
+    if music_duration is not None and music_duration > target_duration + 0.01:
+        fade_start = max(0.0, target_duration - MUSIC_FADEOUT_SECONDS)
+        music_filters.append(f"afade=t=out:st={fade_start:.3f}:d={MUSIC_FADEOUT_SECONDS}")
+    audio_chain = (f"[2:a]volume={float(config.voice_gain):g}[voice];"
+                   f"[3:a]{','.join(music_filters)}[music];"
+                   f"[voice][music]amix=inputs=2:duration=first:dropout_transition=0:normalize=0[aout]")
+
+    filter_complex = ";".join([fg_chain, bg_chain, video_out, audio_chain])
+
+    cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"]
+    if USE_HARDWARE_DECODING and use_nvenc and ffmpeg_cuda_decode_available():
+        cmd.extend(["-hwaccel", "cuda"])
+    if video_mode == "loop":
+        cmd.extend(["-stream_loop", "-1"])
+    cmd.extend(["-i", video_path])
+    cmd.extend(["-ss", f"{t_mid:.3f}", "-i", video_path])
+    cmd.extend(["-i", voice_path])
+    if loop_music:
+        cmd.extend(["-stream_loop", "-1"])
+    cmd.extend(["-i", music_path])
+    cmd.extend(["-filter_complex", filter_complex, "-map", "[vout]", "-map", "[aout]",
+                "-t", f"{float(target_duration):.3f}", "-r", str(fps)])
+
+    codec, vparams, threads, audio_bitrate = get_export_settings()
+    cmd.extend(["-c:v", codec] + vparams + ["-threads", str(threads), "-c:a", "aac", "-b:a", audio_bitrate, output_path])
+    return cmd, video_mode
+
+def single_pass_skip_reason(video_path, voice_path, music_path, crop=None, log=None):
+    """
+    Why build_single_pass_render_cmd can't take these inputs (a short reason for the log), or None.
+
+    The graph reads a video stream from video_path ([0:v]/[1:v]), an audio stream from voice_path
+    ([2:a]) and from music_path ([3:a]), needs the video and voice durations, and crops inside the
+    displayed frame. Every input is checked with the cached probe_media before a graph is built.
+    """
+    names = {"video": video_path, "voice": voice_path, "music": music_path}
+    infos = {}
+    for role, path in names.items():
+        if not path:
+            return f"no {role} file"
+        infos[role] = probe_media(path, log=log)
+        if infos[role] is None:
+            return f"{role} file can't be probed ({os.path.basename(path)})"
+    video, voice, music = infos["video"], infos["voice"], infos["music"]
+    if not video.has_video:
+        return f"no video stream in {os.path.basename(video_path)}"
+    if not video.duration:
+        return f"unknown duration of {os.path.basename(video_path)}"
+    for role, info in (("voice", voice), ("music", music)):
+        if not info.has_audio:
+            return f"no audio stream in the {role} file ({os.path.basename(names[role])})"
+    if not voice.duration:
+        return f"unknown duration of {os.path.basename(voice_path)}"
+    if crop is not None:
+        crop_x, crop_y, crop_w, crop_h = [int(v) for v in crop]
+        frame_w, frame_h = video.display_size
+        if crop_w <= 0 or crop_h <= 0 or crop_x < 0 or crop_y < 0 \
+                or crop_x + crop_w > frame_w or crop_y + crop_h > frame_h:
+            return f"crop {crop_w}x{crop_h}+{crop_x}+{crop_y} outside the {frame_w}x{frame_h} frame"
+    return None
+
+def render_job_single_pass(video_path, voice_path, music_path, output_path, caption_segments, config, crop,
+                           mirror_video=False, words_per_caption=2, use_nvenc=False, log=None, effect_settings=None):
+    """
+    Render a job with build_single_pass_render_cmd. Returns True on success, False if the caller
+    should fall back to the pre-render + compose pipeline (inputs the graph can't take are logged
+    with the reason, see single_pass_skip_reason).
+    """
+    def _log(msg):
+        try:
+            if log: log(msg)
+        except Exception:
+            pass
+
+    reason = single_pass_skip_reason(video_path, voice_path, music_path, crop, log=_log)
+    if reason:
+        _log(f"[SINGLE-PASS] Skipped: {reason}")
+        return False
+    source_duration = probe_media_duration(video_path)
+    target_duration = probe_media_duration(voice_path)
+    music_duration = probe_media_duration(music_path)
+
+    caption_groups = build_caption_groups(caption_segments, words_per_caption)
+    work_dir = tempfile.mkdtemp(prefix="tiktok_single_pass_")
+    try:
+        caption_filter = _build_caption_burn_filter(caption_groups, config.width, config.height, config, _log, work_dir=work_dir)
+        mean_luma = None
+        if effect_settings and effect_settings.get('effect_contrast', False):
+            # contrast pivots on the mean luma of the frame the background is built from
+            t_mid = min(max(0.001, source_duration / 2.0), max(0.001, source_duration - 0.01))
+            mean_luma = sample_mean_luma(video_path, t_mid, crop)
+            _log(f"[SINGLE-PASS] Contrast pivot: mean luma {mean_luma if mean_luma is not None else '128 (no sample)'}")
+        cmd, video_mode = build_single_pass_render_cmd(
+            video_path, voice_path, music_path, output_path, config, crop,
+            source_duration, target_duration, music_duration,
+            caption_filter=caption_filter, mirror_video=mirror_video, use_nvenc=use_nvenc,
+            effect_settings=effect_settings, effects_mean_luma=mean_luma,
+        )
+        _log(f"[SINGLE-PASS] Rendering {len(caption_groups)} captions, video {video_mode} "
+             f"{source_duration:.2f}s -> {target_duration:.2f}s in one ffmpeg pass")
+        t0 = time.time()
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=1800)
+        if result.returncode != 0:
+            _log(f"[SINGLE-PASS] ffmpeg failed with return code {result.returncode}")
+            _log(f"[SINGLE-PASS] Error: {result.stderr[-500:]}")
+            return False
+        _log(f"[SINGLE-PASS] ✓ Rendered {os.path.basename(output_path)} in {time.time() - t0:.1f}s")
+        return True
+    except Exception as e:
+        _log(f"[SINGLE-PASS] Exception: {e}")
+        return False
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
 # ----------------- Video Effects (CapCut-style) -----------------
 def apply_video_effects(frame, effect_settings):
     """
@@ -2167,9 +5723,316 @@ def apply_video_effects(frame, effect_settings):
         return np.array(img)
     return img
 
-def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_segments, output_path, preferred_font=None, log=None, blur_radius=STATIC_BG_BLUR_RADIUS, bg_scale_extra=BG_SCALE_EXTRA, dim_factor=DIM_FACTOR, words_per_caption=2, effect_settings=None):
+EFFECT_KEYS = ('effect_sharpness', 'effect_saturation', 'effect_contrast', 'effect_brightness', 'effect_vintage')
+
+def effects_enabled(effect_settings):
+    """True if any CapCut-style effect is switched on in effect_settings."""
+    return bool(effect_settings) and any(effect_settings.get(k, False) for k in EFFECT_KEYS)
+
+def frame_mean_luma(frame):
+    """Mean ITU-R 601 luma of an RGB frame, rounded to an int like ImageEnhance.Contrast's pivot."""
+    rgb = np.asarray(frame)[..., :3].reshape(-1, 3)
+    return int(float(np.dot(rgb.mean(axis=0), (0.299, 0.587, 0.114))) + 0.5)
+
+def build_effects_filter_chain(effect_settings, mean_luma=None):
+    """
+    Translate effect_settings into an ffmpeg video filter chain (comma-joined, '' if no effects),
+    so the ffmpeg export paths apply effects without Python frame processing.
+
+    Mapping (same order as apply_video_effects):
+    - sharpness f -> unsharp 3x3 with amount (f-1)*9/13 (PIL's SMOOTH blend rewritten as unsharp-mask)
+    - saturation s -> eq=saturation=s
+    - contrast c -> lutrgb m + c*(val - m) on R/G/B, pivoting on mean_luma m like PIL (eq pivots
+      around mid-grey, which darkens dark footage); m is the frame_mean_luma of a sampled source
+      frame, 128 when not given
+    - brightness b -> colorchannelmixer scaling R/G/B by b (eq brightness is additive, PIL multiplies)
+    - vintage g -> temporal noise with strength g*25, then the sepia mix as colorchannelmixer
+    """
+    if not effects_enabled(effect_settings):
+        return ""
+    s = effect_settings
+    filters = []
+    if s.get('effect_sharpness', False):
+        amount = (float(s.get('effect_sharpness_intensity', 1.5)) - 1.0) * 9.0 / 13.0
+        amount = max(-1.5, min(5.0, amount))
+        filters.append(f"unsharp=lx=3:ly=3:la={amount:.4f}:cx=3:cy=3:ca={amount:.4f}")
+    if s.get('effect_saturation', False):
+        saturation = float(s.get('effect_saturation_intensity', 1.3))
+        filters.append(f"eq=saturation={max(0.0, min(3.0, saturation)):.4f}")
+    if s.get('effect_contrast', False):
+        contrast = float(s.get('effect_contrast_intensity', 1.2))
+        pivot = 128 if mean_luma is None else max(0, min(255, int(mean_luma)))
+        expr = f"'clip({pivot}+{contrast:.4f}*(val-{pivot}),0,255)'"
+        filters.append(f"lutrgb=r={expr}:g={expr}:b={expr}")
+    if s.get('effect_brightness', False):
+        b = max(-2.0, min(2.0, float(s.get('effect_brightness_intensity', 1.15))))
+        filters.append(f"colorchannelmixer=rr={b:.4f}:gg={b:.4f}:bb={b:.4f}")
+    if s.get('effect_vintage', False):
+        g = float(s.get('effect_vintage_intensity', 0.3))
+        k = 1.0 - g
+        strength = max(0, min(100, int(round(g * 25))))
+        if strength:
+            filters.append(f"noise=alls={strength}:allf=t")
+        sepia = [
+            0.393 + 0.607 * k, 0.769 - 0.769 * k, 0.189 - 0.189 * k,
+            0.349 - 0.349 * k, 0.686 + 0.314 * k, 0.168 - 0.168 * k,
+            0.272 - 0.272 * k, 0.534 - 0.534 * k, 0.131 + 0.869 * k,
+        ]
+        names = ["rr", "rg", "rb", "gr", "gg", "gb", "br", "bg", "bb"]
+        filters.append("colorchannelmixer=" + ":".join(f"{n}={v:.4f}" for n, v in zip(names, sepia)))
+    return ",".join(filters)
+
+class VideoEffectsEngine:
+    """
+    Vectorized per-frame version of apply_video_effects for RGB uint8 video frames.
+
+    Built once per job from effect_settings and used as `clip.fl_image(engine.process)`. Stages run
+    in the same order as the PIL reference (sharpness -> saturation -> contrast -> brightness ->
+    vintage) and reproduce its clipping between stages, so output matches within a couple of levels:
+    - sharpness: 3x3 SMOOTH kernel (border pixels kept) blended with the frame
+    - saturation: one precomputed 3x3 matrix s*I + (1-s)*luma
+    - contrast + brightness: one 256-entry uint8 LUT, cached per frame mean luma
+    - vintage: grain from a pre-generated bank of noise tiles, then the sepia 3x3 matrix
+    Float/uint8 work buffers are kept per frame size and reused; each call returns a new array.
+    """
+    NOISE_TILE = 128
+    NOISE_BANK_SIZE = 16
+    LUMA = (0.299, 0.587, 0.114)
+
+    def __init__(self, effect_settings, seed=None):
+        s = effect_settings or {}
+        self.sharpness = float(s.get('effect_sharpness_intensity', 1.5)) if s.get('effect_sharpness', False) else None
+        self.saturation = float(s.get('effect_saturation_intensity', 1.3)) if s.get('effect_saturation', False) else None
+        self.contrast = float(s.get('effect_contrast_intensity', 1.2)) if s.get('effect_contrast', False) else None
+        self.brightness = float(s.get('effect_brightness_intensity', 1.15)) if s.get('effect_brightness', False) else None
+        self.grain = float(s.get('effect_vintage_intensity', 0.3)) if s.get('effect_vintage', False) else None
+        self._rng = np.random.default_rng(seed)
+        self._buffers = {}
+        self._lut_cache = {}
+
+        luma = np.array(self.LUMA, dtype=np.float32)
+        self._sat_matrix_t = None
+        if self.saturation is not None:
+            sat = self.saturation
+            matrix = sat * np.eye(3, dtype=np.float32) + (1.0 - sat) * np.outer(np.ones(3, dtype=np.float32), luma)
+            self._sat_matrix_t = np.ascontiguousarray(matrix.T, dtype=np.float32)
+        self._luma = luma.astype(np.float64)
+
+        self._sepia_matrix_t = None
+        self._noise_bank = None
+        if self.grain is not None:
+            g = self.grain
+            k = 1.0 - g
+            sepia = np.array([
+                [0.393 + 0.607 * k, 0.769 - 0.769 * k, 0.189 - 0.189 * k],
+                [0.349 - 0.349 * k, 0.686 + 0.314 * k, 0.168 - 0.168 * k],
+                [0.272 - 0.272 * k, 0.534 - 0.534 * k, 0.131 + 0.869 * k],
+            ], dtype=np.float32)
+            self._sepia_matrix_t = np.ascontiguousarray(sepia.T)
+            t = self.NOISE_TILE
+            bank = self._rng.standard_normal((self.NOISE_BANK_SIZE, t, t, 3), dtype=np.float32)
+            bank *= np.float32(g * 25)
+            self._noise_bank = bank
+
+    @property
+    def active(self):
+        return any(v is not None for v in (self.sharpness, self.saturation, self.contrast, self.brightness, self.grain))
+
+    def _get_buffers(self, h, w):
+        bufs = self._buffers.get((h, w))
+        if bufs is None:
+            bufs = {
+                "fa": np.empty((h, w, 3), dtype=np.float32),
+                "fb": np.empty((h, w, 3), dtype=np.float32),
+                "fc": np.empty((h, w, 3), dtype=np.float32) if self.sharpness is not None else None,
+                "u8a": np.empty((h, w, 3), dtype=np.uint8),
+                "u8b": np.empty((h, w, 3), dtype=np.uint8),
+                "noise": None,
+            }
+            if self._noise_bank is not None:
+                t = self.NOISE_TILE
+                bufs["noise"] = np.empty((-(-h // t) * t, -(-w // t) * t, 3), dtype=np.float32)
+            self._buffers[(h, w)] = bufs
+        return bufs
+
+    def _sharpen(self, src, bufs, out):
+        """ImageEnhance.Sharpness: blend(SMOOTH(img), img, factor) with the SMOOTH border left as-is."""
+        fa, fb, fc = bufs["fa"], bufs["fb"], bufs["fc"]
+        np.copyto(fa, src)
+        # 3x3 box sum (separable), then +4*center gives kernel [[1,1,1],[1,5,1],[1,1,1]]
+        np.add(fa[:-2], fa[1:-1], out=fc[1:-1])
+        fc[1:-1] += fa[2:]
+        fc[0] = 0  # border rows are overwritten below; keep them finite
+        fc[-1] = 0
+        np.add(fc[:, :-2], fc[:, 1:-1], out=fb[:, 1:-1])
+        fb[:, 1:-1] += fc[:, 2:]
+        np.multiply(fa, 4.0, out=fc)
+        inner = fb[1:-1, 1:-1]
+        inner += fc[1:-1, 1:-1]
+        inner *= np.float32(1.0 / 13.0)
+        inner += 0.5
+        np.floor(inner, out=inner)
+        fb[0] = fa[0]
+        fb[-1] = fa[-1]
+        fb[:, 0] = fa[:, 0]
+        fb[:, -1] = fa[:, -1]
+        # out = degenerate + factor * (img - degenerate)
+        fa -= fb
+        fa *= np.float32(self.sharpness)
+        fa += fb
+        np.clip(fa, 0, 255, out=fa)
+        np.copyto(out, fa, casting='unsafe')
+        return out
+
+    def _tone_lut(self, mean):
+        """
+        Contrast (around the frame's mean luma) followed by brightness, as one uint8 LUT.
+        Returns (lut8, lut16); lut16 maps two packed bytes at once, halving the lookups.
+        """
+        luts = self._lut_cache.get(mean)
+        if luts is None:
+            v = np.arange(256, dtype=np.float64)
+            if self.contrast is not None:
+                v = np.clip(np.trunc(mean + self.contrast * (v - mean)), 0, 255)
+            if self.brightness is not None:
+                v = np.clip(np.trunc(self.brightness * v), 0, 255)
+            lut8 = v.astype(np.uint8)
+            pairs = np.arange(65536, dtype=np.uint32)
+            lut16 = (lut8[pairs & 0xFF].astype(np.uint16) | (lut8[pairs >> 8].astype(np.uint16) << 8))
+            luts = (lut8, lut16)
+            self._lut_cache[mean] = luts
+        return luts
+
+    def _noise_frame(self, h, w, canvas):
+        """Fill `canvas` with randomly chosen tiles from the noise bank; returns the (h, w, 3) view."""
+        t = self.NOISE_TILE
+        nh, nw = canvas.shape[0] // t, canvas.shape[1] // t
+        blocks = canvas.reshape(nh, t, nw, t, 3)
+        picks = self._rng.integers(0, len(self._noise_bank), size=(nh, nw))
+        for i in range(nh):
+            for j in range(nw):
+                blocks[i, :, j] = self._noise_bank[picks[i, j]]
+        return canvas[:h, :w]
+
+    def process(self, frame):
+        """Apply the configured effects to one HxWx3 frame and return a new uint8 array."""
+        frame = np.asarray(frame)
+        if frame.dtype != np.uint8:
+            frame = frame.astype(np.uint8)
+        if frame.ndim != 3 or frame.shape[2] != 3 or not self.active:
+            return frame
+        h, w = frame.shape[:2]
+        bufs = self._get_buffers(h, w)
+        u8 = [bufs["u8a"], bufs["u8b"]]
+        cur = frame
+
+        def _next_u8():
+            return u8[1] if cur is u8[0] else u8[0]
+
+        if self.sharpness is not None and h >= 3 and w >= 3:
+            cur = self._sharpen(cur, bufs, _next_u8())
+
+        if self._sat_matrix_t is not None:
+            fa, fb = bufs["fa"], bufs["fb"]
+            np.copyto(fa, cur)
+            np.matmul(fa, self._sat_matrix_t, out=fb)
+            np.clip(fb, 0, 255, out=fb)
+            dst = _next_u8()
+            np.copyto(dst, fb, casting='unsafe')
+            cur = dst
+
+        if self.contrast is not None or self.brightness is not None:
+            mean = 0
+            if self.contrast is not None:
+                # Column sums over contiguous rows are much faster than a strided per-channel mean
+                channel_sums = cur.reshape(h, -1).sum(axis=0, dtype=np.uint32).reshape(-1, 3).sum(axis=0)
+                mean = int(float(np.dot(channel_sums, self._luma)) / (h * w) + 0.5)
+            lut8, lut16 = self._tone_lut(mean)
+            dst = _next_u8()
+            flat = np.ascontiguousarray(cur).reshape(-1)
+            if flat.size % 2 == 0:
+                np.take(lut16, flat.view(np.uint16), out=dst.reshape(-1).view(np.uint16))
+            else:
+                np.take(lut8, flat, out=dst.reshape(-1))
+            cur = dst
+
+        if self.grain is not None:
+            fa, fb = bufs["fa"], bufs["fb"]
+            np.copyto(fa, cur)
+            fa += self._noise_frame(h, w, bufs["noise"])
+            np.clip(fa, 0, 255, out=fa)
+            np.trunc(fa, out=fa)
+            np.matmul(fa, self._sepia_matrix_t, out=fb)
+            np.clip(fb, 0, 255, out=fb)
+            return fb.astype(np.uint8)
+
+        return cur.copy() if cur is not frame else frame.copy()
+
+def _segment_word_groups(segment, text, start_t, end_t, tpl):
+    """Split one transcript segment into caption groups of `tpl` words with start/end times."""
+    # Use word-level timestamps if available (CapCut-style auto-captions)
+    word_data = segment.get("words", [])
+    groups_with_timing = []
+    if word_data:
+        # Word-by-word captions like CapCut
+        for word_idx in range(0, len(word_data), tpl):
+            # Group up to tpl words together
+            word_group = word_data[word_idx:word_idx + tpl]
+            grp_text = " ".join([w.get("word", "").strip() for w in word_group])
+            # Use the start time of the first word and end time of the last word
+            groups_with_timing.append({
+                "text": grp_text,
+                "start": word_group[0].get("start", start_t),
+                "end": word_group[-1].get("end", end_t),
+                "words": word_group
+            })
+    else:
+        # Fallback: split text evenly if no word timestamps
+        words = text.split()
+        seg_dur = max(0.05, end_t - start_t)
+        raw_group_dur = seg_dur / max(1, len(words) // tpl + (1 if len(words) % tpl else 0))
+        for i in range(0, len(words), tpl):
+            g_start = start_t + (i // tpl) * raw_group_dur
+            groups_with_timing.append({
+                "text": " ".join(words[i:i+tpl]),
+                "start": g_start,
+                "end": min(end_t, g_start + raw_group_dur)
+            })
+    return groups_with_timing
+
+def build_caption_groups(caption_segments, words_per_caption=2, min_duration=0.25):
+    """
+    Flatten transcript segments into the timed caption groups that get burned into the video
+    (same grouping and timing rules as compose_final_video_with_static_blurred_bg).
+    Returns a list of {'text', 'start', 'end'} dicts, plus 'words' (the Whisper word timings)
+    when the segment has them.
+    """
+    tpl = max(1, int(words_per_caption or 1))
+    groups = []
+    for segment in caption_segments or []:
+        try:
+            start_t = float(segment.get("start", segment.get("start_time", 0)))
+            end_t = float(segment.get("end", segment.get("end_time", start_t + 3)))
+            text = normalize_text(segment.get("text", "").strip())
+        except Exception:
+            continue
+        if not text:
+            continue
+        for group in _segment_word_groups(segment, text, start_t, end_t, tpl):
+            g_start = group["start"]
+            g_dur = max(min_duration, group["end"] - group["start"])
+            if g_start >= end_t:
+                g_start = max(start_t, end_t - g_dur)
+            entry = {"text": group["text"], "start": g_start, "end": g_start + g_dur}
+            if group.get("words"):
+                entry["words"] = group["words"]
+            groups.append(entry)
+    return groups
+
+def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_segments, output_path, preferred_font=None, log=None, blur_radius=STATIC_BG_BLUR_RADIUS, bg_scale_extra=BG_SCALE_EXTRA, dim_factor=DIM_FACTOR, words_per_caption=2, effect_settings=None, config=None):
     """
     Compose final video with blurred background and caption overlays.
+    Output size, zoom, caption placement and fonts come from `config` (RenderConfig).
     
     FIXED ISSUES:
     - Removed duplicated and nested caption generation loops
@@ -2178,6 +6041,9 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
     - Verified caption layer creation and positioning
     - Ensured captions are properly composited onto final video
     """
+    if config is None:
+        config = RenderConfig.from_globals(preferred_font=preferred_font)
+    width, height = config.width, config.height
     try:
         log("Composing final video (with monitored export).")
     except Exception:
@@ -2191,21 +6057,22 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
     # build background (static blurred frame)
     t_mid = min(max(0.001, video_clip.duration / 2.0), max(0.001, video_clip.duration - 0.01))
     frame = video_clip.get_frame(t_mid)
+    frame_luma = frame_mean_luma(frame)  # contrast pivot for the ffmpeg effect filters
     img = Image.fromarray(frame)
     img_w, img_h = img.size
-    scale_needed = max(WIDTH / img_w, HEIGHT / img_h) * bg_scale_extra
+    scale_needed = max(width / img_w, height / img_h) * bg_scale_extra
     new_w = int(img_w * scale_needed)
     new_h = int(img_h * scale_needed)
     img = img.resize((new_w, new_h), Image.LANCZOS)
-    left = max(0, (new_w - WIDTH) // 2)
-    top = max(0, (new_h - HEIGHT) // 2)
-    img = img.crop((left, top, left + WIDTH, top + HEIGHT))
+    left = max(0, (new_w - width) // 2)
+    top = max(0, (new_h - height) // 2)
+    img = img.crop((left, top, left + width, top + height))
     img = img.filter(ImageFilter.GaussianBlur(blur_radius))
     img = ImageEnhance.Brightness(img).enhance(dim_factor)
     bg_static = ImageClip(np.array(img)).set_duration(video_clip.duration)
     
     try:
-        log(f"[compose] Background created: {WIDTH}x{HEIGHT}, blur={blur_radius}")
+        log(f"[compose] Background created: {width}x{height}, blur={blur_radius}")
     except Exception:
         pass
 
@@ -2213,10 +6080,10 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
     # Calculate scale to fill the canvas width while maintaining aspect ratio
     try:
         # Get user's zoom setting
-        zoom_factor = globals().get('VIDEO_ZOOM_SCALE', 1.0)
+        zoom_factor = config.video_zoom_scale
         
         # Scale to fill width (left/right borders)
-        scale_w = WIDTH / video_clip.w
+        scale_w = width / video_clip.w
         # Apply user's zoom factor
         fg_scale = scale_w * zoom_factor
     except Exception:
@@ -2226,16 +6093,12 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
     # Only the mixed_audio (TTS + music) should be used
     fg = video_clip.without_audio().resize(fg_scale).set_position(("center", "center")).set_duration(video_clip.duration)
     
-    # Apply video effects (CapCut-style) if enabled
-    if effect_settings and any([
-        effect_settings.get('effect_sharpness', False),
-        effect_settings.get('effect_saturation', False),
-        effect_settings.get('effect_contrast', False),
-        effect_settings.get('effect_brightness', False),
-        effect_settings.get('effect_vintage', False)
-    ]):
+    # Video effects (CapCut-style): the FFmpeg export applies them as native filters; the
+    # per-frame engine is only attached if we fall back to the MoviePy export below.
+    effects_engine = None
+    if effects_enabled(effect_settings):
         try:
-            log(f"[EFFECTS] Applying CapCut-style effects to video...")
+            log(f"[EFFECTS] Preparing CapCut-style effects...")
             active_effects = []
             if effect_settings.get('effect_sharpness'): active_effects.append('Resilience')
             if effect_settings.get('effect_saturation'): active_effects.append('Vibrance')
@@ -2244,11 +6107,10 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
             if effect_settings.get('effect_vintage'): active_effects.append('Vintage')
             log(f"[EFFECTS] Active effects: {', '.join(active_effects)}")
             
-            # Apply effects to each frame
-            fg = fg.fl_image(lambda frame: apply_video_effects(frame, effect_settings))
-            log(f"[EFFECTS] ✓ Effects applied successfully")
+            # Vectorized engine for the MoviePy path (apply_video_effects is the PIL reference)
+            effects_engine = VideoEffectsEngine(effect_settings)
         except Exception as e:
-            log(f"[EFFECTS] Warning: Could not apply effects: {e}")
+            log(f"[EFFECTS] Warning: Could not prepare effects: {e}")
     
     try:
         log(f"[compose] Foreground scaled: {fg_scale:.3f}x (fills canvas completely)")
@@ -2258,6 +6120,7 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
     # Build caption clips (FIXED: single clean loop, no duplication)
     caption_clips = []
     caption_data_for_ffmpeg = []  # Collect word-group caption data for FFmpeg export
+    caption_placements = []  # Timed sprites for the FFmpeg caption overlay track
     MIN_GROUP_DURATION = 0.25
     
     # Use the words_per_caption parameter (from UI control)
@@ -2267,6 +6130,26 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
         log(f"[COMPOSE] Using {tpl} word(s) per caption (CapCut-style)")
     except Exception:
         pass
+
+    # Batch stage: rasterize every caption group up front (process pool, cached by text + style)
+    group_texts = []
+    for segment in caption_segments:
+        try:
+            start_t = float(segment.get("start", segment.get("start_time", 0)))
+            end_t = float(segment.get("end", segment.get("end_time", start_t + 3)))
+            text = normalize_text(segment.get("text", "").strip())
+            if text:
+                group_texts.extend(g["text"] for g in _segment_word_groups(segment, text, start_t, end_t, tpl))
+        except Exception:
+            continue
+    try:
+        caption_sprites = render_caption_sprites(group_texts, config, preferred_font=preferred_font, log=log)
+    except Exception as e:
+        caption_sprites = {}
+        try:
+            log(f"[COMPOSE] Caption batch render failed ({e}), rendering per group")
+        except Exception:
+            pass
     
     for seg_idx, segment in enumerate(caption_segments):
         try:
@@ -2291,39 +6174,7 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
             except Exception:
                 pass
             
-            # Use word-level timestamps if available (CapCut-style auto-captions)
-            # Check if segment has word-level timing data
-            word_data = segment.get("words", [])
-            
-            if word_data:
-                # Word-by-word captions like CapCut
-                groups_with_timing = []
-                for word_idx in range(0, len(word_data), tpl):
-                    # Group up to tpl words together
-                    word_group = word_data[word_idx:word_idx + tpl]
-                    grp_text = " ".join([w.get("word", "").strip() for w in word_group])
-                    # Use the start time of the first word and end time of the last word
-                    grp_start = word_group[0].get("start", start_t)
-                    grp_end = word_group[-1].get("end", end_t)
-                    groups_with_timing.append({
-                        "text": grp_text,
-                        "start": grp_start,
-                        "end": grp_end
-                    })
-            else:
-                # Fallback: split text evenly if no word timestamps
-                words = text.split()
-                groups_with_timing = []
-                raw_group_dur = seg_dur / max(1, len(words) // tpl + (1 if len(words) % tpl else 0))
-                for i in range(0, len(words), tpl):
-                    grp_text = " ".join(words[i:i+tpl])
-                    g_start = start_t + (i // tpl) * raw_group_dur
-                    g_end = min(end_t, g_start + raw_group_dur)
-                    groups_with_timing.append({
-                        "text": grp_text,
-                        "start": g_start,
-                        "end": g_end
-                    })
+            groups_with_timing = _segment_word_groups(segment, text, start_t, end_t, tpl)
             
             for i, group_data in enumerate(groups_with_timing):
                 grp_text = group_data["text"]
@@ -2334,58 +6185,47 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
                 
                 try:
                     try:
-                        log(f"[COMPOSE]   Caption group {i+1}/{len(groups)}: '{grp_text}'")
+                        log(f"[COMPOSE]   Caption group {i+1}/{len(groups_with_timing)}: '{grp_text}'")
                         log(f"[COMPOSE]   Display time: {g_start:.2f}s - {g_start + g_dur:.2f}s (duration: {g_dur:.2f}s)")
                     except Exception:
                         pass
                     
-                    # generate PIL image for the caption group (FIXED: proper function call)
-                    pil_img = generate_caption_image(grp_text, preferred_font=preferred_font, log=log)
-                    if pil_img is None:
+                    # rendered caption sprite (RGB + float mask), shared across groups/jobs with the same text and style
+                    if grp_text in caption_sprites:
+                        sprite = caption_sprites[grp_text]
+                    else:
+                        sprite = CAPTION_SPRITES.get_or_render(grp_text, config, preferred_font=preferred_font, log=log)
+                    if sprite is None:
                         try:
                             log(f"[COMPOSE ERROR] generate_caption_image returned None for '{grp_text}'")
                         except Exception:
                             pass
                         continue
-                    
-                    # Ensure RGBA mode
-                    pil_rgba = pil_img.convert("RGBA")
-                    
+
                     # Verify alpha channel is not completely transparent (FIXED: added validation)
-                    alpha_channel = pil_rgba.split()[-1]
-                    alpha_arr_check = np.array(alpha_channel)
-                    if not np.any(alpha_arr_check > 0):  # Performance: short-circuits on first non-zero
+                    if not sprite.visible:
                         try:
                             log(f"[COMPOSE ERROR] Caption image for '{grp_text}' has completely transparent alpha channel!")
                         except Exception:
                             pass
                         continue
-                    
-                    try:
-                        log(f"[COMPOSE]   Alpha channel stats: min={alpha_arr_check.min()}, max={alpha_arr_check.max()}, mean={alpha_arr_check.mean():.1f}")
-                    except Exception:
-                        pass
-                    
-                    # convert to numpy arrays for moviepy ImageClip + mask (FIXED: proper mask handling)
-                    rgb_arr = np.array(pil_rgba.convert("RGB"))
-                    alpha_arr = np.array(pil_rgba.split()[-1]).astype("float32") / 255.0
-                    
+
                     # ImageClip is already imported at top of file
-                    img_clip = ImageClip(rgb_arr).set_start(g_start).set_duration(g_dur)
-                    mask_clip = ImageClip(alpha_arr, ismask=True).set_start(g_start).set_duration(g_dur)
+                    img_clip = ImageClip(sprite.rgb).set_start(g_start).set_duration(g_dur)
+                    mask_clip = ImageClip(sprite.mask, ismask=True).set_start(g_start).set_duration(g_dur)
                     img_clip = img_clip.set_mask(mask_clip)
                     
                     # Position: use CAPTION_Y_OFFSET for vertical positioning
                     # Negative offset moves captions up, positive moves down
-                    y_offset = globals().get('CAPTION_Y_OFFSET', 0)
+                    y_offset = config.caption_y_offset
                     if y_offset == 0:
                         # Default: bottom center
                         img_clip = img_clip.set_position(("center", "bottom"))
                     else:
                         # Custom position with offset from bottom
-                        # Lambda function to calculate position: (x, y) where y = HEIGHT - caption_height + offset
+                        # Lambda function to calculate position: (x, y) where y = height - caption_height + offset
                         # offset = -1080 → y = 1080 - h - 1080 = -h (top), offset = 0 → y = 1080 - h (bottom)
-                        img_clip = img_clip.set_position(lambda t: ("center", HEIGHT - img_clip.h + y_offset))
+                        img_clip = img_clip.set_position(lambda t: ("center", height - img_clip.h + y_offset))
                     
                     caption_clips.append(img_clip)
                     
@@ -2395,9 +6235,10 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
                         'start': g_start,
                         'end': g_start + g_dur
                     })
+                    caption_placements.append({'start': g_start, 'end': g_start + g_dur, 'sprite': sprite})
                     
                     try:
-                        y_offset_value = globals().get('CAPTION_Y_OFFSET', 0)
+                        y_offset_value = config.caption_y_offset
                         log(f"[COMPOSE]   ✓ Caption clip created successfully")
                         log(f"[COMPOSE]   Position: Y offset = {y_offset_value}px")
                         if y_offset_value < 0:
@@ -2430,6 +6271,7 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
     try:
         log(f"[COMPOSE] ═══════════════════════════════════════════════")
         log(f"[COMPOSE] Total caption clips created: {len(caption_clips)}")
+        log(f"[COMPOSE] Caption sprite cache: {CAPTION_SPRITES.stats()}")
         log(f"[COMPOSE] ═══════════════════════════════════════════════")
     except Exception:
         pass
@@ -2441,13 +6283,8 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
     # Determine which caption data to use for FFmpeg
     captions_for_ffmpeg = caption_data_for_ffmpeg if caption_data_for_ffmpeg else caption_segments
     
-    # FFmpeg drawtext filters don't scale well with hundreds of captions
-    # If we have too many captions (>100), skip FFmpeg drawtext and use MoviePy overlay instead
-    MAX_FFMPEG_CAPTIONS = 100
-    if len(captions_for_ffmpeg) > MAX_FFMPEG_CAPTIONS:
-        log(f"[EXPORT] ⚠️ Too many captions ({len(captions_for_ffmpeg)}) for FFmpeg drawtext filters")
-        log(f"[EXPORT] Using MoviePy overlay with FFmpeg NVENC encoding instead (still fast)")
-        try_ffmpeg_export = False  # Skip FFmpeg drawtext, use MoviePy overlay + FFmpeg encoding
+    # Rendered captions reach FFmpeg as one pre-rendered overlay track, or else as an ASS file
+    # burned in by libass; either way the caption count no longer forces the MoviePy path.
     
     if try_ffmpeg_export and caption_segments:
         try:
@@ -2467,6 +6304,18 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
             audio_clip.write_audiofile(audio_temp_path, fps=44100, codec='mp3', verbose=False, logger=None)
             log(f"[EXPORT] Audio saved to: {audio_temp_path}")
             
+            # Caption overlay track: one PNG strip per caption change, overlaid once
+            caption_overlay = None
+            if caption_placements:
+                try:
+                    overlay_path, overlay_y = write_caption_overlay_track(
+                        caption_placements, config, os.path.join(temp_dir, "captions"),
+                        duration=video_clip.duration, log=log)
+                    if overlay_path:
+                        caption_overlay = (overlay_path, overlay_y)
+                except Exception as e_track:
+                    log(f"[EXPORT] ⚠️ Caption overlay track failed ({e_track}), using ASS captions")
+            
             # Get foreground video path (should be from pre-rendered temp file)
             # If fg has a filename attribute, use it; otherwise we need to save it
             fg_video_path = None
@@ -2477,7 +6326,7 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
                 # Need to save foreground video first
                 fg_video_path = os.path.join(temp_dir, "foreground.mp4")
                 log(f"[EXPORT] Saving foreground video to: {fg_video_path}")
-                fg.write_videofile(fg_video_path, fps=FPS, codec='libx264', audio=False, verbose=False, logger=None, preset='ultrafast')
+                fg.write_videofile(fg_video_path, fps=config.fps, codec='libx264', audio=False, verbose=False, logger=None, preset='ultrafast')
             
             # Try FFmpeg export with word-by-word caption data
             ffmpeg_export_successful = _export_with_ffmpeg_filters(
@@ -2486,9 +6335,13 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
                 caption_segments=captions_for_ffmpeg,
                 audio_path=audio_temp_path,
                 output_path=output_path,
-                video_width=WIDTH,
-                video_height=HEIGHT,
-                log_fn=log
+                video_width=width,
+                video_height=height,
+                log_fn=log,
+                config=config,
+                effect_settings=effect_settings,
+                caption_overlay=caption_overlay,
+                effects_mean_luma=frame_luma
             )
             
             if ffmpeg_export_successful:
@@ -2514,6 +6367,9 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
     if not ffmpeg_export_successful:
         try:
             log("[EXPORT] Using MoviePy export (fallback or FFmpeg disabled)...")
+            if effects_engine is not None:
+                fg = fg.fl_image(effects_engine.process)
+                log(f"[EFFECTS] ✓ Effects applied per frame")
             # Verify audio clip before compositing
             if audio_clip is None:
                 try:
@@ -2526,7 +6382,7 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
                 except Exception:
                     pass
             
-            final = CompositeVideoClip([bg_static, fg] + caption_clips, size=(WIDTH, HEIGHT)).set_audio(audio_clip)
+            final = CompositeVideoClip([bg_static, fg] + caption_clips, size=(width, height)).set_audio(audio_clip)
             try:
                 log(f"[COMPOSE] ✓ Final composition created successfully")
                 log(f"[COMPOSE] Layers: background + foreground + {len(caption_clips)} caption overlays")
@@ -2554,11 +6410,15 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
         CHECK_INTERVAL = 8
         MAX_ATTEMPTS_PER_CODEC = 1
 
+        # The writer runs in its own thread; keep its console output in this job's log
+        output_route = current_output_route()
+
         def _run_write(final_clip, out_path, codec_name, ffmpeg_params, threads_setting, result_dict):
+            route_output_to(output_route)
             try:
                 final_clip.write_videofile(
                     out_path,
-                    fps=FPS,
+                    fps=config.fps,
                     codec=codec_name,
                     audio_codec="aac",
                     audio_bitrate="192k",
@@ -2660,9 +6520,11 @@ def compose_final_video_with_static_blurred_bg(video_clip, audio_clip, caption_s
         return False
 
 # ----------------- Processing pipeline (single job) -----------------
-def crop_precise_top_bottom_return_cropped(video_clip, log, top_ratio=None, bottom_ratio=None):
-    tr = CROP_TOP_RATIO if top_ratio is None else top_ratio
-    br = CROP_BOTTOM_RATIO if bottom_ratio is None else bottom_ratio
+def crop_precise_top_bottom_return_cropped(video_clip, log, top_ratio=None, bottom_ratio=None, config=None):
+    if config is None:
+        config = RenderConfig.from_globals()
+    tr = config.crop_top_ratio if top_ratio is None else top_ratio
+    br = config.crop_bottom_ratio if bottom_ratio is None else bottom_ratio
     log(f"Cropping using ratios top={tr:.4f}, bottom={br:.4f} (return cropped clip).")
     original_width, original_height = video_clip.size
     crop_top = int(original_height * tr)
@@ -2673,28 +6535,18 @@ def crop_precise_top_bottom_return_cropped(video_clip, log, top_ratio=None, bott
     log(f"Crop done. Cropped size: {cropped_video.size}, duration: {cropped_video.duration:.2f}s")
     return cropped_video
 
-def _compose_with_pref_font(preferred_font, video_clip, audio_clip, caption_segments, output_path, log, blur_radius=STATIC_BG_BLUR_RADIUS, bg_scale_extra=BG_SCALE_EXTRA, dim_factor=DIM_FACTOR, words_per_caption=2, effect_settings=None):
-    """Helper to temporarily override global CAPTION_FONT_PREFERRED for the duration of compose."""
-    old = globals().get('CAPTION_FONT_PREFERRED')
+def _compose_with_pref_font(preferred_font, video_clip, audio_clip, caption_segments, output_path, log, blur_radius=STATIC_BG_BLUR_RADIUS, bg_scale_extra=BG_SCALE_EXTRA, dim_factor=DIM_FACTOR, words_per_caption=2, effect_settings=None, config=None):
+    """Compose with a per-job preferred font (carried in the RenderConfig, no global override)."""
+    if config is None:
+        config = RenderConfig.from_globals(preferred_font=preferred_font)
+    elif preferred_font and preferred_font != config.caption_font_preferred:
+        config = replace(config, caption_font_preferred=preferred_font, caption_font_path=None)
     try:
-        if preferred_font:
-            globals()['CAPTION_FONT_PREFERRED'] = preferred_font
-            try:
-                if log: log(f"[FONT] Overriding CAPTION_FONT_PREFERRED -> {preferred_font}")
-            except Exception:
-                pass
-        # call compose with keyword args to avoid positional mismatch
-        return compose_final_video_with_static_blurred_bg(video_clip=video_clip, audio_clip=audio_clip, caption_segments=caption_segments, output_path=output_path, log=log, blur_radius=blur_radius, bg_scale_extra=bg_scale_extra, dim_factor=dim_factor, words_per_caption=words_per_caption, effect_settings=effect_settings)
-    finally:
-        try:
-            if preferred_font and old is not None:
-                globals()['CAPTION_FONT_PREFERRED'] = old
-                try:
-                    if log: log(f"[FONT] Restored CAPTION_FONT_PREFERRED -> {old}")
-                except Exception:
-                    pass
-        except Exception:
-            pass
+        if preferred_font and log: log(f"[FONT] Using preferred font for this job -> {preferred_font}")
+    except Exception:
+        pass
+    # call compose with keyword args to avoid positional mismatch
+    return compose_final_video_with_static_blurred_bg(video_clip=video_clip, audio_clip=audio_clip, caption_segments=caption_segments, output_path=output_path, log=log, blur_radius=blur_radius, bg_scale_extra=bg_scale_extra, dim_factor=dim_factor, words_per_caption=words_per_caption, effect_settings=effect_settings, config=config)
 
 
 
@@ -2722,28 +6574,30 @@ def adjust_video_speed(video_clip, audio_duration, log, max_change=2.0):
     log(f"Speed adjusted by factor {factor:.4f}. New duration: {adjusted.duration:.2f}s")
     return adjusted
 
-def make_music_match_duration(music_clip, target_duration, log):
+def make_music_match_duration(music_clip, target_duration, log, gain=None):
+    gain = MUSIC_GAIN if gain is None else gain
     if music_clip.duration <= 0.01:
         raise ValueError("Music clip invalid / durată zero.")
     if abs(music_clip.duration - target_duration) < 0.01:
-        return music_clip.volumex(MUSIC_GAIN).set_duration(target_duration)
+        return music_clip.volumex(gain).set_duration(target_duration)
     if music_clip.duration < target_duration:
         loops = int(np.ceil(target_duration / music_clip.duration))
         log(f"Music too short ({music_clip.duration:.2f}s). Looping {loops} times to reach {target_duration:.2f}s")
         looped = concatenate_audioclips([music_clip] * loops).subclip(0, target_duration)
-        return looped.volumex(MUSIC_GAIN)
+        return looped.volumex(gain)
     else:
         log(f"Music longer ({music_clip.duration:.2f}s). Trimming to {target_duration:.2f}s and applying fadeout {MUSIC_FADEOUT_SECONDS}s.")
         trimmed = music_clip.subclip(0, target_duration)
         trimmed = trimmed.fx(audio_fadeout, MUSIC_FADEOUT_SECONDS)
-        return trimmed.volumex(MUSIC_GAIN).set_duration(target_duration)
+        return trimmed.volumex(gain).set_duration(target_duration)
 
-def process_single_job(video_path, voice_path, music_path, requested_output_path, q, preferred_font=None, custom_top_ratio=None, custom_bottom_ratio=None, mirror_video=False, words_per_caption=2, use_4k=False, blur_radius=None, bg_scale_extra=None, dim_factor=None, effect_settings=None, use_ai_voice=None, target_language=None, translation_enabled=None, tts_language=None):
+def process_single_job(video_path, voice_path, music_path, requested_output_path, q, preferred_font=None, custom_top_ratio=None, custom_bottom_ratio=None, mirror_video=False, words_per_caption=2, use_4k=False, blur_radius=None, bg_scale_extra=None, dim_factor=None, effect_settings=None, use_ai_voice=None, target_language=None, translation_enabled=None, tts_language=None, silence_threshold_ms=None):
     def log(s):
         q.put(str(s))
-    old_stdout, old_stderr = sys.stdout, sys.stderr
-    sys.stdout = sys.stderr = QueueWriter(q)
+    # Route this thread's stdout/stderr into the job log (other jobs keep their own routes)
+    route_output_to(log)
     temp_fg = None
+    ok = False
     
     # Log received crop parameters for debugging
     log(f"[DEBUG] Received custom_top_ratio: {custom_top_ratio}")
@@ -2768,23 +6622,23 @@ def process_single_job(video_path, voice_path, music_path, requested_output_path
         translation_enabled = globals().get('TRANSLATION_ENABLED', False)
     if tts_language is None:
         tts_language = globals().get('TTS_LANGUAGE', 'en')
+    if silence_threshold_ms is None:
+        silence_threshold_ms = 300
     
-    # Set 4K mode if requested
-    # NOTE: Using global state for IS_4K_MODE. This is safe because:
-    # 1. Jobs are processed sequentially (one at a time) via queue_worker
-    # 2. Single jobs via on_run_single run in separate threads but don't overlap
-    # 3. The old value is saved and restored in the finally block
-    old_is_4k = globals().get('IS_4K_MODE', False)
+    # Resolution mode is per job (use_4k); the global IS_4K_MODE is left untouched so
+    # jobs running in parallel don't flip it under each other.
     if use_4k:
-        globals()['IS_4K_MODE'] = True
         log("[RESOLUTION] Job set to 4K mode (2160x3840)")
     else:
-        globals()['IS_4K_MODE'] = False
         log("[RESOLUTION] Job set to HD mode (1080x1920)")
     
     try:
-        load_preferred_font_cached(preferred_font or CAPTION_FONT_PREFERRED, CAPTION_FONT_SIZE, log=log)
-        if REQUIRE_FONT_BANGERS and (LOADED_FONT_PATH is None or ("bangers" not in str(LOADED_FONT_PATH).lower())):
+        # Snapshot all render settings for this job; nothing below reads the mutable globals
+        config = RenderConfig.from_globals(
+            use_4k=use_4k, preferred_font=preferred_font,
+            blur_radius=blur_radius, bg_scale_extra=bg_scale_extra, dim_factor=dim_factor,
+        ).with_resolved_font(log=log)
+        if REQUIRE_FONT_BANGERS and "bangers" not in str(config.font_label()).lower():
             log("Error: Bangers font required but not found. Aborting job.")
             return
 
@@ -2800,10 +6654,10 @@ def process_single_job(video_path, voice_path, music_path, requested_output_path
             log("[VOICE] No separate voice file provided - extracting audio from video...")
             voice_from_video = True
             # Extract audio from video to a temporary file
-            temp_voice_path = tempfile.mktemp(suffix='.mp3', prefix='extracted_voice_')
+            temp_voice_path = None
             try:
-                video_clip_for_audio = VideoFileClip(video_path)
-                if video_clip_for_audio.audio is None:
+                video_info = probe_media(video_path, log=log)
+                if video_info is not None and not video_info.has_audio:
                     log("[VOICE ERROR] Video has no audio track!")
                     if not use_ai_voice:
                         log("[VOICE ERROR] Cannot proceed without voice audio or AI voice enabled.")
@@ -2811,10 +6665,16 @@ def process_single_job(video_path, voice_path, music_path, requested_output_path
                     log("[VOICE] Will generate AI voice from text/captions only.")
                     voice_path = None
                 else:
-                    video_clip_for_audio.audio.write_audiofile(temp_voice_path, logger=None)
+                    # Stream copy (no re-encode) plus the 16 kHz PCM Whisper needs, in one ffmpeg call
+                    temp_voice_path = extract_voice_from_video(video_path, log=log)
+                    if temp_voice_path is None:
+                        log("[VOICE] Falling back to MoviePy audio export...")
+                        temp_voice_path = tempfile.mktemp(suffix='.mp3', prefix='extracted_voice_')
+                        audio_for_voice = AudioFileClip(video_path)
+                        audio_for_voice.write_audiofile(temp_voice_path, logger=None)
+                        audio_for_voice.close()
                     voice_path = temp_voice_path
                     log(f"[VOICE] ✓ Extracted audio from video: {temp_voice_path}")
-                    video_clip_for_audio.close()
             except Exception as e:
                 log(f"[VOICE ERROR] Failed to extract audio from video: {e}")
                 if not use_ai_voice:
@@ -2826,13 +6686,19 @@ def process_single_job(video_path, voice_path, music_path, requested_output_path
             log(f"Error: MUSIC missing: {music_path}")
             return
 
-        # Load video first to get dimensions
-        original_clip = VideoFileClip(video_path)
-        cropped = crop_precise_top_bottom_return_cropped(original_clip, log, top_ratio=custom_top_ratio, bottom_ratio=custom_bottom_ratio)
-
-        orig_w, orig_h = original_clip.size
-        crop_top = int(orig_h * (CROP_TOP_RATIO if custom_top_ratio is None else custom_top_ratio))
-        crop_bottom = int(orig_h * (CROP_BOTTOM_RATIO if custom_bottom_ratio is None else custom_bottom_ratio))
+        # Dimensions and duration come from the cached probe; a MoviePy reader is only opened if the
+        # compose fallback below needs the frames (or the probe failed)
+        video_info = probe_media(video_path, log=log)
+        original_clip = None
+        if video_info is not None and video_info.has_video:
+            orig_w, orig_h = video_info.display_size
+            source_duration = video_info.duration
+        else:
+            original_clip = VideoFileClip(video_path)
+            orig_w, orig_h = original_clip.size
+            source_duration = original_clip.duration
+        crop_top = int(orig_h * (config.crop_top_ratio if custom_top_ratio is None else custom_top_ratio))
+        crop_bottom = int(orig_h * (config.crop_bottom_ratio if custom_bottom_ratio is None else custom_bottom_ratio))
         crop_h = orig_h - crop_top - crop_bottom
         crop_w = orig_w
         crop_x = 0
@@ -2840,23 +6706,23 @@ def process_single_job(video_path, voice_path, music_path, requested_output_path
         
         # Log crop values for debugging
         log(f"[CROP] Custom crop enabled: {custom_top_ratio is not None or custom_bottom_ratio is not None}")
-        log(f"[CROP] Top ratio: {custom_top_ratio if custom_top_ratio is not None else CROP_TOP_RATIO} ({crop_top}px)")
-        log(f"[CROP] Bottom ratio: {custom_bottom_ratio if custom_bottom_ratio is not None else CROP_BOTTOM_RATIO} ({crop_bottom}px)")
+        log(f"[CROP] Top ratio: {custom_top_ratio if custom_top_ratio is not None else config.crop_top_ratio} ({crop_top}px)")
+        log(f"[CROP] Bottom ratio: {custom_bottom_ratio if custom_bottom_ratio is not None else config.crop_bottom_ratio} ({crop_bottom}px)")
         log(f"[CROP] Original: {orig_w}x{orig_h}, Cropped: {crop_w}x{crop_h}")
 
         try:
-            min_scale_to_fit = min(WIDTH / cropped.w, HEIGHT / cropped.h)
+            min_scale_to_fit = min(config.width / crop_w, config.height / crop_h)
         except Exception:
             min_scale_to_fit = 1.0
         
         # Calculate scale with dynamic limits based on resolution mode
         # In 4K mode, we need higher scale limits to maintain same zoom effect
-        is_4k = globals().get('IS_4K_MODE', False)
+        is_4k = config.is_4k
         base_scale_factor = 1.03
         max_scale_limit = 1.06
         
         # Get user's zoom setting
-        user_zoom = globals().get('VIDEO_ZOOM_SCALE', 1.0)
+        user_zoom = config.video_zoom_scale
         
         if is_4k:
             # For 4K, double the scale factors to maintain same visual zoom
@@ -2875,29 +6741,26 @@ def process_single_job(video_path, voice_path, music_path, requested_output_path
         scale_h = max(1, int(round(crop_h * fg_scale)))
         
         # Get caption offset for logging
-        y_offset = globals().get('CAPTION_Y_OFFSET', 0)
+        y_offset = config.caption_y_offset
         offset_desc = f"moving {abs(y_offset)}px {'UP' if y_offset < 0 else 'DOWN'} from bottom" if y_offset != 0 else "at BOTTOM (default)"
         
         # Enhanced detailed logging - now that we have all values
         log("═══════════════ PROCESSING JOB ═══════════════")
-        log(f"VIDEO: {os.path.basename(video_path)} ({orig_w}x{orig_h}, {original_clip.duration:.1f}s)")
-        log(f"VOICE: {os.path.basename(voice_path)} (volume: {VOICE_GAIN:.1f}x)")
-        log(f"MUSIC: {os.path.basename(music_path)} (volume: {MUSIC_GAIN:.2f}x)")
+        log(f"VIDEO: {os.path.basename(video_path)} ({orig_w}x{orig_h}, {source_duration:.1f}s)")
+        log(f"VOICE: {os.path.basename(voice_path)} (volume: {config.voice_gain:.1f}x)")
+        log(f"MUSIC: {os.path.basename(music_path)} (volume: {config.music_gain:.2f}x)")
         
         # Font information
         font_info = "default"
-        if LOADED_FONT_PATH:
-            font_info = f"{os.path.basename(LOADED_FONT_PATH)}"
-            try:
-                if LOADED_FONT_FAMILY:
-                    font_info += f" ({LOADED_FONT_FAMILY})"
-            except:
-                pass
+        if config.caption_font_path:
+            font_info = f"{os.path.basename(config.caption_font_path)}"
+        elif config.font_label():
+            font_info = str(config.font_label())
         log(f"FONT: {font_info}")
         
         # Crop information
-        crop_top_pct = (custom_top_ratio if custom_top_ratio is not None else CROP_TOP_RATIO) * 100
-        crop_bottom_pct = (custom_bottom_ratio if custom_bottom_ratio is not None else CROP_BOTTOM_RATIO) * 100
+        crop_top_pct = (custom_top_ratio if custom_top_ratio is not None else config.crop_top_ratio) * 100
+        crop_bottom_pct = (custom_bottom_ratio if custom_bottom_ratio is not None else config.crop_bottom_ratio) * 100
         
         # Check NVENC support before logging
         use_nvenc = USE_GPU_IF_AVAILABLE and ffmpeg_supports_nvenc(PREFERRED_NVENC_CODEC)
@@ -2907,19 +6770,52 @@ def process_single_job(video_path, voice_path, music_path, requested_output_path
         log(f"SCALE: {fg_scale:.2f}x → {scale_w}x{scale_h}")
         log(f"CAPTION OFFSET: {y_offset}px ({offset_desc})")
         log(f"MIRROR: {'Enabled' if mirror_video else 'Disabled'}")
-        log(f"OUTPUT: {os.path.basename(output_path)} ({WIDTH}x{HEIGHT}, {FPS}fps{',' if use_nvenc else ''}{' NVENC' if use_nvenc else ''})")
+        log(f"OUTPUT: {os.path.basename(output_path)} ({config.width}x{config.height}, {config.fps}fps{',' if use_nvenc else ''}{' NVENC' if use_nvenc else ''})")
         log("══════════════════════════════════════════════")
 
+        # Single-pass render: decode the source once and encode once (effects become ffmpeg
+        # filters). AI voice jobs still need the MoviePy pipeline below.
+        caption_segments = None
+        single_pass_skip = None
+        if SINGLE_PASS_RENDER:
+            single_pass_skip = ("AI voice jobs use the compose pipeline" if use_ai_voice else
+                                single_pass_skip_reason(video_path, voice_path, music_path,
+                                                        (crop_x, crop_y, crop_w, crop_h), log=log))
+            if single_pass_skip:
+                log(f"[SINGLE-PASS] Skipped: {single_pass_skip}")
+        if SINGLE_PASS_RENDER and not single_pass_skip:
+            log("[SINGLE-PASS] Transcribing captions from original voice...")
+            caption_segments = transcribe_captions(
+                voice_path,
+                log,
+                translate_to=target_language if translation_enabled else None
+            )
+            with STAGE_LIMITER.slot("encode", log=log):
+                ok = render_job_single_pass(
+                    video_path, voice_path, music_path, output_path, caption_segments, config,
+                    (crop_x, crop_y, crop_w, crop_h), mirror_video=mirror_video,
+                    words_per_caption=words_per_caption, use_nvenc=use_nvenc, log=log,
+                    effect_settings=effect_settings,
+                )
+            if ok:
+                log(f"Job finished successfully. Output: {output_path}")
+                return ok
+            log("[SINGLE-PASS] Falling back to pre-render + compose pipeline")
+
         temp_dir = tempfile.mkdtemp(prefix="tiktok_prerender_")
         temp_fg = os.path.join(temp_dir, "fg_prerender.mp4")
         log(f"Attempting ffmpeg pre-render -> {os.path.basename(temp_fg)} (nvenc={use_nvenc})")
-        prer_ok = pre_render_foreground_ffmpeg(video_path, temp_fg, crop_x, crop_y, crop_w, crop_h, scale_w, scale_h, FPS, use_nvenc, log)
+        with STAGE_LIMITER.slot("encode", log=log):
+            prer_ok = pre_render_foreground_ffmpeg(video_path, temp_fg, crop_x, crop_y, crop_w, crop_h, scale_w, scale_h, config.fps, use_nvenc, log)
 
         if prer_ok and os.path.exists(temp_fg):
             log("Using pre-rendered foreground clip.")
             fg_clip = VideoFileClip(temp_fg)
         else:
             log("Pre-render failed or missing — falling back to MoviePy in-memory crop/resize.")
+            if original_clip is None:
+                original_clip = VideoFileClip(video_path)
+            cropped = crop_precise_top_bottom_return_cropped(original_clip, log, top_ratio=custom_top_ratio, bottom_ratio=custom_bottom_ratio, config=config)
             fg_clip = cropped.resize(fg_scale).set_position(("center", "center")).set_duration(cropped.duration)
         
         # Remove original audio from video clip to prevent duplicate audio
@@ -2937,18 +6833,20 @@ def process_single_job(video_path, voice_path, music_path, requested_output_path
 
         # Handle audio based on whether we have a voice file
         if voice_path and os.path.exists(voice_path):
-            voice_clip = AudioFileClip(voice_path).volumex(VOICE_GAIN)
+            voice_clip = AudioFileClip(voice_path).volumex(config.voice_gain)
             music_clip = AudioFileClip(music_path)
             target_duration = voice_clip.duration
             log(f"Voice duration (target): {target_duration:.2f}s")
-            music_matched = make_music_match_duration(music_clip, target_duration, log)
+            music_matched = make_music_match_duration(music_clip, target_duration, log, gain=config.music_gain)
             mixed_audio = CompositeAudioClip([music_matched, voice_clip.set_start(0)]).set_duration(target_duration)
             
             synced_video = adjust_video_speed(fg_clip, mixed_audio.duration, log, max_change=2.0)
             
             # Transcribe captions ONLY if AI voice replacement is NOT enabled
             # If AI voice is enabled, we'll transcribe from the TTS audio later
-            if not use_ai_voice:
+            if not use_ai_voice and caption_segments is not None:
+                log("[CAPTION] Reusing captions transcribed for the single-pass attempt")
+            elif not use_ai_voice:
                 log("[CAPTION] Transcribing captions from original voice...")
                 caption_segments = transcribe_captions(
                     voice_path, 
@@ -2968,7 +6866,7 @@ def process_single_job(video_path, voice_path, music_path, requested_output_path
             log("[NO VOICE] Using video duration as target")
             target_duration = fg_clip.duration
             music_clip = AudioFileClip(music_path)
-            music_matched = make_music_match_duration(music_clip, target_duration, log)
+            music_matched = make_music_match_duration(music_clip, target_duration, log, gain=config.music_gain)
             mixed_audio = music_matched.set_duration(target_duration)
             synced_video = fg_clip
             caption_segments = []
@@ -2996,44 +6894,77 @@ def process_single_job(video_path, voice_path, music_path, requested_output_path
                 log("━"*60)
                 log("")
                 
-                tts_audio_path = replace_voice_with_tts(
-                    caption_segments, 
-                    language=tts_language,
-                    log=log
-                )
+                log(f"[AI VOICE] Using silence threshold: {silence_threshold_ms}ms")
+                with STAGE_LIMITER.slot("tts", log=log):
+                    # Per-segment synthesis: clip offsets on the assembled track give the caption timing
+                    tts_audio_path, timed_segments = synthesize_tts_timeline(
+                        caption_segments,
+                        language=tts_language,
+                        log=log,
+                        max_pause_ms=silence_threshold_ms
+                    )
+                    if tts_audio_path is None:
+                        log("[AI VOICE] Per-segment synthesis failed - falling back to one TTS request for the whole text")
+                        tts_audio_path = replace_voice_with_tts(
+                            caption_segments, 
+                            language=tts_language,
+                            log=log
+                        )
                 if tts_audio_path:
                     # Replace voice_clip with TTS audio
                     try:
                         log("")
                         log("[AI VOICE] 🔊 Integrating AI voice into video...")
                         
-                        # STEP 1: Remove all silences from TTS audio FIRST for continuous speech
-                        log("")
-                        log("[AI VOICE] 📝 Removing silences from TTS audio for continuous playback...")
-                        silence_threshold_ms = self.silence_threshold_var.get()
-                        log(f"[AI VOICE] Using silence threshold: {silence_threshold_ms}ms")
-                        compressed_tts_path, silence_map = remove_silence_from_audio(
-                            tts_audio_path, 
-                            output_path=None,
-                            log=log,
-                            min_silence_ms=silence_threshold_ms
-                        )
-                        
-                        # STEP 2: Re-transcribe captions from the SILENCE-REMOVED audio
-                        # This ensures captions match exactly with the final compressed audio
-                        # CapCut-style: transcribe from final audio for perfect sync
-                        log("")
-                        log("[AI VOICE] 📝 TRANSCRIBING CAPTIONS FROM SILENCE-REMOVED TTS AUDIO")
-                        log("[AI VOICE] CapCut-style: Captions generated from final compressed audio...")
-                        caption_segments = transcribe_captions(
-                            compressed_tts_path,  # Use compressed audio instead of original
-                            log, 
-                            translate_to=None  # Already translated during TTS generation
-                        )
-                        log(f"[AI VOICE] ✓ Generated {len(caption_segments)} caption segments with perfect timing")
-                        log("")
+                        if timed_segments is not None:
+                            # Clips were trimmed and laid out with capped pauses - nothing left to
+                            # remove, and segment timings come straight from the assembly
+                            compressed_tts_path = tts_audio_path
+                            caption_segments = timed_segments
+                            log(f"[AI VOICE] ✓ {len(caption_segments)} caption segments timed from the TTS timeline (no re-transcription)")
+                            log("")
+                        else:
+                            # STEP 1: Remove all silences from TTS audio FIRST for continuous speech
+                            log("")
+                            log("[AI VOICE] 📝 Removing silences from TTS audio for continuous playback...")
+                            compressed_tts_path, silence_map = remove_silence_from_audio(
+                                tts_audio_path, 
+                                output_path=None,
+                                log=log,
+                                min_silence_ms=silence_threshold_ms
+                            )
+                            
+                            # STEP 2: Time the captions on the SILENCE-REMOVED audio. The text is known,
+                            # so align it to the TTS audio and remap through the silence map; a second
+                            # Whisper pass is only needed if that finds no speech
+                            aligned_segments = None
+                            if TTS_CAPTION_ALIGNMENT == 'energy':
+                                log("")
+                                log("[AI VOICE] 📝 Aligning caption text to the TTS audio (no re-transcription)...")
+                                try:
+                                    aligned_segments = align_tts_captions(tts_audio_path, caption_segments,
+                                                                          silence_map=silence_map, log=log)
+                                except Exception as e:
+                                    log(f"[AI VOICE] Alignment failed: {e}")
+                            if aligned_segments:
+                                caption_segments = aligned_segments
+                                log(f"[AI VOICE] ✓ {len(caption_segments)} caption segments timed by alignment")
+                                log("")
+                            else:
+                                # This ensures captions match exactly with the final compressed audio
+                                # CapCut-style: transcribe from final audio for perfect sync
+                                log("")
+                                log("[AI VOICE] 📝 TRANSCRIBING CAPTIONS FROM SILENCE-REMOVED TTS AUDIO")
+                                log("[AI VOICE] CapCut-style: Captions generated from final compressed audio...")
+                                caption_segments = transcribe_captions(
+                                    compressed_tts_path,  # Use compressed audio instead of original
+                                    log, 
+                                    translate_to=None  # Already translated during TTS generation
+                                )
+                                log(f"[AI VOICE] ✓ Generated {len(caption_segments)} caption segments with perfect timing")
+                                log("")
                         
-                        # No need for timestamp remapping - captions already match the compressed audio!
+                        # Captions are now on the compressed audio's timeline
                         
                         # STEP 2.5: Extend last caption to cover full video duration
                         # This ensures captions display throughout the entire video
@@ -3049,7 +6980,7 @@ def process_single_job(video_path, voice_path, music_path, requested_output_path
                                 log(f"[AI VOICE] Extended last caption from {last_caption_end:.2f}s to {tts_final_duration:.2f}s (full video duration)")
                         
                         # Load the silence-removed TTS audio
-                        tts_clip = AudioFileClip(compressed_tts_path).volumex(VOICE_GAIN)
+                        tts_clip = AudioFileClip(compressed_tts_path).volumex(config.voice_gain)
                         
                         # Use TTS duration as the new target - DO NOT speed up/slow down the voice
                         tts_duration = tts_clip.duration
@@ -3058,7 +6989,7 @@ def process_single_job(video_path, voice_path, music_path, requested_output_path
                         
                         # Adjust music to match TTS duration
                         log(f"[AI VOICE] Adjusting music to match TTS duration...")
-                        music_matched = make_music_match_duration(music_clip, tts_duration, log)
+                        music_matched = make_music_match_duration(music_clip, tts_duration, log, gain=config.music_gain)
                         
                         # Composite ONLY TTS + music (no original voice to avoid duplicate audio)
                         log(f"[AI VOICE] 🎬 Compositing audio tracks (TTS + Music only)...")
@@ -3113,7 +7044,8 @@ def process_single_job(video_path, voice_path, music_path, requested_output_path
         log("━"*60)
         log("")
         
-        ok = _compose_with_pref_font(preferred_font, synced_video, mixed_audio, caption_segments, output_path, log, blur_radius=blur_radius, bg_scale_extra=bg_scale_extra, dim_factor=dim_factor, words_per_caption=words_per_caption, effect_settings=effect_settings)
+        with STAGE_LIMITER.slot("encode", log=log):
+            ok = _compose_with_pref_font(preferred_font, synced_video, mixed_audio, caption_segments, output_path, log, blur_radius=blur_radius, bg_scale_extra=bg_scale_extra, dim_factor=dim_factor, words_per_caption=words_per_caption, effect_settings=effect_settings, config=config)
         if ok:
             log(f"Job finished successfully. Output: {output_path}")
         else:
@@ -3170,26 +7102,34 @@ def process_single_job(video_path, voice_path, music_path, requested_output_path
         except Exception:
             pass
 
-    # restore stdout/stderr no matter what
-    try:
-        sys.stdout = old_stdout
-        sys.stderr = old_stderr
-    except Exception:
-        pass
-    
-    # Restore IS_4K_MODE
-    try:
-        globals()['IS_4K_MODE'] = old_is_4k
-    except Exception:
-        pass
+        # Stop routing this thread's stdout/stderr into the job log
+        route_output_to(None)
 
+    return ok
 
-def queue_worker(jobs, q):
+
+def queue_worker(jobs, q, max_workers=None):
+    """
+    Run the job queue on a pool of worker threads.
+
+    Up to QUEUE_MAX_WORKERS jobs run at once; heavy stages inside each job are limited by
+    STAGE_SLOTS (e.g. one Whisper inference, N encodes), so independent stages of different
+    jobs overlap. With more than one worker every job message is tagged "[JOB i/N]".
+    """
     def log(s):
         q.put(str(s))
-    log(f"[QUEUE] Starting queue with {len(jobs)} job(s).")
-    for i, job in enumerate(jobs, start=1):
-        log(f"\n===== START JOB {i}/{len(jobs)} =====")
+    total = len(jobs)
+    workers = max_workers if max_workers is not None else globals().get('QUEUE_MAX_WORKERS', 1)
+    workers = max(1, min(int(workers), max(1, total)))
+    STAGE_LIMITER.configure(globals().get('STAGE_SLOTS', {}))
+    log(f"[QUEUE] Starting queue with {total} job(s) on {workers} worker(s). Stage slots: {STAGE_LIMITER.limits()}")
+
+    progress_lock = threading.Lock()
+    progress = {"done": 0, "failed": 0}
+
+    def _run_job(i, job):
+        job_q = JobLogQueue(q, f"[JOB {i}/{total}] " if workers > 1 else "")
+        job_q.put(f"\n===== START JOB {i}/{total} =====")
         # Extract effect settings from job
         effect_settings = {
             'effect_sharpness': job.get("effect_sharpness", False),
@@ -3203,21 +7143,38 @@ def queue_worker(jobs, q):
             'effect_vintage': job.get("effect_vintage", False),
             'effect_vintage_intensity': job.get("effect_vintage_intensity", 0.3)
         }
-        process_single_job(job["video"], job["voice"], job["music"], job["output"], q, job.get("font"),
-                           custom_top_ratio=job.get("custom_top_ratio"),
-                           custom_bottom_ratio=job.get("custom_bottom_ratio"),
-                           mirror_video=job.get("mirror_video", False),
-                           words_per_caption=job.get("words_per_caption", 2),
-                           use_4k=job.get("use_4k", False),
-                           blur_radius=job.get("blur_radius"),
-                           bg_scale_extra=job.get("bg_scale_extra"),
-                           dim_factor=job.get("dim_factor"),
-                           effect_settings=effect_settings,
-                           use_ai_voice=job.get("use_ai_voice", False),
-                           target_language=job.get("target_language", 'none'),
-                           translation_enabled=job.get("translation_enabled", False),
-                           tts_language=job.get("tts_language", 'en'))
-        log(f"===== END JOB {i} =====\n")
+        ok = process_single_job(job["video"], job["voice"], job["music"], job["output"], job_q, job.get("font"),
+                                custom_top_ratio=job.get("custom_top_ratio"),
+                                custom_bottom_ratio=job.get("custom_bottom_ratio"),
+                                mirror_video=job.get("mirror_video", False),
+                                words_per_caption=job.get("words_per_caption", 2),
+                                use_4k=job.get("use_4k", False),
+                                blur_radius=job.get("blur_radius"),
+                                bg_scale_extra=job.get("bg_scale_extra"),
+                                dim_factor=job.get("dim_factor"),
+                                effect_settings=effect_settings,
+                                use_ai_voice=job.get("use_ai_voice", False),
+                                target_language=job.get("target_language", 'none'),
+                                translation_enabled=job.get("translation_enabled", False),
+                                tts_language=job.get("tts_language", 'en'),
+                                silence_threshold_ms=job.get("silence_threshold_ms", 300))
+        job_q.put(f"===== END JOB {i} =====\n")
+        with progress_lock:
+            progress["done"] += 1
+            if not ok:
+                progress["failed"] += 1
+            done = progress["done"]
+        log(f"[QUEUE] Job {i}/{total} {'finished' if ok else 'finished with errors'} ({done}/{total} done)")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tiktok-job") as pool:
+        futures = {pool.submit(_run_job, i, job): i for i, job in enumerate(jobs, start=1)}
+        for fut in as_completed(futures):
+            try:
+                fut.result()
+            except Exception as e:
+                log(f"[QUEUE] Job {futures[fut]}/{total} crashed: {e}")
+    if progress["failed"]:
+        log(f"[QUEUE] {progress['failed']} of {total} job(s) finished with errors.")
     log("[QUEUE_DONE]")
 
 # ----------------- GUI: responsive layout with PanedWindow -----------------
@@ -4025,6 +7982,17 @@ class App:
         self.jobs = []
 
         self.root.after(200, self.poll_queue)
+
+        # Probe ffmpeg once in the background; every job reuses FFMPEG_CAPS afterwards
+        def _probe_ffmpeg():
+            caps = FFMPEG_CAPS.refresh().summary()
+            if caps["available"]:
+                self.q.put(f"[FFMPEG] {caps['version']} | NVENC: {', '.join(caps['nvenc']) or 'none'} | "
+                           f"hwaccels: {', '.join(caps['hwaccels']) or 'none'} | "
+                           f"caption filters: {', '.join(caps['caption_filters']) or 'none'}")
+            else:
+                self.q.put("[FFMPEG] ffmpeg not found on PATH — rendering will fail until it is installed")
+        threading.Thread(target=_probe_ffmpeg, daemon=True).start()
         try:
             self._update_color_canvases()
         except Exception:
@@ -4783,10 +8751,10 @@ class App:
                     self._preview_clip = VideoFileClip(path)
                     dur = self._preview_clip.duration
                 except Exception:
-                    # fallback if caching fails
-                    clip = VideoFileClip(path)
-                    dur = clip.duration
-                    clip.close()
+                    # fallback if caching fails: only the duration is needed here
+                    dur = probe_media_duration(path)
+                    if dur is None:
+                        raise RuntimeError(f"Could not read duration of {path}")
                 try:
                     self.time_scale.to = max(0.1, dur)
                     self.time_scale.set(min(self.time_var.get(), self.time_scale.to))
@@ -5313,7 +9281,7 @@ class App:
                 'effect_vintage_intensity': job.get("effect_vintage_intensity", 0.3)
             }
             # Run in background thread so GUI remains responsive
-            t = threading.Thread(target=process_single_job, args=(job["video"], job["voice"], job["music"], job["output"], q, job.get("font")), kwargs={"custom_top_ratio": job.get("custom_top_ratio"), "custom_bottom_ratio": job.get("custom_bottom_ratio"), "mirror_video": job.get("mirror_video", False), "words_per_caption": job.get("words_per_caption", 2), "use_4k": job.get("use_4k", False), "blur_radius": job.get("blur_radius"), "bg_scale_extra": job.get("bg_scale_extra"), "dim_factor": job.get("dim_factor"), "effect_settings": effect_settings, "use_ai_voice": job.get("use_ai_voice", False), "target_language": job.get("target_language", 'none'), "translation_enabled": job.get("translation_enabled", False), "tts_language": job.get("tts_language", 'en')}, daemon=True)
+            t = threading.Thread(target=process_single_job, args=(job["video"], job["voice"], job["music"], job["output"], q, job.get("font")), kwargs={"custom_top_ratio": job.get("custom_top_ratio"), "custom_bottom_ratio": job.get("custom_bottom_ratio"), "mirror_video": job.get("mirror_video", False), "words_per_caption": job.get("words_per_caption", 2), "use_4k": job.get("use_4k", False), "blur_radius": job.get("blur_radius"), "bg_scale_extra": job.get("bg_scale_extra"), "dim_factor": job.get("dim_factor"), "effect_settings": effect_settings, "use_ai_voice": job.get("use_ai_voice", False), "target_language": job.get("target_language", 'none'), "translation_enabled": job.get("translation_enabled", False), "tts_language": job.get("tts_language", 'en'), "silence_threshold_ms": job.get("silence_threshold_ms", 300)}, daemon=True)
             t.start()
             try:
                 self.log_widget.config(state='normal')
@@ -5331,7 +9299,7 @@ class App:
         target_language = self.target_language_var.get()
         translation_enabled = self.translation_enabled_var.get()
         tts_language = self.tts_language_var.get()
-        process_single_job(video, voice, music, output, self.q, custom_top_ratio=top_ratio, custom_bottom_ratio=bottom_ratio, words_per_caption=words_per_caption, use_ai_voice=use_ai_voice, target_language=target_language, translation_enabled=translation_enabled, tts_language=tts_language)
+        process_single_job(video, voice, music, output, self.q, custom_top_ratio=top_ratio, custom_bottom_ratio=bottom_ratio, words_per_caption=words_per_caption, use_ai_voice=use_ai_voice, target_language=target_language, translation_enabled=translation_enabled, tts_language=tts_language, silence_threshold_ms=self.silence_threshold_var.get())
         self.q.put("[SINGLE_DONE]")
 
     def run_queue(self):
@@ -0,0 +1,26 @@
+"""
+Worker side of parallel CPU transcription (tiktok_full_gui.transcribe_parallel).
+
+Kept apart from the GUI module so worker processes only import torch and whisper: the pool is
+started with a forkserver/spawn context, and each worker loads its own copy of the model once in
+init() and then transcribes chunks with transcribe().
+"""
+
+_MODEL = None
+_OPTIONS = {}
+
+
+def init(model_name, threads, options):
+    """Process pool initializer: split the CPU cores between workers and load the model on CPU."""
+    global _MODEL, _OPTIONS
+    import torch
+    import whisper
+
+    torch.set_num_threads(max(1, threads))
+    _MODEL = whisper.load_model(model_name, device="cpu")
+    _OPTIONS = dict(options)
+
+
+def transcribe(audio):
+    """Transcribe one chunk's float32 16 kHz samples; returns its segments."""
+    return _MODEL.transcribe(audio, fp16=False, **_OPTIONS)["segments"]